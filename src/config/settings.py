@@ -29,8 +29,46 @@ class Settings:
     LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
     LOG_FORMAT = '%(asctime)s | %(levelname)-8s | %(name)-15s | %(message)s'
 
+    # Strategy Optimizer (V22.2)
+    OPTIMIZER_WORKERS = int(os.environ.get("OPTIMIZER_WORKERS", "1"))  # Procesos del torneo (1 = secuencial, 0 = todos los cores)
+    OPTIMIZER_MAX_COMBINATIONS = int(os.environ.get("OPTIMIZER_MAX_COMBINATIONS", "50"))  # Por símbolo
+    OPTIMIZER_SEARCH = os.environ.get("OPTIMIZER_SEARCH", "grid")  # grid | random | halving (opt-in)
+    OPTIMIZER_VALIDATE_TOP_K = int(os.environ.get("OPTIMIZER_VALIDATE_TOP_K", "5"))  # Finalistas con rolling validation
+    OPTIMIZER_WALK_FORWARD_FOLDS = int(os.environ.get("OPTIMIZER_WALK_FORWARD_FOLDS", "0"))  # 0 = sin walk-forward (opt-in)
+    OPTIMIZER_WALK_FORWARD_TRAIN = int(os.environ.get("OPTIMIZER_WALK_FORWARD_TRAIN", "500"))  # Velas de train por fold
+    OPTIMIZER_WALK_FORWARD_TEST = int(os.environ.get("OPTIMIZER_WALK_FORWARD_TEST", "100"))  # Velas OOS por fold
+
+    # Candle Store (V22.2): cache local de velas compartida (src/data, igual que SQLite)
+    CANDLE_STORE_DIR = os.environ.get(
+        "CANDLE_STORE_DIR",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'candles')
+    )
+
     # Infraestructura (Redis)
     REDIS_HOST = os.environ.get("REDIS_HOST", "redis")
     REDIS_PORT = int(os.environ.get("REDIS_PORT", 6379))
+    REDIS_SOCKET_TIMEOUT = float(os.environ.get("REDIS_SOCKET_TIMEOUT", "5"))  # Pool request/response (Pub/Sub sin timeout)
+    REDIS_HEALTH_CHECK_INTERVAL = int(os.environ.get("REDIS_HEALTH_CHECK_INTERVAL", "30"))  # Segundos de inactividad antes de validar
+    REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS", "50"))  # Por pool y proceso
+
+    # Transporte de mensajes (V22.2): "pubsub" (fire-and-forget) | "streams" (consumer groups + ack)
+    MESSAGE_TRANSPORT = os.environ.get("MESSAGE_TRANSPORT", "pubsub").lower()
+    MESSAGE_CODEC = os.environ.get("MESSAGE_CODEC", "json").lower()  # "json" | "msgpack" (los lectores aceptan ambos)
+    STREAM_MAXLEN = int(os.environ.get("STREAM_MAXLEN", "10000"))  # Entradas por stream (aprox.)
+    STREAM_BATCH_SIZE = int(os.environ.get("STREAM_BATCH_SIZE", "100"))  # Entradas por XREADGROUP
+    STREAM_BLOCK_MS = int(os.environ.get("STREAM_BLOCK_MS", "5000"))
+    STREAM_CLAIM_IDLE_MS = int(os.environ.get("STREAM_CLAIM_IDLE_MS", "60000"))  # Pendientes de consumidores caídos
+    STREAM_PARTITIONS = int(os.environ.get("STREAM_PARTITIONS", "1"))  # Particiones de market_data por símbolo
+    BRAIN_STREAM_PARTITIONS = [int(p) for p in os.environ.get("BRAIN_STREAM_PARTITIONS", "").split(',') if p.strip()] or None  # None = todas
+
+    # Brain multi-timeframe (V22.2): barras construidas desde el stream de 1m
+    BRAIN_TIMEFRAMES = [tf.strip() for tf in os.environ.get("BRAIN_TIMEFRAMES", "5m,15m,1h,4h").split(',') if tf.strip()]
+    BRAIN_TIMEFRAME_BARS = int(os.environ.get("BRAIN_TIMEFRAME_BARS", "200"))  # Barras cerradas por timeframe
+
+    # Brain sharded (V22.2): N procesos, cada uno lee sus particiones de market_data
+    # (requiere MESSAGE_TRANSPORT=streams y STREAM_PARTITIONS >= BRAIN_SHARDS)
+    BRAIN_SHARDS = int(os.environ.get("BRAIN_SHARDS", "1"))  # 1 = proceso único (modo clásico)
+    BRAIN_REBALANCE_INTERVAL = int(os.environ.get("BRAIN_REBALANCE_INTERVAL", "10"))  # Segundos entre chequeos del coordinador
+    BRAIN_WARMUP_WORKERS = int(os.environ.get("BRAIN_WARMUP_WORKERS", "8"))  # Series (símbolo, timeframe) cargadas en paralelo al arrancar
 
 config = Settings()
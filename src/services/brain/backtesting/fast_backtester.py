@@ -2,12 +2,16 @@
 Fast Backtester - V18
 =====================
 Motor de backtesting optimizado para evaluación rápida de estrategias.
+
+V22.2: Ruta vectorizada - señales de toda la serie (generate_signals) y
+posiciones/equity calculadas con NumPy, sin bucle Python por vela.
 """
 
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
+from ..indicators import IndicatorSet, IndicatorCache
 
 
 @dataclass
@@ -42,16 +46,26 @@ class FastBacktester:
     
     Ejecuta un backtest completo en < 100ms para períodos de 1000 velas.
     Optimizado para el "Torneo de Estrategias".
+    
+    V22.2: Por defecto usa strategy.generate_signals() + run_signals()
+    (sin bucle Python por vela). vectorized=False conserva el bucle
+    vela a vela como referencia. Con un IndicatorCache las series se
+    comparten entre todas las combinaciones que se backtestean.
     """
     
-    def __init__(self, initial_capital: float = 10000.0, commission: float = 0.001):
+    def __init__(self, initial_capital: float = 10000.0, commission: float = 0.001,
+                 vectorized: bool = True, cache: Optional[IndicatorCache] = None):
         """
         Args:
             initial_capital: Capital inicial para el backtest
             commission: Comisión por operación (0.001 = 0.1%)
+            vectorized: Usar señales vectorizadas (True) o el bucle vela a vela (False)
+            cache: IndicatorCache compartido durante un torneo (None = sin memoización)
         """
         self.initial_capital = initial_capital
         self.commission = commission
+        self.vectorized = vectorized
+        self.cache = cache
     
     def run(self, strategy, price_data: List[float]) -> BacktestResult:
         """
@@ -66,20 +80,174 @@ class FastBacktester:
         """
         if len(price_data) < strategy.get_required_history() + 10:
             # No hay suficientes datos
-            return BacktestResult(
-                strategy_name=strategy.name,
-                params=strategy.params,
-                total_return=0.0,
-                sharpe_ratio=0.0,
-                max_drawdown=100.0,
-                win_rate=0.0,
-                total_trades=0,
-                final_capital=self.initial_capital,
-                initial_capital=self.initial_capital,
-                score=0.0
+            return self._empty_result(strategy)
+        
+        prices = np.asarray(price_data, dtype=float)
+        
+        if self.vectorized:
+            return self.run_signals(strategy, prices, strategy.generate_signals(prices, cache=self.cache))
+        
+        return self._run_loop(strategy, prices)
+    
+    def run_signals(self, strategy, prices: np.ndarray, signals: np.ndarray) -> BacktestResult:
+        """
+        V22.2: Backtest vectorizado a partir de señales precalculadas (ver _simulate).
+        
+        Args:
+            strategy: Estrategia (nombre, params y get_required_history)
+            prices: Array de precios
+            signals: Array de señales (1 = BUY, -1 = SELL, 0 = nada) de generate_signals()
+        
+        Returns:
+            BacktestResult con métricas de performance
+        """
+        prices = np.asarray(prices, dtype=float)
+        required = strategy.get_required_history()
+        if len(prices) < required + 10:
+            return self._empty_result(strategy)
+        
+        equity_curve, _, capital_after, final_capital = self._simulate(prices[required:], np.asarray(signals)[required:])
+        return self._build_result(strategy, equity_curve, capital_after - self.initial_capital, final_capital)
+    
+    def run_range(self, strategy, price_data: List[float], start: int, end: int) -> BacktestResult:
+        """
+        V22.2: Backtest de las velas [start, end) con señales de toda la serie.
+        
+        Las señales se calculan sobre price_data completo (memoizadas en el
+        cache si hay uno), así que en start los indicadores ya están calientes
+        y varios tramos de la misma serie reutilizan el mismo cálculo. Las
+        señales son causales (la vela i solo usa precios <= i): no hay look-ahead.
+        run_range(s, p, 0, len(p)) equivale a run(s, p).
+        
+        Args:
+            strategy: Instancia de StrategyInterface
+            price_data: Serie completa [más antiguo -> más reciente]
+            start: Primera vela a operar
+            end: Vela final (exclusiva)
+        """
+        prices = np.asarray(price_data, dtype=float)
+        required = strategy.get_required_history()
+        first_bar = max(start, required)
+        if end - first_bar < 10 or end > len(prices):
+            return self._empty_result(strategy)
+        
+        if self.cache is not None:
+            signals = self.cache.signals(strategy, prices)
+        else:
+            signals = strategy.generate_signals(prices)
+        
+        equity_curve, _, capital_after, final_capital = self._simulate(prices[first_bar:end], signals[first_bar:end])
+        return self._build_result(strategy, equity_curve, capital_after - self.initial_capital, final_capital)
+    
+    def run_windows(self, strategy, price_data: List[float], windows: Dict[str, int],
+                    cache: Optional[IndicatorCache] = None) -> Dict[str, Optional[BacktestResult]]:
+        """
+        V22.2: Backtest sobre varias ventanas finales (ej: últimas 168/360/720 velas)
+        con una sola simulación.
+        
+        Señales y equity se calculan una vez sobre la ventana más larga; las
+        métricas de cada ventana salen de su tramo final de la curva de equity
+        (reescalado al capital inicial). La ventana más larga coincide con
+        run(); en las cortas los indicadores ya llegan calientes y una
+        posición abierta antes de la ventana se valora a mercado al inicio.
+        
+        Args:
+            strategy: Instancia de StrategyInterface
+            price_data: Precios [más antiguo -> más reciente]
+            windows: {nombre: velas}
+            cache: IndicatorCache para compartir series entre estrategias
+        
+        Returns:
+            {nombre: BacktestResult}, None para ventanas más largas que los datos
+        """
+        prices = np.asarray(price_data, dtype=float)
+        results: Dict[str, Optional[BacktestResult]] = {name: None for name in windows}
+        fitting = {name: size for name, size in windows.items() if len(prices) >= size}
+        if not fitting:
+            return results
+        
+        required = strategy.get_required_history()
+        longest = prices[-max(fitting.values()):]
+        if len(longest) < required + 10:
+            for name in fitting:
+                results[name] = self._empty_result(strategy)
+            return results
+        
+        signals = strategy.generate_signals(longest, cache=cache if cache is not None else self.cache)
+        equity_curve, exit_bars, capital_after, final_capital = self._simulate(longest[required:], signals[required:])
+        evaluated_bars = len(longest) - required
+        
+        for name, size in fitting.items():
+            if size < required + 10:
+                results[name] = self._empty_result(strategy)
+                continue
+            
+            # Primera vela de la ventana (en coordenadas de la simulación) y reescalado
+            first_bar = max(0, evaluated_bars - size)
+            scale = self.initial_capital / equity_curve[first_bar]
+            window_pnls = capital_after[exit_bars >= first_bar] * scale - self.initial_capital
+            
+            results[name] = self._build_result(
+                strategy,
+                equity_curve[first_bar:] * scale,
+                window_pnls,
+                final_capital * scale
             )
         
-        prices = np.array(price_data)
+        return results
+    
+    def _simulate(self, prices: np.ndarray, signals: np.ndarray):
+        """
+        Simula la ejecución de señales (ya sin velas de warm-up) con NumPy.
+        
+        Misma semántica que el bucle vela a vela: BUY abre largo si no hay
+        posición, SELL cierra si la hay, y la posición abierta al final se
+        cierra al último precio.
+        
+        Returns:
+            (equity_curve, exit_bars, capital_after, final_capital)
+            - equity_curve: Capital inicial + equity tras cada vela
+            - exit_bars: Vela de cierre de cada trade
+            - capital_after: Capital tras cerrar cada trade
+            - final_capital: Capital final con la posición cerrada
+        """
+        fee = 1 - self.commission
+        
+        # Estado tras cada vela = última señal no nula (BUY repetido o SELL sin posición no cambian nada)
+        last_signal_index = np.maximum.accumulate(np.where(signals != 0, np.arange(len(signals)), -1))
+        in_position = (last_signal_index >= 0) & (signals[np.maximum(last_signal_index, 0)] > 0)
+        
+        was_in_position = np.concatenate(([False], in_position[:-1]))
+        entries = np.flatnonzero(in_position & ~was_in_position)
+        exits = np.flatnonzero(~in_position & was_in_position)
+        
+        # Posición abierta al final: cierre forzado al último precio
+        if len(exits) < len(entries):
+            exits = np.append(exits, len(prices) - 1)
+        exit_prices = prices[exits]
+        entry_prices = prices[entries]
+        
+        # Capital antes de cada trade y tras cerrarlo
+        trade_growth = fee / entry_prices * exit_prices * fee
+        capital_after = self.initial_capital * np.cumprod(trade_growth)
+        capital_before = np.concatenate(([self.initial_capital], capital_after[:-1]))
+        
+        # Equity: en posición = cantidad * precio, fuera = capital tras el último cierre
+        trade_number = np.cumsum(in_position & ~was_in_position) - 1
+        closed_trades = np.cumsum(~in_position & was_in_position)
+        capital_levels = np.concatenate(([self.initial_capital], capital_after))
+        
+        equity = capital_levels[closed_trades]
+        if len(entries):
+            open_trade = trade_number[in_position]
+            quantity = capital_before[open_trade] * fee / entry_prices[open_trade]
+            equity[in_position] = quantity * prices[in_position]
+        
+        equity_curve = np.concatenate(([self.initial_capital], equity))
+        return equity_curve, exits, capital_after, float(capital_levels[-1])
+    
+    def _run_loop(self, strategy, prices: np.ndarray) -> BacktestResult:
+        """Backtest vela a vela (referencia de la versión vectorizada)"""
         capital = self.initial_capital
         position = 0.0  # Cantidad de activo que tenemos
         position_entry_price = 0.0
@@ -89,13 +257,27 @@ class FastBacktester:
         
         # Iterar sobre cada período (después de tener suficiente historia)
         required = strategy.get_required_history()
+        price_list = prices.tolist()
+        
+        # V22.2: Estrategias incrementales - un solo IndicatorSet alimentado
+        # barra a barra (O(N) total en lugar de reconstruir la historia en cada barra)
+        indicators = None
+        if strategy.supports_incremental:
+            indicators = IndicatorSet()
+            indicators.require_all(strategy.get_indicator_specs().values())
+            for price in price_list[:required]:
+                indicators.update(price)
         
         for i in range(required, len(prices)):
-            current_price = prices[i]
-            history = prices[:i].tolist()
+            current_price = price_list[i]
             
             # Evaluar estrategia
-            result = strategy.evaluate(current_price, history)
+            if indicators is not None:
+                indicators.update(current_price)
+                result = strategy.evaluate_indicators(current_price, indicators)
+            else:
+                history = price_list[:i]
+                result = strategy.evaluate(current_price, history)
             
             # Ejecutar señales
             if result.signal == "BUY" and position == 0:
@@ -141,6 +323,35 @@ class FastBacktester:
         
         final_capital = capital if position == 0 else position * prices[-1]
         
+        trade_pnls = np.array([t['pnl'] for t in trades])
+        return self._build_result(strategy, np.array(equity_curve), trade_pnls, final_capital)
+    
+    def _empty_result(self, strategy) -> BacktestResult:
+        """Resultado neutro cuando no hay suficientes datos"""
+        return BacktestResult(
+            strategy_name=strategy.name,
+            params=strategy.params,
+            total_return=0.0,
+            sharpe_ratio=0.0,
+            max_drawdown=100.0,
+            win_rate=0.0,
+            total_trades=0,
+            final_capital=self.initial_capital,
+            initial_capital=self.initial_capital,
+            score=0.0
+        )
+    
+    def _build_result(self, strategy, equity_curve: np.ndarray, trade_pnls: np.ndarray,
+                      final_capital: float) -> BacktestResult:
+        """
+        Calcula métricas y score a partir de la curva de equity y el PnL de cada trade.
+        
+        Args:
+            strategy: Estrategia evaluada
+            equity_curve: Equity inicial + equity tras cada vela evaluada
+            trade_pnls: PnL de cada trade (capital tras cerrar - capital inicial)
+            final_capital: Capital final (con la posición cerrada)
+        """
         # Calcular métricas
         total_return = (final_capital - self.initial_capital) / self.initial_capital * 100
         
@@ -152,15 +363,15 @@ class FastBacktester:
             sharpe_ratio = 0
         
         # Max Drawdown
-        equity_array = np.array(equity_curve)
+        equity_array = np.asarray(equity_curve)
         running_max = np.maximum.accumulate(equity_array)
         drawdown = (equity_array - running_max) / running_max * 100
         max_drawdown = abs(np.min(drawdown)) if len(drawdown) > 0 else 0
         
         # Win Rate
-        if trades:
-            winning_trades = sum(1 for t in trades if t['pnl'] > 0)
-            win_rate = winning_trades / len(trades) * 100
+        if len(trade_pnls):
+            winning_trades = int(np.sum(trade_pnls > 0))
+            win_rate = winning_trades / len(trade_pnls) * 100
         else:
             win_rate = 0
         
@@ -181,7 +392,7 @@ class FastBacktester:
             sharpe_ratio=sharpe_ratio,
             max_drawdown=max_drawdown,
             win_rate=win_rate,
-            total_trades=len(trades),
+            total_trades=len(trade_pnls),
             final_capital=final_capital,
             initial_capital=self.initial_capital,
             score=score
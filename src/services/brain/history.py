@@ -0,0 +1,114 @@
+"""
+OHLCV History - V22.2
+=====================
+Historial OHLCV acotado por símbolo/timeframe sobre arrays NumPy
+preasignados (ring buffer): append O(1) sin realocar ni crecer.
+
+Cada columna se guarda dos veces (buffer espejado de 2 x capacity): las
+últimas N velas siempre son un slice contiguo, así las lecturas son vistas
+sin copia en orden cronológico.
+"""
+
+import numpy as np
+from typing import Dict, Iterable, Optional
+
+# Columnas del ring (timestamp en segundos, igual que market_data)
+OHLCV_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+_FIELD_INDEX = {name: i for i, name in enumerate(OHLCV_FIELDS)}
+
+
+class OhlcvRing:
+    """
+    Últimas `capacity` velas OHLCV.
+
+    Al llenarse, cada append sobrescribe la vela más antigua. Las columnas
+    (close, high, ... o column(name)) son vistas de solo lectura sobre el
+    buffer: válidas hasta el próximo append (copiar si se necesitan después).
+
+    Uso:
+        ring = OhlcvRing(200)
+        ring.append({'timestamp': 1707350400, 'open': 1, 'high': 2, 'low': 0.5, 'close': 1.5, 'volume': 10})
+        closes = ring.close          # np.ndarray contiguo, sin copia
+        previous = ring.close[:-1]   # también sin copia
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros((len(OHLCV_FIELDS), 2 * capacity), dtype=np.float64)
+        self._next = 0
+        self._size = 0
+        self.total = 0  # Velas agregadas desde la creación (no se acota)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, candle: Dict[str, float]):
+        """Agrega una vela {timestamp, open, high, low, close, volume} (O(1))"""
+        pos = self._next
+        mirror = pos + self.capacity
+        data = self._data
+        for i, name in enumerate(OHLCV_FIELDS):
+            data[i, pos] = data[i, mirror] = candle.get(name, 0.0)
+        self._next = (pos + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, candles: Iterable[Dict[str, float]]):
+        """Agrega un bloque de velas en orden cronológico (una escritura por columna)"""
+        candles = list(candles)
+        if not candles:
+            return
+        block = np.array([[candle.get(name, 0.0) for name in OHLCV_FIELDS] for candle in candles[-self.capacity:]],
+                         dtype=np.float64).T
+        positions = (self._next + np.arange(block.shape[1])) % self.capacity
+        self._data[:, positions] = block
+        self._data[:, positions + self.capacity] = block
+        self._next = int(positions[-1] + 1) % self.capacity
+        self._size = min(self._size + block.shape[1], self.capacity)
+        self.total += len(candles)
+
+    def _window(self) -> slice:
+        if self._size < self.capacity:
+            return slice(0, self._size)
+        return slice(self._next, self._next + self.capacity)
+
+    def column(self, name: str) -> np.ndarray:
+        """Columna en orden cronológico [más antigua -> más reciente] (vista sin copia)"""
+        view = self._data[_FIELD_INDEX[name], self._window()]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self.column('timestamp')
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.column('open')
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.column('high')
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.column('low')
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.column('close')
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.column('volume')
+
+    def last(self) -> Optional[Dict[str, float]]:
+        """Vela más reciente como dict (None si está vacío)"""
+        if not self._size:
+            return None
+        return dict(zip(OHLCV_FIELDS, self._data[:, self._next - 1].tolist()))
+
+    def to_records(self):
+        """Velas como lista de dicts en orden cronológico (copia)"""
+        columns = [self.column(name).tolist() for name in OHLCV_FIELDS]
+        return [dict(zip(OHLCV_FIELDS, row)) for row in zip(*columns)]
@@ -0,0 +1,45 @@
+"""
+Incremental Indicators - V22.2
+==============================
+Indicadores técnicos con estado y actualización O(1) por vela.
+
+El Brain alimenta un IndicatorSet por símbolo con cada vela de market_data
+y las estrategias leen los valores actuales en lugar de recalcularlos
+desde todo el historial en cada tick.
+
+El submódulo series ofrece los mismos indicadores sobre la serie completa
+(NumPy vectorizado) para backtesting, e IndicatorCache los memoiza durante
+un torneo.
+"""
+
+from .base import IncrementalIndicator
+from .moving_average import EmaIndicator, RollingStatsIndicator, RollingStats
+from .momentum import RsiIndicator, MacdIndicator, Macd
+from .volatility import AtrIndicator, DonchianIndicator, Donchian, true_range
+from .directional import AdxIndicator, Adx
+from .indicator_set import IndicatorSet, IndicatorSpec, INDICATOR_TYPES, create_indicator
+from . import series
+from .cache import IndicatorCache, DEFAULT_CACHE_BYTES
+
+__all__ = [
+    'IncrementalIndicator',
+    'EmaIndicator',
+    'RollingStatsIndicator',
+    'RollingStats',
+    'RsiIndicator',
+    'MacdIndicator',
+    'Macd',
+    'AtrIndicator',
+    'DonchianIndicator',
+    'Donchian',
+    'true_range',
+    'AdxIndicator',
+    'Adx',
+    'IndicatorSet',
+    'IndicatorSpec',
+    'INDICATOR_TYPES',
+    'create_indicator',
+    'series',
+    'IndicatorCache',
+    'DEFAULT_CACHE_BYTES'
+]
@@ -0,0 +1,62 @@
+"""
+Incremental Indicator Base - V22.2
+==================================
+Interfaz común para indicadores técnicos con actualización O(1) por vela.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class IncrementalIndicator(ABC):
+    """
+    Indicador con estado que se alimenta vela a vela.
+
+    A diferencia de las estrategias V18-V21 (que recalculan todo desde la
+    lista de precios en cada evaluate()), un indicador incremental guarda
+    el estado mínimo necesario y actualiza su valor en tiempo constante.
+
+    Atributos públicos:
+    - value: Valor actual (None hasta que haya suficientes velas)
+    - prev: Valor antes de la última vela (para detectar cruces)
+    - count: Número de velas procesadas
+    """
+
+    def __init__(self):
+        self.value: Optional[Any] = None
+        self.prev: Optional[Any] = None
+        self.count = 0
+
+    @property
+    def ready(self) -> bool:
+        """True cuando el indicador ya tiene valor"""
+        return self.value is not None
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None):
+        """
+        Procesa una nueva vela.
+
+        Args:
+            close: Precio de cierre
+            high: Máximo de la vela (si falta se usa el cierre)
+            low: Mínimo de la vela (si falta se usa el cierre)
+
+        Returns:
+            Valor actualizado del indicador (o None si aún no está listo)
+        """
+        close = float(close)
+        high = close if high is None else float(high)
+        low = close if low is None else float(low)
+
+        self.prev = self.value
+        self.count += 1
+        self.value = self._update(close, high, low)
+        return self.value
+
+    @abstractmethod
+    def _update(self, close: float, high: float, low: float) -> Optional[Any]:
+        """Actualiza el estado interno y retorna el nuevo valor"""
+        pass
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(value={self.value}, count={self.count})"
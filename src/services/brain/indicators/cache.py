@@ -0,0 +1,153 @@
+"""
+Indicator Cache - V22.2
+=======================
+Memoización de series de indicadores durante un torneo.
+
+Muchas combinaciones del grid de parámetros comparten cálculos (todas las
+SmaCrossover con el mismo 'fast' usan la misma SMA, las MACD comparten EMAs).
+IndicatorCache expone la misma API que el módulo series y guarda cada
+resultado bajo (indicador, parámetros, huella de los datos), con un
+presupuesto de memoria acotado (LRU).
+"""
+
+import hashlib
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Sequence, Tuple
+from . import series
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024  # 64 MB por torneo
+
+
+class IndicatorCache:
+    """
+    Cache LRU de series vectorizadas para una ejecución del torneo.
+
+    Uso:
+        cache = IndicatorCache()
+        sma, std = cache.rolling_stats(prices, 20)   # calcula
+        sma, std = cache.rolling_stats(prices, 20)   # reutiliza
+
+    Los arrays retornados son de solo lectura (se comparten entre estrategias).
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        Args:
+            max_bytes: Memoria máxima ocupada por las series guardadas
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, Tuple[Any, int]]" = OrderedDict()
+
+    @staticmethod
+    def fingerprint(values: np.ndarray) -> str:
+        """Huella de los datos (tipo, largo y contenido)"""
+        values = np.ascontiguousarray(values, dtype=float)
+        digest = hashlib.blake2b(values.tobytes(), digest_size=16).hexdigest()
+        return f"{len(values)}:{digest}"
+
+    def memoize(self, name: str, params: tuple, arrays: Sequence[np.ndarray], compute: Callable[[], Any]) -> Any:
+        """
+        Retorna el resultado guardado o lo calcula y lo guarda.
+
+        Args:
+            name: Nombre del indicador (ej: 'ema')
+            params: Parámetros del indicador (ej: (20,))
+            arrays: Datos de entrada (forman parte de la clave vía fingerprint)
+            compute: Función sin argumentos que calcula el resultado
+        """
+        key = (name, tuple(params)) + tuple(self.fingerprint(values) for values in arrays)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        result = compute()
+        self._store(key, result)
+        return result
+
+    def _store(self, key: tuple, result: Any):
+        """Guarda un resultado (array o tupla de arrays) respetando el presupuesto"""
+        arrays = result if isinstance(result, tuple) else (result,)
+        size = sum(values.nbytes for values in arrays)
+        if size > self.max_bytes:
+            return
+
+        for values in arrays:
+            values.setflags(write=False)
+
+        while self._entries and self.nbytes + size > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.nbytes -= evicted_size
+
+        self._entries[key] = (result, size)
+        self.nbytes += size
+
+    def clear(self):
+        """Vacía el cache y sus contadores (al terminar una ejecución del torneo)"""
+        self._entries.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Estadísticas de uso (para logs)"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'memory_mb': self.nbytes / (1024 * 1024)
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signals(self, strategy, prices: np.ndarray) -> np.ndarray:
+        """
+        Señales de toda la serie de una estrategia (memoizadas por nombre y params).
+
+        Permite evaluar la misma combinación en varios tramos de la serie
+        (rondas de halving, folds de walk-forward) calculando las señales una vez.
+        """
+        params = tuple(sorted(strategy.params.items()))
+        return self.memoize('signals', (strategy.name, params), (prices,),
+                            lambda: strategy.generate_signals(prices, cache=self))
+
+    # ========================================================================
+    # API espejo del módulo series
+    # ========================================================================
+
+    shift = staticmethod(series.shift)
+
+    def ema(self, values: np.ndarray, period: int) -> np.ndarray:
+        return self.memoize('ema', (period,), (values,), lambda: series.ema(values, period))
+
+    def rolling_stats(self, values: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self.memoize('stats', (period,), (values,), lambda: series.rolling_stats(values, period))
+
+    def rsi(self, values: np.ndarray, period: int) -> np.ndarray:
+        return self.memoize('rsi', (period,), (values,), lambda: series.rsi(values, period))
+
+    def macd(self, values: np.ndarray, fast: int, slow: int, signal: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Las EMAs rápida/lenta también se comparten entre combinaciones
+        def compute():
+            macd_line = self.ema(values, fast) - self.ema(values, slow)
+            return series.macd_from_line(macd_line, max(fast, slow) - 1, signal)
+        return self.memoize('macd', (fast, slow, signal), (values,), compute)
+
+    def atr(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+        return self.memoize('atr', (period,), (high, low, close), lambda: series.atr(high, low, close, period))
+
+    def adx(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.memoize('adx', (period,), (high, low, close), lambda: series.adx(high, low, close, period))
+
+    def donchian(self, high: np.ndarray, low: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.memoize('donchian', (period,), (high, low), lambda: series.donchian(high, low, period))
@@ -0,0 +1,91 @@
+"""
+Directional Movement Indicators - V22.2
+=======================================
+ADX / DI+ / DI- de Wilder con actualización O(1).
+"""
+
+from typing import NamedTuple, Optional
+from .base import IncrementalIndicator
+from .volatility import true_range
+
+
+class Adx(NamedTuple):
+    """Sistema direccional de Wilder"""
+    adx: float
+    di_plus: float
+    di_minus: float
+
+
+class AdxIndicator(IncrementalIndicator):
+    """
+    ADX (Average Directional Index) de Welles Wilder (1978).
+
+    1. +DM/-DM y True Range por vela
+    2. Suavizado de Wilder de +DM, -DM y TR (semilla: promedio de `period`)
+    3. DI± = 100 * DM± / TR ; DX = 100 * |DI+ - DI-| / (DI+ + DI-)
+    4. ADX = suavizado de Wilder del DX (semilla: promedio de `period` DX)
+
+    `di_plus`/`di_minus` están disponibles tras period + 1 velas; el valor
+    completo (con ADX) tras 2 * period velas.
+    """
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = int(period)
+        self.di_plus: Optional[float] = None
+        self.di_minus: Optional[float] = None
+        self._prev_high: Optional[float] = None
+        self._prev_low: Optional[float] = None
+        self._prev_close: Optional[float] = None
+        self._avg_dm_plus = 0.0
+        self._avg_dm_minus = 0.0
+        self._avg_tr = 0.0
+        self._dx_count = 0
+        self._adx: Optional[float] = None
+        self._dx_sum = 0.0
+
+    def _update(self, close: float, high: float, low: float) -> Optional[Adx]:
+        prev_high, prev_low, prev_close = self._prev_high, self._prev_low, self._prev_close
+        self._prev_high, self._prev_low, self._prev_close = high, low, close
+        if prev_close is None:
+            return None
+
+        up_move = high - prev_high
+        down_move = prev_low - low
+        dm_plus = up_move if up_move > down_move and up_move > 0 else 0.0
+        dm_minus = down_move if down_move > up_move and down_move > 0 else 0.0
+        tr = true_range(high, low, prev_close)
+
+        # count - 1 = número de movimientos direccionales procesados
+        moves = self.count - 1
+        if moves <= self.period:
+            self._avg_dm_plus += dm_plus / self.period
+            self._avg_dm_minus += dm_minus / self.period
+            self._avg_tr += tr / self.period
+            if moves < self.period:
+                return None
+        else:
+            p = self.period
+            self._avg_dm_plus = (self._avg_dm_plus * (p - 1) + dm_plus) / p
+            self._avg_dm_minus = (self._avg_dm_minus * (p - 1) + dm_minus) / p
+            self._avg_tr = (self._avg_tr * (p - 1) + tr) / p
+
+        if self._avg_tr == 0:
+            self.di_plus, self.di_minus = 0.0, 0.0
+        else:
+            self.di_plus = self._avg_dm_plus / self._avg_tr * 100
+            self.di_minus = self._avg_dm_minus / self._avg_tr * 100
+
+        di_sum = self.di_plus + self.di_minus
+        dx = abs(self.di_plus - self.di_minus) / di_sum * 100 if di_sum > 0 else 0.0
+
+        self._dx_count += 1
+        if self._adx is None:
+            self._dx_sum += dx
+            if self._dx_count < self.period:
+                return None
+            self._adx = self._dx_sum / self.period
+        else:
+            self._adx = (self._adx * (self.period - 1) + dx) / self.period
+
+        return Adx(adx=self._adx, di_plus=self.di_plus, di_minus=self.di_minus)
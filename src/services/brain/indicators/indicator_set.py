@@ -0,0 +1,135 @@
+"""
+Indicator Set - V22.2
+=====================
+Conjunto de indicadores incrementales de un símbolo, compartido por todas
+las estrategias que lo evalúan.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+from .base import IncrementalIndicator
+from .moving_average import EmaIndicator, RollingStatsIndicator
+from .momentum import RsiIndicator, MacdIndicator
+from .volatility import AtrIndicator, DonchianIndicator
+from .directional import AdxIndicator
+
+# Spec de indicador: tupla (tipo, *parámetros). Ej: ('ema', 20), ('macd', 12, 26, 9)
+IndicatorSpec = Tuple
+
+# Registry de tipos de indicador disponibles
+INDICATOR_TYPES: Dict[str, type] = {
+    'ema': EmaIndicator,
+    'stats': RollingStatsIndicator,
+    'rsi': RsiIndicator,
+    'macd': MacdIndicator,
+    'atr': AtrIndicator,
+    'donchian': DonchianIndicator,
+    'adx': AdxIndicator
+}
+
+
+def create_indicator(spec: IndicatorSpec) -> IncrementalIndicator:
+    """
+    Crea un indicador a partir de su spec.
+
+    Raises:
+        ValueError: Si el tipo de indicador no existe
+    """
+    kind, *params = spec
+    if kind not in INDICATOR_TYPES:
+        raise ValueError(f"Indicador desconocido: {kind}. Disponibles: {list(INDICATOR_TYPES)}")
+    return INDICATOR_TYPES[kind](*params)
+
+
+class IndicatorSet:
+    """
+    Indicadores de un símbolo alimentados vela a vela.
+
+    Las estrategias declaran sus specs (get_indicator_specs) y el set crea
+    cada indicador una sola vez: dos estrategias que usan EMA(20) leen la
+    misma instancia. Cada update() cuesta O(nº indicadores), independiente
+    del tamaño del historial.
+
+    Uso:
+        indicators = IndicatorSet()
+        indicators.require_all([('ema', 20), ('rsi', 14)])
+        indicators.update(close=75200.0, high=75500.0, low=74900.0)
+        rsi = indicators[('rsi', 14)].value
+    """
+
+    def __init__(self):
+        self._indicators: Dict[IndicatorSpec, IncrementalIndicator] = {}
+        self.count = 0
+        self.close: Optional[float] = None
+        self.prev_close: Optional[float] = None
+
+    def require(
+        self,
+        spec: IndicatorSpec,
+        history: Optional[Iterable[Tuple[float, float, float]]] = None
+    ) -> IncrementalIndicator:
+        """
+        Retorna el indicador de `spec`, creándolo si no existe.
+
+        Args:
+            spec: Spec del indicador (ej: ('ema', 20))
+            history: (Opcional) Velas previas (close, high, low) con las que
+                     sembrar un indicador NUEVO. Debe cubrir las mismas velas
+                     ya procesadas por el set para mantenerlo sincronizado.
+        """
+        spec = tuple(spec)
+        indicator = self._indicators.get(spec)
+        if indicator is None:
+            indicator = create_indicator(spec)
+            if history is not None:
+                for close, high, low in history:
+                    indicator.update(close, high, low)
+            self._indicators[spec] = indicator
+        return indicator
+
+    def require_all(
+        self,
+        specs: Iterable[IndicatorSpec],
+        history: Optional[Iterable[Tuple[float, float, float]]] = None
+    ):
+        """Registra varias specs (ver require). `history` debe ser re-iterable."""
+        if history is not None:
+            history = list(history)
+        for spec in specs:
+            self.require(spec, history)
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None):
+        """Alimenta una nueva vela a todos los indicadores registrados"""
+        close = float(close)
+        self.prev_close = self.close
+        self.close = close
+        self.count += 1
+        for indicator in self._indicators.values():
+            indicator.update(close, high, low)
+
+    def prune(self, keep: Iterable[IndicatorSpec]):
+        """Elimina los indicadores que ya ninguna estrategia necesita"""
+        keep = {tuple(spec) for spec in keep}
+        for spec in list(self._indicators):
+            if spec not in keep:
+                del self._indicators[spec]
+
+    @classmethod
+    def from_prices(cls, prices: Iterable[float], specs: Iterable[IndicatorSpec]) -> 'IndicatorSet':
+        """Construye un set sembrado con una serie de cierres (high = low = close)"""
+        indicator_set = cls()
+        indicator_set.require_all(specs)
+        for price in prices:
+            indicator_set.update(price)
+        return indicator_set
+
+    def __getitem__(self, spec: IndicatorSpec) -> IncrementalIndicator:
+        return self._indicators[tuple(spec)]
+
+    def __contains__(self, spec: IndicatorSpec) -> bool:
+        return tuple(spec) in self._indicators
+
+    def __len__(self) -> int:
+        return len(self._indicators)
+
+    def __repr__(self) -> str:
+        return f"IndicatorSet({list(self._indicators)}, count={self.count})"
@@ -0,0 +1,87 @@
+"""
+Momentum Indicators - V22.2
+===========================
+RSI de Wilder y MACD con actualización O(1).
+"""
+
+from typing import NamedTuple, Optional
+from .base import IncrementalIndicator
+from .moving_average import EmaIndicator
+
+
+class RsiIndicator(IncrementalIndicator):
+    """
+    RSI con suavizado de Wilder.
+
+    - Primeras `period` variaciones: promedio simple de ganancias/pérdidas
+    - Después: avg = (avg_prev * (period - 1) + valor) / period
+    - RSI = 100 - 100 / (1 + avg_gain / avg_loss)  (100 si avg_loss = 0)
+    """
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = int(period)
+        self.avg_gain: Optional[float] = None
+        self.avg_loss: Optional[float] = None
+        self._last_close: Optional[float] = None
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+
+    def _update(self, close: float, high: float, low: float) -> Optional[float]:
+        last_close = self._last_close
+        self._last_close = close
+        if last_close is None:
+            return None
+
+        delta = close - last_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if self.avg_gain is None:
+            self._gain_sum += gain
+            self._loss_sum += loss
+            if self.count <= self.period:
+                return None
+            self.avg_gain = self._gain_sum / self.period
+            self.avg_loss = self._loss_sum / self.period
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+
+        if self.avg_loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + self.avg_gain / self.avg_loss))
+
+
+class Macd(NamedTuple):
+    """Componentes del MACD"""
+    macd: float
+    signal: float
+    histogram: float
+
+
+class MacdIndicator(IncrementalIndicator):
+    """
+    MACD estándar: EMA(fast) - EMA(slow), Signal = EMA(signal) del MACD.
+
+    Listo tras slow + signal - 1 velas.
+    """
+
+    def __init__(self, fast: int, slow: int, signal: int):
+        super().__init__()
+        self.fast_ema = EmaIndicator(fast)
+        self.slow_ema = EmaIndicator(slow)
+        self.signal_ema = EmaIndicator(signal)
+
+    def _update(self, close: float, high: float, low: float) -> Optional[Macd]:
+        fast = self.fast_ema.update(close)
+        slow = self.slow_ema.update(close)
+        if fast is None or slow is None:
+            return None
+
+        macd_line = fast - slow
+        signal_line = self.signal_ema.update(macd_line)
+        if signal_line is None:
+            return None
+
+        return Macd(macd=macd_line, signal=signal_line, histogram=macd_line - signal_line)
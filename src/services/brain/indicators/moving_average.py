@@ -0,0 +1,80 @@
+"""
+Moving Average Indicators - V22.2
+=================================
+EMA y SMA/desviación estándar móviles con actualización O(1).
+"""
+
+import math
+from collections import deque
+from typing import NamedTuple, Optional
+from .base import IncrementalIndicator
+
+
+class EmaIndicator(IncrementalIndicator):
+    """
+    EMA (Exponential Moving Average) incremental.
+
+    Semilla estándar: SMA de las primeras `period` velas, después
+    EMA = (precio - EMA_prev) * k + EMA_prev, con k = 2 / (period + 1).
+    """
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = int(period)
+        self.multiplier = 2 / (self.period + 1)
+        self._seed_sum = 0.0
+
+    def _update(self, close: float, high: float, low: float) -> Optional[float]:
+        if self.value is None:
+            self._seed_sum += close
+            if self.count < self.period:
+                return None
+            return self._seed_sum / self.period
+
+        return (close - self.value) * self.multiplier + self.value
+
+
+class RollingStats(NamedTuple):
+    """Media y desviación estándar (poblacional) de la ventana"""
+    mean: float
+    std: float
+
+
+class RollingStatsIndicator(IncrementalIndicator):
+    """
+    SMA + desviación estándar móviles (base de SMA Crossover y Bollinger).
+
+    Mantiene suma y suma de cuadrados de la ventana. Para evitar deriva
+    numérica en procesos de larga duración, re-sincroniza las sumas desde
+    la ventana cada RESYNC_INTERVAL velas (coste amortizado O(1)).
+    """
+
+    RESYNC_INTERVAL = 1000
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = int(period)
+        self._window = deque(maxlen=self.period)
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def _update(self, close: float, high: float, low: float) -> Optional[RollingStats]:
+        if len(self._window) == self.period:
+            oldest = self._window[0]
+            self._sum -= oldest
+            self._sum_sq -= oldest * oldest
+
+        self._window.append(close)
+        self._sum += close
+        self._sum_sq += close * close
+
+        if self.count % self.RESYNC_INTERVAL == 0:
+            self._sum = math.fsum(self._window)
+            self._sum_sq = math.fsum(x * x for x in self._window)
+
+        if len(self._window) < self.period:
+            return None
+
+        mean = self._sum / self.period
+        variance = max(self._sum_sq / self.period - mean * mean, 0.0)
+        return RollingStats(mean=mean, std=math.sqrt(variance))
@@ -0,0 +1,183 @@
+"""
+Vectorized Indicator Series - V22.2
+===================================
+Versión NumPy (serie completa) de los indicadores incrementales.
+
+Cada función retorna arrays del mismo largo que la entrada, con NaN donde
+el indicador aún no está listo. El valor en el índice i coincide con el del
+indicador incremental tras procesar las velas 0..i, de modo que backtests
+vectorizados y Brain en vivo usan exactamente la misma matemática.
+"""
+
+import numpy as np
+from typing import Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Máximo factor de escala (en log) usado por el suavizado exponencial por bloques
+_MAX_LOG_SCALE = 200.0
+
+
+def shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Desplaza la serie hacia adelante rellenando con NaN (valor previo en cada índice)"""
+    shifted = np.full(len(values), np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+
+def _exponential_smoothing(values: np.ndarray, alpha: float, start: int, seed: float) -> np.ndarray:
+    """
+    Resuelve y[t] = alpha * x[t] + (1 - alpha) * y[t-1] sin bucle por vela.
+
+    y[start] = seed; NaN antes de start. Usa la forma cerrada
+    y[t] = d^t * (y0 + sum(alpha * x[i] / d^i)), d = 1 - alpha, por bloques
+    cuyo factor d^-k no desborda.
+    """
+    out = np.full(len(values), np.nan)
+    if start >= len(values):
+        return out
+
+    out[start] = seed
+    weighted = alpha * values[start + 1:]
+    decay = 1.0 - alpha
+
+    if decay <= 0:
+        out[start + 1:] = weighted
+        return out
+
+    block = max(1, int(_MAX_LOG_SCALE / -np.log(decay)))
+    prev = seed
+    offset = start + 1
+    for begin in range(0, len(weighted), block):
+        chunk = weighted[begin:begin + block]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        smoothed = powers * (prev + np.cumsum(chunk / powers))
+        out[offset + begin:offset + begin + len(chunk)] = smoothed
+        prev = smoothed[-1]
+    return out
+
+
+def _wilder(values: np.ndarray, period: int, first: int) -> np.ndarray:
+    """
+    Suavizado de Wilder de values[first:]: semilla = promedio de los primeros
+    `period` valores (en el índice first + period - 1), alpha = 1 / period.
+    """
+    seed_index = first + period - 1
+    if seed_index >= len(values):
+        return np.full(len(values), np.nan)
+    seed = np.mean(values[first:seed_index + 1])
+    return _exponential_smoothing(values, 1.0 / period, seed_index, seed)
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """EMA con semilla SMA (equivale a EmaIndicator)"""
+    values = np.asarray(values, dtype=float)
+    if len(values) < period:
+        return np.full(len(values), np.nan)
+    return _exponential_smoothing(values, 2 / (period + 1), period - 1, np.mean(values[:period]))
+
+
+def rolling_stats(values: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Media y desviación estándar poblacional móviles (equivale a RollingStatsIndicator)"""
+    values = np.asarray(values, dtype=float)
+    mean = np.full(len(values), np.nan)
+    std = np.full(len(values), np.nan)
+    if len(values) >= period:
+        windows = sliding_window_view(values, period)
+        mean[period - 1:] = windows.mean(axis=1)
+        std[period - 1:] = windows.std(axis=1)
+    return mean, std
+
+
+def rsi(values: np.ndarray, period: int) -> np.ndarray:
+    """RSI de Wilder (equivale a RsiIndicator)"""
+    values = np.asarray(values, dtype=float)
+    deltas = np.diff(values, prepend=np.nan)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+
+    avg_gain = _wilder(gains, period, first=1)
+    avg_loss = _wilder(losses, period, first=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = 100 - (100 / (1 + avg_gain / avg_loss))
+    result = np.where(avg_loss == 0, 100.0, result)
+    result[np.isnan(avg_loss)] = np.nan
+    return result
+
+
+def macd(values: np.ndarray, fast: int, slow: int, signal: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD, Signal e Histograma (equivale a MacdIndicator)"""
+    values = np.asarray(values, dtype=float)
+    return macd_from_line(ema(values, fast) - ema(values, slow), max(fast, slow) - 1, signal)
+
+
+def macd_from_line(macd_line: np.ndarray, first: int, signal: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Completa MACD a partir de la línea (EMA rápida - EMA lenta).
+
+    Args:
+        macd_line: Diferencia de EMAs (NaN antes de first)
+        first: Primer índice con ambas EMAs listas
+        signal: Período de la línea de señal
+    """
+    macd_line = np.array(macd_line, dtype=float)
+    signal_line = np.full(len(macd_line), np.nan)
+    if first < len(macd_line):
+        signal_line[first:] = ema(macd_line[first:], signal)
+
+    macd_line[np.isnan(signal_line)] = np.nan
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True Range por vela (NaN en la primera, que no tiene cierre previo)"""
+    prev_close = shift(close)
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """ATR de Wilder (equivale a AtrIndicator)"""
+    high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+    return _wilder(true_range(high, low, close), period, first=1)
+
+
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ADX, DI+ y DI- de Wilder (equivale a AdxIndicator).
+
+    Las tres series son NaN hasta que el ADX está listo (índice 2 * period - 1).
+    """
+    high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+    up_move = high - shift(high)
+    down_move = shift(low) - low
+    dm_plus = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    dm_minus = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+
+    avg_tr = _wilder(true_range(high, low, close), period, first=1)
+    avg_dm_plus = _wilder(dm_plus, period, first=1)
+    avg_dm_minus = _wilder(dm_minus, period, first=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_plus = np.where(avg_tr == 0, 0.0, avg_dm_plus / avg_tr * 100)
+        di_minus = np.where(avg_tr == 0, 0.0, avg_dm_minus / avg_tr * 100)
+        di_sum = di_plus + di_minus
+        dx = np.where(di_sum > 0, np.abs(di_plus - di_minus) / di_sum * 100, 0.0)
+    dx[np.isnan(avg_tr)] = np.nan
+
+    adx_line = _wilder(dx, period, first=period)
+    not_ready = np.isnan(adx_line)
+    di_plus[not_ready] = np.nan
+    di_minus[not_ready] = np.nan
+    return adx_line, di_plus, di_minus
+
+
+def donchian(high: np.ndarray, low: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Canal de Donchian: (upper, lower, middle) (equivale a DonchianIndicator)"""
+    high, low = np.asarray(high, dtype=float), np.asarray(low, dtype=float)
+    upper = np.full(len(high), np.nan)
+    lower = np.full(len(low), np.nan)
+    if len(high) >= period:
+        upper[period - 1:] = sliding_window_view(high, period).max(axis=1)
+        lower[period - 1:] = sliding_window_view(low, period).min(axis=1)
+    return upper, lower, (upper + lower) / 2
@@ -0,0 +1,91 @@
+"""
+Volatility Indicators - V22.2
+=============================
+ATR de Wilder y canales de Donchian con actualización O(1).
+"""
+
+from collections import deque
+from typing import NamedTuple, Optional
+from .base import IncrementalIndicator
+
+
+def true_range(high: float, low: float, prev_close: float) -> float:
+    """True Range = max(H-L, |H-Cp|, |L-Cp|)"""
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class AtrIndicator(IncrementalIndicator):
+    """
+    ATR (Average True Range) con suavizado de Wilder.
+
+    Listo tras period + 1 velas (la primera solo aporta el cierre previo).
+    Con series de solo cierres (high = low = close) el True Range se reduce
+    a |close - close_prev|.
+    """
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = int(period)
+        self._prev_close: Optional[float] = None
+        self._seed_sum = 0.0
+
+    def _update(self, close: float, high: float, low: float) -> Optional[float]:
+        prev_close = self._prev_close
+        self._prev_close = close
+        if prev_close is None:
+            return None
+
+        tr = true_range(high, low, prev_close)
+
+        if self.value is None:
+            self._seed_sum += tr
+            if self.count <= self.period:
+                return None
+            return self._seed_sum / self.period
+
+        return (self.value * (self.period - 1) + tr) / self.period
+
+
+class Donchian(NamedTuple):
+    """Canal de Donchian"""
+    upper: float
+    lower: float
+    middle: float
+
+
+class DonchianIndicator(IncrementalIndicator):
+    """
+    Máximo/mínimo móviles (Donchian) usando colas monótonas.
+
+    Cada vela entra y sale una sola vez de cada cola: O(1) amortizado.
+    Base de las líneas Tenkan/Kijun/Senkou B de Ichimoku.
+    """
+
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = int(period)
+        self._highs = deque()  # (index, high) con highs decrecientes
+        self._lows = deque()   # (index, low) con lows crecientes
+
+    def _update(self, close: float, high: float, low: float) -> Optional[Donchian]:
+        index = self.count
+        oldest_valid = index - self.period + 1
+
+        while self._highs and self._highs[-1][1] <= high:
+            self._highs.pop()
+        self._highs.append((index, high))
+        while self._highs[0][0] < oldest_valid:
+            self._highs.popleft()
+
+        while self._lows and self._lows[-1][1] >= low:
+            self._lows.pop()
+        self._lows.append((index, low))
+        while self._lows[0][0] < oldest_valid:
+            self._lows.popleft()
+
+        if index < self.period:
+            return None
+
+        upper = self._highs[0][1]
+        lower = self._lows[0][1]
+        return Donchian(upper=upper, lower=lower, middle=(upper + lower) / 2)
@@ -7,13 +7,14 @@ Características V19:
 - Regime Detection (Bull/Bear/Sideways) usando ADX + EMA(200)
 - 9 estrategias avanzadas (Ichimoku, Keltner, Volume Profile, etc.)
 - Filtrado automático de estrategias según régimen
-- Hot-swap de parámetros sin restart
+- Hot-swap de parámetros sin restart (V22.2: por símbolo, al publicarse en strategy_updates)
 - Monitorización de compatibilidad estrategia-régimen
 """
 
 import time
-import json
-from collections import deque
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Dict, Optional, List
 from src.config.settings import config
@@ -21,42 +22,85 @@ from src.config.symbols import ACTIVE_SYMBOLS, FALLBACK_SYMBOLS
 from src.shared.utils import get_logger, normalize_symbol, fetch_binance_klines  # Keep for backward compat
 from src.domain import TradingSymbol, parse_symbol_list  # V21.3: Value Object
 from src.shared.memory import memory
+from src.shared.candle_store import candle_store  # V22.2: Cache local de velas
+from src.shared.codec import encode, decode
 from src.services.brain.strategies import AVAILABLE_STRATEGIES
 from src.services.brain.strategies.base import StrategyInterface
-from src.services.brain.strategies.regime_detector import RegimeDetector, MarketRegime
+from src.services.brain.strategies.optimizer import STRATEGY_UPDATES_CHANNEL
+from src.services.brain.strategies.regime_detector import RegimeDetector, RegimeTracker, MarketRegime
+from src.services.brain.indicators import IndicatorSet
+from src.services.brain.resampler import TimeframeResampler, BASE_TIMEFRAME
+from src.services.brain.history import OhlcvRing
+from src.services.brain.sharding import BRAIN_GROUP, BrainCoordinator, assign_partitions, load_assignment, sharding_error
 
 logger = get_logger("BrainV21.3")
 
+STRATEGY_UPDATES_POLL = 1.0  # Segundos entre chequeos de stop del listener de estrategias
+REGIME_TTL = 300  # Segundos de vida de market_regime:{symbol} en Redis
+
 
 class RegimeSwitchingBrain:
     """
     Brain V19 con Regime Detection y selección adaptativa de estrategias.
+    
+    V22.2: Con shard_id lee solo sus particiones del stream market_data (ver
+    src.services.brain.sharding); sin shard_id procesa todos los símbolos.
     """
     
-    def __init__(self):
+    def __init__(self, shard_id: Optional[int] = None, num_shards: int = 1):
         self.redis_client = memory.get_client()
         
+        # V22.2: Particiones del stream market_data (modo sharded)
+        self.shard_id = shard_id
+        self.num_shards = num_shards
+        # {partición: shard} publicado por el coordinador (reparto inicial hasta recibirlo)
+        self.partition_owners: Dict[int, int] = (
+            assign_partitions(config.STREAM_PARTITIONS, range(num_shards)) if shard_id is not None else {}
+        )
+        self.assignment: Dict[str, int] = {}  # {símbolo: shard} (símbolos activos, para el warm-up)
+        self.assignment_version = None
+        self.last_assignment_check = 0.0
+        self.warmed_up = False  # Los símbolos recibidos después del warm-up inicial se precargan aparte
+        
         # V21: Cachés OHLCV completos
-        self.price_history: Dict[str, deque] = {}   # Close prices
-        self.high_history: Dict[str, deque] = {}     # High prices (V21 NUEVO)
-        self.low_history: Dict[str, deque] = {}      # Low prices (V21 NUEVO)
+        # V22.2: Ring buffer NumPy por símbolo (timestamp + OHLCV); las
+        # columnas son vistas sin copia (history[symbol].close, .high, ...)
+        self.history: Dict[str, OhlcvRing] = {}
         self.max_history_size = 200
         
+        # V22.2: Indicadores incrementales por símbolo (alimentados vela a vela)
+        # Solo con el cierre (high = low = close), igual que el torneo y evaluate():
+        # ADX/ATR/canales con la misma definición con la que se optimizaron
+        self.indicators: Dict[str, IndicatorSet] = {}
+        
+        # V22.2: Barras 5m/15m/1h/4h construidas desde el stream de 1m, con
+        # sus propios indicadores incrementales (estrategias de timeframe superior)
+        self.resamplers: Dict[str, TimeframeResampler] = {}
+        self.tf_indicators: Dict[str, Dict[str, IndicatorSet]] = {}
+        
         # Estrategias activas por símbolo (cargadas desde Redis)
         self.active_strategies: Dict[str, StrategyInterface] = {}
         
-        # Timestamp de última actualización de estrategias
-        self.last_strategy_update = None
+        # V22.2: Hot-swap por eventos - símbolos con strategy_config nueva,
+        # anotados por el listener de STRATEGY_UPDATES_CHANNEL y aplicados en el loop
+        self.pending_swaps: set = set()
+        self.swap_lock = threading.Lock()
         
         # V19: Regime Detector
         self.regime_detector = RegimeDetector(ema_period=200, adx_period=14)
         self.current_regimes: Dict[str, MarketRegime] = {}
+        self.regime_written: Dict[str, float] = {}  # V22.2: Último setex de market_regime por símbolo
+        # V22.2: EMA(200)/ATR/ADX incrementales por símbolo (régimen en cada vela)
+        self.regime_trackers: Dict[str, RegimeTracker] = {}
         
         # V19.1: Cooldown tracking para evitar overtrading
+        # V22.2: La fuente de verdad es Redis (brain:cooldown:{symbol}), compartida entre shards
         self.last_signal_time: Dict[str, datetime] = {}  # {symbol: last_signal_timestamp}
         self.cooldown_minutes = 10  # 10 minutos cooldown por símbolo
         
         logger.info("🦅 Brain V21.2 - SYNCHRONIZED ARCHITECTURE Initialized")
+        if shard_id is not None:
+            logger.info(f"🧩 Shard {shard_id}/{num_shards}")
         logger.info(f"📊 {len(AVAILABLE_STRATEGIES)} estrategias disponibles")
         logger.info(f"⏳ Cooldown: {self.cooldown_minutes} minutos por símbolo")
     
@@ -67,10 +111,14 @@ class RegimeSwitchingBrain:
         Soluciona el "Cold Start Blindness": Descarga las últimas 200 velas de Binance
         al iniciar el sistema, eliminando la espera de 3.3 horas.
         
+        V22.2: Las series (1m + BRAIN_TIMEFRAMES de cada símbolo) se leen en
+        paralelo del candle store local (solo se descarga de Binance la cola
+        que falta) y el estado de cada símbolo se siembra en bloque (seed_symbol).
+        
         Args:
             symbols: Lista de TradingSymbol a pre-cargar (type-safe)
         
-        Tiempo estimado: 5-10 segundos (vs 3.3 horas del sistema anterior)
+        Tiempo estimado: ~1 segundo con el candle store al día
         """
         logger.info("=" * 80)
         logger.info("🔥 WARM-UP SYSTEM ACTIVADO: Descargando historial inicial...")
@@ -78,31 +126,39 @@ class RegimeSwitchingBrain:
         logger.info(f"   Objetivo: {self.max_history_size} velas por símbolo (1m interval)")
         logger.info("=" * 80)
         
+        started = time.time()
+        timeframes = [tf for tf in config.BRAIN_TIMEFRAMES if tf != BASE_TIMEFRAME]
+        jobs = [
+            (symbol.to_short(), interval, self.max_history_size if interval == BASE_TIMEFRAME else config.BRAIN_TIMEFRAME_BARS)
+            for symbol in symbols for interval in [BASE_TIMEFRAME] + timeframes
+        ]
+        
+        # 1. I/O en paralelo: candle store (disco) + top-up de la cola faltante
+        series: Dict[tuple, list] = {}
+        if jobs:
+            with ThreadPoolExecutor(max_workers=max(1, min(len(jobs), config.BRAIN_WARMUP_WORKERS)),
+                                    thread_name_prefix="warm-up") as executor:
+                futures = {(key, interval): executor.submit(self._fetch_warm_up_series, key, interval, limit)
+                           for key, interval, limit in jobs}
+            for job, future in futures.items():
+                try:
+                    series[job] = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Error descargando {job[0]} {job[1]}: {e}")
+                    series[job] = []
+        
+        # 2. Siembra en bloque por símbolo
         for symbol in symbols:
             try:
-                logger.info(f"📥 Warm-up: {symbol}...")  # Usa __str__() automáticamente
-                
-                # Descargar últimas 200 velas de 1m
-                klines = fetch_binance_klines(symbol.to_short(), interval='1m', limit=self.max_history_size)
+                # Key para storage interno (usa formato corto)
+                symbol_key = symbol.to_short()
+                klines = series.get((symbol_key, BASE_TIMEFRAME))
                 
                 if not klines:
                     logger.warning(f"⚠️ No se pudo descargar historial para {symbol}")
                     continue
                 
-                # Key para storage interno (usa formato corto)
-                symbol_key = symbol.to_short()
-                
-                # Inicializar deques
-                if symbol_key not in self.price_history:
-                    self.price_history[symbol_key] = deque(maxlen=self.max_history_size)
-                    self.high_history[symbol_key] = deque(maxlen=self.max_history_size)
-                    self.low_history[symbol_key] = deque(maxlen=self.max_history_size)
-                
-                # Llenar historial con datos descargados
-                for kline in klines:
-                    self.price_history[symbol_key].append(kline['close'])
-                    self.high_history[symbol_key].append(kline['high'])
-                    self.low_history[symbol_key].append(kline['low'])
+                self.seed_symbol(symbol_key, klines, {tf: series.get((symbol_key, tf), []) for tf in timeframes})
                 
                 # Detectar régimen inmediatamente
                 regime = self.detect_market_regime(symbol_key)
@@ -114,18 +170,31 @@ class RegimeSwitchingBrain:
                     'unknown': '❓'
                 }.get(regime.value if regime else 'unknown', '❓')
                 
-                logger.info(f"✅ {symbol}: {len(self.price_history[symbol_key])} velas cargadas | "
+                resampler = self.resamplers[symbol_key]
+                logger.info(f"✅ {symbol}: {len(self.history[symbol_key])} velas cargadas | "
                            f"Régimen: {regime_emoji} {regime.value if regime else 'unknown'} | "
-                           f"Último precio: ${klines[-1]['close']:.2f}")
+                           f"Último precio: ${klines[-1]['close']:.2f} | "
+                           + ", ".join(f"{tf}={len(resampler.bars[tf])}" for tf in resampler.timeframes))
                 
             except Exception as e:
                 logger.error(f"❌ Error en warm-up de {symbol}: {e}", exc_info=True)
         
         logger.info("=" * 80)
-        logger.info(f"🎯 WARM-UP COMPLETADO: {len(self.price_history)} símbolos listos para trading")
-        logger.info("   ⚡ Sistema operativo en <10 segundos (vs 3.3 horas anterior)")
+        logger.info(f"🎯 WARM-UP COMPLETADO: {len(self.history)} símbolos listos para trading")
+        logger.info(f"   ⚡ Sistema operativo en {time.time() - started:.2f}s")
         logger.info("=" * 80)
     
+    def _fetch_warm_up_series(self, symbol_key: str, interval: str, limit: int) -> List[Dict[str, float]]:
+        """V22.2: Últimas `limit` velas cerradas del candle store (solo se descarga lo que falta)"""
+        try:
+            return candle_store.get_last(symbol_key, interval, limit).to_records()
+        except Exception as e:
+            if interval != BASE_TIMEFRAME:
+                logger.warning(f"⚠️ Sin barras {interval} para {symbol_key} en el candle store: {e}")
+                return []
+            logger.warning(f"⚠️ Candle store no disponible para {symbol_key} ({e}), descargando de Binance")
+            return fetch_binance_klines(symbol_key, interval=interval, limit=limit)
+    
     def load_strategy_for_symbol(self, symbol_key: str) -> Optional[StrategyInterface]:
         """
         V21.3: Carga la estrategia óptima para un símbolo desde Redis.
@@ -137,7 +206,8 @@ class RegimeSwitchingBrain:
         Value: {
             'strategy_name': 'SmaCrossover',
             'params': {'fast': 10, 'slow': 30},
-            'metrics': {...}
+            'metrics': {...},
+            'interval': '1h'  # V22.2: Timeframe de evaluación (default 1m)
         }
         """
         try:
@@ -153,14 +223,22 @@ class RegimeSwitchingBrain:
                     'overbought': 70
                 })
             
-            config_data = json.loads(config_json)
+            config_data = decode(config_json)
             strategy_name = config_data['strategy_name']
             params = config_data['params']
             
             # Buscar clase de estrategia
             if strategy_name in AVAILABLE_STRATEGIES:
                 strategy = AVAILABLE_STRATEGIES[strategy_name](params)
-                logger.info(f"✅ Cargada estrategia para {symbol_key}: {strategy}")
+                
+                # V22.2: Timeframe con el que el optimizador eligió la estrategia
+                timeframe = config_data.get('interval', BASE_TIMEFRAME)
+                if timeframe == BASE_TIMEFRAME or timeframe in config.BRAIN_TIMEFRAMES:
+                    strategy.timeframe = timeframe
+                else:
+                    logger.warning(f"⚠️ Timeframe {timeframe} no disponible (BRAIN_TIMEFRAMES), {symbol_key} usa 1m")
+                
+                logger.info(f"✅ Cargada estrategia para {symbol_key}: {strategy} [{strategy.timeframe}]")
                 return strategy
             
             logger.error(f"❌ Estrategia desconocida: {strategy_name}")
@@ -170,7 +248,116 @@ class RegimeSwitchingBrain:
             logger.error(f"Error cargando estrategia para {symbol_key}: {e}")
             return None
     
-    def update_ohlcv_history(self, symbol: str, ohlcv_data: dict):
+    def owns(self, symbol: str) -> bool:
+        """V22.2: True si la partición del símbolo es de este shard (siempre True sin sharding)"""
+        if self.shard_id is None:
+            return True
+        return self.partition_owners.get(memory.partition_of(symbol)) == self.shard_id
+    
+    def owned_partitions(self) -> Optional[List[int]]:
+        """V22.2: Particiones de market_data a leer (None = las de BRAIN_STREAM_PARTITIONS)"""
+        if self.shard_id is None:
+            return config.BRAIN_STREAM_PARTITIONS
+        return sorted(p for p, shard in self.partition_owners.items() if shard == self.shard_id)
+    
+    def refresh_assignment(self, force: bool = False):
+        """
+        V22.2: Relee la asignación del coordinador (como mucho cada BRAIN_REBALANCE_INTERVAL).
+        
+        Los símbolos recibidos se precargan (warm-up desde el candle store) y
+        los perdidos se descartan junto con su estado. Si cambian las
+        particiones propias, run() vuelve a suscribirse (owned_partitions).
+        """
+        if self.shard_id is None:
+            return
+        now = time.time()
+        if not force and now - self.last_assignment_check < config.BRAIN_REBALANCE_INTERVAL:
+            return
+        self.last_assignment_check = now
+        
+        try:
+            version, partition_owners, assignment = load_assignment()
+        except Exception as e:
+            logger.error(f"❌ Error leyendo asignación de shards: {e}")
+            return
+        if version is None or version == self.assignment_version:
+            return
+        
+        owned_before = {s for s in self.history if self.owns(s)}
+        self.partition_owners = partition_owners or self.partition_owners
+        self.assignment, self.assignment_version = assignment, version
+        owned = {s for s in assignment if self.owns(s)}
+        
+        lost = [s for s in self.history if not self.owns(s)]
+        for symbol in lost:
+            self.drop_symbol(symbol)
+        gained = sorted(owned - owned_before)
+        logger.info(f"⚖️ Shard {self.shard_id}: asignación v{version} | particiones {self.owned_partitions()} | "
+                    f"{len(owned)} símbolos | +{gained} -{sorted(lost)}")
+        
+        # Warm-up de los recibidos (los demás ya tienen estado)
+        if gained and self.warmed_up:
+            try:
+                self.warm_up_history(parse_symbol_list(gained))
+            except (ValueError, TypeError) as e:
+                logger.error(f"❌ Símbolos asignados inválidos {gained}: {e}")
+    
+    def drop_symbol(self, symbol: str):
+        """V22.2: Descarta el estado de un símbolo que pasó a otro shard"""
+        for state in (self.history, self.indicators, self.resamplers, self.tf_indicators,
+                      self.regime_trackers, self.active_strategies, self.current_regimes,
+                      self.regime_written):
+            state.pop(symbol, None)
+    
+    def _init_symbol(self, symbol: str):
+        """Crea historial, indicadores y resampler de un símbolo nuevo"""
+        if symbol in self.history:
+            return
+        self.history[symbol] = OhlcvRing(self.max_history_size)
+        self.indicators[symbol] = IndicatorSet()
+        self.regime_trackers[symbol] = RegimeTracker(self.regime_detector)
+        self.resamplers[symbol] = TimeframeResampler(config.BRAIN_TIMEFRAMES, config.BRAIN_TIMEFRAME_BARS)
+        self.tf_indicators[symbol] = {tf: IndicatorSet() for tf in self.resamplers[symbol].timeframes}
+    
+    def seed_symbol(self, symbol: str, klines: List[Dict[str, float]], tf_bars: Dict[str, List[Dict[str, float]]]):
+        """
+        V22.2: Siembra en bloque el historial de warm-up de un símbolo.
+        
+        Mismo estado que update_ohlcv_history vela a vela, pero el ring se
+        llena con una escritura por columna y el régimen con RegimeTracker.seed.
+        
+        Args:
+            symbol: Símbolo en formato corto (ej: "BTC")
+            klines: Velas de 1m en orden cronológico
+            tf_bars: {timeframe: barras cerradas} del candle store; las velas
+                     de 1m posteriores solo completan la barra en curso
+        """
+        self._init_symbol(symbol)
+        resampler = self.resamplers[symbol]
+        tf_indicators = self.tf_indicators[symbol]
+        for tf, bars in tf_bars.items():
+            if tf not in resampler.bars:
+                continue
+            resampler.seed(tf, bars)
+            for bar in bars:
+                tf_indicators[tf].update(bar['close'])
+        
+        self.history[symbol].extend(klines)
+        closes = np.array([kline['close'] for kline in klines], dtype=np.float64)
+        highs = np.array([kline['high'] for kline in klines], dtype=np.float64)
+        lows = np.array([kline['low'] for kline in klines], dtype=np.float64)
+        self.regime_trackers[symbol].seed(closes, highs, lows)
+        
+        indicator_set = self.indicators[symbol]
+        for kline in klines:
+            indicator_set.update(kline['close'])
+            if 'timestamp' not in kline:
+                continue
+            for tf in resampler.update(kline):
+                bar = resampler.bars[tf].last()
+                tf_indicators[tf].update(bar['close'])
+    
+    def update_ohlcv_history(self, symbol: str, ohlcv_data: dict) -> List[str]:
         """
         V21: Actualiza el historial OHLCV completo para un símbolo.
         
@@ -184,17 +371,52 @@ class RegimeSwitchingBrain:
                 "volume": float,
                 "timestamp": float
             }
+        
+        Returns:
+            V22.2: Timeframes superiores cuya barra se cerró con esta vela
+        """
+        # Inicializar historial si no existe
+        self._init_symbol(symbol)
+        
+        # Agregar datos OHLCV (V22.2: O(1) en el ring buffer, sin realocar)
+        self.history[symbol].append(ohlcv_data)
+        
+        # V22.2: Actualización O(1) de los indicadores del símbolo
+        self.indicators[symbol].update(ohlcv_data['close'])
+        self.regime_trackers[symbol].update(ohlcv_data['close'], ohlcv_data['high'], ohlcv_data['low'])
+        
+        # V22.2: Barras de timeframes superiores (O(1) por timeframe)
+        if 'timestamp' not in ohlcv_data:
+            return []
+        resampler = self.resamplers[symbol]
+        closed = resampler.update(ohlcv_data)
+        for tf in closed:
+            bar = resampler.bars[tf].last()
+            self.tf_indicators[symbol][tf].update(bar['close'])
+        return closed
+    
+    def bind_strategy_indicators(self, symbol: str, strategy: Optional[StrategyInterface]):
+        """
+        V22.2: Registra en el IndicatorSet del símbolo los indicadores que usa la estrategia.
+        
+        Los indicadores nuevos se siembran con el historial en memoria; los que
+        ya no usa ninguna estrategia se descartan para no actualizarlos en vano.
         """
-        # Inicializar deques si no existen
-        if symbol not in self.price_history:
-            self.price_history[symbol] = deque(maxlen=self.max_history_size)
-            self.high_history[symbol] = deque(maxlen=self.max_history_size)
-            self.low_history[symbol] = deque(maxlen=self.max_history_size)
-        
-        # Agregar datos OHLCV
-        self.price_history[symbol].append(ohlcv_data['close'])
-        self.high_history[symbol].append(ohlcv_data['high'])
-        self.low_history[symbol].append(ohlcv_data['low'])
+        if strategy is None or symbol not in self.indicators:
+            return
+        
+        specs = list(strategy.get_indicator_specs().values())
+        if strategy.timeframe == BASE_TIMEFRAME:
+            indicator_set = self.indicators[symbol]
+            bars = self.history[symbol]
+        else:
+            # V22.2: Set del timeframe de la estrategia, sembrado con sus barras
+            indicator_set = self.tf_indicators[symbol][strategy.timeframe]
+            bars = self.resamplers[symbol].bars[strategy.timeframe]
+        closes = bars.close.tolist()
+        history = zip(closes, closes, closes)  # Solo cierres (ver self.indicators)
+        indicator_set.prune(specs)
+        indicator_set.require_all(specs, history=history)
     
     def detect_market_regime(self, symbol: str) -> Optional[MarketRegime]:
         """
@@ -202,41 +424,44 @@ class RegimeSwitchingBrain:
         
         Returns:
             MarketRegime o None si no hay suficientes datos
-        """
-        if symbol not in self.price_history:
-            return None
         
-        price_hist = list(self.price_history[symbol])
+        V22.2: Lee el RegimeTracker del símbolo (EMA/ATR/ADX ya actualizados
+        vela a vela), sin recalcular sobre el historial.
+        """
+        tracker = self.regime_trackers.get(symbol)
         
-        if len(price_hist) < 200:  # Necesita EMA(200)
+        if tracker is None or not tracker.ready:  # Necesita EMA(200)
             return None
         
         try:
-            # V21: Pasar High/Low para cálculo correcto de ADX
-            high_hist = list(self.high_history[symbol]) if symbol in self.high_history else None
-            low_hist = list(self.low_history[symbol]) if symbol in self.low_history else None
-            
-            regime, indicators = self.regime_detector.detect(
-                price_history=price_hist,
-                high_history=high_hist,
-                low_history=low_hist
-            )
+            regime, indicators = tracker.regime()
             
             # Guardar régimen detectado
+            previous = self.current_regimes.get(symbol)
             self.current_regimes[symbol] = regime
+            if regime != previous:
+                logger.info(
+                    f"🔄 {symbol}: Régimen {previous.value if previous else 'unknown'} -> {regime.value} "
+                    f"(ADX={indicators['adx']:.1f}, EMA200={indicators['ema_200']:.2f}, ATR={indicators['atr_percent']:.2f}%)"
+                )
             
             # Guardar en Redis para dashboard/diagnóstico
-            regime_data = {
-                'symbol': symbol,
-                'regime': regime.value,
-                'indicators': indicators,
-                'timestamp': datetime.utcnow().isoformat()
-            }
-            self.redis_client.setex(
-                f"market_regime:{symbol}",
-                300,  # 5 minutos TTL
-                json.dumps(regime_data)
-            )
+            # V22.2: Solo si cambió o para refrescar el TTL, no en cada vela
+            now = time.monotonic()
+            written = self.regime_written.get(symbol)
+            if regime != previous or written is None or now - written >= REGIME_TTL / 2:
+                regime_data = {
+                    'symbol': symbol,
+                    'regime': regime.value,
+                    'indicators': indicators,
+                    'timestamp': datetime.utcnow().isoformat()
+                }
+                self.redis_client.setex(
+                    f"market_regime:{symbol}",
+                    REGIME_TTL,
+                    encode(regime_data)
+                )
+                self.regime_written[symbol] = now
             
             return regime
         
@@ -249,7 +474,7 @@ class RegimeSwitchingBrain:
         V21.3: Procesa actualización OHLCV usando TradingSymbol (type-safe).
         """
         try:
-            data = json.loads(message['data'])
+            data = memory.decode(message['data'])  # V22.2: JSON o msgpack
             
             # Manejar arrays de datos o data simple
             if isinstance(data, list):
@@ -269,6 +494,10 @@ class RegimeSwitchingBrain:
                 
                 symbol_key = symbol.to_short()  # "BTC" para storage interno
                 
+                # V22.2: Modo sharded - solo los símbolos de esta partición
+                if not self.owns(symbol_key):
+                    continue
+                
                 # V21: Validar estructura OHLCV
                 required_keys = ['open', 'high', 'low', 'close']
                 if not all(k in coin_data for k in required_keys):
@@ -280,21 +509,20 @@ class RegimeSwitchingBrain:
                     continue
                 
                 # V21: Actualizar historial OHLCV completo
-                self.update_ohlcv_history(symbol_key, coin_data)
+                closed_timeframes = self.update_ohlcv_history(symbol_key, coin_data)
                 
                 # Para compatibilidad con estrategias que usan solo 'price'
                 price = float(coin_data['close'])
                 
                 # V21.3.1: FIX KeyError - Usar symbol_key (string) para dict access
-                regime = None
-                if len(self.price_history[symbol_key]) % 10 == 0:
-                    regime = self.detect_market_regime(symbol_key)
-                else:
-                    regime = self.current_regimes.get(symbol_key)
+                # V22.2: Régimen en cada vela (tracker incremental, O(1))
+                regime = self.detect_market_regime(symbol_key)
                 
-                # Cargar estrategia si no existe o recargar periódicamente
-                if symbol_key not in self.active_strategies or self._should_reload_strategy():
+                # Cargar estrategia si no existe
+                # V22.2: Los cambios posteriores llegan por STRATEGY_UPDATES_CHANNEL (apply_strategy_swaps)
+                if symbol_key not in self.active_strategies:
                     self.active_strategies[symbol_key] = self.load_strategy_for_symbol(symbol_key)
+                    self.bind_strategy_indicators(symbol_key, self.active_strategies[symbol_key])
                 
                 strategy = self.active_strategies.get(symbol_key)
                 
@@ -312,13 +540,32 @@ class RegimeSwitchingBrain:
                         )
                         # Continuar pero con advertencia (no bloqueamos)
                 
+                # V22.2: Estrategias de timeframe superior se evalúan al cerrar su barra
+                # (con el close de esa barra, no el del minuto que la cerró)
+                if strategy.timeframe == BASE_TIMEFRAME:
+                    indicator_set = self.indicators[symbol_key]
+                    closes = self.history[symbol_key].close
+                    eval_price = price
+                elif strategy.timeframe in closed_timeframes:
+                    bars = self.resamplers[symbol_key].bars[strategy.timeframe]
+                    indicator_set = self.tf_indicators[symbol_key][strategy.timeframe]
+                    closes = bars.close
+                    eval_price = bars.last()['close']
+                else:
+                    continue
+                
                 # Verificar si tenemos suficiente historia
-                history = list(self.price_history[symbol_key])
-                if len(history) < strategy.get_required_history():
+                if len(closes) < strategy.get_required_history():
                     continue
                 
-                # Evaluar estrategia (sin incluir precio actual en historia)
-                result = strategy.evaluate(price, history[:-1])
+                # V22.2: Estrategias incrementales leen los valores actuales del
+                # IndicatorSet (O(1) por tick, sin copiar el historial)
+                if strategy.supports_incremental:
+                    result = strategy.evaluate_indicators(eval_price, indicator_set)
+                else:
+                    # Evaluar estrategia (sin incluir precio actual en historia)
+                    # V22.2: Vista sin copia del ring buffer
+                    result = strategy.evaluate(eval_price, closes[:-1])
                 
                 if result.signal:
                     # Mapeo de emojis por régimen
@@ -349,24 +596,16 @@ class RegimeSwitchingBrain:
                     current_time = datetime.now(timezone.utc)
                     
                     # V21.3.1: Fix KeyError - use symbol_key
-                    if symbol_key in self.last_signal_time:
-                        time_since_last = (current_time - self.last_signal_time[symbol_key]).total_seconds() / 60
-                        
-                        if time_since_last < self.cooldown_minutes:
-                            logger.info(
-                                f"⏳ Cooldown activo para {symbol_key}: {time_since_last:.1f} < {self.cooldown_minutes} min - Señal rechazada"
-                            )
-                            continue  # Rechazar señal y continuar con siguiente símbolo
-                    
-                    # Actualizar timestamp de última señal
-                    self.last_signal_time[symbol_key] = current_time
+                    # V22.2: Reserva atómica en Redis (correcta entre shards y reinicios)
+                    if not self._acquire_cooldown(symbol_key, current_time):
+                        continue  # Rechazar señal y continuar con siguiente símbolo
                     
                     # Publicar en Redis
                     try:
                         memory.publish('signals', signal)
                         
                         # Cache para Dashboard
-                        self.redis_client.lpush('recent_signals', json.dumps(signal))
+                        self.redis_client.lpush('recent_signals', encode(signal))
                         self.redis_client.ltrim('recent_signals', 0, 49)
                         
                         logger.info(
@@ -382,23 +621,118 @@ class RegimeSwitchingBrain:
         except Exception as e:
             logger.error(f"Error procesando update: {e}", exc_info=True)
     
-    def _should_reload_strategy(self) -> bool:
+    def _acquire_cooldown(self, symbol_key: str, current_time: datetime) -> bool:
         """
-        Verifica si debe recargar estrategias (cada 30 min para hot-swap)
-        """
-        if not self.last_strategy_update:
-            self.last_strategy_update = time.time()
-            return True
+        V22.2: Reserva el cooldown del símbolo con SET NX EX en Redis.
         
-        # Recargar cada 30 minutos
-        if time.time() - self.last_strategy_update > 1800:
-            self.last_strategy_update = time.time()
-            logger.info("🔄 Hot-swap: Recargando estrategias desde Redis...")
-            self.active_strategies.clear()
-            return True
+        La key expira sola al terminar el cooldown; si otro shard (o este
+        proceso antes de reiniciarse) ya la tomó, la señal se rechaza. Sin
+        Redis se usa el registro local.
+        
+        Returns:
+            True si la señal puede publicarse
+        """
+        cooldown_seconds = self.cooldown_minutes * 60
+        try:
+            key = f"brain:cooldown:{symbol_key}"
+            if self.redis_client.set(key, current_time.isoformat(), nx=True, ex=cooldown_seconds):
+                self.last_signal_time[symbol_key] = current_time
+                return True
+            last = self.redis_client.get(key)
+            last_time = datetime.fromisoformat(last) if last else current_time
+        except Exception as e:
+            logger.warning(f"⚠️ Cooldown en Redis no disponible ({e}), usando registro local")
+            last_time = self.last_signal_time.get(symbol_key)
+            if last_time is None or (current_time - last_time).total_seconds() >= cooldown_seconds:
+                self.last_signal_time[symbol_key] = current_time
+                return True
         
+        time_since_last = (current_time - last_time).total_seconds() / 60
+        logger.info(
+            f"⏳ Cooldown activo para {symbol_key}: {time_since_last:.1f} < {self.cooldown_minutes} min - Señal rechazada"
+        )
         return False
     
+    def listen_strategy_updates(self, stop: threading.Event):
+        """
+        V22.2: Escucha STRATEGY_UPDATES_CHANNEL (thread daemon) y anota los
+        símbolos cuya strategy_config cambió.
+        
+        Al (re)conectar se anotan todos los símbolos cargados: los avisos
+        publicados mientras no había suscripción se habrían perdido.
+        
+        Args:
+            stop: Se activa al salir de run(); el listener cierra su conexión y termina
+        """
+        while not stop.is_set():
+            pubsub = None
+            try:
+                pubsub = memory.pubsub()
+                if not pubsub:
+                    raise ConnectionError("Redis no disponible")
+                pubsub.subscribe(STRATEGY_UPDATES_CHANNEL)
+                logger.info(f"📡 Hot-swap: escuchando '{STRATEGY_UPDATES_CHANNEL}'")
+                # Snapshot: el loop principal agrega símbolos a active_strategies en paralelo
+                self.request_strategy_swap(*list(self.active_strategies))
+                
+                while not stop.is_set():
+                    message = pubsub.get_message(ignore_subscribe_messages=True, timeout=STRATEGY_UPDATES_POLL)
+                    if not message or message['type'] != 'message':
+                        continue
+                    try:
+                        symbol = TradingSymbol.from_str(decode(message['data'])['symbol']).to_short()
+                    except (ValueError, TypeError, KeyError) as e:
+                        logger.error(f"❌ Aviso de estrategia inválido {message['data']}: {e}")
+                        continue
+                    self.request_strategy_swap(symbol)
+            except Exception as e:
+                logger.error(f"❌ Error en listener de estrategias: {e}")
+            finally:
+                if pubsub:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            stop.wait(5)
+    
+    def request_strategy_swap(self, *symbols: str):
+        """V22.2: Marca símbolos para recargar su estrategia en el próximo tick (thread-safe)"""
+        with self.swap_lock:
+            self.pending_swaps.update(symbols)
+    
+    def apply_strategy_swaps(self):
+        """
+        V22.2: Cambia la estrategia de los símbolos notificados, uno por uno.
+        
+        Los indicadores que la nueva estrategia comparte con la anterior
+        conservan su estado; solo los nuevos se siembran con el historial.
+        Si la nueva configuración no carga se mantiene la estrategia actual.
+        """
+        with self.swap_lock:
+            if not self.pending_swaps:
+                return
+            symbols, self.pending_swaps = self.pending_swaps, set()
+        
+        for symbol_key in symbols:
+            current = self.active_strategies.get(symbol_key)
+            if current is None:
+                continue  # Sin cargar (u otro shard): se leerá de Redis al llegar su vela
+            
+            strategy = self.load_strategy_for_symbol(symbol_key)
+            if strategy is None:
+                logger.warning(f"⚠️ Hot-swap {symbol_key}: configuración inválida, se mantiene {current}")
+                continue
+            
+            if current.timeframe != strategy.timeframe:
+                # Liberar los indicadores del timeframe que deja de usarse
+                if current.timeframe == BASE_TIMEFRAME:
+                    self.indicators[symbol_key].prune([])
+                else:
+                    self.tf_indicators[symbol_key][current.timeframe].prune([])
+            self.active_strategies[symbol_key] = strategy
+            self.bind_strategy_indicators(symbol_key, strategy)
+            logger.info(f"🔄 Hot-swap {symbol_key}: {current} [{current.timeframe}] -> {strategy} [{strategy.timeframe}]")
+    
     def run(self):
         """
         V21.3: Loop principal del Brain con Warm-up System (Value Object Pattern).
@@ -429,26 +763,76 @@ class RegimeSwitchingBrain:
                 logger.warning("⚠️ No se encontraron active_symbols en Redis, usando canonical default")
                 active_symbols = parse_symbol_list(FALLBACK_SYMBOLS)
             
+            # V22.2: Modo sharded - warm-up solo de los símbolos propios
+            if self.shard_id is not None:
+                self.refresh_assignment(force=True)
+                if self.assignment:
+                    active_symbols = parse_symbol_list([s for s in self.assignment if self.owns(s)])
+                else:
+                    active_symbols = [s for s in active_symbols if self.owns(s.to_short())]
+            
             # Ejecutar warm-up (descarga 200 velas por símbolo)
             # active_symbols es ahora List[TradingSymbol], no List[str]
             self.warm_up_history(active_symbols)
+            self.warmed_up = True
             
         except Exception as e:
             logger.error(f"❌ Error en warm-up system: {e}", exc_info=True)
             logger.warning("⚠️ Continuando sin warm-up (modo legacy: espera 3.3 horas)")
         
         # Suscribirse a updates en tiempo real
-        pubsub = self.redis_client.pubsub()
-        pubsub.subscribe('market_data')
+        # V22.2: Pub/Sub o Redis Streams (grupo 'brain', particiones BRAIN_STREAM_PARTITIONS)
+        logger.info(f"✅ Brain escuchando mercado en tiempo real ({config.MESSAGE_TRANSPORT})...")
         
-        logger.info("✅ Brain escuchando mercado en tiempo real...")
+        # V22.2: Hot-swap de estrategias por eventos (sin recarga periódica). El
+        # listener vive lo mismo que este run(): al salir (desconexión o crash,
+        # tras lo cual se crea otro Brain) se detiene y se espera.
+        stop_updates = threading.Event()
+        updates_listener = threading.Thread(
+            target=self.listen_strategy_updates, args=(stop_updates,), name="strategy-updates", daemon=True
+        )
+        updates_listener.start()
         
-        for message in pubsub.listen():
-            if message['type'] == 'message':
-                self.process_market_update(message)
+        # V22.2: Modo sharded - solo las particiones propias, en el grupo compartido
+        # (una partición que cambia de dueño sigue desde la última entrada confirmada;
+        # las recibidas toman enseguida lo que quedó pendiente del dueño anterior)
+        listened = []
+        try:
+            while True:
+                partitions = self.owned_partitions()
+                if partitions == []:
+                    logger.warning(f"⚠️ Shard {self.shard_id} sin particiones asignadas, esperando...")
+                    time.sleep(config.BRAIN_REBALANCE_INTERVAL)
+                    self.refresh_assignment(force=True)
+                    continue
+                
+                takeover = [p for p in partitions if p not in listened] if self.shard_id is not None else None
+                listened = partitions
+                for message in memory.listen(['market_data'], group=BRAIN_GROUP, partitions=partitions,
+                                             takeover=takeover):
+                    self.refresh_assignment()
+                    if self.owned_partitions() != partitions:
+                        # Sin procesar ni confirmar: queda pendiente para el nuevo dueño (o para
+                        # este shard al re-suscribirse si la partición sigue siendo suya)
+                        logger.info(f"🔀 Shard {self.shard_id}: particiones {partitions} -> {self.owned_partitions()}")
+                        break
+                    self.apply_strategy_swaps()
+                    self.process_market_update(message)
+                else:
+                    return  # listen() terminó (sin conexión): run() se reinicia desde main
+        finally:
+            stop_updates.set()
+            updates_listener.join(timeout=STRATEGY_UPDATES_POLL + 5)
 
 
 def main():
+    # V22.2: BRAIN_SHARDS > 1 = coordinador + N workers (un proceso por shard)
+    if config.BRAIN_SHARDS > 1:
+        error = sharding_error(config.BRAIN_SHARDS)
+        if not error:
+            BrainCoordinator(config.BRAIN_SHARDS).run()
+            return
+        logger.error(f"❌ Brain sharded no disponible: {error}. Usando un solo proceso")
     brain = RegimeSwitchingBrain()
     brain.run()
 
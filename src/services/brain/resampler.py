@@ -0,0 +1,132 @@
+"""
+Timeframe Resampler - V22.2
+===========================
+Construye barras de timeframes superiores (5m/15m/1h/4h) a partir del
+stream de velas de 1m, en O(1) por vela y timeframe.
+
+Así el Brain evalúa cada estrategia en el timeframe con el que la eligió
+el optimizador (1h) sin pedir velas extra a Binance.
+
+Uso:
+    resampler = TimeframeResampler(['5m', '1h'], max_bars=200)
+    closed = resampler.update(candle_1m)    # ['5m'] al cerrar una barra de 5m
+    closes_1h = resampler.bars['1h'].column('close')
+"""
+
+from typing import Dict, Iterable, List, Optional
+from .history import OhlcvRing
+
+BASE_TIMEFRAME = '1m'
+BASE_SECONDS = 60
+
+TIMEFRAME_SECONDS = {
+    '1m': 60,
+    '5m': 5 * 60,
+    '15m': 15 * 60,
+    '1h': 3600,
+    '4h': 4 * 3600,
+}
+
+DEFAULT_TIMEFRAMES = ('5m', '15m', '1h', '4h')
+
+
+class TimeframeResampler:
+    """
+    Resampler incremental de un símbolo.
+
+    Por cada timeframe mantiene la barra en construcción (parcial) y un
+    OhlcvRing con las últimas `max_bars` barras cerradas. Una barra se
+    cierra con la vela de 1m de su último minuto, o al llegar una vela de
+    un bucket posterior si ese minuto faltó.
+    """
+
+    def __init__(self, timeframes: Iterable[str] = DEFAULT_TIMEFRAMES, max_bars: int = 200):
+        """
+        Args:
+            timeframes: Timeframes a construir (claves de TIMEFRAME_SECONDS, > 1m)
+            max_bars: Barras cerradas a conservar por timeframe
+
+        Raises:
+            ValueError: Si un timeframe no está soportado
+        """
+        self.timeframes = [tf for tf in timeframes if tf != BASE_TIMEFRAME]
+        for tf in self.timeframes:
+            if tf not in TIMEFRAME_SECONDS:
+                raise ValueError(f"Timeframe no soportado: {tf}. Disponibles: {list(TIMEFRAME_SECONDS)}")
+        self.bars: Dict[str, OhlcvRing] = {tf: OhlcvRing(max_bars) for tf in self.timeframes}
+        self._partial: Dict[str, Optional[Dict[str, float]]] = {tf: None for tf in self.timeframes}
+        self._last_closed: Dict[str, float] = {tf: float('-inf') for tf in self.timeframes}
+
+    def update(self, candle: Dict[str, float]) -> List[str]:
+        """
+        Agrega una vela de 1m cerrada.
+
+        Args:
+            candle: {timestamp (segundos, apertura), open, high, low, close, volume}
+
+        Returns:
+            Timeframes cuya barra se cerró con esta vela (en orden de self.timeframes)
+        """
+        ts = float(candle['timestamp'])
+        closed = []
+        for tf in self.timeframes:
+            span = TIMEFRAME_SECONDS[tf]
+            bucket = ts - ts % span
+            if bucket <= self._last_closed[tf]:
+                continue  # Duplicada, atrasada o ya sembrada
+
+            partial = self._partial[tf]
+            if partial is not None and bucket != partial['timestamp']:
+                if bucket < partial['timestamp']:
+                    continue  # Fuera de orden dentro de la barra anterior
+                # Faltó el último minuto del bucket anterior: se cierra igual
+                self._close(tf)
+                closed.append(tf)
+                partial = None
+
+            if partial is None:
+                self._partial[tf] = {
+                    'timestamp': bucket,
+                    'open': float(candle['open']),
+                    'high': float(candle['high']),
+                    'low': float(candle['low']),
+                    'close': float(candle['close']),
+                    'volume': float(candle.get('volume', 0.0))
+                }
+            else:
+                partial['high'] = max(partial['high'], float(candle['high']))
+                partial['low'] = min(partial['low'], float(candle['low']))
+                partial['close'] = float(candle['close'])
+                partial['volume'] += float(candle.get('volume', 0.0))
+
+            if ts + BASE_SECONDS >= bucket + span:
+                self._close(tf)
+                if tf not in closed:
+                    closed.append(tf)
+        return closed
+
+    def _close(self, tf: str):
+        bar = self._partial[tf]
+        self.bars[tf].append(bar)
+        self._last_closed[tf] = bar['timestamp']
+        self._partial[tf] = None
+
+    def seed(self, tf: str, bars: Iterable[Dict[str, float]]):
+        """
+        Carga barras ya cerradas de `tf` (ej: del candle store al arrancar).
+
+        Las velas de 1m de esos buckets que lleguen después se ignoran para
+        `tf`; la barra parcial se descarta si quedó cubierta.
+        """
+        for bar in bars:
+            if bar['timestamp'] > self._last_closed[tf]:
+                self.bars[tf].append(bar)
+                self._last_closed[tf] = bar['timestamp']
+        partial = self._partial[tf]
+        if partial is not None and partial['timestamp'] <= self._last_closed[tf]:
+            self._partial[tf] = None
+
+    def partial(self, tf: str) -> Optional[Dict[str, float]]:
+        """Barra en construcción de `tf` (None si no hay)"""
+        partial = self._partial[tf]
+        return dict(partial) if partial is not None else None
@@ -0,0 +1,244 @@
+"""
+Brain Sharding - V22.2
+======================
+Modo multi-proceso del Brain: BRAIN_SHARDS procesos worker, cada uno dueño
+de un subconjunto de las particiones del stream market_data (historial,
+indicadores, régimen y estrategias solo de los símbolos de esas particiones).
+
+- Cada worker lee (XREADGROUP) solo sus particiones: la ingesta y el decode
+  se reparten entre los procesos, no se filtra el feed completo en cada uno
+- assign_partitions: reparto balanceado y estable; al quitar o agregar un
+  shard solo se mueven las particiones necesarias
+- BrainCoordinator (proceso padre): lanza y supervisa los workers, y cuando
+  cambian active_symbols o los shards vivos publica la asignación en Redis
+  (ASSIGNMENT_KEY); cada worker la relee, re-suscribe sus particiones, hace
+  warm-up de los símbolos que recibe y descarta los que pierde
+- Todos los workers comparten el consumer group 'brain': una partición que
+  cambia de dueño sigue desde la última entrada confirmada, y el nuevo dueño
+  reclama enseguida las entradas que quedaron pendientes del anterior
+- Los cooldowns de señales viven en Redis (SET NX EX), así siguen siendo
+  correctos cuando un símbolo cambia de shard
+
+Requiere MESSAGE_TRANSPORT=streams y STREAM_PARTITIONS >= BRAIN_SHARDS
+(idealmente varias particiones por shard).
+
+Uso:
+    MESSAGE_TRANSPORT=streams STREAM_PARTITIONS=16 BRAIN_SHARDS=4 python src/services/brain/main.py
+"""
+
+import time
+import multiprocessing
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.config.settings import config
+from src.config.symbols import FALLBACK_SYMBOLS
+from src.domain import parse_symbol_list
+from src.shared.memory import memory
+from src.shared.utils import get_logger
+
+logger = get_logger("BrainCoordinator")
+
+ASSIGNMENT_KEY = "brain:shard_assignment"
+BRAIN_GROUP = "brain"  # Consumer group compartido por todos los shards
+WORKER_MIN_UPTIME = 60  # Un worker que muere antes se considera en crash loop
+WORKER_BACKOFF = 300  # Segundos fuera del reparto tras un crash loop
+WORKER_RESTART_DELAY = 5  # Espera antes de reiniciar un worker en crash loop (se duplica por crash)
+
+
+def sharding_error(num_shards: int) -> Optional[str]:
+    """Motivo por el que no se puede particionar el Brain (None si se puede)"""
+    if config.MESSAGE_TRANSPORT != 'streams':
+        return "BRAIN_SHARDS > 1 requiere MESSAGE_TRANSPORT=streams"
+    if config.STREAM_PARTITIONS < num_shards:
+        return f"STREAM_PARTITIONS ({config.STREAM_PARTITIONS}) < BRAIN_SHARDS ({num_shards})"
+    return None
+
+
+def assign_partitions(partitions: int, shards: Iterable[int],
+                      previous: Optional[Dict[int, int]] = None) -> Dict[int, int]:
+    """
+    Reparte las particiones entre los shards: {partición: shard}.
+
+    Cada shard recibe partitions // len(shards) o una más. Las particiones
+    conservan su dueño anterior mientras siga vivo y no supere su cuota; solo
+    se mueven las huérfanas y los excedentes.
+
+    Raises:
+        ValueError: Si no hay shards
+    """
+    shards = sorted(shards)
+    if not shards:
+        raise ValueError("Reparto sin shards")
+    previous = previous or {}
+
+    owned: Dict[int, List[int]] = {shard: [] for shard in shards}
+    free = []
+    for partition in range(partitions):
+        owner = previous.get(partition)
+        (owned[owner] if owner in owned else free).append(partition)
+
+    # La cuota extra va a los que ya tienen más (menos movimientos)
+    base, extra = divmod(partitions, len(shards))
+    order = sorted(shards, key=lambda shard: (-len(owned[shard]), shard))
+    quota = {shard: base + (1 if i < extra else 0) for i, shard in enumerate(order)}
+
+    for shard in shards:
+        while len(owned[shard]) > quota[shard]:
+            free.append(owned[shard].pop())
+    free.sort(reverse=True)
+    for shard in shards:
+        while len(owned[shard]) < quota[shard]:
+            owned[shard].append(free.pop())
+
+    return {partition: shard for shard in shards for partition in owned[shard]}
+
+
+def load_assignment() -> Tuple[Optional[int], Dict[int, int], Dict[str, int]]:
+    """
+    Asignación publicada por el coordinador.
+
+    Returns:
+        (versión, {partición: shard}, {símbolo: shard}); (None, {}, {}) si no hay
+    """
+    data = memory.get(ASSIGNMENT_KEY)
+    if not isinstance(data, dict):
+        return None, {}, {}
+    partitions = {int(partition): int(shard) for partition, shard in data.get('partitions', {}).items()}
+    symbols = {symbol: int(shard) for symbol, shard in data.get('symbols', {}).items()}
+    return data.get('version'), partitions, symbols
+
+
+def run_shard(shard_id: int, num_shards: int):
+    """Entry point de un proceso worker (un Brain limitado a sus particiones)"""
+    from src.services.brain.main import RegimeSwitchingBrain
+
+    while True:
+        try:
+            RegimeSwitchingBrain(shard_id=shard_id, num_shards=num_shards).run()
+        except Exception as e:
+            logger.error(f"❌ Crash en Brain shard {shard_id}: {e}", exc_info=True)
+        time.sleep(5)
+
+
+class BrainCoordinator:
+    """
+    Proceso padre del modo sharded: supervisa los workers y rebalancea.
+
+    La asignación es assign_partitions(STREAM_PARTITIONS, shards vivos). Un
+    worker caído se reinicia enseguida (conserva sus particiones); si entra
+    en crash loop sale del reparto por WORKER_BACKOFF segundos, sus
+    particiones pasan a los demás shards y cada reinicio espera el doble
+    (WORKER_RESTART_DELAY, 2x, ... hasta WORKER_BACKOFF). Un shard sin
+    particiones asignadas queda detenido hasta que vuelva a recibir alguna.
+    """
+
+    def __init__(self, num_shards: int, refresh_seconds: int = None):
+        """
+        Raises:
+            ValueError: Si la configuración no permite particionar (ver sharding_error)
+        """
+        error = sharding_error(num_shards)
+        if error:
+            raise ValueError(error)
+        self.num_shards = num_shards
+        self.refresh_seconds = refresh_seconds or config.BRAIN_REBALANCE_INTERVAL
+        self._ctx = multiprocessing.get_context('spawn')
+        self.workers: Dict[int, multiprocessing.Process] = {}
+        self.started_at: Dict[int, float] = {}
+        self.backoff_until: Dict[int, float] = {}
+        self.restart_at: Dict[int, float] = {}  # Workers caídos pendientes de reinicio
+        self.crashes: Dict[int, int] = {}  # Crashes seguidos con uptime < WORKER_MIN_UPTIME
+        self.partitions: Dict[int, int] = {}
+        self.symbols: Dict[str, int] = {}
+        self.version = 0
+
+    def _start_worker(self, shard_id: int):
+        process = self._ctx.Process(
+            target=run_shard, args=(shard_id, self.num_shards), name=f"brain-shard-{shard_id}", daemon=True
+        )
+        process.start()
+        self.workers[shard_id] = process
+        self.started_at[shard_id] = time.time()
+        logger.info(f"🚀 Brain shard {shard_id}/{self.num_shards} iniciado (pid {process.pid})")
+
+    def supervise(self):
+        """Detecta los workers caídos; los que están en crash loop salen del reparto y esperan para reiniciarse"""
+        now = time.time()
+        for shard_id, process in list(self.workers.items()):
+            if process.is_alive() or shard_id in self.restart_at:
+                continue
+            uptime = now - self.started_at[shard_id]
+            logger.error(f"💀 Brain shard {shard_id} terminó (exit {process.exitcode}, uptime {uptime:.0f}s)")
+            if uptime < WORKER_MIN_UPTIME:
+                self.crashes[shard_id] = self.crashes.get(shard_id, 0) + 1
+                delay = min(WORKER_RESTART_DELAY * 2 ** (self.crashes[shard_id] - 1), WORKER_BACKOFF)
+                self.backoff_until[shard_id] = now + WORKER_BACKOFF
+                logger.warning(f"⏸️ Shard {shard_id} fuera del reparto {WORKER_BACKOFF}s, "
+                               f"reinicio en {delay}s (crash loop)")
+            else:
+                self.crashes.pop(shard_id, None)
+                delay = 0
+            self.restart_at[shard_id] = now + delay
+
+    def restart_workers(self):
+        """Reinicia los workers caídos cuyo backoff terminó y que tienen particiones asignadas"""
+        now = time.time()
+        assigned = set(self.partitions.values())
+        for shard_id, restart_at in list(self.restart_at.items()):
+            if restart_at <= now and shard_id in assigned:
+                del self.restart_at[shard_id]
+                self._start_worker(shard_id)
+
+    def live_shards(self) -> List[int]:
+        now = time.time()
+        live = [s for s in range(self.num_shards) if self.backoff_until.get(s, 0) <= now]
+        return live or list(range(self.num_shards))
+
+    def active_symbols(self) -> List[str]:
+        raw = memory.get("active_symbols")
+        try:
+            symbols = parse_symbol_list(raw) if isinstance(raw, list) and raw else parse_symbol_list(FALLBACK_SYMBOLS)
+        except (ValueError, TypeError) as e:
+            logger.error(f"❌ Error parsing active_symbols: {e}")
+            symbols = parse_symbol_list(FALLBACK_SYMBOLS)
+        return [symbol.to_short() for symbol in symbols]
+
+    def rebalance(self, symbols: List[str], shards: List[int]) -> bool:
+        """Publica la asignación si cambió. Returns: True si se publicó una nueva versión"""
+        partitions = assign_partitions(config.STREAM_PARTITIONS, shards, self.partitions)
+        assigned = {symbol: partitions[memory.partition_of(symbol)] for symbol in symbols}
+        if partitions == self.partitions and assigned == self.symbols:
+            return False
+
+        moved = sum(1 for p, shard in partitions.items() if p in self.partitions and self.partitions[p] != shard)
+        self.partitions, self.symbols = partitions, assigned
+        self.version += 1
+        memory.set(ASSIGNMENT_KEY, {
+            'version': self.version,
+            'shards': self.num_shards,
+            'partitions': {str(p): shard for p, shard in partitions.items()},
+            'symbols': assigned
+        })
+
+        per_shard = {shard: sum(1 for owner in assigned.values() if owner == shard) for shard in shards}
+        logger.info(f"⚖️ Asignación v{self.version}: {len(partitions)} particiones ({moved} movidas), "
+                    f"{len(assigned)} símbolos | {per_shard}")
+        return True
+
+    def run(self):
+        logger.info(f"🧠 Brain sharded: {self.num_shards} workers, {config.STREAM_PARTITIONS} particiones")
+
+        # Primera asignación antes de lanzar los workers (warm-up solo de lo propio)
+        self.version = int(time.time())  # Versiones crecientes entre reinicios del coordinador
+        _, self.partitions, _ = load_assignment()  # Reparto anterior (menos movimientos al reiniciar)
+        self.rebalance(self.active_symbols(), self.live_shards())
+        for shard_id in range(self.num_shards):
+            self._start_worker(shard_id)
+
+        while True:
+            time.sleep(self.refresh_seconds)
+            try:
+                self.supervise()
+                self.rebalance(self.active_symbols(), self.live_shards())
+                self.restart_workers()
+            except Exception as e:
+                logger.error(f"❌ Error en coordinador: {e}", exc_info=True)
@@ -8,8 +8,9 @@ Basado en el trabajo de Welles Wilder Jr. (1978).
 
 import numpy as np
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base import StrategyInterface, StrategyResult
+from ..indicators import IndicatorSet, IndicatorCache
 
 
 class AdxTrendFilter(StrategyInterface):
@@ -43,88 +44,25 @@ class AdxTrendFilter(StrategyInterface):
         self.adx_period = params.get('adx_period', 14)
         self.adx_threshold = params.get('adx_threshold', 25)
     
-    def calculate_ema(self, values: np.ndarray, period: int) -> float:
-        """Calcula EMA para smoothing"""
-        if len(values) < period:
-            return np.mean(values)
-        
-        multiplier = 2 / (period + 1)
-        ema = values[0]
-        
-        for value in values[1:]:
-            ema = (value - ema) * multiplier + ema
-        
-        return ema
+    def get_indicator_specs(self) -> Dict[str, tuple]:
+        """V22.2: Sistema direccional de Wilder incremental"""
+        return {'adx': ('adx', self.adx_period)}
     
-    def calculate_adx_from_prices(self, prices: np.ndarray, period: int = 14) -> tuple:
-        """
-        Calcula ADX, DI+, DI- usando solo precios de cierre.
-        (Versión simplificada sin high/low)
-        
-        Returns:
-            Tuple[adx, di_plus, di_minus]
-        """
-        if len(prices) < period + 1:
-            return 0.0, 0.0, 0.0
-        
-        # 1. Calcular movimientos direccionales
-        price_changes = np.diff(prices)
-        
-        # +DM: Movimientos alcistas
-        dm_plus = np.where(price_changes > 0, price_changes, 0)
-        
-        # -DM: Movimientos bajistas (valor absoluto)
-        dm_minus = np.where(price_changes < 0, -price_changes, 0)
-        
-        # 2. Calcular True Range simplificado
-        tr = np.abs(price_changes)
-        
-        # 3. Smooth +DM, -DM y TR
-        smoothed_dm_plus = self.calculate_ema(dm_plus[-period:], period)
-        smoothed_dm_minus = self.calculate_ema(dm_minus[-period:], period)
-        smoothed_tr = self.calculate_ema(tr[-period:], period)
-        
-        if smoothed_tr == 0:
-            return 0.0, 0.0, 0.0
-        
-        # 4. Calcular DI+ y DI-
-        di_plus = (smoothed_dm_plus / smoothed_tr) * 100
-        di_minus = (smoothed_dm_minus / smoothed_tr) * 100
-        
-        # 5. Calcular DX (Directional Index)
-        di_sum = di_plus + di_minus
-        if di_sum == 0:
-            return 0.0, di_plus, di_minus
-        
-        dx = abs(di_plus - di_minus) / di_sum * 100
-        
-        # 6. ADX = Smooth de DX
-        # Para simplificar en tiempo real, usamos directamente DX
-        # (Idealmente se debería promediar múltiples DX)
-        adx = dx
-        
-        return adx, di_plus, di_minus
-    
-    def evaluate(self, current_price: float, price_history: list) -> StrategyResult:
+    def evaluate_indicators(self, current_price: float, indicators: IndicatorSet) -> StrategyResult:
         """
         Evalúa si hay tendencia fuerte (ADX filter).
+        
+        V22.2: ADX real (suavizado de Wilder del DX) en lugar del DX
+        instantáneo. Con series de solo cierres, +DM/-DM y TR se derivan
+        de las variaciones de cierre.
         """
-        prices = np.array(price_history + [current_price])
+        directional = indicators[('adx', self.adx_period)].value
         
-        if len(prices) < self.adx_period + 2:
-            return StrategyResult(
-                signal=None,
-                confidence=0.0,
-                reason="Historial insuficiente para ADX",
-                indicators={},
-                timestamp=datetime.utcnow()
-            )
+        if directional is None:
+            return self._no_signal("Historial insuficiente para ADX")
         
-        # Calcular ADX y Directional Indicators
-        adx, di_plus, di_minus = self.calculate_adx_from_prices(
-            prices[-self.adx_period-1:], 
-            self.adx_period
-        )
+        # ADX y Directional Indicators
+        adx, di_plus, di_minus = directional
         
         signal = None
         confidence = 0.0
@@ -177,9 +115,18 @@ class AdxTrendFilter(StrategyInterface):
             timestamp=datetime.utcnow()
         )
     
+    def generate_signals(self, prices: np.ndarray, cache: Optional[IndicatorCache] = None) -> np.ndarray:
+        """V22.2: Tendencias fuertes (ADX + DI) vectorizadas sobre toda la serie"""
+        calc = self._series(cache)
+        prices = np.asarray(prices, dtype=float)
+        adx, di_plus, di_minus = calc.adx(prices, prices, prices, self.adx_period)
+        
+        strong_trend = adx >= self.adx_threshold
+        return self._signal_array(strong_trend & (di_plus > di_minus), strong_trend & (di_minus > di_plus))
+    
     def get_required_history(self) -> int:
-        """Necesita adx_period + 2"""
-        return self.adx_period + 3
+        """Necesita 2 * adx_period velas (period para DI, period para suavizar DX)"""
+        return 2 * self.adx_period
     
     def get_parameter_space(self) -> Dict[str, list]:
         """Espacio de búsqueda"""
@@ -2,12 +2,25 @@
 Base Strategy Interface - V18
 =============================
 Interfaz abstracta para todas las estrategias de trading.
+
+V22.2: Modo incremental - las estrategias declaran sus indicadores
+(get_indicator_specs) y evalúan sobre un IndicatorSet alimentado vela a vela.
+V22.2: Modo vectorizado - generate_signals() produce las señales de toda
+la serie de una vez (usado por FastBacktester en el torneo).
 """
 
+import numpy as np
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Optional, Dict, Any
 from datetime import datetime
+from ..indicators import IndicatorSet, IndicatorCache, series
+
+# Códigos de señal en modo vectorizado (generate_signals)
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+SIGNAL_NONE = 0
+SIGNAL_CODES = {'BUY': SIGNAL_BUY, 'SELL': SIGNAL_SELL}
 
 
 @dataclass
@@ -38,6 +51,14 @@ class StrategyInterface(ABC):
     1. evaluate() - Evalúa precio actual y genera señal
     2. get_required_history() - Cuántos períodos necesita
     3. get_parameter_space() - Espacio de búsqueda para optimización
+    
+    V22.2 (opcional, recomendado): Modo incremental
+    4. get_indicator_specs() - Indicadores incrementales que necesita
+    5. evaluate_indicators() - Evalúa leyendo los valores actuales del IndicatorSet
+    6. generate_signals() - Señales de toda la serie con NumPy (backtesting)
+    
+    Las estrategias incrementales no necesitan implementar evaluate():
+    la versión por defecto reconstruye un IndicatorSet desde la lista.
     """
     
     def __init__(self, params: Dict[str, Any]):
@@ -47,8 +68,9 @@ class StrategyInterface(ABC):
         """
         self.params = params
         self.name = self.__class__.__name__
+        # V22.2: Timeframe de evaluación en vivo (strategy_config 'interval')
+        self.timeframe = '1m'
     
-    @abstractmethod
     def evaluate(self, current_price: float, price_history: list) -> StrategyResult:
         """
         Evalúa si debe generar señal de compra/venta.
@@ -56,11 +78,115 @@ class StrategyInterface(ABC):
         Args:
             current_price: Precio actual del activo
             price_history: Lista de precios históricos [más antiguo -> más reciente]
+                (V22.2: en vivo, vista NumPy de solo lectura del ring buffer del Brain)
         
         Returns:
             StrategyResult con señal y metadatos
+        
+        V22.2: Por defecto reproduce la serie sobre un IndicatorSet nuevo
+        (O(historial)) y delega en evaluate_indicators(). En vivo el Brain
+        usa directamente evaluate_indicators() con su set incremental.
         """
-        pass
+        specs = self.get_indicator_specs()
+        if not specs:
+            raise NotImplementedError(f"{self.name} debe implementar evaluate() o get_indicator_specs()")
+        
+        indicators = IndicatorSet.from_prices(list(price_history) + [current_price], specs.values())
+        return self.evaluate_indicators(current_price, indicators)
+    
+    def get_indicator_specs(self) -> Dict[str, tuple]:
+        """
+        V22.2: Indicadores incrementales que usa la estrategia.
+        
+        Returns:
+            {nombre: spec}, ej: {'fast': ('stats', 10), 'slow': ('stats', 30)}
+            Vacío si la estrategia no soporta modo incremental.
+        """
+        return {}
+    
+    @property
+    def supports_incremental(self) -> bool:
+        """True si la estrategia puede evaluarse desde un IndicatorSet"""
+        return bool(self.get_indicator_specs())
+    
+    def evaluate_indicators(self, current_price: float, indicators: IndicatorSet) -> Optional[StrategyResult]:
+        """
+        V22.2: Evalúa usando indicadores incrementales (O(1) por tick).
+        
+        Args:
+            current_price: Precio actual (ya incluido en el IndicatorSet)
+            indicators: IndicatorSet del símbolo con las specs de get_indicator_specs()
+        
+        Returns:
+            StrategyResult, o None si la estrategia no soporta modo incremental
+        """
+        return None
+    
+    def generate_signals(self, prices: np.ndarray, cache: Optional[IndicatorCache] = None) -> np.ndarray:
+        """
+        V22.2: Genera las señales de toda la serie de precios de una vez.
+        
+        Args:
+            prices: Array de precios [más antiguo -> más reciente]
+            cache: IndicatorCache del torneo (comparte series entre combinaciones)
+        
+        Returns:
+            Array int8 del mismo largo: 1 = BUY, -1 = SELL, 0 = sin señal.
+            signals[i] equivale a evaluate(prices[i], prices[:i]).signal y es 0
+            durante el warm-up (i < get_required_history()).
+        
+        La versión por defecto evalúa vela a vela (incremental si la estrategia
+        lo soporta). Las estrategias la sobreescriben con NumPy vectorizado.
+        """
+        prices = np.asarray(prices, dtype=float)
+        signals = np.zeros(len(prices), dtype=np.int8)
+        price_list = prices.tolist()
+        required = self.get_required_history()
+        
+        indicators = None
+        if self.supports_incremental:
+            indicators = IndicatorSet()
+            indicators.require_all(self.get_indicator_specs().values())
+        
+        for i, price in enumerate(price_list):
+            if indicators is not None:
+                indicators.update(price)
+            if i < required:
+                continue
+            
+            if indicators is not None:
+                result = self.evaluate_indicators(price, indicators)
+            else:
+                result = self.evaluate(price, price_list[:i])
+            signals[i] = SIGNAL_CODES.get(result.signal, SIGNAL_NONE)
+        
+        return signals
+    
+    @staticmethod
+    def _series(cache: Optional[IndicatorCache]):
+        """Fuente de series vectorizadas: el cache del torneo o el módulo series"""
+        return cache if cache is not None else series
+    
+    def _signal_array(self, buy: np.ndarray, sell: np.ndarray) -> np.ndarray:
+        """
+        Combina máscaras booleanas BUY/SELL en el array de señales.
+        
+        BUY tiene prioridad (mismo orden que los if/elif de evaluate) y las
+        velas de warm-up quedan sin señal.
+        """
+        signals = np.where(buy, SIGNAL_BUY, np.where(sell, SIGNAL_SELL, SIGNAL_NONE)).astype(np.int8)
+        signals[:self.get_required_history()] = SIGNAL_NONE
+        return signals
+    
+    def _no_signal(self, reason: str) -> StrategyResult:
+        """Resultado neutro (sin señal), ej: historial insuficiente"""
+        return StrategyResult(
+            signal=None,
+            confidence=0.0,
+            reason=reason,
+            indicators={},
+            timestamp=datetime.utcnow()
+        )
     
     @abstractmethod
     def get_required_history(self) -> int:
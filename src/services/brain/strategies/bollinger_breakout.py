@@ -6,8 +6,9 @@ Estrategia de ruptura de Bandas de Bollinger.
 
 import numpy as np
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base import StrategyInterface, StrategyResult
+from ..indicators import IndicatorSet, IndicatorCache
 
 
 class BollingerBreakout(StrategyInterface):
@@ -36,41 +37,28 @@ class BollingerBreakout(StrategyInterface):
         self.period = params.get('period', 20)
         self.num_std = params.get('num_std', 2.0)
     
-    def calculate_bollinger_bands(self, prices: np.ndarray):
-        """
-        Calcula Bandas de Bollinger.
-        
-        Returns:
-            tuple: (middle_band, upper_band, lower_band)
-        """
-        middle_band = np.mean(prices[-self.period:])
-        std_dev = np.std(prices[-self.period:])
-        
-        upper_band = middle_band + (self.num_std * std_dev)
-        lower_band = middle_band - (self.num_std * std_dev)
-        
-        return middle_band, upper_band, lower_band
+    def get_indicator_specs(self) -> Dict[str, tuple]:
+        """V22.2: Media y desviación estándar móviles"""
+        return {'bands': ('stats', self.period)}
     
-    def evaluate(self, current_price: float, price_history: list) -> StrategyResult:
+    def evaluate_indicators(self, current_price: float, indicators: IndicatorSet) -> StrategyResult:
         """
         Evalúa rupturas de las bandas de Bollinger.
+        
+        Bandas = SMA ± (num_std * std_dev)
         """
-        prices = np.array(price_history + [current_price])
+        stats = indicators[('stats', self.period)].value
         
-        if len(prices) < self.period + 1:
-            return StrategyResult(
-                signal=None,
-                confidence=0.0,
-                reason="Historial insuficiente para Bollinger",
-                indicators={},
-                timestamp=datetime.utcnow()
-            )
+        if stats is None or indicators.prev_close is None:
+            return self._no_signal("Historial insuficiente para Bollinger")
         
         # Calcular bandas actuales
-        middle, upper, lower = self.calculate_bollinger_bands(prices)
+        middle = stats.mean
+        upper = middle + (self.num_std * stats.std)
+        lower = middle - (self.num_std * stats.std)
         
         # Precio anterior
-        prev_price = prices[-2]
+        prev_price = indicators.prev_close
         
         signal = None
         confidence = 0.0
@@ -111,6 +99,19 @@ class BollingerBreakout(StrategyInterface):
             timestamp=datetime.utcnow()
         )
     
+    def generate_signals(self, prices: np.ndarray, cache: Optional[IndicatorCache] = None) -> np.ndarray:
+        """V22.2: Rupturas de bandas vectorizadas sobre toda la serie"""
+        calc = self._series(cache)
+        prices = np.asarray(prices, dtype=float)
+        middle, std = calc.rolling_stats(prices, self.period)
+        upper = middle + (self.num_std * std)
+        lower = middle - (self.num_std * std)
+        prev_price = calc.shift(prices)
+        
+        buy = (prev_price <= lower) & (prices > lower)
+        sell = (prev_price >= upper) & (prices < upper)
+        return self._signal_array(buy, sell)
+    
     def get_required_history(self) -> int:
         """Necesita period + 1 para calcular bandas y detectar rupturas"""
         return self.period + 1
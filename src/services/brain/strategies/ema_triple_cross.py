@@ -6,8 +6,9 @@ Estrategia con 3 EMAs para mejor filtrado de señales.
 
 import numpy as np
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base import StrategyInterface, StrategyResult
+from ..indicators import IndicatorSet, IndicatorCache
 
 
 class EmaTripleCross(StrategyInterface):
@@ -44,40 +45,28 @@ class EmaTripleCross(StrategyInterface):
                 f"medium({self.medium_period}) < slow({self.slow_period})"
             )
     
-    def calculate_ema(self, prices: np.ndarray, period: int) -> float:
-        """Calcula EMA con precisión"""
-        multiplier = 2 / (period + 1)
-        ema = prices[0]
-        
-        for price in prices[1:]:
-            ema = (price - ema) * multiplier + ema
-        
-        return ema
+    def get_indicator_specs(self) -> Dict[str, tuple]:
+        """V22.2: Tres EMAs incrementales"""
+        return {
+            'fast': ('ema', self.fast_period),
+            'medium': ('ema', self.medium_period),
+            'slow': ('ema', self.slow_period)
+        }
     
-    def evaluate(self, current_price: float, price_history: list) -> StrategyResult:
+    def evaluate_indicators(self, current_price: float, indicators: IndicatorSet) -> StrategyResult:
         """
         Evalúa alineación de 3 EMAs.
         """
-        prices = np.array(price_history + [current_price])
+        fast = indicators[('ema', self.fast_period)]
+        medium = indicators[('ema', self.medium_period)]
+        slow = indicators[('ema', self.slow_period)]
         
-        if len(prices) < self.slow_period + 2:
-            return StrategyResult(
-                signal=None,
-                confidence=0.0,
-                reason="Historial insuficiente",
-                indicators={},
-                timestamp=datetime.utcnow()
-            )
+        if slow.prev is None:
+            return self._no_signal("Historial insuficiente")
         
-        # Calcular EMAs actuales
-        ema_fast = self.calculate_ema(prices[-self.fast_period:], self.fast_period)
-        ema_medium = self.calculate_ema(prices[-self.medium_period:], self.medium_period)
-        ema_slow = self.calculate_ema(prices[-self.slow_period:], self.slow_period)
-        
-        # EMAs previas (para detectar cruces)
-        ema_fast_prev = self.calculate_ema(prices[-(self.fast_period+1):-1], self.fast_period)
-        ema_medium_prev = self.calculate_ema(prices[-(self.medium_period+1):-1], self.medium_period)
-        ema_slow_prev = self.calculate_ema(prices[-(self.slow_period+1):-1], self.slow_period)
+        # EMAs actuales y previas (para detectar cruces)
+        ema_fast, ema_medium, ema_slow = fast.value, medium.value, slow.value
+        ema_fast_prev, ema_medium_prev, ema_slow_prev = fast.prev, medium.prev, slow.prev
         
         signal = None
         confidence = 0.0
@@ -117,9 +106,27 @@ class EmaTripleCross(StrategyInterface):
             timestamp=datetime.utcnow()
         )
     
+    def generate_signals(self, prices: np.ndarray, cache: Optional[IndicatorCache] = None) -> np.ndarray:
+        """V22.2: Alineaciones de las 3 EMAs vectorizadas sobre toda la serie"""
+        calc = self._series(cache)
+        fast = calc.ema(prices, self.fast_period)
+        medium = calc.ema(prices, self.medium_period)
+        slow = calc.ema(prices, self.slow_period)
+        fast_prev, medium_prev, slow_prev = (calc.shift(ema) for ema in (fast, medium, slow))
+        
+        ready = ~np.isnan(slow_prev)
+        bullish_now = (fast > medium) & (medium > slow)
+        bearish_now = (fast < medium) & (medium < slow)
+        was_bullish = (fast_prev > medium_prev) & (medium_prev > slow_prev)
+        was_bearish = (fast_prev < medium_prev) & (medium_prev < slow_prev)
+        
+        buy = ready & bullish_now & ~was_bullish
+        sell = ready & bearish_now & ~was_bearish
+        return self._signal_array(buy, sell)
+    
     def get_required_history(self) -> int:
-        """Necesita slow + 2 para cruces"""
-        return self.slow_period + 2
+        """Necesita slow + 1 para cruces (EMA lenta actual y previa)"""
+        return self.slow_period + 1
     
     def get_parameter_space(self) -> Dict[str, list]:
         """
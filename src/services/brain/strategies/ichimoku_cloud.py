@@ -8,8 +8,9 @@ Desarrollado por Goichi Hosoda (1968) - Japón.
 
 import numpy as np
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Optional
 from .base import StrategyInterface, StrategyResult
+from ..indicators import IndicatorSet, IndicatorCache
 
 
 class IchimokuCloud(StrategyInterface):
@@ -45,37 +46,24 @@ class IchimokuCloud(StrategyInterface):
         self.kijun_period = params.get('kijun_period', 26)
         self.senkou_b_period = params.get('senkou_b_period', 52)
     
-    def calculate_donchian(self, prices: np.ndarray, period: int) -> float:
-        """
-        Calcula Donchian Midpoint: (Max + Min) / 2
-        """
-        if len(prices) < period:
-            return np.mean(prices)
-        
-        window = prices[-period:]
-        return (np.max(window) + np.min(window)) / 2
+    def get_indicator_specs(self) -> Dict[str, tuple]:
+        """V22.2: Canales de Donchian incrementales para Tenkan, Kijun y Senkou B"""
+        return {
+            'tenkan': ('donchian', self.tenkan_period),
+            'kijun': ('donchian', self.kijun_period),
+            'senkou_b': ('donchian', self.senkou_b_period)
+        }
     
-    def calculate_ichimoku_components(self, price_history: List[float]) -> Dict[str, float]:
+    def _components(self, tenkan: float, kijun: float, senkou_b: float) -> Dict[str, float]:
         """
-        Calcula todos los componentes de Ichimoku.
+        Calcula todos los componentes de Ichimoku a partir de los puntos medios de Donchian.
         
         Returns:
             Dict con tenkan, kijun, senkou_a, senkou_b
         """
-        prices = np.array(price_history)
-        
-        # Tenkan-sen (Conversion Line) - 9 períodos
-        tenkan = self.calculate_donchian(prices, self.tenkan_period)
-        
-        # Kijun-sen (Base Line) - 26 períodos
-        kijun = self.calculate_donchian(prices, self.kijun_period)
-        
         # Senkou Span A: (Tenkan + Kijun) / 2
         senkou_a = (tenkan + kijun) / 2
         
-        # Senkou Span B: 52-period Donchian
-        senkou_b = self.calculate_donchian(prices, self.senkou_b_period)
-        
         return {
             'tenkan': tenkan,
             'kijun': kijun,
@@ -85,22 +73,20 @@ class IchimokuCloud(StrategyInterface):
             'kumo_bottom': min(senkou_a, senkou_b)
         }
     
-    def evaluate(self, current_price: float, price_history: list) -> StrategyResult:
+    def evaluate_indicators(self, current_price: float, indicators: IndicatorSet) -> StrategyResult:
         """
         Evalúa señales de Ichimoku Cloud.
         """
-        if len(price_history) < self.senkou_b_period:
-            return StrategyResult(
-                signal=None,
-                confidence=0.0,
-                reason="Historial insuficiente para Ichimoku",
-                indicators={},
-                timestamp=datetime.utcnow()
-            )
+        tenkan = indicators[('donchian', self.tenkan_period)]
+        kijun = indicators[('donchian', self.kijun_period)]
+        senkou_b = indicators[('donchian', self.senkou_b_period)]
+        
+        if senkou_b.prev is None or kijun.prev is None or tenkan.prev is None:
+            return self._no_signal("Historial insuficiente para Ichimoku")
         
         # Calcular componentes actuales y previos
-        current_components = self.calculate_ichimoku_components(price_history + [current_price])
-        prev_components = self.calculate_ichimoku_components(price_history)
+        current_components = self._components(tenkan.value.middle, kijun.value.middle, senkou_b.value.middle)
+        prev_components = self._components(tenkan.prev.middle, kijun.prev.middle, senkou_b.prev.middle)
         
         signal = None
         confidence = 0.0
@@ -109,7 +95,7 @@ class IchimokuCloud(StrategyInterface):
         kumo_top = current_components['kumo_top']
         kumo_bottom = current_components['kumo_bottom']
         
-        prev_price = price_history[-1]
+        prev_price = indicators.prev_close
         
         # Señal BULLISH: Precio rompe Kumo al alza
         if prev_price <= prev_components['kumo_top'] and current_price > kumo_top:
@@ -185,6 +171,34 @@ class IchimokuCloud(StrategyInterface):
             timestamp=datetime.utcnow()
         )
     
+    def generate_signals(self, prices: np.ndarray, cache: Optional[IndicatorCache] = None) -> np.ndarray:
+        """
+        V22.2: Rupturas del Kumo y TK Cross vectorizados sobre toda la serie.
+        
+        Con solo cierres, High = Low = Close (igual que el modo incremental del backtester).
+        """
+        calc = self._series(cache)
+        prices = np.asarray(prices, dtype=float)
+        _, _, tenkan = calc.donchian(prices, prices, self.tenkan_period)
+        _, _, kijun = calc.donchian(prices, prices, self.kijun_period)
+        _, _, senkou_b = calc.donchian(prices, prices, self.senkou_b_period)
+        senkou_a = (tenkan + kijun) / 2
+        kumo_top = np.maximum(senkou_a, senkou_b)
+        kumo_bottom = np.minimum(senkou_a, senkou_b)
+        
+        tenkan_prev, kijun_prev = calc.shift(tenkan), calc.shift(kijun)
+        kumo_top_prev, kumo_bottom_prev = calc.shift(kumo_top), calc.shift(kumo_bottom)
+        prev_price = calc.shift(prices)
+        
+        breakout = (prev_price <= kumo_top_prev) & (prices > kumo_top)
+        breakdown = ~breakout & (prev_price >= kumo_bottom_prev) & (prices < kumo_bottom)
+        no_breakout = ~breakout & ~breakdown
+        golden_cross = no_breakout & (tenkan_prev <= kijun_prev) & (tenkan > kijun) & (prices > kumo_top)
+        death_cross = (no_breakout & ~golden_cross & (tenkan_prev >= kijun_prev) &
+                       (tenkan < kijun) & (prices < kumo_bottom))
+        
+        return self._signal_array(breakout | golden_cross, breakdown | death_cross)
+    
     def get_required_history(self) -> int:
         """Necesita senkou_b_period + buffer"""
         return self.senkou_b_period + 5
@@ -8,8 +8,9 @@ Desarrollado por Chester W. Keltner (1960), modernizado por Linda Bradford Rasch
 
 import numpy as np
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base import StrategyInterface, StrategyResult
+from ..indicators import IndicatorSet, IndicatorCache
 
 
 class KeltnerChannels(StrategyInterface):
@@ -43,53 +44,31 @@ class KeltnerChannels(StrategyInterface):
         self.atr_period = params.get('atr_period', 10)
         self.atr_multiplier = params.get('atr_multiplier', 2.0)
     
-    def calculate_ema(self, prices: np.ndarray, period: int) -> float:
-        """Calcula EMA"""
-        if len(prices) < period:
-            return np.mean(prices)
-        
-        multiplier = 2 / (period + 1)
-        ema = prices[0]
-        
-        for price in prices[1:]:
-            ema = (price - ema) * multiplier + ema
-        
-        return ema
-    
-    def calculate_atr_simple(self, prices: np.ndarray, period: int) -> float:
-        """
-        Calcula ATR simplificado usando solo precios de cierre.
-        (Versión completa requiere high/low/close)
-        """
-        if len(prices) < period + 1:
-            return 0.0
-        
-        # True Range simplificado: |precio_actual - precio_anterior|
-        true_ranges = np.abs(np.diff(prices[-period-1:]))
-        
-        return np.mean(true_ranges)
+    def get_indicator_specs(self) -> Dict[str, tuple]:
+        """V22.2: EMA y ATR (Wilder) incrementales"""
+        return {
+            'middle': ('ema', self.ema_period),
+            'atr': ('atr', self.atr_period)
+        }
     
-    def evaluate(self, current_price: float, price_history: list) -> StrategyResult:
+    def evaluate_indicators(self, current_price: float, indicators: IndicatorSet) -> StrategyResult:
         """
         Evalúa señales de Keltner Channels.
+        
+        V22.2: El ATR usa High/Low reales cuando el Brain los alimenta
+        (con series de solo cierres se reduce a |close - close_prev|).
         """
-        prices = np.array(price_history + [current_price])
+        ema = indicators[('ema', self.ema_period)]
+        atr_indicator = indicators[('atr', self.atr_period)]
         
-        required = max(self.ema_period, self.atr_period) + 2
-        if len(prices) < required:
-            return StrategyResult(
-                signal=None,
-                confidence=0.0,
-                reason="Historial insuficiente",
-                indicators={},
-                timestamp=datetime.utcnow()
-            )
+        if ema.prev is None or atr_indicator.prev is None:
+            return self._no_signal("Historial insuficiente")
         
-        # 1. Calcular línea media (EMA)
-        middle_line = self.calculate_ema(prices[-self.ema_period:], self.ema_period)
+        # 1. Línea media (EMA)
+        middle_line = ema.value
         
-        # 2. Calcular ATR
-        atr = self.calculate_atr_simple(prices, self.atr_period)
+        # 2. ATR
+        atr = atr_indicator.value
         
         # 3. Calcular bandas
         upper_band = middle_line + (atr * self.atr_multiplier)
@@ -114,11 +93,9 @@ class KeltnerChannels(StrategyInterface):
         reason = "Precio en rango medio"
         
         # Precio previo para detectar rebotes
-        prev_price = prices[-2]
-        prev_middle = self.calculate_ema(prices[-self.ema_period-1:-1], self.ema_period)
-        prev_atr = self.calculate_atr_simple(prices[:-1], self.atr_period)
-        prev_upper = prev_middle + (prev_atr * self.atr_multiplier)
-        prev_lower = prev_middle - (prev_atr * self.atr_multiplier)
+        prev_price = indicators.prev_close
+        prev_upper = ema.prev + (atr_indicator.prev * self.atr_multiplier)
+        prev_lower = ema.prev - (atr_indicator.prev * self.atr_multiplier)
         
         # SEÑAL BUY: Rebote en banda inferior
         # Condición: Precio tocó/perforó banda inferior y ahora rebota hacia arriba
@@ -183,6 +160,33 @@ class KeltnerChannels(StrategyInterface):
             timestamp=datetime.utcnow()
         )
     
+    def generate_signals(self, prices: np.ndarray, cache: Optional[IndicatorCache] = None) -> np.ndarray:
+        """V22.2: Rebotes y rupturas de Keltner vectorizados sobre toda la serie"""
+        calc = self._series(cache)
+        prices = np.asarray(prices, dtype=float)
+        middle_line = calc.ema(prices, self.ema_period)
+        atr = calc.atr(prices, prices, prices, self.atr_period)
+        upper_band = middle_line + (atr * self.atr_multiplier)
+        lower_band = middle_line - (atr * self.atr_multiplier)
+        band_width = upper_band - lower_band
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position_in_bands = (prices - middle_line) / (band_width / 2)
+        
+        prev_price = calc.shift(prices)
+        prev_upper = calc.shift(upper_band)
+        prev_lower = calc.shift(lower_band)
+        
+        # Bandas colapsadas (volatilidad = 0) no generan señal
+        valid = band_width != 0
+        bounce = valid & (prev_price <= prev_lower) & (prices > lower_band)
+        rejection = valid & ~bounce & (prev_price >= prev_upper) & (prices < upper_band)
+        no_bounce = ~bounce & ~rejection
+        breakout = valid & no_bounce & (prices > upper_band) & (position_in_bands > 1.2)
+        breakdown = valid & no_bounce & ~breakout & (prices < lower_band) & (position_in_bands < -1.2)
+        
+        return self._signal_array(bounce | breakout, rejection | breakdown)
+    
     def get_required_history(self) -> int:
         """Necesita max(ema, atr) + buffer"""
         return max(self.ema_period, self.atr_period) + 5
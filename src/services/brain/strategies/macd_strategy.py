@@ -6,8 +6,9 @@ Moving Average Convergence Divergence - Estrategia de momentum.
 
 import numpy as np
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base import StrategyInterface, StrategyResult
+from ..indicators import IndicatorSet, IndicatorCache
 
 
 class MacdStrategy(StrategyInterface):
@@ -36,73 +37,25 @@ class MacdStrategy(StrategyInterface):
         self.slow_period = params.get('slow', 26)
         self.signal_period = params.get('signal', 9)
     
-    def calculate_ema(self, prices: np.ndarray, period: int) -> float:
-        """Calcula EMA (Exponential Moving Average)"""
-        multiplier = 2 / (period + 1)
-        ema = prices[0]  # Seed con primer valor
-        
-        for price in prices[1:]:
-            ema = (price - ema) * multiplier + ema
-        
-        return ema
+    def get_indicator_specs(self) -> Dict[str, tuple]:
+        """V22.2: MACD estándar incremental (EMA rápida, lenta y Signal)"""
+        return {'macd': ('macd', self.fast_period, self.slow_period, self.signal_period)}
     
-    def calculate_macd(self, prices: np.ndarray):
-        """
-        Calcula MACD y Signal Line.
-        
-        Returns:
-            tuple: (macd_line, signal_line, histogram)
-        """
-        # EMA rápida y lenta
-        ema_fast = self.calculate_ema(prices[-self.fast_period:], self.fast_period)
-        ema_slow = self.calculate_ema(prices[-self.slow_period:], self.slow_period)
-        
-        # MACD Line
-        macd_line = ema_fast - ema_slow
-        
-        # Para Signal Line, necesitamos historial de MACD
-        # Simplificado: calculamos MACD para varios puntos y luego EMA
-        macd_history = []
-        window_size = self.signal_period + 5
-        
-        for i in range(len(prices) - window_size, len(prices)):
-            if i >= self.slow_period:
-                segment = prices[:i+1]
-                fast = self.calculate_ema(segment[-self.fast_period:], self.fast_period)
-                slow = self.calculate_ema(segment[-self.slow_period:], self.slow_period)
-                macd_history.append(fast - slow)
-        
-        if len(macd_history) >= self.signal_period:
-            signal_line = self.calculate_ema(
-                np.array(macd_history[-self.signal_period:]), 
-                self.signal_period
-            )
-        else:
-            signal_line = macd_line
-        
-        histogram = macd_line - signal_line
-        
-        return macd_line, signal_line, histogram
-    
-    def evaluate(self, current_price: float, price_history: list) -> StrategyResult:
+    def evaluate_indicators(self, current_price: float, indicators: IndicatorSet) -> StrategyResult:
         """
         Evalúa cruces de MACD.
+        
+        MACD Line = EMA(fast) - EMA(slow)
+        Signal Line = EMA(signal) del MACD Line
         """
-        prices = np.array(price_history + [current_price])
+        macd = indicators[('macd', self.fast_period, self.slow_period, self.signal_period)]
         
-        required = self.slow_period + self.signal_period + 5
-        if len(prices) < required:
-            return StrategyResult(
-                signal=None,
-                confidence=0.0,
-                reason="Historial insuficiente para MACD",
-                indicators={},
-                timestamp=datetime.utcnow()
-            )
+        if macd.prev is None:
+            return self._no_signal("Historial insuficiente para MACD")
         
-        # Calcular MACD actual y previo
-        macd_current, signal_current, hist_current = self.calculate_macd(prices)
-        macd_prev, signal_prev, hist_prev = self.calculate_macd(prices[:-1])
+        # MACD actual y previo
+        macd_current, signal_current, hist_current = macd.value
+        macd_prev, signal_prev, hist_prev = macd.prev
         
         signal = None
         confidence = 0.0
@@ -135,9 +88,20 @@ class MacdStrategy(StrategyInterface):
             timestamp=datetime.utcnow()
         )
     
+    def generate_signals(self, prices: np.ndarray, cache: Optional[IndicatorCache] = None) -> np.ndarray:
+        """V22.2: Cruces MACD/Signal vectorizados sobre toda la serie"""
+        calc = self._series(cache)
+        macd_line, signal_line, _ = calc.macd(prices, self.fast_period, self.slow_period, self.signal_period)
+        macd_prev = calc.shift(macd_line)
+        signal_prev = calc.shift(signal_line)
+        
+        buy = (macd_prev <= signal_prev) & (macd_line > signal_line)
+        sell = (macd_prev >= signal_prev) & (macd_line < signal_line)
+        return self._signal_array(buy, sell)
+    
     def get_required_history(self) -> int:
-        """Necesita slow + signal + buffer para cálculo preciso"""
-        return self.slow_period + self.signal_period + 10
+        """Necesita slow + signal velas para el MACD y una más para detectar cruces"""
+        return self.slow_period + self.signal_period
     
     def get_parameter_space(self) -> Dict[str, list]:
         """
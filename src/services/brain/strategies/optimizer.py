@@ -2,18 +2,90 @@
 Tournament Optimizer - V18
 ==========================
 Motor de optimización que compite estrategias para encontrar la mejor configuración.
+
+V22.2: Modo paralelo - los jobs (símbolo, estrategia, params) se reparten en
+un pool de procesos. Los precios se envían una sola vez a cada proceso
+(initializer), no en cada job.
+V22.2: Cada ejecución usa un IndicatorCache (uno por proceso) para calcular
+cada serie de indicador una sola vez por símbolo.
+V22.2: Modo de búsqueda configurable (grid / random / halving, ver search.py).
+V22.2: Torneos sobre tramos [start, end) de la serie (run_tournaments): las
+señales de cada combinación se calculan una vez sobre toda la serie y se
+reutilizan en cada tramo (rondas de halving, folds de walk-forward).
+V22.2: save_to_redis notifica cada configuración nueva en STRATEGY_UPDATES_CHANNEL
+(el Brain cambia la estrategia de ese símbolo al instante).
 """
 
-import itertools
-import json
-from typing import Dict, List, Tuple, Any
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Any, Optional
 from datetime import datetime
 from src.shared.utils import get_logger
+from src.shared.codec import encode
 from .base import StrategyInterface
+from .search import ParameterSearch, create_search
 from ..backtesting.fast_backtester import FastBacktester, BacktestResult
+from ..indicators import IndicatorCache, DEFAULT_CACHE_BYTES
 
 logger = get_logger("TournamentOptimizer")
 
+# Job del torneo: (símbolo, nombre de estrategia, params, primera vela, vela final exclusiva)
+TournamentJob = Tuple[str, str, Dict[str, Any], int, int]
+
+# Tramo de un torneo: (símbolo, primera vela, vela final exclusiva)
+TournamentTarget = Tuple[str, int, int]
+
+# Velas mínimas de una ventana corta en Successive Halving
+MIN_ROUND_CANDLES = 100
+
+# Estado de cada proceso del pool (cargado una vez por _init_tournament_worker)
+_worker_state: Dict[str, Any] = {}
+
+# Canal Pub/Sub de cambios en strategy_config:{symbol} (broadcast a todas las
+# instancias del Brain, independiente de MESSAGE_TRANSPORT)
+STRATEGY_UPDATES_CHANNEL = "strategy_updates"
+
+
+def publish_strategy_update(redis_client, symbol: str, config: Optional[Dict[str, Any]] = None):
+    """Avisa que cambió strategy_config:{symbol} (el Brain la relee y cambia solo ese símbolo)"""
+    config = config or {}
+    try:
+        redis_client.publish(STRATEGY_UPDATES_CHANNEL, encode({
+            'symbol': symbol,
+            'strategy_name': config.get('strategy_name'),
+            'interval': config.get('interval')
+        }))
+    except Exception as e:
+        logger.error(f"❌ Error notificando cambio de estrategia de {symbol}: {e}")
+
+
+def _init_tournament_worker(symbols_data: Dict[str, np.ndarray], strategy_classes: Dict[str, type],
+                            initial_capital: float, commission: float, cache_bytes: int):
+    """Initializer del pool: recibe los precios de todos los símbolos una sola vez"""
+    _worker_state['symbols_data'] = symbols_data
+    _worker_state['strategy_classes'] = strategy_classes
+    _worker_state['backtester'] = FastBacktester(
+        initial_capital=initial_capital,
+        commission=commission,
+        cache=IndicatorCache(cache_bytes) if cache_bytes > 0 else None
+    )
+
+
+def _run_tournament_job(job: TournamentJob) -> Tuple[Optional[BacktestResult], Optional[str]]:
+    """
+    Ejecuta un backtest dentro de un proceso del pool.
+    
+    Returns:
+        (resultado, None) si OK, (None, mensaje de error) si falla
+    """
+    symbol, strategy_name, params, start, end = job
+    try:
+        strategy = _worker_state['strategy_classes'][strategy_name](params)
+        return _worker_state['backtester'].run_range(strategy, _worker_state['symbols_data'][symbol], start, end), None
+    except Exception as e:
+        return None, str(e)
+
 
 class TournamentOptimizer:
     """
@@ -26,16 +98,130 @@ class TournamentOptimizer:
     4. Retorna la estrategia ganadora (mayor score)
     
     El "torneo" se ejecuta cada 4 horas para adaptarse al mercado.
+    
+    V22.2: Con max_workers > 1 los backtests de todos los símbolos se
+    reparten en un ProcessPoolExecutor y el ranking se hace al final.
+    V22.2: El modo de búsqueda decide qué combinaciones se prueban y en
+    cuántas rondas (ej: halving descarta perdedores en ventanas cortas).
     """
     
-    def __init__(self, strategy_classes: Dict[str, type]):
+    def __init__(self, strategy_classes: Dict[str, type], max_workers: int = 1,
+                 cache_bytes: int = DEFAULT_CACHE_BYTES, search: Any = 'grid'):
         """
         Args:
             strategy_classes: Diccionario {nombre: clase} de estrategias disponibles
                               Ej: {'sma': SmaCrossover, 'rsi': RsiMeanReversion}
+            max_workers: (V22.2) Procesos para el torneo. 1 = secuencial, <= 0 = os.cpu_count()
+            cache_bytes: (V22.2) Presupuesto del IndicatorCache por proceso. 0 = sin cache
+            search: (V22.2) Modo de búsqueda: 'grid', 'random', 'halving' o un ParameterSearch
         """
         self.strategy_classes = strategy_classes
         self.backtester = FastBacktester(initial_capital=10000.0)
+        self.max_workers = max_workers if max_workers > 0 else (os.cpu_count() or 1)
+        self.cache_bytes = cache_bytes
+        self.search: ParameterSearch = create_search(search) if isinstance(search, str) else search
+        
+        # V22.2: Ranking final (ordenado por score) de la última ejecución, por símbolo
+        self.last_ranking: Dict[str, List[Tuple[StrategyInterface, BacktestResult]]] = {}
+    
+    def _sample_candidates(
+        self,
+        strategies: Dict[str, type],
+        max_combinations: int
+    ) -> Dict[str, List[StrategyInterface]]:
+        """
+        Candidatos iniciales por estrategia según el modo de búsqueda.
+        
+        Returns:
+            {nombre_estrategia: [estrategias instanciadas]}
+        """
+        candidates = {}
+        for strategy_name, params_list in self.search.sample(strategies, max_combinations).items():
+            logger.info(f"  🔍 Probando {strategy_name} ({len(params_list)} combinaciones)...")
+            candidates[strategy_name] = [strategies[strategy_name](params) for params in params_list]
+        return candidates
+    
+    def _open_pool(self, symbols_data: Dict[str, np.ndarray]) -> Optional[ProcessPoolExecutor]:
+        """Crea el pool de procesos (None si max_workers == 1 o si no se puede crear)"""
+        if self.max_workers <= 1:
+            return None
+        try:
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_tournament_worker,
+                initargs=(symbols_data, self.strategy_classes, self.backtester.initial_capital,
+                          self.backtester.commission, self.cache_bytes)
+            )
+        except Exception as e:
+            logger.error(f"❌ No se pudo crear el pool de procesos, ejecutando secuencial: {e}")
+            return None
+    
+    def _run_jobs(
+        self,
+        symbols_data: Dict[str, np.ndarray],
+        jobs: List[Tuple[Any, StrategyInterface, TournamentJob]],
+        pool: Optional[ProcessPoolExecutor] = None
+    ) -> List[Tuple[Any, StrategyInterface, BacktestResult]]:
+        """
+        Ejecuta los backtests (en el pool si se proporciona).
+        
+        Args:
+            jobs: Lista de (clave del torneo, estrategia, job)
+        
+        Returns:
+            Lista de (clave del torneo, estrategia, resultado) de los jobs que terminaron bien
+        """
+        outcomes = None
+        
+        if pool is not None and len(jobs) > 1:
+            try:
+                chunksize = max(1, len(jobs) // (self.max_workers * 4))
+                outcomes = list(pool.map(_run_tournament_job, [job for _, _, job in jobs], chunksize=chunksize))
+            except Exception as e:
+                logger.error(f"❌ Error en pool de procesos, ejecutando secuencial: {e}")
+                outcomes = None
+        
+        if outcomes is None:
+            outcomes = []
+            for _, strategy, (symbol, _, _, start, end) in jobs:
+                try:
+                    outcomes.append((self.backtester.run_range(strategy, symbols_data[symbol], start, end), None))
+                except Exception as e:
+                    outcomes.append((None, str(e)))
+        
+        results = []
+        for (key, strategy, (_, _, params, _, _)), (result, error) in zip(jobs, outcomes):
+            if result is None:
+                logger.warning(f"    ⚠️ Error con params {params}: {error}")
+                continue
+            results.append((key, strategy, result))
+        return results
+    
+    def _select_winner(
+        self,
+        symbol: str,
+        all_results: List[Tuple[StrategyInterface, BacktestResult]]
+    ) -> Tuple[StrategyInterface, BacktestResult]:
+        """Ordena por score y retorna la mejor (estrategia, resultado)"""
+        if not all_results:
+            logger.error(f"❌ No se pudo probar ninguna estrategia para {symbol}")
+            raise ValueError("No valid strategies tested")
+        
+        # Ordenar por score y seleccionar la mejor
+        all_results.sort(key=lambda x: x[1].score, reverse=True)
+        
+        best_strategy, best_result = all_results[0]
+        
+        logger.info(f"✅ Ganador para {symbol}: {best_result}")
+        logger.info(f"   Total combinaciones en ronda final: {len(all_results)}")
+        
+        # Mostrar top 3
+        if len(all_results) > 1:
+            logger.info(f"   🥈 Runner-up: {all_results[1][1]}")
+        if len(all_results) > 2:
+            logger.info(f"   🥉 Third: {all_results[2][1]}")
+        
+        return best_strategy, best_result
     
     def optimize_for_symbol(
         self, 
@@ -50,7 +236,7 @@ class TournamentOptimizer:
         Args:
             symbol: Símbolo del activo (ej: 'BTC')
             price_history: Datos históricos de precio [más antiguo -> más reciente]
-            max_combinations: Máximo de combinaciones a probar (para limitar tiempo)
+            max_combinations: Presupuesto en backtests completos (para limitar tiempo)
             strategies_to_test: (V19) Diccionario de estrategias a probar. Si None, usa todas.
         
         Returns:
@@ -62,61 +248,141 @@ class TournamentOptimizer:
         logger.info(f"🏆 Iniciando Torneo de Estrategias para {symbol} ({len(price_history)} precios)")
         logger.info(f"   🎯 Probando {len(strategies)} estrategias")
         
-        all_results = []
-        combinations_tested = 0
+        winners = self.optimize_symbols({symbol: price_history}, max_combinations, {symbol: strategies})
+        if symbol not in winners:
+            raise ValueError("No valid strategies tested")
+        return winners[symbol]
+    
+    def optimize_symbols(
+        self,
+        symbols_data: Dict[str, List[float]],
+        max_combinations: int = 50,
+        strategies_by_symbol: Dict[str, Dict[str, type]] = None
+    ) -> Dict[str, Tuple[StrategyInterface, BacktestResult]]:
+        """
+        V22.2: Ejecuta el torneo de varios símbolos en un solo pool de procesos.
         
-        # Probar cada tipo de estrategia
-        for strategy_name, strategy_class in strategies.items():
-            logger.info(f"  🔍 Probando {strategy_name}...")
-            
-            # Obtener espacio de parámetros
-            temp_strategy = strategy_class({})
-            param_space = temp_strategy.get_parameter_space()
-            
-            # Generar todas las combinaciones posibles
-            param_names = list(param_space.keys())
-            param_values = [param_space[name] for name in param_names]
-            
-            for combination in itertools.product(*param_values):
-                if combinations_tested >= max_combinations:
-                    break
-                
-                # Crear diccionario de parámetros
-                params = dict(zip(param_names, combination))
-                
-                try:
-                    # Crear instancia de estrategia con estos parámetros
-                    strategy = strategy_class(params)
-                    
-                    # Ejecutar backtest
-                    result = self.backtester.run(strategy, price_history)
-                    
-                    all_results.append((strategy, result))
-                    combinations_tested += 1
-                    
-                except Exception as e:
-                    logger.warning(f"    ⚠️ Error con params {params}: {e}")
-                    continue
+        Cada ronda del modo de búsqueda se ejecuta para todos los símbolos a la
+        vez; entre rondas sobreviven los mejores candidatos de cada estrategia.
         
-        if not all_results:
-            logger.error(f"❌ No se pudo probar ninguna estrategia para {symbol}")
-            raise ValueError("No valid strategies tested")
+        Args:
+            symbols_data: Diccionario {símbolo: [precios históricos]}
+            max_combinations: Presupuesto por símbolo en backtests completos equivalentes
+            strategies_by_symbol: Estrategias a probar por símbolo (filtro por régimen).
+                                  Los símbolos ausentes usan todas.
         
-        # Ordenar por score y seleccionar la mejor
-        all_results.sort(key=lambda x: x[1].score, reverse=True)
+        Returns:
+            Diccionario {símbolo: (estrategia_ganadora, resultado_backtest)}.
+            Los símbolos sin ningún backtest válido no aparecen.
+            El ranking completo de la ronda final queda en self.last_ranking.
+        """
+        self.last_ranking = {}
+        targets = {symbol: (symbol, 0, len(prices)) for symbol, prices in symbols_data.items()}
+        rankings = self.run_tournaments(symbols_data, targets, max_combinations, strategies_by_symbol)
         
-        best_strategy, best_result = all_results[0]
+        winners = {}
+        for symbol, all_results in rankings.items():
+            try:
+                winners[symbol] = self._select_winner(symbol, all_results)
+                self.last_ranking[symbol] = all_results
+            except ValueError:
+                continue
+        return winners
+    
+    def run_tournaments(
+        self,
+        symbols_data: Dict[str, List[float]],
+        targets: Dict[Any, TournamentTarget],
+        max_combinations: int = 50,
+        strategies_by_symbol: Dict[str, Dict[str, type]] = None
+    ) -> Dict[Any, List[Tuple[StrategyInterface, BacktestResult]]]:
+        """
+        V22.2: Ejecuta varios torneos, cada uno sobre un tramo de un símbolo.
         
-        logger.info(f"✅ Ganador para {symbol}: {best_result}")
-        logger.info(f"   Total combinaciones probadas: {combinations_tested}")
+        Todos los torneos comparten un solo pool (los precios se envían una vez
+        por símbolo) y los mismos candidatos por símbolo, así que las señales
+        de cada combinación se calculan una vez por proceso y se reutilizan en
+        todos los tramos de ese símbolo.
         
-        # Mostrar top 3
-        if len(all_results) > 1:
-            logger.info(f"   🥈 Runner-up: {all_results[1][1]}")
-        if len(all_results) > 2:
-            logger.info(f"   🥉 Third: {all_results[2][1]}")
+        Args:
+            symbols_data: Diccionario {símbolo: [precios históricos]}
+            targets: {clave del torneo: (símbolo, primera vela, vela final exclusiva)}
+            max_combinations: Presupuesto por torneo en backtests completos equivalentes
+            strategies_by_symbol: Estrategias a probar por símbolo. Los ausentes usan todas.
         
-        return best_strategy, best_result
+        Returns:
+            {clave del torneo: [(estrategia, resultado)] de la ronda final ordenado por score}
+        """
+        strategies_by_symbol = strategies_by_symbol or {}
+        arrays = {symbol: np.asarray(prices, dtype=float) for symbol, prices in symbols_data.items()}
+        
+        # Candidatos por (clave del torneo, estrategia); los tramos de un símbolo comparten muestra
+        samples = {}
+        population = {}
+        for key, (symbol, _, _) in targets.items():
+            if symbol not in samples:
+                strategies = strategies_by_symbol.get(symbol, self.strategy_classes)
+                samples[symbol] = self._sample_candidates(strategies, max_combinations)
+            for strategy_name, candidates in samples[symbol].items():
+                population[(key, strategy_name)] = list(candidates)
+        
+        schedule = self.search.schedule()
+        logger.info(f"🏆 Torneo de {len(targets)} tramo(s) en {len(arrays)} símbolo(s) ({self.search}): "
+                    f"{sum(len(c) for c in population.values())} candidatos, {len(schedule)} ronda(s), "
+                    f"{self.max_workers} proceso(s)")
+        
+        results = []
+        pool = self._open_pool(arrays)
+        self.backtester.cache = IndicatorCache(self.cache_bytes) if self.cache_bytes > 0 else None
+        try:
+            for round_index, fraction in enumerate(schedule):
+                final_round = round_index == len(schedule) - 1
+                
+                jobs = []
+                for (key, strategy_name), candidates in population.items():
+                    symbol, first, last = targets[key]
+                    window = max(int((last - first) * fraction), MIN_ROUND_CANDLES)
+                    start = first if final_round else max(first, last - window)
+                    for strategy in candidates:
+                        jobs.append((key, strategy, (symbol, strategy_name, strategy.params, start, last)))
+                
+                # Misma combinación contigua en todos los tramos -> mismo proceso reutiliza sus señales
+                jobs.sort(key=lambda job: (job[2][0], job[2][1], sorted(job[2][2].items())))
+                results = self._run_jobs(arrays, jobs, pool)
+                
+                if final_round:
+                    break
+                
+                # Sobreviven los mejores de cada estrategia (reparto equitativo entre estrategias)
+                grouped = {key: [] for key in population}
+                for key, strategy, result in results:
+                    grouped[(key, strategy.name)].append((strategy, result))
+                population = {}
+                for key, ranked in grouped.items():
+                    if not ranked:
+                        continue
+                    ranked.sort(key=lambda x: x[1].score, reverse=True)
+                    population[key] = [strategy for strategy, _ in ranked[:self.search.survivors(len(ranked))]]
+                
+                logger.info(f"   ⏩ Ronda {round_index + 1}/{len(schedule)} ({fraction:.0%} de velas): "
+                            f"{len(jobs)} backtests -> {sum(len(c) for c in population.values())} pasan")
+            
+            if self.backtester.cache is not None:
+                stats = self.backtester.cache.stats()
+                if stats['hits'] + stats['misses']:
+                    logger.info(f"   🧠 Cache de indicadores: {stats['entries']} series, "
+                                f"hit rate {stats['hit_rate']:.0%}, {stats['memory_mb']:.1f}MB")
+        finally:
+            self.backtester.cache = None
+            if pool is not None:
+                pool.shutdown()
+        
+        rankings = {key: [] for key in targets}
+        for key, strategy, result in results:
+            rankings[key].append((strategy, result))
+        for ranked in rankings.values():
+            ranked.sort(key=lambda x: x[1].score, reverse=True)
+        return rankings
     
     def optimize_all_symbols(
         self, 
@@ -142,13 +408,14 @@ class TournamentOptimizer:
         logger.info(f"🎯 Optimizando estrategias para {len(symbols_data)} símbolos...")
         
         results = {}
+        winners = self.optimize_symbols(symbols_data)
         
-        for symbol, price_history in symbols_data.items():
+        for symbol in symbols_data:
             try:
-                best_strategy, backtest_result = self.optimize_for_symbol(
-                    symbol, 
-                    price_history
-                )
+                if symbol not in winners:
+                    raise ValueError("No valid strategies tested")
+                
+                best_strategy, backtest_result = winners[symbol]
                 
                 results[symbol] = {
                     'strategy_name': best_strategy.name,
@@ -185,10 +452,12 @@ class TournamentOptimizer:
         Redis Structure:
         - Key: strategy_config:{symbol}
         - Value: JSON con estrategia ganadora y parámetros
+        - V22.2: Aviso en STRATEGY_UPDATES_CHANNEL por símbolo (ver publish_strategy_update)
         """
         for symbol, config in results.items():
             key = f"strategy_config:{symbol}"
-            redis_client.set(key, json.dumps(config))
+            redis_client.set(key, encode(config))
+            publish_strategy_update(redis_client, symbol, config)
             logger.info(f"💾 Guardado: {key} -> {config['strategy_name']}{config['params']}")
         
         # Guardar timestamp de última optimización
@@ -10,9 +10,10 @@ Referencias:
 
 import numpy as np
 from enum import Enum
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Iterable, Optional
 from datetime import datetime
 from src.shared.utils import get_logger
+from ..indicators import EmaIndicator, AtrIndicator, AdxIndicator, RollingStatsIndicator
 
 logger = get_logger("RegimeDetector")
 
@@ -162,9 +163,9 @@ class RegimeDetector:
         Detecta el régimen de mercado actual.
         
         Args:
-            price_history: Lista de precios de cierre (últimos N datos)
-            high_history: Lista de máximos (opcional, para ADX preciso)
-            low_history: Lista de mínimos (opcional, para ADX preciso)
+            price_history: Lista o array de precios de cierre (últimos N datos)
+            high_history: Lista o array de máximos (opcional, para ADX preciso)
+            low_history: Lista o array de mínimos (opcional, para ADX preciso)
         
         Returns:
             Tuple[MarketRegime, indicators_dict]
@@ -173,16 +174,16 @@ class RegimeDetector:
             logger.warning(f"Historial insuficiente para régimen: {len(price_history)} < {self.ema_period}")
             return MarketRegime.UNKNOWN, {}
         
-        prices = np.array(price_history)
+        prices = np.asarray(price_history, dtype=float)  # V22.2: Sin copia si ya es array
         current_price = prices[-1]
         
         # 1. Calcular EMA(200) para tendencia macro
         ema_200 = self.calculate_ema(prices[-self.ema_period:], self.ema_period)
         
         # 2. Calcular ADX para fuerza de tendencia
-        if high_history and low_history and len(high_history) >= self.adx_period:
-            highs = np.array(high_history[-self.adx_period-1:])
-            lows = np.array(low_history[-self.adx_period-1:])
+        if high_history is not None and low_history is not None and len(high_history) >= self.adx_period:
+            highs = np.asarray(high_history[-self.adx_period-1:], dtype=float)
+            lows = np.asarray(low_history[-self.adx_period-1:], dtype=float)
             closes = prices[-self.adx_period-1:]
             
             adx, di_plus, di_minus = self.calculate_adx(highs, lows, closes, self.adx_period)
@@ -212,6 +213,27 @@ class RegimeDetector:
                 atr_percent = volatility
         
         # 3. Clasificar Régimen según Matriz de Decisión
+        return self.classify(current_price, ema_200, adx, di_plus, di_minus, atr_percent)
+    
+    def classify(
+        self,
+        current_price: float,
+        ema_200: float,
+        adx: float,
+        di_plus: float,
+        di_minus: float,
+        atr_percent: float,
+        verbose: bool = True
+    ) -> Tuple[MarketRegime, Dict[str, Any]]:
+        """
+        V22.2: Matriz de decisión sobre indicadores ya calculados (detect o RegimeTracker).
+        
+        Args:
+            verbose: Loguear el régimen (el Brain lo desactiva al evaluar cada vela)
+        
+        Returns:
+            Tuple[MarketRegime, indicators_dict]
+        """
         indicators = {
             'current_price': float(current_price),
             'ema_200': float(ema_200),
@@ -225,27 +247,32 @@ class RegimeDetector:
         # Regla 1: Alta Volatilidad = Reducir exposición
         if atr_percent > self.volatility_threshold:
             regime = MarketRegime.HIGH_VOLATILITY
-            logger.info(f"🔥 HIGH VOLATILITY detected: ATR={atr_percent:.2f}% > {self.volatility_threshold}%")
+            if verbose:
+                logger.info(f"🔥 HIGH VOLATILITY detected: ATR={atr_percent:.2f}% > {self.volatility_threshold}%")
         
         # Regla 2: Lateral/Choppy = Sin tendencia clara
         elif adx < self.adx_sideways_threshold:
             regime = MarketRegime.SIDEWAYS_RANGE
-            logger.info(f"↔️ SIDEWAYS market: ADX={adx:.1f} < {self.adx_sideways_threshold}")
+            if verbose:
+                logger.info(f"↔️ SIDEWAYS market: ADX={adx:.1f} < {self.adx_sideways_threshold}")
         
         # Regla 3: Tendencia Alcista = Precio > EMA(200) + ADX > 25
         elif current_price > ema_200 and adx >= self.adx_trend_threshold:
             regime = MarketRegime.BULL_TREND
-            logger.info(f"📈 BULL TREND: Price={current_price:.2f} > EMA200={ema_200:.2f}, ADX={adx:.1f}")
+            if verbose:
+                logger.info(f"📈 BULL TREND: Price={current_price:.2f} > EMA200={ema_200:.2f}, ADX={adx:.1f}")
         
         # Regla 4: Tendencia Bajista = Precio < EMA(200) + ADX > 25
         elif current_price < ema_200 and adx >= self.adx_trend_threshold:
             regime = MarketRegime.BEAR_TREND
-            logger.info(f"📉 BEAR TREND: Price={current_price:.2f} < EMA200={ema_200:.2f}, ADX={adx:.1f}")
+            if verbose:
+                logger.info(f"📉 BEAR TREND: Price={current_price:.2f} < EMA200={ema_200:.2f}, ADX={adx:.1f}")
         
         # Regla 5: Transición (ADX entre 20-25)
         else:
             regime = MarketRegime.SIDEWAYS_RANGE
-            logger.info(f"⚖️ TRANSITIONAL market (weak trend): ADX={adx:.1f}")
+            if verbose:
+                logger.info(f"⚖️ TRANSITIONAL market (weak trend): ADX={adx:.1f}")
         
         return regime, indicators
     
@@ -286,3 +313,70 @@ class RegimeDetector:
         }
         
         return strategy_matrix.get(regime, ['RsiMeanReversion'])
+
+
+class RegimeTracker:
+    """
+    V22.2: Régimen de un símbolo actualizado vela a vela (O(1) por vela).
+    
+    Mantiene EMA(ema_period), ATR y ADX/DI± de Wilder (suavizado completo,
+    no solo el último DX) y la media de cierres de la ventana del ATR, y
+    clasifica con la misma matriz que RegimeDetector.detect(). Así el Brain
+    puede evaluar el régimen en cada vela sin recorrer el historial.
+    
+    Uso:
+        tracker = RegimeTracker(detector)
+        tracker.seed(closes, highs, lows)       # warm-up en bloque
+        tracker.update(close, high, low)        # cada vela nueva
+        regime, indicators = tracker.regime()
+    """
+    
+    def __init__(self, detector: RegimeDetector):
+        self.detector = detector
+        self.ema = EmaIndicator(detector.ema_period)
+        self.atr = AtrIndicator(detector.adx_period)
+        self.adx = AdxIndicator(detector.adx_period)
+        self.mean = RollingStatsIndicator(detector.adx_period + 1)  # Base del ATR %
+        self.count = 0
+        self.close: Optional[float] = None
+    
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None):
+        """Procesa una vela (sin high/low se usa el cierre)"""
+        close = float(close)
+        high = close if high is None else float(high)
+        low = close if low is None else float(low)
+        self.ema.update(close, high, low)
+        self.atr.update(close, high, low)
+        self.adx.update(close, high, low)
+        self.mean.update(close, high, low)
+        self.close = close
+        self.count += 1
+    
+    def seed(
+        self,
+        closes: Iterable[float],
+        highs: Optional[Iterable[float]] = None,
+        lows: Optional[Iterable[float]] = None
+    ):
+        """Alimenta un bloque de velas (listas o arrays, ej: vistas del ring buffer)"""
+        closes = np.asarray(closes, dtype=float).tolist()
+        highs = closes if highs is None else np.asarray(highs, dtype=float).tolist()
+        lows = closes if lows is None else np.asarray(lows, dtype=float).tolist()
+        for close, high, low in zip(closes, highs, lows):
+            self.update(close, high, low)
+    
+    @property
+    def ready(self) -> bool:
+        """True con EMA(ema_period) completa (igual que detect()) y ADX listo"""
+        return self.count >= self.detector.ema_period and self.adx.ready
+    
+    def regime(self, verbose: bool = False) -> Tuple[MarketRegime, Dict[str, Any]]:
+        """Régimen actual (UNKNOWN hasta que esté listo)"""
+        if not self.ready:
+            return MarketRegime.UNKNOWN, {}
+        
+        adx = self.adx.value
+        atr_percent = self.atr.value / self.mean.value.mean * 100 if self.mean.value.mean else 0.0
+        return self.detector.classify(
+            self.close, self.ema.value, adx.adx, adx.di_plus, adx.di_minus, atr_percent, verbose=verbose
+        )
@@ -6,8 +6,9 @@ Estrategia de reversión a la media basada en RSI.
 
 import numpy as np
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base import StrategyInterface, StrategyResult
+from ..indicators import IndicatorSet, IndicatorCache
 
 
 class RsiMeanReversion(StrategyInterface):
@@ -36,51 +37,21 @@ class RsiMeanReversion(StrategyInterface):
         self.oversold = params.get('oversold', 30)
         self.overbought = params.get('overbought', 70)
     
-    def calculate_rsi(self, prices: np.ndarray) -> float:
-        """
-        Calcula RSI usando método estándar de Wilder.
-        
-        RSI = 100 - (100 / (1 + RS))
-        RS = Average Gain / Average Loss
-        """
-        if len(prices) < self.period + 1:
-            return 50.0  # Neutral si no hay suficientes datos
-        
-        # Calcular cambios de precio
-        deltas = np.diff(prices)
-        
-        # Separar ganancias y pérdidas
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        
-        # Promedio de ganancias y pérdidas (método EMA de Wilder)
-        avg_gain = np.mean(gains[-self.period:])
-        avg_loss = np.mean(losses[-self.period:])
-        
-        if avg_loss == 0:
-            return 100.0  # Todas ganancias = RSI máximo
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+    def get_indicator_specs(self) -> Dict[str, tuple]:
+        """V22.2: RSI de Wilder incremental"""
+        return {'rsi': ('rsi', self.period)}
     
-    def evaluate(self, current_price: float, price_history: list) -> StrategyResult:
+    def evaluate_indicators(self, current_price: float, indicators: IndicatorSet) -> StrategyResult:
         """
         Evalúa condiciones de sobrecompra/sobreventa con RSI.
-        """
-        prices = np.array(price_history + [current_price])
         
-        if len(prices) < self.period + 1:
-            return StrategyResult(
-                signal=None,
-                confidence=0.0,
-                reason="Historial insuficiente para RSI",
-                indicators={},
-                timestamp=datetime.utcnow()
-            )
+        RSI = 100 - (100 / (1 + RS))
+        RS = Average Gain / Average Loss (suavizado de Wilder)
+        """
+        rsi = indicators[('rsi', self.period)].value
         
-        rsi = self.calculate_rsi(prices)
+        if rsi is None:
+            return self._no_signal("Historial insuficiente para RSI")
         
         signal = None
         confidence = 0.0
@@ -112,6 +83,12 @@ class RsiMeanReversion(StrategyInterface):
             timestamp=datetime.utcnow()
         )
     
+    def generate_signals(self, prices: np.ndarray, cache: Optional[IndicatorCache] = None) -> np.ndarray:
+        """V22.2: Sobreventa/sobrecompra de RSI vectorizadas sobre toda la serie"""
+        calc = self._series(cache)
+        rsi = calc.rsi(prices, self.period)
+        return self._signal_array(rsi < self.oversold, rsi > self.overbought)
+    
     def get_required_history(self) -> int:
         """Necesita period + 1 para calcular RSI correctamente"""
         return self.period + 1
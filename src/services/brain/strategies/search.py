@@ -0,0 +1,220 @@
+"""
+Parameter Search Modes - V22.2
+==============================
+Modos de búsqueda de parámetros para el Torneo de Estrategias.
+
+- grid: Producto cartesiano truncado en max_combinations (comportamiento V18).
+  Las primeras estrategias del diccionario consumen todo el presupuesto.
+- random: Muestreo Latin Hypercube con reparto equitativo del presupuesto
+  entre estrategias.
+- halving: Successive Halving - muchos candidatos evaluados en ventanas
+  cortas (velas más recientes); en cada ronda sobrevive 1/eta de cada
+  estrategia hasta el backtest completo.
+
+El presupuesto (max_combinations) se mide en backtests completos
+equivalentes, así que los tres modos cuestan lo mismo por ciclo.
+"""
+
+import itertools
+import random
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any, Optional
+from src.shared.utils import get_logger
+
+logger = get_logger("ParameterSearch")
+
+
+def valid_parameter_grid(strategy_class: type) -> List[Dict[str, Any]]:
+    """
+    Todas las combinaciones de get_parameter_space() que la estrategia acepta.
+
+    Las combinaciones inválidas (el constructor lanza excepción, ej:
+    SmaCrossover con fast >= slow) se descartan.
+    """
+    param_space = strategy_class({}).get_parameter_space()
+    param_names = list(param_space.keys())
+    grid = []
+    for combination in itertools.product(*[param_space[name] for name in param_names]):
+        params = dict(zip(param_names, combination))
+        try:
+            strategy_class(params)
+        except Exception as e:
+            logger.debug(f"Combinación descartada {strategy_class.__name__}{params}: {e}")
+            continue
+        grid.append(params)
+    return grid
+
+
+def fair_shares(sizes: Dict[str, int], total: int) -> Dict[str, int]:
+    """
+    Reparte `total` entre estrategias en partes iguales sin superar el tamaño
+    de cada grid (lo que sobra de grids pequeños pasa a las demás).
+
+    Args:
+        sizes: {estrategia: combinaciones válidas}
+        total: Candidatos a repartir
+    """
+    shares = {name: 0 for name in sizes}
+    pending = [name for name, size in sizes.items() if size > 0]
+    remaining = total
+
+    while pending and remaining > 0:
+        quota = max(1, remaining // len(pending))
+        for name in list(pending):
+            if remaining <= 0:
+                break
+            grant = min(quota, sizes[name] - shares[name], remaining)
+            shares[name] += grant
+            remaining -= grant
+            if shares[name] >= sizes[name]:
+                pending.remove(name)
+    return shares
+
+
+def latin_hypercube(param_space: Dict[str, list], grid: List[Dict[str, Any]], k: int,
+                    rng: random.Random) -> List[Dict[str, Any]]:
+    """
+    Elige k combinaciones del grid cubriendo uniformemente cada parámetro.
+
+    Cada dimensión se divide en k estratos (valores repetidos de forma
+    equilibrada y permutados). Los puntos inválidos o repetidos se
+    reemplazan por combinaciones válidas al azar.
+    """
+    if k >= len(grid):
+        return list(grid)
+
+    valid = {tuple(sorted(params.items())) for params in grid}
+    columns = {}
+    for name, values in param_space.items():
+        strata = [values[i * len(values) // k] for i in range(k)]
+        rng.shuffle(strata)
+        columns[name] = strata
+
+    chosen, seen = [], set()
+    for i in range(k):
+        params = {name: columns[name][i] for name in param_space}
+        key = tuple(sorted(params.items()))
+        if key in valid and key not in seen:
+            seen.add(key)
+            chosen.append(params)
+
+    unused = [params for params in grid if tuple(sorted(params.items())) not in seen]
+    chosen.extend(rng.sample(unused, k - len(chosen)))
+    return chosen
+
+
+class ParameterSearch(ABC):
+    """
+    Interfaz de un modo de búsqueda.
+
+    El optimizador pide los candidatos iniciales (sample) y luego ejecuta
+    una ronda por cada fracción de schedule(); tras cada ronda (salvo la
+    última) conserva survivors(n) candidatos por estrategia.
+    """
+
+    name = "base"
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    @abstractmethod
+    def sample(self, strategies: Dict[str, type], budget: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Candidatos iniciales {estrategia: [params]} para un presupuesto dado"""
+        pass
+
+    def schedule(self) -> List[float]:
+        """Fracción de las velas (más recientes) usada en cada ronda"""
+        return [1.0]
+
+    def survivors(self, n: int) -> int:
+        """Candidatos de una estrategia que pasan a la siguiente ronda"""
+        return n
+
+    def _fair_sample(self, strategies: Dict[str, type], total: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Reparte `total` candidatos entre estrategias y muestrea cada grid con LHS"""
+        grids = {name: valid_parameter_grid(cls) for name, cls in strategies.items()}
+        shares = fair_shares({name: len(grid) for name, grid in grids.items()}, total)
+        return {
+            name: latin_hypercube(strategies[name]({}).get_parameter_space(), grids[name], shares[name], self.rng)
+            for name in strategies
+            if shares[name] > 0
+        }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class GridSearch(ParameterSearch):
+    """Producto cartesiano en orden, truncado en el presupuesto (V18)"""
+
+    name = "grid"
+
+    def sample(self, strategies: Dict[str, type], budget: int) -> Dict[str, List[Dict[str, Any]]]:
+        candidates = {}
+        remaining = budget
+        for strategy_name, strategy_class in strategies.items():
+            if remaining <= 0:
+                break
+            grid = valid_parameter_grid(strategy_class)[:remaining]
+            candidates[strategy_name] = grid
+            remaining -= len(grid)
+        return candidates
+
+
+class RandomSearch(ParameterSearch):
+    """Muestreo Latin Hypercube con el presupuesto repartido entre estrategias"""
+
+    name = "random"
+
+    def sample(self, strategies: Dict[str, type], budget: int) -> Dict[str, List[Dict[str, Any]]]:
+        return self._fair_sample(strategies, budget)
+
+
+class SuccessiveHalvingSearch(ParameterSearch):
+    """
+    Successive Halving sobre ventanas de datos crecientes.
+
+    Con rounds=3 y eta=3: ronda 1 con 1/9 de las velas, ronda 2 con 1/3 y
+    ronda final con todas; en cada ronda sobrevive 1/eta de cada estrategia.
+    Cada ronda cuesta ~presupuesto/rounds, así que se pueden probar
+    presupuesto * eta^(rounds-1) / rounds candidatos iniciales.
+    """
+
+    name = "halving"
+
+    def __init__(self, seed: Optional[int] = None, eta: int = 3, rounds: int = 3):
+        super().__init__(seed)
+        self.eta = eta
+        self.rounds = rounds
+
+    def sample(self, strategies: Dict[str, type], budget: int) -> Dict[str, List[Dict[str, Any]]]:
+        initial = budget * self.eta ** (self.rounds - 1) // self.rounds
+        return self._fair_sample(strategies, max(initial, budget))
+
+    def schedule(self) -> List[float]:
+        return [1.0 / self.eta ** (self.rounds - 1 - i) for i in range(self.rounds)]
+
+    def survivors(self, n: int) -> int:
+        return max(1, -(-n // self.eta))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(eta={self.eta}, rounds={self.rounds})"
+
+
+SEARCH_MODES = {
+    GridSearch.name: GridSearch,
+    RandomSearch.name: RandomSearch,
+    SuccessiveHalvingSearch.name: SuccessiveHalvingSearch
+}
+
+
+def create_search(mode: str, seed: Optional[int] = None) -> ParameterSearch:
+    """
+    Crea un modo de búsqueda por nombre ('grid', 'random', 'halving').
+
+    Raises:
+        ValueError: Si el modo no existe
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Modo de búsqueda desconocido: {mode} (disponibles: {list(SEARCH_MODES)})")
+    return SEARCH_MODES[mode](seed=seed)
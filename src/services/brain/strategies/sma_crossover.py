@@ -8,6 +8,7 @@ import numpy as np
 from datetime import datetime
 from typing import Dict, Any, Optional
 from .base import StrategyInterface, StrategyResult
+from ..indicators import IndicatorSet, IndicatorCache
 
 
 class SmaCrossover(StrategyInterface):
@@ -35,30 +36,28 @@ class SmaCrossover(StrategyInterface):
         if self.fast_period >= self.slow_period:
             raise ValueError(f"Fast period ({self.fast_period}) debe ser menor que slow period ({self.slow_period})")
     
-    def evaluate(self, current_price: float, price_history: list) -> StrategyResult:
+    def get_indicator_specs(self) -> Dict[str, tuple]:
+        """V22.2: SMAs rápida y lenta como medias móviles incrementales"""
+        return {
+            'fast': ('stats', self.fast_period),
+            'slow': ('stats', self.slow_period)
+        }
+    
+    def evaluate_indicators(self, current_price: float, indicators: IndicatorSet) -> StrategyResult:
         """
         Evalúa cruce de SMAs.
         
         Necesita al menos slow_period + 1 precios para detectar cruces.
         """
-        prices = np.array(price_history + [current_price])
+        fast = indicators[('stats', self.fast_period)]
+        slow = indicators[('stats', self.slow_period)]
         
-        if len(prices) < self.slow_period + 1:
-            return StrategyResult(
-                signal=None,
-                confidence=0.0,
-                reason="Historial insuficiente",
-                indicators={},
-                timestamp=datetime.utcnow()
-            )
+        if slow.prev is None:
+            return self._no_signal("Historial insuficiente")
         
-        # Calcular SMAs
-        sma_fast = np.mean(prices[-self.fast_period:])
-        sma_slow = np.mean(prices[-self.slow_period:])
-        
-        # SMAs del período anterior (para detectar cruce)
-        sma_fast_prev = np.mean(prices[-(self.fast_period+1):-1])
-        sma_slow_prev = np.mean(prices[-(self.slow_period+1):-1])
+        # SMAs actuales y del período anterior (para detectar cruce)
+        sma_fast, sma_slow = fast.value.mean, slow.value.mean
+        sma_fast_prev, sma_slow_prev = fast.prev.mean, slow.prev.mean
         
         # Detectar cruce
         signal = None
@@ -92,6 +91,19 @@ class SmaCrossover(StrategyInterface):
             timestamp=datetime.utcnow()
         )
     
+    def generate_signals(self, prices: np.ndarray, cache: Optional[IndicatorCache] = None) -> np.ndarray:
+        """V22.2: Golden/Death Cross vectorizados sobre toda la serie"""
+        calc = self._series(cache)
+        prices = np.asarray(prices, dtype=float)
+        sma_fast, _ = calc.rolling_stats(prices, self.fast_period)
+        sma_slow, _ = calc.rolling_stats(prices, self.slow_period)
+        sma_fast_prev = calc.shift(sma_fast)
+        sma_slow_prev = calc.shift(sma_slow)
+        
+        buy = (sma_fast_prev <= sma_slow_prev) & (sma_fast > sma_slow)
+        sell = (sma_fast_prev >= sma_slow_prev) & (sma_fast < sma_slow)
+        return self._signal_array(buy, sell)
+    
     def get_required_history(self) -> int:
         """Necesita slow_period + 1 para detectar cruces"""
         return self.slow_period + 1
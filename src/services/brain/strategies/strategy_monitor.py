@@ -4,11 +4,12 @@ Strategy Performance Monitor - V18.5
 Monitorea performance de estrategias en tiempo real y las desactiva si fallan.
 """
 
-import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 from src.shared.utils import get_logger
+from src.shared.codec import encode, decode
+from .optimizer import publish_strategy_update
 
 logger = get_logger("StrategyMonitor")
 
@@ -60,7 +61,7 @@ class StrategyMonitor:
         }
         
         # Añadir a lista (mantener últimos 50 outcomes)
-        self.redis_client.lpush(key, json.dumps(outcome))
+        self.redis_client.lpush(key, encode(outcome))
         self.redis_client.ltrim(key, 0, 49)
         
         logger.debug(f"Recorded outcome for {symbol} {strategy_name}: PnL={pnl:.2f}")
@@ -75,7 +76,7 @@ class StrategyMonitor:
         if not outcomes_json or len(outcomes_json) < self.min_signals_for_eval:
             return None
         
-        outcomes = [json.loads(o) for o in outcomes_json]
+        outcomes = [decode(o) for o in outcomes_json]
         
         total_signals = len(outcomes)
         winning_signals = sum(1 for o in outcomes if o['is_win'])
@@ -156,12 +157,13 @@ class StrategyMonitor:
         config_json = self.redis_client.get(key)
         
         if config_json:
-            config = json.loads(config_json)
+            config = decode(config_json)
             config['is_disabled'] = True
             config['disabled_reason'] = 'Poor performance detected'
             config['disabled_at'] = datetime.utcnow().isoformat()
             
-            self.redis_client.set(key, json.dumps(config))
+            self.redis_client.set(key, encode(config))
+            publish_strategy_update(self.redis_client, symbol, config)
             logger.warning(f"🚫 DISABLED strategy for {symbol}: {strategy_name} due to poor performance")
     
     def run_health_check(self):
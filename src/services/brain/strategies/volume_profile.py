@@ -8,9 +8,14 @@ Basado en Market Profile (J. Peter Steidlmayer, 1985) y Volume Profile.
 
 import numpy as np
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from collections import Counter
+from numpy.lib.stride_tricks import sliding_window_view
 from .base import StrategyInterface, StrategyResult
+from ..indicators import IndicatorCache
+
+# Máximo de celdas (ventanas x precios) por bloque en modo vectorizado
+_VECTOR_CHUNK_CELLS = 2_000_000
 
 
 class VolumeProfileStrategy(StrategyInterface):
@@ -60,7 +65,7 @@ class VolumeProfileStrategy(StrategyInterface):
         else:
             prices = price_history[-self.lookback_period:]
         
-        prices_array = np.array(prices)
+        prices_array = np.asarray(prices, dtype=float)
         
         # Crear bins de precios
         min_price = np.min(prices_array)
@@ -190,6 +195,101 @@ class VolumeProfileStrategy(StrategyInterface):
             timestamp=datetime.utcnow()
         )
     
+    def _poc_levels(self, windows: np.ndarray):
+        """
+        V22.2: POC y Value Area de varias ventanas a la vez (misma lógica que calculate_poc).
+        
+        Args:
+            windows: Matriz (ventanas x lookback_period) de precios
+        
+        Returns:
+            (poc_price, value_area_low, value_area_high) como arrays por ventana
+        """
+        rows = np.arange(len(windows))
+        min_price = windows.min(axis=1)
+        max_price = windows.max(axis=1)
+        
+        # Bordes de bins idénticos a np.linspace(min, max, num_bins + 1)
+        step = (max_price - min_price) / self.num_bins
+        bin_edges = np.arange(self.num_bins + 1) * step[:, None] + min_price[:, None]
+        bin_edges[:, -1] = max_price
+        
+        # Bin de cada precio (el último bin incluye el borde derecho, como np.histogram):
+        # estimación aritmética + corrección contra los bordes reales
+        with np.errstate(divide='ignore', invalid='ignore'):
+            estimate = np.floor((windows - min_price[:, None]) / step[:, None])
+        bin_index = np.clip(np.nan_to_num(estimate), 0, self.num_bins - 1).astype(np.intp)
+        row_index = np.broadcast_to(rows[:, None], bin_index.shape)
+        bin_index -= (windows < bin_edges[row_index, bin_index]) & (bin_index > 0)
+        bin_index += (windows >= bin_edges[row_index, bin_index + 1]) & (bin_index < self.num_bins - 1)
+        histogram = np.bincount(
+            (rows[:, None] * self.num_bins + bin_index).ravel(),
+            minlength=len(windows) * self.num_bins
+        ).reshape(len(windows), self.num_bins)
+        
+        poc_bin_index = histogram.argmax(axis=1)
+        poc_price = (bin_edges[rows, poc_bin_index] + bin_edges[rows, poc_bin_index + 1]) / 2
+        value_area_low = bin_edges[rows, np.maximum(0, poc_bin_index - 2)]
+        value_area_high = bin_edges[rows, np.minimum(self.num_bins - 1, poc_bin_index + 2) + 1]
+        
+        flat = min_price == max_price
+        for levels in (poc_price, value_area_low, value_area_high):
+            levels[flat] = min_price[flat]
+        
+        return poc_price, value_area_low, value_area_high
+    
+    def _profile_levels(self, prices: np.ndarray):
+        """
+        V22.2: POC y Value Area de cada vela desde get_required_history() en adelante.
+        
+        Cada vela usa como ventana los lookback_period precios anteriores
+        (igual que evaluate). Se procesa por bloques para acotar memoria.
+        """
+        required = self.get_required_history()
+        
+        # Fila j = historial de la vela required + j
+        windows = sliding_window_view(prices[:-1], self.lookback_period)[required - self.lookback_period:]
+        chunk = max(1, _VECTOR_CHUNK_CELLS // self.lookback_period)
+        levels = [self._poc_levels(windows[start:start + chunk]) for start in range(0, len(windows), chunk)]
+        return tuple(np.concatenate(level) for level in zip(*levels))
+    
+    def generate_signals(self, prices: np.ndarray, cache: Optional[IndicatorCache] = None) -> np.ndarray:
+        """
+        V22.2: Rebotes en POC y rupturas del Value Area vectorizados.
+        
+        Los niveles solo dependen de lookback_period y num_bins, así que con
+        cache se comparten entre valores de poc_proximity_pct.
+        """
+        prices = np.asarray(prices, dtype=float)
+        required = self.get_required_history()
+        buy = np.zeros(len(prices), dtype=bool)
+        sell = np.zeros(len(prices), dtype=bool)
+        
+        if len(prices) <= required:
+            return self._signal_array(buy, sell)
+        
+        if cache is not None:
+            poc_price, va_low, va_high = cache.memoize(
+                'volume_profile', (self.lookback_period, self.num_bins), (prices,),
+                lambda: self._profile_levels(prices)
+            )
+        else:
+            poc_price, va_low, va_high = self._profile_levels(prices)
+        
+        current_price = prices[required:]
+        prev_price = prices[required - 1:-1]
+        distance_to_poc_pct = np.abs(current_price - poc_price) / poc_price * 100
+        near_poc = distance_to_poc_pct < self.poc_proximity_pct
+        
+        bounce = near_poc & (current_price > poc_price) & (prev_price <= poc_price)
+        rejection = near_poc & ~bounce & (current_price < poc_price) & (prev_price >= poc_price)
+        breakout = ~near_poc & (current_price > va_high) & (prev_price <= va_high)
+        breakdown = ~near_poc & ~breakout & (current_price < va_low) & (prev_price >= va_low)
+        
+        buy[required:] = bounce | breakout
+        sell[required:] = rejection | breakdown
+        return self._signal_array(buy, sell)
+    
     def get_required_history(self) -> int:
         """Necesita lookback_period"""
         return max(20, self.lookback_period)
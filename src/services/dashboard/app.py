@@ -6,7 +6,6 @@ from src.domain import TradingSymbol, parse_symbol_list  # V21.3: Value Object
 from src.shared.memory import memory # Redis Client
 from src.shared.database import SessionLocal, Signal, Trade, Wallet, PairsSignal # Local DB
 import requests
-import json
 from datetime import datetime, timedelta
 from openpyxl import Workbook
 from io import BytesIO
@@ -178,7 +177,7 @@ def get_market_regimes():
                 regime_json = memory.get_client().get(key)
                 
                 if regime_json:
-                    regime_data = json.loads(regime_json)
+                    regime_data = memory.decode(regime_json)
                     
                     regimes[symbol.to_short()] = {
                         'regime': regime_data.get('regime', 'unknown'),
@@ -1,10 +1,11 @@
 import os
-import requests
+import json
 import logging
-from flask import Flask, jsonify, request
-from datetime import datetime, timedelta
+from flask import Flask, Response, jsonify, request, stream_with_context
+from datetime import datetime, timedelta, timezone
 from src.shared.utils import get_logger, normalize_symbol  # Keep for backward compat
 from src.domain import TradingSymbol  # V21.3: Value Object
+from src.shared.candle_store import candle_store, interval_ms, COLUMNS  # V22.2: Cache local de velas
 
 app = Flask(__name__)
 
@@ -20,15 +21,71 @@ logger = get_logger('HistoricalDataSvcV21.3')
 # 3. Entrenar modelos de ML en el futuro
 #
 # V17: Sin Firestore, datos servidos directamente desde Binance API
+# V22.2: Servidos desde el candle store local (solo se descargan los huecos)
 
 BINANCE_API = "https://api.binance.com/api/v3/klines"
 
+# V22.2: Consultas de rango (/range)
+RANGE_FIELDS = [name for name, _ in COLUMNS if name != 'open_time']  # open, high, low, close, volume
+RANGE_CHUNK_SIZE = 10000  # Velas por chunk en las respuestas streaming
+RANGE_DEFAULT_DAYS = 30
+RANGE_MAX_CANDLES = 527_040  # Tope de velas con descarga de huecos (366 días de 1m)
+
+
+def _candles_to_json(candles, interval: str) -> list:
+    """Velas del candle store en el formato de respuesta (timestamps en ms + close_time)"""
+    step = interval_ms(interval)
+    return [
+        dict(record, close_time=record['timestamp'] + step - 1)
+        for record in candles.to_records(timestamp_unit='ms')
+    ]
+
+def _parse_time_ms(value: str) -> int:
+    """'1704067200000' (ms) o ISO 8601 ('2024-01-01', '2024-01-01T12:00', UTC) -> ms"""
+    if value.isdigit():
+        return int(value)
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def _json_chunks(array):
+    """Elementos de un array como fragmentos JSON ('1.5,2.0,...') de RANGE_CHUNK_SIZE"""
+    for i in range(0, len(array), RANGE_CHUNK_SIZE):
+        yield json.dumps(array[i:i + RANGE_CHUNK_SIZE].tolist())[1:-1]
+
+
+def _stream_columns(header: dict, columns: dict):
+    """
+    Documento JSON columnar generado por partes:
+    {...header, "columns": {"timestamp": [...], "close": [...]}}
+    
+    Cada columna se serializa en chunks de RANGE_CHUNK_SIZE directo desde
+    los arrays del store (sin lista de dicts por vela en memoria).
+    """
+    yield json.dumps(header)[:-1] + ', "columns": {'
+    for n, (name, array) in enumerate(columns.items()):
+        yield f'{", " if n else ""}"{name}": ['
+        for i, chunk in enumerate(_json_chunks(array)):
+            yield f",{chunk}" if i else chunk
+        yield ']'
+    yield '}}'
+
+
+def _stream_ndjson(header: dict, columns: dict):
+    """Una línea de header y luego una línea por chunk: {"timestamp": [...], "close": [...]}"""
+    yield json.dumps(header) + '\n'
+    length = len(next(iter(columns.values())))
+    for i in range(0, length, RANGE_CHUNK_SIZE):
+        yield json.dumps({name: array[i:i + RANGE_CHUNK_SIZE].tolist() for name, array in columns.items()}) + '\n'
+
 @app.route('/')
 def health():
     return jsonify({
         "status": "online",
         "service": "historical-data-v17",
-        "description": "Historical data from Binance API (no cache)"
+        "description": "Historical data from Binance API (local candle store cache)"
     })
 
 @app.route('/load/<symbol>', methods=['POST'])
@@ -36,6 +93,7 @@ def load_historical(symbol):
     """
     Carga datos históricos de un símbolo desde Binance.
     V17: Retorna datos sin persistirlos en base de datos.
+    V22.2: Los datos quedan en el candle store; solo se piden a Binance los huecos.
     
     ¿Qué son los Klines/Candlesticks?
     ---------------------------------
@@ -64,40 +122,9 @@ def load_historical(symbol):
     
     logger.info(f"📊 Fetching {symbol_normalized} historical data: {days}d, interval={interval}")
     
-    all_data = []
-    current_start = start_time
-    
     try:
-        while current_start < end_time:
-            params = {
-                'symbol': symbol_pair,
-                'interval': interval,
-                'startTime': current_start,
-                'endTime': end_time,
-                'limit': 1000
-            }
-            
-            response = requests.get(BINANCE_API, params=params, timeout=10)
-            if response.status_code != 200:
-                logger.error(f"Binance API error: {response.text}")
-                return jsonify({"error": f"Binance API error: {response.text}"}), 500
-            
-            klines = response.json()
-            if not klines:
-                break
-                
-            for k in klines:
-                all_data.append({
-                    'timestamp': k[0],
-                    'open': float(k[1]),
-                    'high': float(k[2]),
-                    'low': float(k[3]),
-                    'close': float(k[4]),
-                    'volume': float(k[5]),
-                    'close_time': k[6]
-                })
-            
-            current_start = klines[-1][6] + 1
+        # V22.2: Top-up de los huecos + lectura local (sin re-descargar lo cacheado)
+        all_data = _candles_to_json(candle_store.get(symbol_pair, interval, start_time, end_time), interval)
         
         logger.info(f"✅ Loaded {len(all_data)} candles for {symbol_normalized}")
         
@@ -119,6 +146,7 @@ def get_historical(symbol):
     """
     Obtiene datos históricos desde Binance API.
     V17: Sin caché, consulta directa a Binance.
+    V22.2: Servido desde el candle store (solo velas cerradas).
     
     Uso: GET /get/BTC?interval=1h&limit=100
     """
@@ -136,30 +164,8 @@ def get_historical(symbol):
         return jsonify({"error": f"Invalid symbol: {symbol}"}), 400
     
     try:
-        params = {
-            'symbol': symbol_pair,
-            'interval': interval,
-            'limit': limit
-        }
-        
-        response = requests.get(BINANCE_API, params=params, timeout=10)
-        if response.status_code != 200:
-            logger.error(f"Binance API error: {response.text}")
-            return jsonify({"error": f"Binance API error: {response.text}"}), 500
-        
-        klines = response.json()
-        data = []
-        
-        for k in klines:
-            data.append({
-                'timestamp': k[0],
-                'open': float(k[1]),
-                'high': float(k[2]),
-                'low': float(k[3]),
-                'close': float(k[4]),
-                'volume': float(k[5]),
-                'close_time': k[6]
-            })
+        # V22.2: Últimas `limit` velas cerradas desde el candle store
+        data = _candles_to_json(candle_store.get_last(symbol_pair, interval, limit), interval)
         
         logger.info(f"✅ Returned {len(data)} candles for {symbol_normalized}")
         
@@ -175,6 +181,83 @@ def get_historical(symbol):
         logger.error(f"Error getting historical data: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/range/<symbol>', methods=['GET'])
+def get_range(symbol):
+    """
+    V22.2: Consulta de rango servida desde el candle store.
+    
+    Solo se piden a Binance los huecos del rango (el resto sale del cache
+    local); la respuesta es columnar y se envía en chunks, así un año de
+    velas de 1m no se arma como una lista de dicts en memoria.
+    
+    Uso: GET /range/BTC?start=2024-01-01&end=2024-12-31&interval=1m&fields=close,volume
+    
+    Params:
+        start / end: ms epoch o ISO 8601 UTC (default: últimos 30 días)
+        interval: Intervalo de vela (default 1h)
+        fields: Columnas separadas por coma (default todas; timestamp siempre)
+        format: 'columns' (JSON columnar, default) o 'ndjson' (header + un chunk por línea)
+        fill: '0' para leer solo el cache, sin descargar huecos (obligatorio
+              si el rango supera RANGE_MAX_CANDLES velas)
+    
+    Respuesta (format=columns):
+        {"status", "symbol", "interval", "start", "end", "count", "fields",
+         "columns": {"timestamp": [ms, ...], "close": [...], ...}}
+    """
+    interval = request.args.get('interval', '1h')
+    fmt = request.args.get('format', 'columns')
+    fields = [f for f in request.args.get('fields', ','.join(RANGE_FIELDS)).split(',') if f]
+    
+    try:
+        symbol_normalized = normalize_symbol(symbol, format='short')  # "BTC"
+        symbol_pair = normalize_symbol(symbol, format='long')  # "BTCUSDT"
+        step = interval_ms(interval)
+        end_ms = _parse_time_ms(request.args['end']) if 'end' in request.args else int(datetime.now().timestamp() * 1000)
+        start_ms = (_parse_time_ms(request.args['start']) if 'start' in request.args
+                    else end_ms - RANGE_DEFAULT_DAYS * 86_400_000)
+    except (ValueError, TypeError) as e:
+        logger.error(f"❌ Invalid range request for '{symbol}': {e}")
+        return jsonify({"error": str(e)}), 400
+    
+    invalid = [f for f in fields if f not in RANGE_FIELDS]
+    if invalid or fmt not in ('columns', 'ndjson') or start_ms > end_ms:
+        return jsonify({"error": f"Invalid params: fields={invalid or fields}, format={fmt}, start/end"}), 400
+    
+    fill = request.args.get('fill', '1') != '0'
+    span = (end_ms - start_ms) // step + 1
+    if fill and span > RANGE_MAX_CANDLES:
+        logger.warning(f"⚠️ Range too large for {symbol_normalized}: {span} {interval} candles")
+        return jsonify({"error": f"Range too large: {span} candles (max {RANGE_MAX_CANDLES}, use fill=0 for cache only)"}), 400
+    
+    try:
+        if not fill:
+            candles = candle_store.read(symbol_pair, interval, start_ms, end_ms)
+        else:
+            candles = candle_store.get(symbol_pair, interval, start_ms, end_ms)
+    except Exception as e:
+        logger.error(f"Error loading range for {symbol_normalized}: {e}")
+        return jsonify({"error": str(e)}), 500
+    
+    columns = {'timestamp': candles.open_time}
+    columns.update({name: getattr(candles, name) for name in fields})
+    header = {
+        "status": "success",
+        "symbol": symbol_normalized,
+        "interval": interval,
+        "start": start_ms,
+        "end": end_ms,
+        "count": len(candles),
+        "fields": list(columns)
+    }
+    
+    logger.info(f"📤 {symbol_normalized} {interval}: {len(candles)} velas ({fmt})")
+    
+    if fmt == 'ndjson':
+        body, mimetype = _stream_ndjson(header, columns), 'application/x-ndjson'
+    else:
+        body, mimetype = _stream_columns(header, columns), 'application/json'
+    return Response(stream_with_context(body), mimetype=mimetype, headers={'X-Candle-Count': str(len(candles))})
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     logger.info(f"🚀 Historical Data Service V19 starting on port {port}")
@@ -31,9 +31,101 @@ current_symbols = parse_symbol_list(DEFAULT_SYMBOLS_STR)  # List[TradingSymbol]
 MARKET_SCAN_INTERVAL = 3600  # Escanear el mercado cada 1 hora (3600s)
 selector = MarketSelector() # Instancia del cerebro
 
+# V22.2: Sesión HTTP compartida y fetches concurrentes
+BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
+BINANCE_TICKER_24HR_URL = "https://api.binance.com/api/v3/ticker/24hr"
+MAX_CONCURRENT_FETCHES = int(os.environ.get("MARKET_DATA_MAX_CONCURRENT_FETCHES", "10"))
+HTTP_TIMEOUT_SECONDS = 10
+BINANCE_WEIGHT_LIMIT = 1200  # Peso máximo por minuto (X-MBX-USED-WEIGHT-1M)
+BINANCE_WEIGHT_SAFETY = 0.8  # Pausar al llegar al 80% del límite
+
+_http_session = None
+_fetch_semaphore = None
+
+# V22.2: Modo de ingesta. "stream" = WebSocket kline_1m (fallback a REST), "rest" = polling cada 60s
+MARKET_DATA_MODE = os.environ.get("MARKET_DATA_MODE", "stream").lower()
+BINANCE_WS_URL = os.environ.get("BINANCE_WS_URL", "wss://stream.binance.com:9443/stream")
+STREAM_MAX_FAILURES = 3  # Fallos de conexión consecutivos antes de pasar a REST
+STREAM_FALLBACK_SECONDS = 300  # Tiempo en modo REST antes de reintentar el stream
+STREAM_PING_INTERVAL = 20
+STREAM_BATCH_WINDOW = 0.5  # Segundos máximos que se agrupan los cierres de un minuto
+
+# Timestamp de la última vela publicada por símbolo (evita duplicados stream/REST)
+last_published = {}
+symbols_changed = asyncio.Event()
+
+
+class BinanceRateLimiter:
+    """
+    V22.2: Respeta los límites de peso de Binance.
+    
+    - Lee X-MBX-USED-WEIGHT-1M de cada respuesta; al superar el umbral de
+      seguridad espera al siguiente minuto (la ventana de peso se reinicia).
+    - Ante 429/418 respeta Retry-After antes de volver a pedir.
+    """
+    
+    def __init__(self, weight_limit: int = BINANCE_WEIGHT_LIMIT, safety_ratio: float = BINANCE_WEIGHT_SAFETY):
+        self.weight_limit = weight_limit
+        self.safety_ratio = safety_ratio
+        self.used_weight = 0
+        self.blocked_until = 0.0
+    
+    async def acquire(self):
+        """Espera si estamos bloqueados o cerca del límite de peso"""
+        now = time.time()
+        if self.blocked_until > now:
+            await asyncio.sleep(self.blocked_until - now)
+        elif self.used_weight >= self.weight_limit * self.safety_ratio:
+            wait = 60 - (now % 60)
+            logger.warning(f"⏳ Peso Binance {self.used_weight}/{self.weight_limit}, esperando {wait:.0f}s")
+            await asyncio.sleep(wait)
+            self.used_weight = 0
+    
+    def update(self, response):
+        """Actualiza el estado con los headers de una respuesta"""
+        used = response.headers.get('X-MBX-USED-WEIGHT-1M')
+        if used is not None:
+            try:
+                self.used_weight = int(used)
+            except ValueError:
+                pass
+        
+        if response.status in (418, 429):
+            try:
+                retry_after = int(response.headers.get('Retry-After', 60))
+            except ValueError:
+                retry_after = 60
+            self.blocked_until = time.time() + retry_after
+            logger.warning(f"🚫 Binance rate limit (HTTP {response.status}), pausando {retry_after}s")
+
+
+rate_limiter = BinanceRateLimiter()
+
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """V22.2: Sesión aiohttp compartida (pool de conexiones keep-alive)"""
+    global _http_session, _fetch_semaphore
+    if _http_session is None or _http_session.closed:
+        connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_FETCHES, ttl_dns_cache=300)
+        _http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS)
+        )
+    if _fetch_semaphore is None:
+        _fetch_semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    return _http_session
+
+
+async def close_http_session():
+    """V22.2: Cierra la sesión compartida (shutdown)"""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
 async def health_check(request):
     """Endpoint de salud para Cloud Run."""
-    status = "✅ Connected" if memory.connect() else "❌ Redis Fail"
+    status = "✅ Connected" if memory.ping() else "❌ Redis Fail"
 
     return web.Response(
         text=f"Market Data Hub v15.0 (Redis Enterprise) | Redis: {status} | Monitoreando: {current_symbols}",
@@ -42,21 +134,25 @@ async def health_check(request):
 
 async def fetch_binance_ticker_24hr():
     """Obtiene el resumen de 24h de todos los pares de Binance para el análisis."""
-    url = "https://api.binance.com/api/v3/ticker/24hr"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                data = await response.json()
-                # Convertir lista a diccionario para el selector
-                return {item['symbol']: item for item in data}
-            else:
-                logger.error(f"Error obteniendo tickers de Binance: {response.status}")
-                return {}
+    session = await get_http_session()
+    await rate_limiter.acquire()
+    async with session.get(BINANCE_TICKER_24HR_URL) as response:
+        rate_limiter.update(response)
+        if response.status == 200:
+            data = await response.json()
+            # Convertir lista a diccionario para el selector
+            return {item['symbol']: item for item in data}
+        else:
+            logger.error(f"Error obteniendo tickers de Binance: {response.status}")
+            return {}
 
 async def fetch_latest_kline(symbol: TradingSymbol) -> dict:
     """
     V21.3: Obtiene la última vela cerrada de 1 minuto desde Binance (Value Object).
     
+    V22.2: Usa la sesión compartida; la concurrencia está acotada por
+    MAX_CONCURRENT_FETCHES y el rate limiter de Binance.
+    
     Args:
         symbol: TradingSymbol (type-safe, ya validado)
     
@@ -71,22 +167,23 @@ async def fetch_latest_kline(symbol: TradingSymbol) -> dict:
             "volume": 120.5
         }
     """
-    url = "https://api.binance.com/api/v3/klines"
-    
     params = {
         "symbol": symbol.to_binance_api(),  # V21.3: Type-safe "BTCUSDT"
         "interval": "1m",
-        "limit": 1
+        "limit": 2  # V22.2: La última es la vela en curso; se publica la anterior (cerrada)
     }
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
+        session = await get_http_session()
+        async with _fetch_semaphore:
+            await rate_limiter.acquire()
+            async with session.get(BINANCE_KLINES_URL, params=params) as response:
+                rate_limiter.update(response)
                 if response.status == 200:
                     data = await response.json()
                     
-                    if data and len(data) > 0:
-                        kline = data[0]
+                    if data and len(data) >= 2:
+                        kline = data[-2]
                         
                         # Binance kline format: [OpenTime, Open, High, Low, Close, Volume, ...]
                         return {
@@ -106,6 +203,86 @@ async def fetch_latest_kline(symbol: TradingSymbol) -> dict:
     
     return None
 
+async def fetch_latest_klines(symbols: list) -> list:
+    """
+    V22.2: Obtiene la última vela de todos los símbolos en paralelo.
+    
+    Returns:
+        Lista de (TradingSymbol, kline_data o None) en el mismo orden que symbols
+    """
+    klines = await asyncio.gather(*(fetch_latest_kline(symbol) for symbol in symbols))
+    return list(zip(symbols, klines))
+
+def build_stream_url(symbols: list, base_url: str = None) -> str:
+    """
+    V22.2: URL del stream combinado de klines de 1m.
+    
+    Ejemplo: wss://stream.binance.com:9443/stream?streams=btcusdt@kline_1m/ethusdt@kline_1m
+    """
+    streams = '/'.join(f"{symbol.to_lower()}@kline_1m" for symbol in symbols)
+    return f"{base_url or BINANCE_WS_URL}?streams={streams}"
+
+def parse_stream_kline(message) -> dict:
+    """
+    V22.2: Convierte un mensaje del stream combinado en kline_data.
+    
+    Returns:
+        kline_data (mismo formato que fetch_latest_kline) solo si la vela
+        está cerrada (k.x == true); None para actualizaciones intermedias
+    """
+    payload = json.loads(message) if isinstance(message, (str, bytes)) else message
+    data = payload.get('data', payload)
+    kline = data.get('k') if isinstance(data, dict) else None
+    if not kline or not kline.get('x'):
+        return None
+    
+    symbol = TradingSymbol.from_str(kline.get('s') or data['s'])
+    return {
+        "symbol": symbol.to_short(),
+        "timestamp": int(kline['t']) / 1000,
+        "open": float(kline['o']),
+        "high": float(kline['h']),
+        "low": float(kline['l']),
+        "close": float(kline['c']),
+        "volume": float(kline['v'])
+    }
+
+def publish_klines(klines: list) -> int:
+    """
+    V22.2: Publica un lote de velas cerradas en un solo mensaje.
+    
+    - Pub/Sub para Brain: una lista de kline_data en 'market_data'
+    - Cache para Dashboard: todas las keys price:* en un pipeline
+    
+    Args:
+        klines: Lista de (TradingSymbol, kline_data)
+    
+    Returns:
+        Número de velas publicadas (se descartan las ya publicadas: mismo
+        timestamp o anterior)
+    """
+    batch = []
+    prices = {}
+    for symbol, kline_data in klines:
+        base = symbol.to_short()
+        if kline_data['timestamp'] <= last_published.get(base, 0):
+            continue
+        last_published[base] = kline_data['timestamp']
+        batch.append(kline_data)
+        prices[symbol.to_redis_key("price")] = kline_data  # "price:BTC"
+        
+        logger.info(f"📊 OHLCV: {symbol} | O:{kline_data['open']:.2f} H:{kline_data['high']:.2f} L:{kline_data['low']:.2f} C:{kline_data['close']:.2f}")
+    
+    if batch:
+        # Un mensaje por partición de símbolos (una sola con Pub/Sub o STREAM_PARTITIONS=1)
+        partitions = {}
+        for kline_data in batch:
+            partitions.setdefault(memory.partition_of(kline_data['symbol']), []).append(kline_data)
+        for partition, items in partitions.items():
+            memory.publish('market_data', items, partition=partition)
+        memory.set_many(prices, ttl=300)
+    return len(batch)
+
 async def update_top_coins():
     """
     V21.3: Función periódica que usa el MarketSelector (Value Object Pattern).
@@ -140,7 +317,8 @@ async def update_top_coins():
                 logger.info(f"💾 Active Symbols guardados en Redis: {symbols_to_store}")
             except Exception as e:
                 logger.error(f"❌ Error guardando active_symbols: {e}")
-                
+            
+            symbols_changed.set()
             return True  # Indica que hay que reiniciar el stream
         else:
             # Aunque no cambie, refrescamos el TTL/valor en Redis
@@ -150,7 +328,7 @@ async def update_top_coins():
             return False
     return False
 
-async def ohlcv_update_cycle():
+async def ohlcv_update_cycle(max_duration: float = None, rescan: bool = True):
     """
     V21 EAGLE EYE: Ciclo de actualización OHLCV cada 60 segundos.
     
@@ -158,35 +336,43 @@ async def ohlcv_update_cycle():
     1. Cada 60s, fetch última vela cerrada (1m) de cada símbolo activo
     2. Publica OHLCV completo en Redis
     3. Actualiza cache de precios para Dashboard
+    
+    V22.2: Los fetches se hacen en paralelo y se publican juntos al final,
+    así la latencia del ciclo no crece con el número de símbolos.
+    
+    Args:
+        max_duration: Segundos de polling antes de retornar (None = indefinido,
+            usado como fallback temporal del modo stream)
+        rescan: Re-escanear el mercado cada MARKET_SCAN_INTERVAL (False si
+            market_scan_loop ya lo hace)
     """
     retry_delay = 5
     last_scan_time = time.time()
+    started = time.time()
     
-    # Asegurar que tenemos símbolos activos
-    await update_top_coins()
+    if rescan:
+        # Asegurar que tenemos símbolos activos
+        await update_top_coins()
     
     logger.info("🦅 V21 EAGLE EYE: OHLCV Update Cycle iniciado (60s interval)")
     
-    while True:
+    while max_duration is None or time.time() - started < max_duration:
         try:
-            # 1. Fetch OHLCV de cada símbolo activo
-            for symbol in current_symbols:  # symbol is TradingSymbol
-                kline_data = await fetch_latest_kline(symbol)
-                
-                if kline_data:
-                    # 2. Publicar en Redis Pub/Sub para Brain
-                    memory.publish('market_data', kline_data)
-                    
-                    # 3. Cache en Redis para Dashboard (V21.3: usando Value Object)
-                    redis_key = symbol.to_redis_key("price")  # "price:BTC"
-                    memory.set(redis_key, kline_data, ttl=300)
-                    
-                    logger.info(f"📊 OHLCV: {symbol} | O:{kline_data['open']:.2f} H:{kline_data['high']:.2f} L:{kline_data['low']:.2f} C:{kline_data['close']:.2f}")
-                else:
+            # 1. Fetch OHLCV de todos los símbolos activos (en paralelo)
+            cycle_start = time.time()
+            klines = await fetch_latest_klines(current_symbols)
+            
+            for symbol, kline_data in klines:  # symbol is TradingSymbol
+                if not kline_data:
                     logger.warning(f"⚠️ No se pudo obtener OHLCV para {symbol}")
             
+            # 2-3. Pub/Sub para Brain + cache para Dashboard (un lote por ciclo)
+            publish_klines([(symbol, kline_data) for symbol, kline_data in klines if kline_data])
+            
+            logger.info(f"⚡ Ciclo OHLCV: {sum(1 for _, k in klines if k)}/{len(klines)} símbolos en {time.time() - cycle_start:.2f}s")
+            
             # 4. Verificar si toca re-escanear mercado (cada hora)
-            if time.time() - last_scan_time > MARKET_SCAN_INTERVAL:
+            if rescan and time.time() - last_scan_time > MARKET_SCAN_INTERVAL:
                 logger.info("⏰ Re-evaluando mercado...")
                 await update_top_coins()
                 last_scan_time = time.time()
@@ -199,6 +385,121 @@ async def ohlcv_update_cycle():
             await asyncio.sleep(retry_delay)
             retry_delay = min(retry_delay * 2, 60)
 
+async def market_scan_loop():
+    """V22.2: Re-escanea el mercado cada MARKET_SCAN_INTERVAL (modo stream)"""
+    while True:
+        await asyncio.sleep(MARKET_SCAN_INTERVAL)
+        try:
+            logger.info("⏰ Re-evaluando mercado...")
+            await update_top_coins()
+        except Exception as e:
+            logger.error(f"❌ Error re-escaneando mercado: {e}")
+
+async def consume_kline_stream(url: str) -> int:
+    """
+    V22.2: Consume el stream combinado hasta que cambien los símbolos activos
+    o se cierre la conexión.
+    
+    Los cierres de un mismo minuto se agrupan en un lote: se publica cuando
+    llegan todos los símbolos o a los STREAM_BATCH_WINDOW segundos del primero.
+    
+    Returns:
+        Número de velas cerradas publicadas
+    """
+    published = 0
+    symbols_by_base = {s.to_short(): s for s in current_symbols}
+    pending = {}
+    deadline = None
+    
+    async with connect(url, ping_interval=STREAM_PING_INTERVAL) as ws:
+        logger.info(f"🔌 Stream conectado: {len(symbols_by_base)} símbolos ({', '.join(symbols_by_base)})")
+        changed = asyncio.create_task(symbols_changed.wait())
+        received = None
+        try:
+            while True:
+                if received is None:
+                    received = asyncio.create_task(ws.recv())
+                timeout = max(deadline - time.monotonic(), 0) if deadline is not None else None
+                done, _ = await asyncio.wait({received, changed}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                if changed in done:
+                    # Rotación de símbolos: reconectar con la nueva suscripción
+                    logger.info("🔄 Símbolos activos cambiaron, re-suscribiendo stream...")
+                    return published
+                
+                if received in done:
+                    message = received.result()
+                    received = None
+                    try:
+                        kline_data = parse_stream_kline(message)
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.warning(f"⚠️ Mensaje de stream inválido: {e}")
+                        continue
+                    
+                    symbol = symbols_by_base.get(kline_data['symbol']) if kline_data else None
+                    if symbol is None:
+                        continue
+                    if pending and kline_data['timestamp'] != next(iter(pending.values()))[1]['timestamp']:
+                        # Empieza otro minuto: publicar el lote anterior
+                        published += publish_klines(list(pending.values()))
+                        pending.clear()
+                    if not pending:
+                        deadline = time.monotonic() + STREAM_BATCH_WINDOW
+                    pending[symbol.to_short()] = (symbol, kline_data)
+                    if len(pending) < len(symbols_by_base):
+                        continue
+                
+                # Lote completo o ventana vencida
+                published += publish_klines(list(pending.values()))
+                pending.clear()
+                deadline = None
+        finally:
+            changed.cancel()
+            if received is not None:
+                received.cancel()
+            if pending:
+                published += publish_klines(list(pending.values()))
+
+async def kline_stream_cycle():
+    """
+    V22.2: Ingesta por WebSocket (<symbol>@kline_1m combinados).
+    
+    - Publica cada vela en cuanto Binance la marca como cerrada (latencia
+      sub-segundo en vez de hasta 60s del polling)
+    - Reconecta y re-suscribe cuando update_top_coins rota los símbolos
+    - Tras STREAM_MAX_FAILURES fallos seguidos cae a polling REST durante
+      STREAM_FALLBACK_SECONDS y vuelve a intentar el stream
+    """
+    await update_top_coins()
+    scan_task = asyncio.create_task(market_scan_loop())
+    failures = 0
+    retry_delay = 1
+    
+    logger.info("🦅 V22.2 EAGLE EYE: Kline stream iniciado (kline_1m)")
+    
+    try:
+        while True:
+            symbols_changed.clear()
+            try:
+                await consume_kline_stream(build_stream_url(current_symbols))
+                failures = 0
+                retry_delay = 1
+                continue
+            except Exception as e:
+                failures += 1
+                logger.error(f"❌ Error en kline stream ({failures}/{STREAM_MAX_FAILURES}): {e}")
+            
+            if failures >= STREAM_MAX_FAILURES:
+                logger.warning(f"🛟 Stream no disponible, fallback a REST por {STREAM_FALLBACK_SECONDS}s")
+                await ohlcv_update_cycle(max_duration=STREAM_FALLBACK_SECONDS, rescan=False)
+                failures = 0
+                retry_delay = 1
+            else:
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30)
+    finally:
+        scan_task.cancel()
+
 async def main():
     # Servidor HTTP Health Check
     app = web.Application()
@@ -209,10 +510,16 @@ async def main():
     site = web.TCPSite(runner, '0.0.0.0', port)
     await site.start()
     
-    logger.info(f"🚀 Market Data Hub V21 EAGLE EYE (OHLCV) iniciado en puerto {port}")
+    logger.info(f"🚀 Market Data Hub V21 EAGLE EYE (OHLCV) iniciado en puerto {port} | modo: {MARKET_DATA_MODE}")
     
-    # V21: Iniciar motor OHLCV
-    await ohlcv_update_cycle()
+    # V21: Iniciar motor OHLCV (V22.2: stream por defecto, REST con MARKET_DATA_MODE=rest)
+    try:
+        if MARKET_DATA_MODE == "rest":
+            await ohlcv_update_cycle()
+        else:
+            await kline_stream_cycle()
+    finally:
+        await close_http_session()
 
 if __name__ == '__main__':
     asyncio.run(main())
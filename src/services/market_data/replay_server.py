@@ -0,0 +1,183 @@
+"""
+Kline Replay Server - V22.2
+===========================
+Servidor WebSocket local que imita el stream combinado de Binance
+(/stream?streams=<symbol>@kline_1m/...) reproduciendo velas grabadas.
+
+Permite probar el modo stream de market_data sin conexión:
+
+    python -m src.services.market_data.replay_server --csv candles.csv --port 9001
+    BINANCE_WS_URL=ws://127.0.0.1:9001/stream MARKET_DATA_MODE=stream python main.py
+
+Por cada vela envía primero actualizaciones intermedias (k.x = false) y luego
+la vela cerrada (k.x = true), igual que Binance.
+"""
+
+import asyncio
+import argparse
+import json
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+from websockets.server import serve
+
+logger = logging.getLogger("KlineReplayServer")
+
+
+def build_kline_message(symbol: str, candle: Dict[str, float], closed: bool = True) -> str:
+    """
+    Mensaje del stream combinado para una vela.
+
+    Args:
+        symbol: Par en formato Binance ("BTCUSDT")
+        candle: {timestamp (segundos), open, high, low, close, volume}
+        closed: Vela cerrada (k.x)
+    """
+    open_time = int(candle['timestamp'] * 1000)
+    return json.dumps({
+        'stream': f"{symbol.lower()}@kline_1m",
+        'data': {
+            'e': 'kline',
+            'E': open_time + 60000,
+            's': symbol,
+            'k': {
+                't': open_time,
+                'T': open_time + 59999,
+                's': symbol,
+                'i': '1m',
+                'o': str(candle['open']),
+                'h': str(candle['high']),
+                'l': str(candle['low']),
+                'c': str(candle['close']),
+                'v': str(candle['volume']),
+                'x': closed
+            }
+        }
+    })
+
+
+class KlineReplayServer:
+    """
+    Reproduce {SYMBOL: [velas]} a cada cliente según los streams que pida.
+
+    Cada conexión recibe la secuencia desde el principio; al terminar la
+    conexión queda abierta (sin datos) hasta que el cliente la cierre.
+    """
+
+    def __init__(self, candles: Dict[str, List[Dict[str, float]]], interval: float = 0.05,
+                 partial_updates: int = 1):
+        """
+        Args:
+            candles: {par Binance ("BTCUSDT"): [velas en orden]}
+            interval: Segundos entre velas (0.05 = 1 minuto simulado cada 50ms)
+            partial_updates: Actualizaciones intermedias (x = false) antes de cada cierre
+        """
+        self.candles = {symbol.upper(): list(rows) for symbol, rows in candles.items()}
+        self.interval = interval
+        self.partial_updates = partial_updates
+        self.subscriptions: List[List[str]] = []
+        self._server = None
+
+    @property
+    def port(self) -> Optional[int]:
+        if self._server is None:
+            return None
+        return next(iter(self._server.sockets)).getsockname()[1]
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> 'KlineReplayServer':
+        """Inicia el servidor (port=0 = puerto libre, ver self.port)"""
+        self._server = await serve(self._handle, host, port)
+        logger.info(f"📼 Replay server en ws://{host}:{self.port}/stream ({len(self.candles)} símbolos)")
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    @staticmethod
+    def parse_streams(path: str) -> List[str]:
+        """'/stream?streams=btcusdt@kline_1m/ethusdt@kline_1m' -> ['BTCUSDT', 'ETHUSDT']"""
+        query = parse_qs(urlparse(path).query)
+        streams = query.get('streams', [''])[0]
+        return [stream.split('@')[0].upper() for stream in streams.split('/') if stream]
+
+    async def _handle(self, websocket):
+        symbols = [s for s in self.parse_streams(websocket.path) if s in self.candles]
+        self.subscriptions.append(symbols)
+        logger.info(f"🔌 Cliente suscrito a {symbols}")
+
+        length = max((len(self.candles[s]) for s in symbols), default=0)
+        for i in range(length):
+            for symbol in symbols:
+                if i >= len(self.candles[symbol]):
+                    continue
+                candle = self.candles[symbol][i]
+                for _ in range(self.partial_updates):
+                    await websocket.send(build_kline_message(symbol, candle, closed=False))
+                await websocket.send(build_kline_message(symbol, candle, closed=True))
+            await asyncio.sleep(self.interval)
+
+        await websocket.wait_closed()
+
+
+def load_candles_csv(path: str) -> Dict[str, List[Dict[str, float]]]:
+    """CSV con columnas symbol, timestamp, open, high, low, close, volume"""
+    df = pd.read_csv(path).sort_values('timestamp', kind='stable')
+    return {
+        symbol.upper(): group[['timestamp', 'open', 'high', 'low', 'close', 'volume']].to_dict('records')
+        for symbol, group in df.groupby('symbol', sort=False)
+    }
+
+
+def synthetic_candles(symbols: List[str], minutes: int, start_ts: float = 1700000000.0,
+                      seed: int = 42) -> Dict[str, List[Dict[str, float]]]:
+    """Random walk de velas de 1m por símbolo (para pruebas sin datos grabados)"""
+    rng = np.random.default_rng(seed)
+    result = {}
+    for symbol in symbols:
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, minutes)))
+        opens = np.concatenate([[100.0], closes[:-1]])
+        spread = np.abs(rng.normal(0, 0.0005, minutes)) * closes
+        result[symbol.upper()] = [
+            {
+                'timestamp': start_ts + 60 * i,
+                'open': float(opens[i]),
+                'high': float(max(opens[i], closes[i]) + spread[i]),
+                'low': float(min(opens[i], closes[i]) - spread[i]),
+                'close': float(closes[i]),
+                'volume': float(rng.uniform(1, 100))
+            }
+            for i in range(minutes)
+        ]
+    return result
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Replay local del stream de klines de Binance")
+    parser.add_argument('--csv', help="CSV con symbol,timestamp,open,high,low,close,volume")
+    parser.add_argument('--symbols', default='BTCUSDT,ETHUSDT,SOLUSDT', help="Símbolos sintéticos (sin --csv)")
+    parser.add_argument('--minutes', type=int, default=1440, help="Velas sintéticas por símbolo")
+    parser.add_argument('--interval', type=float, default=1.0, help="Segundos entre velas")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9001)
+    args = parser.parse_args()
+
+    candles = load_candles_csv(args.csv) if args.csv else synthetic_candles(args.symbols.split(','), args.minutes)
+
+    async def run():
+        server = await KlineReplayServer(candles, interval=args.interval).start(args.host, args.port)
+        try:
+            await asyncio.Future()
+        finally:
+            await server.stop()
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
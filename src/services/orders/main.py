@@ -1,5 +1,4 @@
 import time
-import json
 import logging
 from datetime import datetime
 from src.config.settings import config
@@ -273,7 +272,7 @@ def execute_sell(signal):
 def process_signal(message):
     """Procesa señales de trading del canal Redis"""
     try:
-        data = json.loads(message['data'])
+        data = memory.decode(message['data'])  # V22.2: JSON o msgpack
         signal_type = data.get('type', '').upper()
         symbol = data.get('symbol', '')
         
@@ -300,20 +299,16 @@ def main():
     initialize_wallet()
     
     # Conectar a Redis
-    redis_conn = memory.get_client()
-    if not redis_conn:
+    if not memory.get_pubsub_client():
         logger.critical("🔥 No se pudo conectar a Redis. Reintentando...")
         time.sleep(5)
         return
     
-    pubsub = redis_conn.pubsub()
-    pubsub.subscribe('signals')
+    logger.info(f"✅ Suscrito al canal 'signals' ({config.MESSAGE_TRANSPORT}). Esperando señales de trading...")
     
-    logger.info("✅ Suscrito al canal 'signals'. Esperando señales de trading...")
-    
-    for message in pubsub.listen():
-        if message['type'] == 'message':
-            process_signal(message)
+    # V22.2: Pub/Sub o Streams (grupo 'orders': las réplicas se reparten las señales)
+    for message in memory.listen(['signals'], group='orders'):
+        process_signal(message)
 
 if __name__ == '__main__':
     time.sleep(5)  # Esperar a que otros servicios inicien
@@ -1,7 +1,7 @@
 import os
-import json
 import time
 from datetime import datetime
+from src.config.settings import config
 from src.shared.memory import memory # <--- SHARED CLIENT
 from src.shared.database import init_db, SessionLocal, Signal, MarketSnapshot
 from src.shared.utils import get_logger
@@ -18,9 +18,17 @@ WRITE_INTERVAL = 60  # Guardar snapshot cada 60 segundos por símbolo
 last_db_write = {}
 
 def process_market_data(message):
-    """Procesa mensajes del canal market_data."""
+    """Procesa mensajes del canal market_data (V22.2: dict o lote de velas)."""
+    try:
+        data = memory.decode(message['data'])  # V22.2: JSON o msgpack
+        for item in (data if isinstance(data, list) else [data]):
+            save_market_snapshot(item)
+    except Exception as e:
+        logger.error(f"Error procesando mensaje de mercado: {e}")
+
+def save_market_snapshot(data):
+    """Guarda un snapshot por símbolo (throttling de WRITE_INTERVAL)."""
     try:
-        data = json.loads(message['data'])
         symbol = data['symbol']
         
         # Lógica de Throttling para Snapshots de Mercado
@@ -30,7 +38,7 @@ def process_market_data(message):
             try:
                 snapshot = MarketSnapshot(
                     symbol=symbol,
-                    price=float(data['price']),
+                    price=float(data.get('price', data.get('close'))),  # V21: OHLCV usa 'close'
                     volume_24h=float(data.get('volume', 0)),
                     change_24h=float(data.get('change', 0)),
                     timestamp=datetime.utcnow()
@@ -50,7 +58,7 @@ def process_market_data(message):
 def process_signal(message):
     """Procesa señales de trading y las guarda en BD."""
     try:
-        data = json.loads(message['data'])
+        data = memory.decode(message['data'])  # V22.2: JSON o msgpack
         session = SessionLocal()
         try:
             signal = Signal(
@@ -74,24 +82,19 @@ def process_signal(message):
 def main():
     logger.info("💾 Persistence Worker v16.0 (Local Sovereignty) INICIADO")
     
-    redis_conn = memory.get_client()
-    if not redis_conn:
+    if not memory.get_pubsub_client():
         logger.critical("🔥 Fallo conectando a Redis")
         return
 
-    pubsub = redis_conn.pubsub()
-    # Nos suscribimos a TODO lo que necesite guardarse
-    pubsub.subscribe('market_data', 'signals')
-    
-    logger.info("✅ Suscrito a canales: market_data, signals. Esperando datos...")
+    logger.info(f"✅ Suscrito a canales: market_data, signals ({config.MESSAGE_TRANSPORT}). Esperando datos...")
     
-    for message in pubsub.listen():
-        if message['type'] == 'message':
-            channel = message['channel']
-            if channel == 'market_data':
-                process_market_data(message)
-            elif channel == 'signals':
-                process_signal(message)
+    # Nos suscribimos a TODO lo que necesite guardarse (V22.2: Pub/Sub o Streams, grupo 'persistence')
+    for message in memory.listen(['market_data', 'signals'], group='persistence'):
+        channel = message['channel']
+        if channel == 'market_data':
+            process_market_data(message)
+        elif channel == 'signals':
+            process_signal(message)
 
 if __name__ == '__main__':
     time.sleep(5)
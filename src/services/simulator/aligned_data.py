@@ -0,0 +1,143 @@
+"""
+Aligned Market Data - V22.2
+===========================
+Matriz OHLCV alineada (timestamps × símbolos × OHLCV) para el simulador de
+alta fidelidad.
+
+Se construye en una pasada vectorizada por símbolo (np.searchsorted) en lugar
+de filtrar el DataFrame por cada timestamp:
+- values[t, s] = última vela de s con timestamp <= timestamps[t] (forward fill)
+- valid[t, s] = False antes de la primera vela de s (values = NaN)
+- history_end[t, s] = nº de velas de s con timestamp < timestamps[t]
+
+La historia de cada símbolo se entrega como OhlcView (array contiguo por
+símbolo + cursor), sin copiar velas en cada minuto.
+
+save/load guardan la matriz en un directorio de .npy; load(mmap=True) la
+abre memory-mapped para compartirla entre procesos (sweep.py) sin copias.
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any
+
+from .ohlc_view import OhlcView, OHLCV_COLUMNS, CLOSE
+
+
+class AlignedMarketData:
+    """
+    Datos de mercado alineados por timestamp, con acceso O(1) por minuto.
+
+    La historia de cada símbolo son sus velas originales (sin forward fill),
+    igual que en la simulación minuto a minuto: la historia visible en el
+    índice t son las velas [0, history_end[t, s]).
+    """
+
+    def __init__(self, timestamps: List[Any], symbols: List[str], values: np.ndarray,
+                 valid: np.ndarray, history_end: np.ndarray, candles: Dict[str, np.ndarray]):
+        self.timestamps = timestamps
+        self.symbols = symbols
+        self.values = values
+        self.valid = valid
+        self.history_end = history_end
+        self.candles = candles
+        self._column = {symbol: s for s, symbol in enumerate(symbols)}
+        self._closes = values[:, :, CLOSE].tolist()
+        self._valid = valid.tolist()
+        self._history_end = history_end.tolist()
+
+    @classmethod
+    def from_frames(cls, market_data: Dict[str, pd.DataFrame]) -> 'AlignedMarketData':
+        """
+        Alinea {symbol: DataFrame(timestamp, open, high, low, close, volume)}.
+
+        Las filas con timestamp repetido conservan la primera aparición.
+        """
+        symbols = list(market_data.keys())
+        frames = {symbol: df.sort_values('timestamp', kind='stable') for symbol, df in market_data.items()}
+
+        stamps = [df['timestamp'].to_numpy() for df in frames.values() if len(df)]
+        index = pd.Index(np.unique(np.concatenate(stamps))) if stamps else pd.Index([])
+        all_ts = index.to_numpy()
+
+        values = np.full((len(all_ts), len(symbols), len(OHLCV_COLUMNS)), np.nan)
+        valid = np.zeros((len(all_ts), len(symbols)), dtype=bool)
+        history_end = np.zeros((len(all_ts), len(symbols)), dtype=np.int64)
+        candles = {}
+
+        for s, symbol in enumerate(symbols):
+            df = frames[symbol]
+            sym_ts = df['timestamp'].to_numpy()
+            ohlcv = np.ascontiguousarray(df[list(OHLCV_COLUMNS)].to_numpy(dtype=float))
+            ohlcv.setflags(write=False)
+            candles[symbol] = ohlcv
+
+            # Primera fila de cada timestamp y última fila con timestamp <= t
+            first = np.ones(len(sym_ts), dtype=bool)
+            first[1:] = sym_ts[1:] != sym_ts[:-1]
+            unique_ts = sym_ts[first]
+            rows = np.flatnonzero(first)
+            pos = np.searchsorted(unique_ts, all_ts, side='right') - 1
+
+            present = pos >= 0
+            values[present, s] = ohlcv[rows[pos[present]]]
+            valid[:, s] = present
+            history_end[:, s] = np.searchsorted(sym_ts, all_ts, side='left')
+
+        return cls(index.tolist(), symbols, values, valid, history_end, candles)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def prices_at(self, index: int) -> Dict[str, float]:
+        """{symbol: close} en el índice (solo símbolos con datos hasta ese momento)"""
+        return {symbol: close for symbol, close, ok in zip(self.symbols, self._closes[index], self._valid[index]) if ok}
+
+    def ohlc_view(self, symbol: str, index: int) -> OhlcView:
+        """Velas de symbol anteriores a timestamps[index] (vista sin copia)"""
+        return OhlcView(self.candles[symbol], 0, self._history_end[index][self._column[symbol]])
+
+    def price_history(self, symbol: str, index: int) -> np.ndarray:
+        """Cierres de symbol anteriores a timestamps[index] (slice de solo lectura)"""
+        return self.candles[symbol][:self._history_end[index][self._column[symbol]], CLOSE]
+
+    def save(self, directory: str) -> str:
+        """
+        Guarda los arrays en directory (un .npy por array + meta.json).
+
+        Returns:
+            Path del directorio
+        """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'timestamps.npy'), pd.Index(self.timestamps).to_numpy())
+        np.save(os.path.join(directory, 'values.npy'), self.values)
+        np.save(os.path.join(directory, 'valid.npy'), self.valid)
+        np.save(os.path.join(directory, 'history_end.npy'), self.history_end)
+        for s, symbol in enumerate(self.symbols):
+            np.save(os.path.join(directory, f'candles_{s}.npy'), self.candles[symbol])
+
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'symbols': self.symbols}, f)
+        return directory
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'AlignedMarketData':
+        """
+        Carga una matriz guardada con save.
+
+        Args:
+            directory: Directorio de save
+            mmap: Abrir los arrays memory-mapped de solo lectura (compartidos entre procesos)
+        """
+        mode = 'r' if mmap else None
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            symbols = json.load(f)['symbols']
+
+        def _load(name):
+            return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mode)
+
+        candles = {symbol: _load(f'candles_{s}') for s, symbol in enumerate(symbols)}
+        timestamps = pd.Index(np.load(os.path.join(directory, 'timestamps.npy'))).tolist()
+        return cls(timestamps, symbols, _load('values'), _load('valid'), _load('history_end'), candles)
@@ -4,12 +4,12 @@ Binance Data Fetcher - V19.1
 Descarga datos históricos de 1 minuto de Binance API.
 """
 
-import requests
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import List, Dict
 import time
 import logging
+from src.shared.candle_store import candle_store
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("BinanceDataFetcher")
@@ -55,6 +55,9 @@ def _fetch_symbol_data(symbol: str, hours_back: int) -> pd.DataFrame:
     """
     Descarga datos de un símbolo específico.
     
+    V22.2: Lee del candle store local; solo se descargan de Binance los
+    minutos que faltan (re-ejecutar una simulación no consume API).
+    
     Args:
         symbol: Símbolo (ej: 'BTC')
         hours_back: Horas hacia atrás
@@ -66,72 +69,12 @@ def _fetch_symbol_data(symbol: str, hours_back: int) -> pd.DataFrame:
     end_time = datetime.utcnow()
     start_time = end_time - timedelta(hours=hours_back)
     
-    # Convertir a milisegundos (formato Binance)
-    start_ms = int(start_time.timestamp() * 1000)
-    end_ms = int(end_time.timestamp() * 1000)
-    
-    # Binance retorna max 1000 velas por request
-    # Calcular cuántos requests necesitamos
-    minutes_needed = hours_back * 60
-    requests_needed = (minutes_needed // 1000) + 1
-    
-    all_data = []
-    current_start = start_ms
-    
-    for i in range(requests_needed):
-        params = {
-            'symbol': f'{symbol}USDT',
-            'interval': '1m',
-            'startTime': current_start,
-            'endTime': end_ms,
-            'limit': 1000
-        }
-        
-        response = requests.get(BINANCE_API_URL, params=params, timeout=10)
-        
-        if response.status_code != 200:
-            raise Exception(f"Binance API error: {response.status_code} - {response.text}")
-        
-        data = response.json()
-        
-        if not data:
-            break
-        
-        all_data.extend(data)
-        
-        # Actualizar start time para próximo request
-        last_timestamp = data[-1][0]
-        current_start = last_timestamp + 1  # +1ms para evitar duplicados
-        
-        # Si ya alcanzamos el end_time, terminar
-        if last_timestamp >= end_ms:
-            break
-    
-    # Convertir a DataFrame
-    df = pd.DataFrame(all_data, columns=[
-        'timestamp', 'open', 'high', 'low', 'close', 'volume',
-        'close_time', 'quote_asset_volume', 'number_of_trades',
-        'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-    ])
-    
-    # Limpiar y convertir tipos
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-    df['open'] = df['open'].astype(float)
-    df['high'] = df['high'].astype(float)
-    df['low'] = df['low'].astype(float)
-    df['close'] = df['close'].astype(float)
-    df['volume'] = df['volume'].astype(float)
-    
-    # Seleccionar columnas relevantes
-    df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
-    
-    # Eliminar duplicados (por si acaso)
-    df = df.drop_duplicates(subset=['timestamp']).reset_index(drop=True)
-    
-    # Ordenar por timestamp
-    df = df.sort_values('timestamp').reset_index(drop=True)
-    
-    return df
+    # Convertir a milisegundos (formato Binance); datetime naive UTC
+    start_ms = int(pd.Timestamp(start_time).value // 1_000_000)
+    end_ms = int(pd.Timestamp(end_time).value // 1_000_000)
+    
+    # Velas cerradas de 1m en [start, end], ordenadas y sin duplicados
+    return candle_store.get(symbol, '1m', start_ms, end_ms).to_frame()
 
 
 def validate_data(market_data: Dict[str, pd.DataFrame]) -> bool:
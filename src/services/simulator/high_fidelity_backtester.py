@@ -12,15 +12,22 @@ Características:
 - Global throttling
 - Stop loss automático
 - Trend filters
+
+V22.2: Datos alineados en una matriz OHLCV (AlignedMarketData) construida en
+una pasada vectorizada; la simulación accede a cada minuto por índice.
+V22.2: Las estrategias reciben la historia como OhlcView de solo lectura
+(array contiguo por símbolo + cursor) en lugar de una lista de dicts.
 """
 
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta
 import logging
 
+from .aligned_data import AlignedMarketData
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("HighFidelityBacktester")
 
@@ -172,26 +179,34 @@ class HighFidelityBacktester:
         self.balance_rejections = 0
         self.stop_loss_triggered = 0
         
-    def run(self, market_data: Dict[str, pd.DataFrame], strategy) -> SimulationResult:
+    def run(self, market_data: Union[Dict[str, pd.DataFrame], AlignedMarketData], strategy) -> SimulationResult:
         """
         Ejecuta la simulación minuto a minuto.
         
         Args:
             market_data: {symbol: DataFrame(timestamp, open, high, low, close, volume)}
+                         o (V22.2) AlignedMarketData ya alineado (ej: memory-mapped en sweep.py)
             strategy: Instancia de estrategia con método evaluate()
         
         Returns:
             SimulationResult con métricas completas
         """
         # Preparar datos - alinear timestamps
-        aligned_data = self._align_data(market_data)
+        if isinstance(market_data, AlignedMarketData):
+            aligned_data = market_data
+        else:
+            aligned_data = self._align_data(market_data)
         total_minutes = len(aligned_data)
         
         logger.info(f"🚀 Iniciando simulación de {total_minutes} minutos...")
         logger.info(f"📊 Config: {self.config}")
         
+        if total_minutes == 0:
+            return self._generate_result()
+        
         # Procesar minuto a minuto
-        for i, (timestamp, prices) in enumerate(aligned_data.items()):
+        for i, timestamp in enumerate(aligned_data.timestamps):
+            prices = aligned_data.prices_at(i)
             if i % 500 == 0:
                 logger.info(f"   Procesando minuto {i}/{total_minutes} ({i/total_minutes*100:.0f}%)")
             
@@ -209,7 +224,7 @@ class HighFidelityBacktester:
                 # V20: Obtener historia OHLC completa (si estrategia lo soporta)
                 # Intentar primero con OHLC, si falla usar solo prices
                 try:
-                    ohlc_history = self._get_ohlc_history(market_data[symbol], timestamp)
+                    ohlc_history = aligned_data.ohlc_view(symbol, i)
                     
                     if len(ohlc_history) < 50:
                         continue
@@ -229,7 +244,7 @@ class HighFidelityBacktester:
                     
                 except (AttributeError, TypeError):
                     # Fallback: estrategia antigua que solo usa price_history
-                    price_history = self._get_price_history(market_data[symbol], timestamp)
+                    price_history = aligned_data.price_history(symbol, i)
                     
                     if len(price_history) < 50:
                         continue
@@ -247,11 +262,11 @@ class HighFidelityBacktester:
             self.equity_curve.append(current_equity)
         
         # Cerrar posiciones abiertas al final
-        final_prices = list(aligned_data.values())[-1]
+        final_prices = aligned_data.prices_at(total_minutes - 1)
         for symbol in list(self.open_positions.keys()):
             if symbol in final_prices:
                 self._execute_sell(
-                    list(aligned_data.keys())[-1],
+                    aligned_data.timestamps[-1],
                     symbol,
                     final_prices[symbol],
                     "End of simulation"
@@ -259,47 +274,14 @@ class HighFidelityBacktester:
         
         return self._generate_result()
     
-    def _align_data(self, market_data: Dict[str, pd.DataFrame]) -> Dict[datetime, Dict[str, float]]:
-        """Alinea datos de múltiples símbolos por timestamp"""
-        # Crear un índice común de timestamps
-        all_timestamps = set()
-        for df in market_data.values():
-            all_timestamps.update(df['timestamp'].tolist())
-        
-        sorted_timestamps = sorted(list(all_timestamps))
-        
-        # Crear diccionario {timestamp: {symbol: close_price}}
-        aligned = {}
-        for ts in sorted_timestamps:
-            aligned[ts] = {}
-            for symbol, df in market_data.items():
-                # Buscar precio en este timestamp
-                row = df[df['timestamp'] == ts]
-                if not row.empty:
-                    aligned[ts][symbol] = row.iloc[0]['close']
-                else:
-                    # Forward fill si falta dato
-                    prev_data = df[df['timestamp'] < ts]
-                    if not prev_data.empty:
-                        aligned[ts][symbol] = prev_data.iloc[-1]['close']
-        
-        return aligned
-    
-    def _get_price_history(self, df: pd.DataFrame, until_timestamp: datetime) -> List[float]:
-        """Obtiene historia de precios hasta un timestamp"""
-        historical = df[df['timestamp'] < until_timestamp]
-        return historical['close'].tolist()
-    
-    def _get_ohlc_history(self, df: pd.DataFrame, until_timestamp: datetime) -> List[Dict]:
+    def _align_data(self, market_data: Dict[str, pd.DataFrame]) -> AlignedMarketData:
         """
-        Obtiene historia OHLC completa hasta un timestamp.
-        V20: Necesario para filtros de velas y cálculo de ATR.
-        """
-        historical = df[df['timestamp'] < until_timestamp]
-        if historical.empty:
-            return []
+        Alinea datos de múltiples símbolos por timestamp.
         
-        return historical[['open', 'high', 'low', 'close', 'volume']].to_dict('records')
+        V22.2: Matriz (timestamps × símbolos × OHLCV) con forward fill,
+        construida en una pasada vectorizada (ver aligned_data.py).
+        """
+        return AlignedMarketData.from_frames(market_data)
     
     def _check_stop_loss(self, timestamp: datetime, current_prices: Dict[str, float]):
         """Verifica stop loss para posiciones abiertas"""
@@ -0,0 +1,98 @@
+"""
+OHLC View - V22.2
+=================
+Vista de solo lectura sobre un array OHLCV contiguo (N × 5).
+
+El simulador pasa a las estrategias una vista de las velas [start, end) en
+lugar de una lista de dicts por minuto: crear la vista es O(1) y las columnas
+(open/high/low/close/volume) son slices de NumPy sin copia.
+
+Compatibilidad: view[i] retorna la vela como dict y se puede iterar como la
+lista de dicts de V20; as_ohlc_view convierte una lista de dicts a vista.
+"""
+
+import numpy as np
+from typing import Dict, List, Union
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(OHLCV_COLUMNS))
+
+
+class OhlcView:
+    """Velas [start, end) de un array OHLCV de solo lectura"""
+
+    __slots__ = ('_data', '_start', '_end')
+
+    def __init__(self, data: np.ndarray, start: int = 0, end: int = None):
+        """
+        Args:
+            data: Array (N, 5) con columnas OHLCV_COLUMNS (se marca de solo lectura)
+            start: Primera vela de la vista
+            end: Vela final exclusiva (None = N)
+        """
+        if data.flags.writeable:
+            data.setflags(write=False)
+        self._data = data
+        self._start = start
+        self._end = len(data) if end is None else end
+
+    @property
+    def array(self) -> np.ndarray:
+        """Velas de la vista como array (N, 5) sin copia"""
+        return self._data[self._start:self._end]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._data[self._start:self._end, OPEN]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._data[self._start:self._end, HIGH]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._data[self._start:self._end, LOW]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._data[self._start:self._end, CLOSE]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._data[self._start:self._end, VOLUME]
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Dict[str, float], 'OhlcView']:
+        """view[i] -> vela como dict; view[a:b] -> sub-vista (sin copia)"""
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("OhlcView solo soporta slices contiguos")
+            return OhlcView(self._data, self._start + start, self._start + max(start, stop))
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("OhlcView index out of range")
+        return dict(zip(OHLCV_COLUMNS, self._data[self._start + key].tolist()))
+
+    def __iter__(self):
+        for row in self.array.tolist():
+            yield dict(zip(OHLCV_COLUMNS, row))
+
+    def to_records(self) -> List[Dict[str, float]]:
+        """Velas como lista de dicts (formato V20)"""
+        return list(self)
+
+
+def as_ohlc_view(ohlc_data) -> OhlcView:
+    """OhlcView tal cual; lista de dicts (o DataFrame) -> OhlcView (copia una vez)"""
+    if isinstance(ohlc_data, OhlcView):
+        return ohlc_data
+    if hasattr(ohlc_data, 'to_numpy'):
+        return OhlcView(ohlc_data[list(OHLCV_COLUMNS)].to_numpy(dtype=float))
+    if not len(ohlc_data):
+        return OhlcView(np.empty((0, len(OHLCV_COLUMNS))))
+    return OhlcView(np.array([[candle.get(column, 0.0) for column in OHLCV_COLUMNS] for candle in ohlc_data], dtype=float))
@@ -2,11 +2,14 @@
 Report Generator - V19.1
 =========================
 Genera reportes comparativos entre V19 y V19.1.
+
+V22.2: generate_sweep_report - tabla rankeada de un sweep de parámetros (sweep.py).
 """
 
 from datetime import datetime
 from typing import List
 from .high_fidelity_backtester import SimulationResult
+from .sweep import SweepResult
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -474,6 +477,75 @@ def _calculate_profit_factor(result: SimulationResult) -> float:
     return gross_profit / gross_loss
 
 
+def generate_sweep_report(
+    results: List[SweepResult],
+    output_file: str = "SIMULATION_SWEEP_REPORT.md",
+    top_n: int = 20
+) -> str:
+    """
+    V22.2: Genera tabla comparativa rankeada de un sweep de parámetros.
+    
+    Args:
+        results: Resultados de sweep.run_sweep (ya rankeados)
+        output_file: Archivo de salida
+        top_n: Filas del ranking (None = todas)
+    
+    Returns:
+        Path del archivo generado
+    """
+    logger.info(f"📊 Generando reporte de sweep ({len(results)} simulaciones)...")
+    
+    ok = [r for r in results if r.result is not None]
+    failed = [r for r in results if r.result is None]
+    shown = ok[:top_n] if top_n else ok
+    capital = ok[0].result.initial_capital if ok else 0.0
+    
+    report = f"""# 🧪 SWEEP DE PARÁMETROS - High Fidelity Simulator
+
+**Fecha de Simulación:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}  
+**Simulaciones:** {len(results)} ({len(ok)} OK, {len(failed)} con error)  
+**Capital Inicial:** ${capital:,.2f}
+
+---
+
+## 🏆 Ranking (por PnL)
+
+| # | Variante | Stop Loss | Trailing | Cooldown | Max Pos | ATR TP | Trades | Win Rate | PnL | Max DD | Sharpe | PF | Criterios |
+|---|----------|-----------|----------|----------|---------|--------|--------|----------|-----|--------|--------|----|-----------|
+"""
+    
+    for rank, r in enumerate(shown, 1):
+        config, result = r.config, r.result
+        trailing = f"{config.trailing_distance_pct}%" if config.enable_trailing_stop else "-"
+        atr_tp = f"{config.atr_multiplier}x" if config.enable_atr_tp else "-"
+        stop_loss = f"{config.stop_loss_pct}%" if config.stop_loss_pct else "-"
+        criteria = sum(_evaluate_criteria(result).values())
+        report += (
+            f"| {rank} | {r.variant} | {stop_loss} | {trailing} | {config.cooldown_minutes}m | "
+            f"{config.max_positions} | {atr_tp} | {result.total_trades} | {result.win_rate:.1f}% | "
+            f"${result.total_pnl:.2f} ({result.total_return_pct:+.1f}%) | {result.max_drawdown:.1f}% | "
+            f"{result.sharpe_ratio:.2f} | {_calculate_profit_factor(result):.2f} | {criteria}/5 |\n"
+        )
+    
+    if failed:
+        report += "\n### ⚠️ Simulaciones con error\n\n"
+        for r in failed:
+            report += f"- {r.variant} {r.config}: {r.error}\n"
+    
+    report += f"""
+---
+
+**Generado por Parameter Sweep V22.2**  
+**Timestamp:** {datetime.now().isoformat()}
+"""
+    
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(report)
+    
+    logger.info(f"✅ Reporte de sweep guardado: {output_file}")
+    return output_file
+
+
 def print_summary(result_baseline: SimulationResult, result_new: SimulationResult):
     """Imprime resumen en consola"""
     print("\n" + "="*80)
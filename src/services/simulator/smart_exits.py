@@ -8,6 +8,8 @@ Características:
 - Take Profit basado en ATR
 - Breakeven Stop automático
 - Partial Profit Taking
+
+V22.2: calculate_atr acepta OhlcView (sin copia) o lista de dicts.
 """
 
 import numpy as np
@@ -16,6 +18,8 @@ from typing import Optional, Dict
 from datetime import datetime
 import logging
 
+from .ohlc_view import as_ohlc_view
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("SmartExits")
 
@@ -170,12 +174,12 @@ class SmartExitManager:
         
         return None
     
-    def calculate_atr(self, ohlc_data: list, period: int = 14) -> float:
+    def calculate_atr(self, ohlc_data, period: int = 14) -> float:
         """
         Calcula ATR (Average True Range).
         
         Args:
-            ohlc_data: Lista de diccionarios con keys: open, high, low, close
+            ohlc_data: OhlcView o lista de diccionarios con keys: open, high, low, close
             period: Período para el ATR
         
         Returns:
@@ -184,27 +188,19 @@ class SmartExitManager:
         if len(ohlc_data) < period + 1:
             return 0.0
         
-        # Extraer arrays
-        highs = np.array([candle['high'] for candle in ohlc_data])
-        lows = np.array([candle['low'] for candle in ohlc_data])
-        closes = np.array([candle['close'] for candle in ohlc_data])
+        # V22.2: Solo las últimas period + 1 velas (el ATR solo usa los últimos period TR)
+        ohlc = as_ohlc_view(ohlc_data)[-(period + 1):]
+        highs, lows, closes = ohlc.high, ohlc.low, ohlc.close
         
         # Calcular True Range
-        true_ranges = []
-        for i in range(1, len(highs)):
-            tr = max(
-                highs[i] - lows[i],
-                abs(highs[i] - closes[i-1]),
-                abs(lows[i] - closes[i-1])
-            )
-            true_ranges.append(tr)
+        true_ranges = np.maximum.reduce([
+            highs[1:] - lows[1:],
+            np.abs(highs[1:] - closes[:-1]),
+            np.abs(lows[1:] - closes[:-1])
+        ])
         
         # ATR = promedio de True Ranges
-        if len(true_ranges) >= period:
-            atr = np.mean(true_ranges[-period:])
-            return atr
-        
-        return 0.0
+        return np.mean(true_ranges)
     
     def get_exit_stats(self, position: PositionState) -> Dict:
         """Retorna estadísticas del estado de exits de una posición"""
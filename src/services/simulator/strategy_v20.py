@@ -8,15 +8,18 @@ Mejoras sobre V19.1:
 - Sniper Entries: Candle confirmation, Volume surge, Spread filter
 - Multi-Timeframe confirmation (opcional)
 - Objetivo: Transformar R:R de 1:2 a 2:1+
+
+V22.2: evaluate acepta OhlcView (historia sin copia del simulador) o lista de dicts.
 """
 
 import numpy as np
 import pandas as pd
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Union
 from datetime import datetime
 import logging
 
 from .smart_exits import SmartExitManager, ExitConfig, PositionState
+from .ohlc_view import OhlcView, as_ohlc_view
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("StrategyV20")
@@ -81,7 +84,7 @@ class RsiMeanReversionV20:
         self,
         symbol: str,
         current_price: float,
-        ohlc_data: List[Dict],
+        ohlc_data: Union[OhlcView, List[Dict]],
         timestamp: datetime,
         open_position: Optional[Dict] = None
     ) -> Optional[Dict]:
@@ -91,7 +94,7 @@ class RsiMeanReversionV20:
         Args:
             symbol: Símbolo del activo
             current_price: Precio actual
-            ohlc_data: Lista de OHLC completo [más antiguo -> más reciente]
+            ohlc_data: OhlcView (V22.2) o lista de OHLC completo [más antiguo -> más reciente]
             timestamp: Timestamp actual
             open_position: Posición abierta si existe
         
@@ -102,11 +105,13 @@ class RsiMeanReversionV20:
             return None
         
         # Extraer precios de cierre
-        prices = np.array([candle['close'] for candle in ohlc_data])
+        # V22.2: Vista sin copia (las listas de dicts se convierten una vez)
+        ohlc = as_ohlc_view(ohlc_data)
+        prices = ohlc.close
         
         # Calcular indicadores
         rsi = self._calculate_rsi(prices)
-        current_atr = self.smart_exit_manager.calculate_atr(ohlc_data, period=14)
+        current_atr = self.smart_exit_manager.calculate_atr(ohlc, period=14)
         
         # V20: Validación menos restrictiva - RSI extremo solo si es exactamente 0 o 100
         # (En mercados fuerte, RSI puede ser <5 legítimamente)
@@ -134,7 +139,7 @@ class RsiMeanReversionV20:
                 position=position_state,
                 current_price=current_price,
                 current_atr=current_atr,
-                ohlc_current=ohlc_data[-1] if ohlc_data else None
+                ohlc_current=ohlc[-1] if len(ohlc) else None
             )
             
             if exit_signal:
@@ -192,7 +197,7 @@ class RsiMeanReversionV20:
                 return None
             
             # V20: Solo verificar que vela actual es verde, no exigir que anterior sea roja
-            current_candle = ohlc_data[-1]
+            current_candle = ohlc[-1]
             is_green = current_candle['close'] > current_candle['open']
             
             # Y que tenga body significativo
@@ -208,8 +213,8 @@ class RsiMeanReversionV20:
             if len(ohlc_data) < 20:
                 return None
             
-            volumes = [candle['volume'] for candle in ohlc_data[-20:]]
-            current_volume = ohlc_data[-1]['volume']
+            volumes = ohlc.volume[-20:]
+            current_volume = ohlc.volume[-1]
             avg_volume = np.mean(volumes)
             
             # V20: Reducir threshold a 120% (menos restrictivo que 150%)
@@ -243,7 +248,7 @@ class RsiMeanReversionV20:
         if len(prices) < self.rsi_period + 1:
             return 50.0
         
-        deltas = np.diff(prices)
+        deltas = np.diff(prices[-(self.rsi_period + 1):])
         gains = np.where(deltas > 0, deltas, 0)
         losses = np.where(deltas < 0, -deltas, 0)
         
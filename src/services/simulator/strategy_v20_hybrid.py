@@ -7,15 +7,18 @@ Filosofía:
 - Mantener lógica de entrada simple y efectiva de V19.1
 - Aplicar Smart Exits para mejorar ratio R:R
 - Objetivo: Win Rate 50%+ con R:R 2:1+
+
+V22.2: evaluate acepta OhlcView (historia sin copia del simulador) o lista de dicts.
 """
 
 import numpy as np
 import pandas as pd
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Union
 from datetime import datetime
 import logging
 
 from .smart_exits import SmartExitManager, ExitConfig, PositionState
+from .ohlc_view import OhlcView, as_ohlc_view
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("StrategyV20Hybrid")
@@ -72,7 +75,7 @@ class RsiMeanReversionV20Hybrid:
         self,
         symbol: str,
         current_price: float,
-        ohlc_data: List[Dict],
+        ohlc_data: Union[OhlcView, List[Dict]],
         timestamp: datetime,
         open_position: Optional[Dict] = None
     ) -> Optional[Dict]:
@@ -80,9 +83,11 @@ class RsiMeanReversionV20Hybrid:
         if len(ohlc_data) < max(self.rsi_period + 1, self.ema_slow + 1):
             return None
         
-        prices = np.array([candle['close'] for candle in ohlc_data])
+        # V22.2: Vista sin copia (las listas de dicts se convierten una vez)
+        ohlc = as_ohlc_view(ohlc_data)
+        prices = ohlc.close
         rsi = self._calculate_rsi(prices)
-        current_atr = self.smart_exit_manager.calculate_atr(ohlc_data, period=14)
+        current_atr = self.smart_exit_manager.calculate_atr(ohlc, period=14)
         
         # Si tenemos posición abierta, usar SMART EXITS
         if open_position:
@@ -102,7 +107,7 @@ class RsiMeanReversionV20Hybrid:
                 position=position_state,
                 current_price=current_price,
                 current_atr=current_atr,
-                ohlc_current=ohlc_data[-1]
+                ohlc_current=ohlc[-1]
             )
             
             if exit_signal:
@@ -164,7 +169,7 @@ class RsiMeanReversionV20Hybrid:
         if len(prices) < self.rsi_period + 1:
             return 50.0
         
-        deltas = np.diff(prices)
+        deltas = np.diff(prices[-(self.rsi_period + 1):])
         gains = np.where(deltas > 0, deltas, 0)
         losses = np.where(deltas < 0, -deltas, 0)
         
@@ -0,0 +1,244 @@
+"""
+Parameter Sweep - V22.2
+=======================
+Ejecuta una grilla de SimulationConfig × variantes de estrategia con el
+HighFidelityBacktester en un pool de procesos.
+
+- Los datos se alinean una sola vez (AlignedMarketData) y se guardan en un
+  directorio temporal; cada proceso los abre memory-mapped (sin copias).
+- Cada job es (variante, config); los resultados se rankean por PnL y se
+  exportan como tabla comparativa con report_generator.generate_sweep_report.
+
+Usage:
+    python -m src.services.simulator.sweep --hours 48 --symbols BTC,ETH,SOL \\
+        --stop-loss 1,2,3 --cooldown 5,10 --max-positions 2,3 --trailing 0,1 --atr-multiplier 2,3
+"""
+
+import os
+import shutil
+import inspect
+import argparse
+import itertools
+import tempfile
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+from typing import Dict, List, Optional, Any, Tuple, Union
+
+import pandas as pd
+
+from .aligned_data import AlignedMarketData
+from .high_fidelity_backtester import HighFidelityBacktester, SimulationConfig, SimulationResult
+from .smart_exits import ExitConfig
+from .strategy_v20 import RsiMeanReversionV20, RsiMeanReversionV20_NoFilters
+from .strategy_v20_hybrid import RsiMeanReversionV20Hybrid
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("ParameterSweep")
+
+# Variante de estrategia: (clase, kwargs del constructor)
+StrategyVariant = Tuple[type, Dict[str, Any]]
+
+DEFAULT_VARIANTS: Dict[str, StrategyVariant] = {
+    'V20': (RsiMeanReversionV20, {}),
+    'V20_NoFilters': (RsiMeanReversionV20_NoFilters, {}),
+    'V20_Hybrid': (RsiMeanReversionV20Hybrid, {}),
+}
+
+# Logs por minuto/trade de cada simulación (se silencian dentro del sweep)
+_QUIET_LOGGERS = ('HighFidelityBacktester', 'SmartExits', 'StrategyV20', 'StrategyV20Hybrid')
+
+# Estado de cada proceso del pool (cargado una vez por _init_sweep_worker)
+_worker_state: Dict[str, Any] = {}
+
+
+@dataclass
+class SweepResult:
+    """Resultado de un job del sweep"""
+    variant: str
+    config: SimulationConfig
+    result: Optional[SimulationResult]
+    error: Optional[str] = None
+
+
+def build_config_grid(base: SimulationConfig = None, **grid: List[Any]) -> List[SimulationConfig]:
+    """
+    Producto cartesiano de valores sobre una SimulationConfig base.
+
+    Ejemplo:
+        build_config_grid(stop_loss_pct=[1.0, 2.0], cooldown_minutes=[5, 10])  # 4 configs
+
+    Raises:
+        ValueError: Si un parámetro no es un campo de SimulationConfig
+    """
+    base = base or SimulationConfig()
+    valid_fields = {f.name for f in fields(SimulationConfig)}
+    unknown = set(grid) - valid_fields
+    if unknown:
+        raise ValueError(f"Parámetros desconocidos para SimulationConfig: {sorted(unknown)}")
+
+    names = list(grid)
+    return [replace(base, **dict(zip(names, values))) for values in itertools.product(*grid.values())]
+
+
+def build_strategy(variant: StrategyVariant, config: SimulationConfig):
+    """
+    Instancia la estrategia de una variante para una config.
+
+    Si config.enable_atr_tp y la variante no fija exit_config, el Smart Exit
+    Manager usa config.atr_multiplier como multiplicador del TP.
+    """
+    strategy_class, kwargs = variant
+    kwargs = dict(kwargs)
+
+    if config.enable_atr_tp and 'exit_config' not in kwargs:
+        params = inspect.signature(strategy_class.__init__).parameters
+        if 'exit_config' in params or any(p.kind == p.VAR_KEYWORD for p in params.values()):
+            kwargs['exit_config'] = ExitConfig(atr_multiplier_tp=config.atr_multiplier)
+
+    return strategy_class(**kwargs)
+
+
+def _init_sweep_worker(data_dir: str):
+    """Initializer del pool: abre los datos alineados memory-mapped"""
+    for name in _QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.ERROR)
+    _worker_state['market_data'] = AlignedMarketData.load(data_dir, mmap=True)
+
+
+def _run_sweep_job(job: Tuple[str, StrategyVariant, SimulationConfig]) -> SweepResult:
+    """Ejecuta una simulación dentro de un proceso del pool"""
+    variant_name, variant, config = job
+    try:
+        strategy = build_strategy(variant, config)
+        result = HighFidelityBacktester(config).run(_worker_state['market_data'], strategy)
+        return SweepResult(variant_name, config, result)
+    except Exception as e:
+        return SweepResult(variant_name, config, None, str(e))
+
+
+def rank_results(results: List[SweepResult]) -> List[SweepResult]:
+    """Ordena por PnL (desc) y drawdown (asc); los jobs con error van al final"""
+    ok = [r for r in results if r.result is not None]
+    failed = [r for r in results if r.result is None]
+    ok.sort(key=lambda r: (-r.result.total_pnl, r.result.max_drawdown))
+    return ok + failed
+
+
+def run_sweep(
+    market_data: Union[Dict[str, pd.DataFrame], AlignedMarketData],
+    configs: List[SimulationConfig],
+    variants: Dict[str, StrategyVariant] = None,
+    max_workers: int = 0,
+    work_dir: Optional[str] = None
+) -> List[SweepResult]:
+    """
+    Ejecuta todas las combinaciones (variante, config).
+
+    Args:
+        market_data: {symbol: DataFrame OHLCV} o AlignedMarketData
+        configs: Grilla de SimulationConfig (ver build_config_grid)
+        variants: {nombre: (clase, kwargs)}. None = DEFAULT_VARIANTS
+        max_workers: Procesos del pool. 1 = secuencial, <= 0 = os.cpu_count()
+        work_dir: Directorio para los datos memory-mapped (None = temporal del sistema)
+
+    Returns:
+        Lista de SweepResult rankeada (ver rank_results)
+    """
+    variants = variants or DEFAULT_VARIANTS
+    aligned = market_data if isinstance(market_data, AlignedMarketData) else AlignedMarketData.from_frames(market_data)
+    jobs = [(name, variant, config) for name, variant in variants.items() for config in configs]
+    workers = max_workers if max_workers > 0 else (os.cpu_count() or 1)
+
+    logger.info(f"🧪 Sweep: {len(variants)} variantes × {len(configs)} configs = {len(jobs)} simulaciones "
+                f"({len(aligned)} minutos, {len(aligned.symbols)} símbolos, {workers} procesos)")
+
+    data_dir = aligned.save(tempfile.mkdtemp(prefix='sweep_', dir=work_dir))
+    results = None
+    try:
+        if workers > 1 and len(jobs) > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep_worker,
+                                         initargs=(data_dir,)) as pool:
+                    results = list(pool.map(_run_sweep_job, jobs))
+            except Exception as e:
+                logger.error(f"❌ Error en pool de procesos, ejecutando secuencial: {e}")
+                results = None
+
+        if results is None:
+            levels = {name: logging.getLogger(name).level for name in _QUIET_LOGGERS}
+            _init_sweep_worker(data_dir)
+            try:
+                results = [_run_sweep_job(job) for job in jobs]
+            finally:
+                _worker_state.clear()
+                for name, level in levels.items():
+                    logging.getLogger(name).setLevel(level)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    for r in results:
+        if r.error:
+            logger.warning(f"   ⚠️ {r.variant} {r.config}: {r.error}")
+
+    ranked = rank_results(results)
+    if ranked and ranked[0].result is not None:
+        best = ranked[0]
+        logger.info(f"🏆 Mejor: {best.variant} | PnL ${best.result.total_pnl:.2f} | "
+                    f"Win Rate {best.result.win_rate:.1f}% | DD {best.result.max_drawdown:.1f}%")
+    return ranked
+
+
+def _parse_values(text: Optional[str], cast=float) -> Optional[List[Any]]:
+    """'1,2,3' -> [1.0, 2.0, 3.0]"""
+    if not text:
+        return None
+    return [cast(value) for value in text.split(',') if value.strip()]
+
+
+def main():
+    from .binance_data_fetcher import fetch_1m_data
+    from .report_generator import generate_sweep_report
+
+    parser = argparse.ArgumentParser(description="Sweep de parámetros del simulador de alta fidelidad")
+    parser.add_argument('--symbols', default='BTC,ETH,SOL')
+    parser.add_argument('--hours', type=int, default=48)
+    parser.add_argument('--stop-loss', help="Stop loss en %%, ej: 1,2,3")
+    parser.add_argument('--cooldown', help="Cooldown en minutos, ej: 5,10,15")
+    parser.add_argument('--max-positions', help="Máximo de posiciones, ej: 2,3")
+    parser.add_argument('--trailing', help="Trailing stop activado (0/1), ej: 0,1")
+    parser.add_argument('--trailing-distance', help="Distancia del trailing en %%, ej: 0.3,0.5")
+    parser.add_argument('--atr-multiplier', help="Multiplicador ATR del TP (activa ATR TP), ej: 2,3")
+    parser.add_argument('--variants', default=','.join(DEFAULT_VARIANTS), help="Variantes de estrategia")
+    parser.add_argument('--workers', type=int, default=0, help="Procesos (0 = todos los cores)")
+    parser.add_argument('--top', type=int, default=20, help="Filas del ranking en el reporte")
+    parser.add_argument('--output', default="SIMULATION_SWEEP_REPORT.md")
+    args = parser.parse_args()
+
+    grid = {
+        'stop_loss_pct': _parse_values(args.stop_loss),
+        'cooldown_minutes': _parse_values(args.cooldown, int),
+        'max_positions': _parse_values(args.max_positions, int),
+        'enable_trailing_stop': _parse_values(args.trailing, lambda v: bool(int(v))),
+        'trailing_distance_pct': _parse_values(args.trailing_distance),
+        'atr_multiplier': _parse_values(args.atr_multiplier),
+    }
+    grid = {name: values for name, values in grid.items() if values}
+    base = SimulationConfig(enable_atr_tp=bool(args.atr_multiplier))
+
+    unknown = [name for name in args.variants.split(',') if name not in DEFAULT_VARIANTS]
+    if unknown:
+        parser.error(f"Variantes desconocidas: {unknown} (disponibles: {list(DEFAULT_VARIANTS)})")
+    variants = {name: DEFAULT_VARIANTS[name] for name in args.variants.split(',')}
+
+    market_data = fetch_1m_data(args.symbols.split(','), hours_back=args.hours)
+    if not market_data:
+        logger.error("❌ No se pudieron descargar datos")
+        return
+
+    results = run_sweep(market_data, build_config_grid(base, **grid), variants, args.workers)
+    generate_sweep_report(results, output_file=args.output, top_n=args.top)
+
+
+if __name__ == '__main__':
+    main()
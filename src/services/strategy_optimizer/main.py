@@ -8,20 +8,25 @@ Proceso:
 2. Descarga datos históricos recientes (últimas 1000 velas de 1h)
 3. Ejecuta TournamentOptimizer para cada símbolo
 4. Guarda configuración ganadora en Redis para que Brain la use
+
+V22.2: Walk-forward opcional (OPTIMIZER_WALK_FORWARD_FOLDS) - el reporte OOS
+y de estabilidad de parámetros se guarda junto a la configuración ganadora.
 """
 
 import time
-import requests
 import logging
 from datetime import datetime
 from typing import Dict, List
 from src.shared.memory import memory
+from src.shared.candle_store import candle_store  # V22.2: Cache local de velas
+from src.config.settings import config
 from src.shared.utils import get_logger, normalize_symbol  # Keep for backward compat
 from src.domain import TradingSymbol, parse_symbol_list  # V21.3: Value Object
 from src.config.symbols import ACTIVE_SYMBOLS, FALLBACK_SYMBOLS
 from src.services.brain.strategies import AVAILABLE_STRATEGIES
 from src.services.brain.strategies.optimizer import TournamentOptimizer
 from src.services.strategy_optimizer.rolling_validator import RollingValidator
+from src.services.strategy_optimizer.walk_forward import WalkForwardOptimizer
 
 logger = get_logger("StrategyOptimizerV19")
 
@@ -29,6 +34,7 @@ logger = get_logger("StrategyOptimizerV19")
 OPTIMIZATION_INTERVAL = 4 * 3600  # 4 horas en segundos
 BINANCE_API = "https://api.binance.com/api/v3/klines"
 HISTORICAL_CANDLES = 1000  # Últimas 1000 velas de 1h (~42 días)
+HISTORICAL_INTERVAL = '1h'  # V22.2: Timeframe del torneo (el Brain evalúa en el mismo)
 
 
 class StrategyOptimizerWorker:
@@ -38,8 +44,18 @@ class StrategyOptimizerWorker:
     
     def __init__(self):
         self.redis_client = memory.get_client()
-        self.optimizer = TournamentOptimizer(AVAILABLE_STRATEGIES)
+        self.optimizer = TournamentOptimizer(
+            AVAILABLE_STRATEGIES,
+            max_workers=config.OPTIMIZER_WORKERS,
+            search=config.OPTIMIZER_SEARCH
+        )
         self.rolling_validator = RollingValidator()
+        self.walk_forward = WalkForwardOptimizer(
+            self.optimizer,
+            train_size=config.OPTIMIZER_WALK_FORWARD_TRAIN,
+            test_size=config.OPTIMIZER_WALK_FORWARD_TEST,
+            max_folds=config.OPTIMIZER_WALK_FORWARD_FOLDS
+        ) if config.OPTIMIZER_WALK_FORWARD_FOLDS > 0 else None
         
         # V19: Importar regime detector para filtrado inteligente
         from src.services.brain.strategies.regime_detector import RegimeDetector
@@ -47,6 +63,7 @@ class StrategyOptimizerWorker:
         
         logger.info("🎯 Strategy Optimizer Worker V19 - Regime-Aware Initialized")
         logger.info(f"⏰ Intervalo de optimización: {OPTIMIZATION_INTERVAL//3600}h")
+        logger.info(f"⚙️ Torneo paralelo: {self.optimizer.max_workers} procesos, {config.OPTIMIZER_MAX_COMBINATIONS} combinaciones/símbolo, búsqueda {self.optimizer.search}")
         
         # V19: Ejecutar torneo inmediato si Redis está vacío (post-reset)
         if not self.redis_client.exists('strategy_config:BTC'):
@@ -85,6 +102,9 @@ class StrategyOptimizerWorker:
         """
         V21.2.1: Descarga datos históricos de Binance para backtesting con normalización.
         
+        V22.2: Lee del candle store; solo descarga las velas de 1h nuevas desde
+        el último torneo (en vez de 1000 velas cada 4h).
+        
         Returns:
             Lista de precios de cierre [más antiguo -> más reciente]
         """
@@ -92,27 +112,14 @@ class StrategyOptimizerWorker:
             # V21.2.1: NORMALIZACIÓN
             symbol_normalized = normalize_symbol(symbol, format='long')  # "BTCUSDT"
             
-            logger.info(f"📥 Descargando {HISTORICAL_CANDLES} velas para {symbol}...")
-            
-            params = {
-                'symbol': symbol_normalized,  # V21.2.1: Usar símbolo normalizado
-                'interval': '1h',
-                'limit': HISTORICAL_CANDLES
-            }
+            logger.info(f"📥 Cargando {HISTORICAL_CANDLES} velas para {symbol}...")
             
-            response = requests.get(BINANCE_API, params=params, timeout=30)
-            response.raise_for_status()
+            candles = candle_store.get_last(symbol_normalized, HISTORICAL_INTERVAL, HISTORICAL_CANDLES)
             
-            klines = response.json()
+            # Precios de cierre
+            prices = candles.close.tolist()
             
-            if isinstance(klines, dict) and 'code' in klines:
-                logger.error(f"❌ Binance API error: {klines}")
-                return []
-            
-            # Extraer precios de cierre (índice 4)
-            prices = [float(k[4]) for k in klines]
-            
-            logger.info(f"✅ Descargados {len(prices)} precios para {symbol}")
+            logger.info(f"✅ Cargados {len(prices)} precios para {symbol}")
             return prices
             
         except Exception as e:
@@ -150,16 +157,14 @@ class StrategyOptimizerWorker:
         logger.info(f"\n🎯 Ejecutando torneo CON VALIDACIÓN ROLLING para {len(symbols_data)} símbolos...")
         logger.info("   📊 Validación: 50% peso últimos 7d, 30% últimos 15d, 20% últimos 30d")
         
-        results = {}
+        # V19: Detectar régimen de mercado para filtrar estrategias
+        strategies_by_symbol = {}
         for symbol, price_data in symbols_data.items():
             try:
-                logger.info(f"\n🏆 Torneo para {symbol}:")
-                
-                # V19: Detectar régimen de mercado para filtrar estrategias
                 regime, regime_indicators = self.regime_detector.detect(price_data)
                 recommended_strategy_names = self.regime_detector.get_recommended_strategies(regime)
                 
-                logger.info(f"   📊 Régimen detectado: {regime.value}")
+                logger.info(f"   📊 {symbol} - Régimen detectado: {regime.value}")
                 logger.info(f"   🎯 Estrategias compatibles: {', '.join(recommended_strategy_names)}")
                 
                 # Filtrar AVAILABLE_STRATEGIES por régimen
@@ -172,20 +177,54 @@ class StrategyOptimizerWorker:
                     logger.warning(f"   ⚠️ No hay estrategias compatibles para {symbol} en {regime.value}, usando todas")
                     filtered_strategies = AVAILABLE_STRATEGIES
                 
-                # Generar candidatos con optimizer (solo estrategias filtradas)
-                best_strategy, backtest_result = self.optimizer.optimize_for_symbol(
-                    symbol,
-                    price_data,
-                    max_combinations=50,
-                    strategies_to_test=filtered_strategies
+                strategies_by_symbol[symbol] = filtered_strategies
+            except Exception as e:
+                logger.error(f"❌ Error detectando régimen de {symbol}: {e}")
+        
+        # V22.2: Generar candidatos de todos los símbolos en un solo torneo paralelo
+        tournament = self.optimizer.optimize_symbols(
+            symbols_data,
+            max_combinations=config.OPTIMIZER_MAX_COMBINATIONS,
+            strategies_by_symbol=strategies_by_symbol
+        )
+        
+        # V22.2: Walk-forward (OOS y estabilidad) reutilizando los mismos precios
+        walk_forward = {}
+        if self.walk_forward is not None:
+            try:
+                walk_forward = self.walk_forward.run(
+                    symbols_data,
+                    max_combinations=config.OPTIMIZER_MAX_COMBINATIONS,
+                    strategies_by_symbol=strategies_by_symbol
                 )
+            except Exception as e:
+                logger.error(f"❌ Error en walk-forward: {e}")
+        
+        results = {}
+        for symbol, price_data in symbols_data.items():
+            try:
+                logger.info(f"\n🏆 Torneo para {symbol}:")
                 
-                # VALIDACIÓN ROLLING: Verificar con datos recientes
-                logger.info(f"   🔄 Aplicando Rolling Validation...")
-                validation = self.rolling_validator.validate_strategy(best_strategy, price_data)
+                if symbol not in tournament:
+                    raise ValueError("No valid strategies tested")
+                
+                # V22.2: VALIDACIÓN ROLLING en lote de los top-K finalistas del torneo
+                finalists = self.optimizer.last_ranking.get(symbol) or [tournament[symbol]]
+                finalists = finalists[:config.OPTIMIZER_VALIDATE_TOP_K]
+                tournament_results = {id(strategy): result for strategy, result in finalists}
+                
+                logger.info(f"   🔄 Aplicando Rolling Validation a {len(finalists)} finalistas...")
+                validations = self.rolling_validator.validate_candidates(
+                    [strategy for strategy, _ in finalists],
+                    price_data
+                )
+                
+                # Mejor aprobada por weighted score (o la primera si ninguna aprueba)
+                best_strategy, validation = validations[0]
+                backtest_result = tournament_results[id(best_strategy)]
                 
                 if validation['is_approved']:
-                    logger.info(f"   ✅ Estrategia APROBADA (Weighted Score: {validation['weighted_score']:.3f})")
+                    logger.info(f"   ✅ Estrategia APROBADA: {best_strategy} (Weighted Score: {validation['weighted_score']:.3f})")
                     
                     # Usar métricas de ventana más reciente (7d) como principales
                     recent_metrics = validation['results_by_window'].get('recent_7d', {})
@@ -206,8 +245,17 @@ class StrategyOptimizerWorker:
                             'valid_windows': validation['valid_windows'],
                             'by_window': validation['results_by_window']
                         },
+                        # V22.2: Timeframe del torneo, para que el Brain evalúe en el mismo
+                        # (los fallbacks no lo llevan y se quedan en el timeframe base)
+                        'interval': HISTORICAL_INTERVAL,
                         'last_updated': datetime.utcnow().isoformat()
                     }
+                    
+                    if symbol in walk_forward:
+                        results[symbol]['walk_forward'] = {
+                            'oos': walk_forward[symbol]['oos'],
+                            'stability': walk_forward[symbol]['stability']
+                        }
                 else:
                     logger.warning(f"   ⚠️ Estrategia RECHAZADA en rolling validation, usando RSI default")
                     # Fallback a RSI conservador
@@ -241,10 +289,10 @@ class StrategyOptimizerWorker:
         
         # Mostrar resumen por símbolo
         logger.info("\n📊 RESUMEN DE ESTRATEGIAS GANADORAS:")
-        for symbol, config in results.items():
-            metrics = config.get('metrics', {})
+        for symbol, symbol_config in results.items():
+            metrics = symbol_config.get('metrics', {})
             logger.info(
-                f"   {symbol}: {config['strategy_name']}{config['params']} | "
+                f"   {symbol}: {symbol_config['strategy_name']}{symbol_config['params']} | "
                 f"Return: {metrics.get('total_return', 0):.2f}% | "
                 f"Sharpe: {metrics.get('sharpe_ratio', 0):.2f} | "
                 f"Score: {metrics.get('score', 0):.2f}"
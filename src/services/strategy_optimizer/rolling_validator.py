@@ -2,12 +2,18 @@
 Rolling Validation - V18.5
 ===========================
 Valida estrategias con ventanas de tiempo más recientes para evitar overfitting.
+
+V22.2: Modo shared_work - una sola simulación sobre la ventana más larga y
+métricas de cada ventana derivadas de su tramo (FastBacktester.run_windows).
+Validación en lote de los top-K candidatos del torneo (validate_candidates).
 """
 
 import logging
-from typing import List, Dict, Any
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from src.services.brain.backtesting.fast_backtester import FastBacktester, BacktestResult
+from src.services.brain.indicators import IndicatorCache
 
 logger = logging.getLogger("RollingValidator")
 
@@ -22,10 +28,15 @@ class RollingValidator:
     - Últimos 30 días (720 velas) - Balance entre reciente e histórico
     
     Solo aprueba estrategias que funcionen bien en TODAS las ventanas.
+    
+    V22.2: Con shared_work=True (default) se simula una sola vez por
+    estrategia; shared_work=False ejecuta un backtest independiente por
+    ventana (comportamiento V18.5).
     """
     
-    def __init__(self, initial_capital: float = 10000.0):
+    def __init__(self, initial_capital: float = 10000.0, shared_work: bool = True):
         self.backtester = FastBacktester(initial_capital)
+        self.shared_work = shared_work
         self.validation_windows = {
             'recent_7d': 168,    # Últimas 7 días (peso: 50%)
             'medium_15d': 360,   # Últimos 15 días (peso: 30%)
@@ -40,25 +51,36 @@ class RollingValidator:
     def validate_strategy(
         self,
         strategy,
-        full_price_data: List[float]
+        full_price_data: List[float],
+        cache: Optional[IndicatorCache] = None
     ) -> Dict[str, Any]:
         """
         Valida estrategia en múltiples ventanas temporales.
         
+        Args:
+            strategy: Estrategia a validar
+            full_price_data: Precios [más antiguo -> más reciente]
+            cache: (V22.2) IndicatorCache compartido entre candidatos (validate_candidates)
+        
         Returns:
             Dict con resultados por ventana y score ponderado
         """
+        if self.shared_work:
+            window_results = self.backtester.run_windows(strategy, full_price_data, self.validation_windows, cache)
+        else:
+            window_results = {
+                window_name: self.backtester.run(strategy, full_price_data[-window_size:])
+                if len(full_price_data) >= window_size else None
+                for window_name, window_size in self.validation_windows.items()
+            }
+        
         results = {}
         weighted_score = 0.0
         
         for window_name, window_size in self.validation_windows.items():
-            # Extraer ventana de datos
-            if len(full_price_data) >= window_size:
-                window_data = full_price_data[-window_size:]
-                
-                # Ejecutar backtest en esta ventana
-                result = self.backtester.run(strategy, window_data)
-                
+            result = window_results[window_name]
+            
+            if result is not None:
                 results[window_name] = {
                     'total_return': result.total_return,
                     'sharpe_ratio': result.sharpe_ratio,
@@ -88,6 +110,34 @@ class RollingValidator:
             'is_approved': weighted_score > 0 and valid_windows >= 2  # Al menos 2 ventanas válidas
         }
     
+    def validate_candidates(
+        self,
+        strategies: List[Any],
+        full_price_data: List[float],
+        top_k: Optional[int] = None
+    ) -> List[Tuple[Any, Dict[str, Any]]]:
+        """
+        V22.2: Valida en lote los mejores candidatos del torneo de un símbolo.
+        
+        Todos comparten el mismo array de precios y un IndicatorCache, así
+        que las series comunes (ej: mismas EMAs) se calculan una sola vez.
+        
+        Args:
+            strategies: Candidatos ordenados por score del torneo
+            full_price_data: Precios [más antiguo -> más reciente]
+            top_k: Cuántos candidatos validar (None = todos)
+        
+        Returns:
+            Lista de (estrategia, validation) ordenada por weighted_score (aprobadas primero)
+        """
+        prices = np.asarray(full_price_data, dtype=float)
+        cache = IndicatorCache()
+        candidates = strategies[:top_k] if top_k else strategies
+        
+        validations = [(strategy, self.validate_strategy(strategy, prices, cache)) for strategy in candidates]
+        validations.sort(key=lambda x: (x[1]['is_approved'], x[1]['weighted_score']), reverse=True)
+        return validations
+    
     def get_best_validated_strategy(
         self,
         strategies_with_data: List[tuple],  # [(strategy_instance, price_data), ...]
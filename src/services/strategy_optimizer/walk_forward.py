@@ -0,0 +1,236 @@
+"""
+Walk-Forward Optimization - V22.2
+=================================
+Optimiza en ventanas de entrenamiento rodantes y mide el resultado fuera de
+muestra (OOS) en la ventana siguiente.
+
+Proceso:
+1. Divide la serie en folds (train -> test) que avanzan `step` velas
+2. Ejecuta un torneo por fold (todos en el mismo pool de procesos)
+3. Opera la ganadora de cada fold en su ventana de test (sin re-optimizar)
+4. Reporta rendimiento OOS agregado y estabilidad de los parámetros ganadores
+
+Los folds se solapan: los precios se envían una vez por símbolo y las señales
+de cada combinación se calculan una vez sobre toda la serie (IndicatorCache),
+así que cada fold extra solo cuesta sus simulaciones.
+"""
+
+import logging
+import numpy as np
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+from src.services.brain.backtesting.fast_backtester import FastBacktester, BacktestResult
+from src.services.brain.indicators import IndicatorCache
+from src.services.brain.strategies.optimizer import TournamentOptimizer
+
+logger = logging.getLogger("WalkForward")
+
+
+@dataclass
+class WalkForwardFold:
+    """Índices de un fold: train [train_start, train_end), test [train_end, test_end)"""
+    index: int
+    train_start: int
+    train_end: int
+    test_end: int
+
+    @property
+    def test_start(self) -> int:
+        return self.train_end
+
+
+def _metrics(result: BacktestResult) -> Dict[str, float]:
+    """Métricas de un BacktestResult en formato serializable (mismo que strategy_config)"""
+    return {
+        'total_return': result.total_return,
+        'sharpe_ratio': result.sharpe_ratio,
+        'win_rate': result.win_rate,
+        'max_drawdown': result.max_drawdown,
+        'total_trades': result.total_trades,
+        'score': result.score
+    }
+
+
+class WalkForwardOptimizer:
+    """
+    Walk-forward sobre TournamentOptimizer.
+
+    Los folds se anclan al final de la serie: el último test termina en la
+    vela más reciente y los anteriores retroceden `step` velas cada uno.
+    """
+
+    def __init__(
+        self,
+        optimizer: TournamentOptimizer,
+        train_size: int = 500,
+        test_size: int = 100,
+        step: Optional[int] = None,
+        max_folds: Optional[int] = None,
+        initial_capital: float = 10000.0
+    ):
+        """
+        Args:
+            optimizer: TournamentOptimizer que ejecuta los torneos de cada fold
+            train_size: Velas de entrenamiento por fold
+            test_size: Velas fuera de muestra por fold
+            step: Avance entre folds (None = test_size, folds de test contiguos)
+            max_folds: Máximo de folds (los más recientes). None = todos los que quepan
+            initial_capital: Capital inicial de los backtests OOS
+        """
+        if train_size <= 0 or test_size <= 0:
+            raise ValueError("train_size y test_size deben ser positivos")
+
+        self.optimizer = optimizer
+        self.train_size = train_size
+        self.test_size = test_size
+        self.step = step if step and step > 0 else test_size
+        self.max_folds = max_folds
+        self.initial_capital = initial_capital
+
+    def make_folds(self, n_candles: int) -> List[WalkForwardFold]:
+        """
+        Folds que caben en n_candles, en orden cronológico.
+
+        Returns:
+            Lista de WalkForwardFold (vacía si la serie es más corta que train + test)
+        """
+        bounds = []
+        test_end = n_candles
+        while test_end - self.test_size - self.train_size >= 0:
+            if self.max_folds is not None and len(bounds) >= self.max_folds:
+                break
+            train_end = test_end - self.test_size
+            bounds.append((train_end - self.train_size, train_end, test_end))
+            test_end -= self.step
+
+        return [WalkForwardFold(i, *b) for i, b in enumerate(reversed(bounds))]
+
+    def run(
+        self,
+        symbols_data: Dict[str, List[float]],
+        max_combinations: int = 50,
+        strategies_by_symbol: Dict[str, Dict[str, type]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Ejecuta el walk-forward de varios símbolos.
+
+        Args:
+            symbols_data: Diccionario {símbolo: [precios históricos]}
+            max_combinations: Presupuesto por fold (igual que en el torneo)
+            strategies_by_symbol: Estrategias a probar por símbolo (filtro por régimen)
+
+        Returns:
+            {símbolo: reporte} (ver _build_report). Los símbolos sin folds no aparecen.
+        """
+        arrays = {symbol: np.asarray(prices, dtype=float) for symbol, prices in symbols_data.items()}
+
+        folds_by_symbol = {}
+        targets = {}
+        for symbol, prices in arrays.items():
+            folds = self.make_folds(len(prices))
+            if not folds:
+                logger.warning(
+                    f"⚠️ {symbol}: datos insuficientes para walk-forward "
+                    f"(necesita {self.train_size + self.test_size}, tiene {len(prices)})"
+                )
+                continue
+            folds_by_symbol[symbol] = folds
+            for fold in folds:
+                targets[(symbol, fold.index)] = (symbol, fold.train_start, fold.train_end)
+
+        if not targets:
+            return {}
+
+        logger.info(f"🚶 Walk-forward: {len(targets)} folds en {len(folds_by_symbol)} símbolos "
+                    f"(train={self.train_size}, test={self.test_size}, step={self.step})")
+
+        rankings = self.optimizer.run_tournaments(
+            {symbol: arrays[symbol] for symbol in folds_by_symbol},
+            targets,
+            max_combinations,
+            strategies_by_symbol
+        )
+
+        # Las ganadoras repetidas entre folds reutilizan sus señales
+        backtester = FastBacktester(self.initial_capital, cache=IndicatorCache())
+        reports = {}
+        for symbol, folds in folds_by_symbol.items():
+            fold_reports = []
+            for fold in folds:
+                ranking = rankings.get((symbol, fold.index))
+                if not ranking:
+                    logger.warning(f"   ⚠️ {symbol} fold {fold.index}: sin estrategias válidas")
+                    continue
+
+                winner, in_sample = ranking[0]
+                oos = backtester.run_range(winner, arrays[symbol], fold.test_start, fold.test_end)
+                fold_reports.append({
+                    'fold': fold.index,
+                    'train': [fold.train_start, fold.train_end],
+                    'test': [fold.test_start, fold.test_end],
+                    'strategy_name': winner.name,
+                    'params': winner.params,
+                    'in_sample': _metrics(in_sample),
+                    'out_of_sample': _metrics(oos)
+                })
+
+            if fold_reports:
+                reports[symbol] = self._build_report(symbol, fold_reports)
+
+        return reports
+
+    def _build_report(self, symbol: str, fold_reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Agrega los folds de un símbolo.
+
+        - oos: score/retorno medio, retorno compuesto, % de folds positivos y
+          eficiencia (score OOS medio / score in-sample medio)
+        - stability: estrategia dominante, % de folds que la eligen y
+          coeficiente de variación de cada parámetro numérico entre esos folds
+        """
+        oos_scores = np.array([f['out_of_sample']['score'] for f in fold_reports])
+        oos_returns = np.array([f['out_of_sample']['total_return'] for f in fold_reports])
+        is_scores = np.array([f['in_sample']['score'] for f in fold_reports])
+
+        mean_is_score = float(is_scores.mean())
+        oos = {
+            'mean_score': float(oos_scores.mean()),
+            'mean_return': float(oos_returns.mean()),
+            'compounded_return': float((np.prod(1 + oos_returns / 100) - 1) * 100),
+            'positive_folds': float((oos_returns > 0).mean()),
+            'total_trades': int(sum(f['out_of_sample']['total_trades'] for f in fold_reports)),
+            'efficiency': float(oos_scores.mean() / mean_is_score) if mean_is_score > 0 else 0.0
+        }
+
+        counts = Counter(f['strategy_name'] for f in fold_reports)
+        dominant, dominant_count = counts.most_common(1)[0]
+        dominant_params = [f['params'] for f in fold_reports if f['strategy_name'] == dominant]
+
+        param_dispersion = {}
+        for param in dominant_params[0]:
+            values = [p.get(param) for p in dominant_params]
+            if not all(isinstance(v, (int, float)) for v in values):
+                continue
+            values = np.array(values, dtype=float)
+            mean = np.abs(values.mean())
+            param_dispersion[param] = float(values.std() / mean) if mean > 0 else 0.0
+
+        stability = {
+            'dominant_strategy': dominant,
+            'strategy_consistency': dominant_count / len(fold_reports),
+            'distinct_strategies': len(counts),
+            'param_dispersion': param_dispersion
+        }
+
+        logger.info(
+            f"   🚶 {symbol}: {len(fold_reports)} folds | OOS score medio {oos['mean_score']:.3f} | "
+            f"retorno compuesto {oos['compounded_return']:.2f}% | folds positivos {oos['positive_folds']:.0%} | "
+            f"dominante {dominant} ({stability['strategy_consistency']:.0%})"
+        )
+
+        return {
+            'folds': fold_reports,
+            'oos': oos,
+            'stability': stability
+        }
@@ -0,0 +1,78 @@
+"""
+Message Codec - V22.2
+=====================
+Serialización de payloads entre servicios (Pub/Sub, Streams y keys de Redis).
+
+Formatos:
+- JSON (texto): formato histórico, lo leen todas las versiones
+- msgpack v1: byte de versión 0x01 + msgpack (binario, más compacto)
+
+decode detecta el formato por el primer byte (un JSON nunca empieza con
+0x01), así los lectores entienden ambos durante el rollout; los escritores
+pasan a msgpack con MESSAGE_CODEC=msgpack una vez desplegados los lectores.
+
+Los clientes Redis usan decode_responses=True con
+encoding_errors='surrogateescape': los payloads binarios llegan como str y se
+recuperan sin pérdida con .encode('utf-8', 'surrogateescape').
+"""
+
+import json
+import logging
+from typing import Any, Union
+from src.config.settings import config
+
+try:
+    import msgpack
+except ImportError:  # Dependencia opcional: sin msgpack se escribe JSON
+    msgpack = None
+
+logger = logging.getLogger("MessageCodec")
+
+MSGPACK_V1 = b'\x01'
+_MSGPACK_V1_STR = MSGPACK_V1.decode()
+
+_warned_missing_msgpack = False
+
+
+def active_codec() -> str:
+    """Codec de escritura efectivo ('msgpack' solo si está instalado)"""
+    global _warned_missing_msgpack
+    if config.MESSAGE_CODEC == 'msgpack':
+        if msgpack is not None:
+            return 'msgpack'
+        if not _warned_missing_msgpack:
+            logger.warning("⚠️ MESSAGE_CODEC=msgpack pero msgpack no está instalado, usando JSON")
+            _warned_missing_msgpack = True
+    return 'json'
+
+
+def encode(value: Any) -> Union[str, bytes]:
+    """Serializa con el codec configurado (MESSAGE_CODEC)"""
+    if active_codec() == 'msgpack':
+        return MSGPACK_V1 + msgpack.packb(value, use_bin_type=True)
+    return json.dumps(value)
+
+
+def decode(raw: Union[str, bytes, None]) -> Any:
+    """
+    Deserializa un payload JSON o msgpack v1.
+
+    Returns:
+        Objeto decodificado; el valor tal cual si no es JSON ni msgpack
+        (ej: strings planos guardados con memory.set)
+    """
+    if raw is None:
+        return None
+
+    if isinstance(raw, str) and raw.startswith(_MSGPACK_V1_STR):
+        raw = raw.encode('utf-8', 'surrogateescape')
+
+    if isinstance(raw, (bytes, bytearray)) and raw[:1] == MSGPACK_V1:
+        if msgpack is None:
+            raise ValueError("Payload msgpack recibido pero msgpack no está instalado")
+        return msgpack.unpackb(raw[1:], raw=False)
+
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, TypeError, UnicodeDecodeError):
+        return raw
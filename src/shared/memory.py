@@ -1,89 +1,287 @@
 import os
+import time
+import zlib
 import redis
-import json
+import socket
 import logging
+from redis.backoff import ExponentialBackoff
+from redis.retry import Retry
 from src.config.settings import config
+from src.shared.codec import encode, decode
 
 logger = logging.getLogger("RedisClient")
 
 class RedisClient:
+    """
+    Cliente Redis compartido (Singleton).
+    
+    V22.2: Dos ConnectionPool por proceso:
+    - request/response (get/set/publish/...): socket_timeout acotado
+    - Pub/Sub (listeners bloqueantes): socket_timeout=None
+    
+    Sin PING por llamada: los pools validan las conexiones inactivas con
+    health_check_interval y reconectan de forma perezosa (Retry con backoff)
+    cuando un comando falla por conexión.
+    
+    V22.2: Los payloads usan src.shared.codec (JSON o msgpack según
+    MESSAGE_CODEC); las respuestas binarias llegan como str vía surrogateescape.
+    """
     _instance = None
     _connection = None
+    _pubsub_connection = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(RedisClient, cls).__new__(cls)
         return cls._instance
 
-    def connect(self):
-        """Establece conexión con Redis (Singleton)"""
-        if self._connection:
-            try:
-                self._connection.ping()
-                return self._connection
-            except redis.ConnectionError:
-                logger.warning("⚠️ Conexión Redis perdida, reconectando...")
-                self._connection = None
-
-        redis_host = config.REDIS_HOST
-        redis_port = config.REDIS_PORT
-        
+    def _create_client(self, socket_timeout):
+        """Crea un cliente sobre un ConnectionPool nuevo (PING solo al crearlo)"""
+        pool = redis.ConnectionPool(
+            host=config.REDIS_HOST,
+            port=config.REDIS_PORT,
+            db=0,
+            decode_responses=True,
+            encoding_errors='surrogateescape',  # Payloads msgpack (ver codec)
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=10,
+            socket_keepalive=True,
+            health_check_interval=config.REDIS_HEALTH_CHECK_INTERVAL,
+            max_connections=config.REDIS_MAX_CONNECTIONS,
+            retry=Retry(ExponentialBackoff(cap=2, base=0.1), 3),
+            retry_on_error=[redis.ConnectionError, redis.TimeoutError]
+        )
+        client = redis.Redis(connection_pool=pool)
         try:
-            # V17: socket_timeout=None for blocking Pub/Sub listeners
-            # para evitar que los workers (Brain/Persistence) crashean esperando mensajes.
-            self._connection = redis.Redis(
-                host=redis_host, 
-                port=redis_port, 
-                db=0, 
-                decode_responses=True,
-                socket_timeout=None,
-                socket_connect_timeout=10
-            )
-            self._connection.ping()
-            logger.info(f"✅ Conectado a Redis en {redis_host}:{redis_port}")
-            return self._connection
+            client.ping()
+            return client
         except Exception as e:
             logger.critical(f"🔥 Fallo conectando a Redis: {e}")
+            pool.disconnect()
             return None
 
+    def connect(self):
+        """Cliente request/response (Singleton, pool compartido)"""
+        if self._connection is None:
+            self._connection = self._create_client(config.REDIS_SOCKET_TIMEOUT)
+            if self._connection:
+                logger.info(f"✅ Conectado a Redis en {config.REDIS_HOST}:{config.REDIS_PORT}")
+        return self._connection
+
     def get_client(self):
-        """Retorna el cliente crudo para operaciones avanzadas (PubSub, etc)"""
+        """Retorna el cliente crudo para operaciones avanzadas (pipelines, listas, etc)"""
         return self.connect()
 
-    def publish(self, channel: str, message: dict):
-        """Publica un mensaje JSON en un canal"""
+    def get_pubsub_client(self):
+        """
+        V22.2: Cliente del pool de Pub/Sub.
+        
+        V17: socket_timeout=None para listeners bloqueantes, para evitar que
+        los workers (Brain/Persistence) crasheen esperando mensajes.
+        """
+        if self._pubsub_connection is None:
+            self._pubsub_connection = self._create_client(None)
+        return self._pubsub_connection
+
+    def pubsub(self):
+        """V22.2: Objeto PubSub sobre el pool de Pub/Sub (None si Redis no responde)"""
+        client = self.get_pubsub_client()
+        return client.pubsub() if client else None
+
+    def ping(self) -> bool:
+        """V22.2: Health check explícito (connect() ya no hace PING)"""
+        try:
+            r = self.connect()
+            return bool(r and r.ping())
+        except Exception as e:
+            logger.warning(f"⚠️ Redis no responde: {e}")
+            return False
+
+    def publish(self, channel: str, message: dict, partition: int = 0):
+        """
+        Publica un mensaje en un canal (dict o lista de dicts para lotes).
+        
+        V22.2: Con MESSAGE_TRANSPORT=streams el mensaje se agrega (XADD) al
+        stream del canal/partición, acotado a STREAM_MAXLEN entradas.
+        """
         try:
             r = self.connect()
             if r:
-                r.publish(channel, json.dumps(message))
+                if config.MESSAGE_TRANSPORT == 'streams':
+                    r.xadd(self.stream_key(channel, partition), {'data': encode(message)},
+                           maxlen=config.STREAM_MAXLEN, approximate=True)
+                else:
+                    r.publish(channel, encode(message))
         except Exception as e:
             logger.error(f"Error publicando en {channel}: {e}")
 
+    # ========== V22.2: TRANSPORTE REDIS STREAMS ==========
+
+    @staticmethod
+    def stream_key(channel: str, partition: int = 0) -> str:
+        """'market_data' -> 'stream:market_data' (o 'stream:market_data:3' con particiones)"""
+        if config.STREAM_PARTITIONS > 1:
+            return f"stream:{channel}:{partition}"
+        return f"stream:{channel}"
+
+    @staticmethod
+    def partition_of(key: str) -> int:
+        """Partición estable de una key (ej: símbolo). 0 sin streams o con una partición"""
+        if config.MESSAGE_TRANSPORT != 'streams' or config.STREAM_PARTITIONS <= 1:
+            return 0
+        return zlib.crc32(key.encode()) % config.STREAM_PARTITIONS
+
+    def listen(self, channels: list, group: str, consumer: str = None, partitions: list = None,
+               takeover: list = None):
+        """
+        V22.2: Itera los mensajes de los canales con el transporte configurado.
+        
+        Los mensajes tienen el formato de Pub/Sub ({'type', 'channel', 'data'}),
+        así los handlers existentes no cambian.
+        
+        Con MESSAGE_TRANSPORT=streams:
+        - group: consumer group (las réplicas del mismo servicio comparten el
+          grupo y se reparten las entradas; cada servicio usa su propio grupo)
+        - Una entrada se confirma (XACK) cuando el handler termina y se pide la
+          siguiente; si el proceso muere antes, queda pendiente y se re-entrega
+        - Al iniciar re-procesa sus pendientes y reclama (XAUTOCLAIM) las de
+          consumidores caídos con más de STREAM_CLAIM_IDLE_MS sin confirmar
+        - Las particiones de `takeover` (recién recibidas de otro consumidor)
+          reclaman sus pendientes enseguida, sin esperar STREAM_CLAIM_IDLE_MS
+        
+        Args:
+            channels: Canales a escuchar
+            group: Consumer group (ignorado en Pub/Sub)
+            consumer: Nombre del consumidor (None = hostname-pid)
+            partitions: Particiones a leer (None = todas)
+            takeover: Particiones cuyo dueño anterior dejó de leerlas
+        """
+        if config.MESSAGE_TRANSPORT != 'streams':
+            pubsub = self.pubsub()
+            if not pubsub:
+                return
+            pubsub.subscribe(*channels)
+            for message in pubsub.listen():
+                if message['type'] == 'message':
+                    yield message
+            return
+
+        yield from self._listen_streams(channels, group, consumer, partitions, takeover)
+
+    def _listen_streams(self, channels: list, group: str, consumer: str = None, partitions: list = None,
+                        takeover: list = None):
+        # XREADGROUP con BLOCK usa el pool sin socket_timeout
+        r = self.get_pubsub_client()
+        if not r:
+            return
+
+        consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        if partitions is None:
+            partitions = range(max(config.STREAM_PARTITIONS, 1))
+        channel_of = {self.stream_key(channel, p): channel for channel in channels for p in partitions}
+
+        for key in channel_of:
+            try:
+                # '$': el grupo nuevo empieza en las entradas futuras (no re-ejecuta historia)
+                r.xgroup_create(key, group, id='$', mkstream=True)
+            except redis.ResponseError as e:
+                if 'BUSYGROUP' not in str(e):
+                    raise
+
+        logger.info(f"📬 Streams {list(channel_of)} | grupo '{group}' | consumidor '{consumer}'")
+
+        def _deliver(key, entries):
+            for entry_id, fields in entries:
+                if fields:  # None = entrada recortada por MAXLEN
+                    yield {'type': 'message', 'channel': channel_of[key], 'data': fields.get('data'), 'id': entry_id}
+                r.xack(key, group, entry_id)
+
+        # 1. Pendientes propios (crash o reinicio antes del XACK)
+        for key in channel_of:
+            while True:
+                response = r.xreadgroup(group, consumer, {key: '0'}, count=config.STREAM_BATCH_SIZE)
+                entries = response[0][1] if response else []
+                if not entries:
+                    break
+                logger.info(f"♻️ Re-procesando {len(entries)} entradas pendientes de {key}")
+                yield from _deliver(key, entries)
+
+        # 2. Pendientes del dueño anterior de las particiones recibidas (sin esperar el idle)
+        for key in (self.stream_key(channel, p) for channel in channels for p in takeover or []):
+            while True:
+                claimed = r.xautoclaim(key, group, consumer, 0, count=config.STREAM_BATCH_SIZE)
+                if not claimed or not claimed[1]:
+                    break
+                logger.warning(f"♻️ Tomadas {len(claimed[1])} entradas pendientes de {key}")
+                yield from _deliver(key, claimed[1])
+
+        last_claim = 0.0
+        while True:
+            # 3. Reclamar pendientes de consumidores caídos
+            if time.time() - last_claim > config.STREAM_CLAIM_IDLE_MS / 1000:
+                last_claim = time.time()
+                for key in channel_of:
+                    claimed = r.xautoclaim(key, group, consumer, config.STREAM_CLAIM_IDLE_MS,
+                                           count=config.STREAM_BATCH_SIZE)
+                    if claimed and claimed[1]:
+                        logger.warning(f"♻️ Reclamadas {len(claimed[1])} entradas de {key}")
+                        yield from _deliver(key, claimed[1])
+
+            # 4. Entradas nuevas en lotes
+            response = r.xreadgroup(group, consumer, {key: '>' for key in channel_of},
+                                    count=config.STREAM_BATCH_SIZE, block=config.STREAM_BLOCK_MS)
+            for key, entries in response or []:
+                yield from _deliver(key, entries)
+
     def set(self, key: str, value: any, ttl: int = None):
-        """Guarda un valor (serializa dicts a JSON automáticamente)"""
+        """Guarda un valor (serializa dicts/listas con el codec automáticamente)"""
         try:
             r = self.connect()
             if r:
                 if isinstance(value, (dict, list)):
-                    value = json.dumps(value)
+                    value = encode(value)
                 r.set(key, value, ex=ttl)
         except Exception as e:
             logger.error(f"Error escribiendo key {key}: {e}")
 
+    def set_many(self, values: dict, ttl: int = None):
+        """
+        V22.2: Guarda varias keys en un solo round-trip (pipeline sin transacción).
+        
+        Args:
+            values: {key: valor} (dicts/listas se serializan con el codec)
+            ttl: Expiración en segundos para todas las keys
+        """
+        if not values:
+            return
+        try:
+            r = self.connect()
+            if r:
+                pipe = r.pipeline(transaction=False)
+                for key, value in values.items():
+                    if isinstance(value, (dict, list)):
+                        value = encode(value)
+                    pipe.set(key, value, ex=ttl)
+                pipe.execute()
+        except Exception as e:
+            logger.error(f"Error escribiendo {len(values)} keys en pipeline: {e}")
+
     def get(self, key: str):
-        """Obtiene un valor (intenta deserializar JSON)"""
+        """Obtiene un valor (deserializa JSON/msgpack; strings planos tal cual)"""
         try:
             r = self.connect()
             if r:
                 val = r.get(key)
                 if val:
-                    try:
-                        return json.loads(val)
-                    except (json.JSONDecodeError, TypeError):
-                        return val
+                    return decode(val)
         except Exception as e:
             logger.error(f"Error leyendo key {key}: {e}")
         return None
 
+    @staticmethod
+    def decode(data):
+        """V22.2: Deserializa el 'data' de un mensaje de listen() (JSON o msgpack)"""
+        return decode(data)
+
 # Instancia global para importar
 memory = RedisClient()
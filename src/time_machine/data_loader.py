@@ -15,11 +15,12 @@ Usage:
     )
 """
 
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-import time
 from src.shared.utils import get_logger
+from src.shared.candle_store import CandleStore, Candles, ParallelKlineFetcher, interval_ms, MAX_CONCURRENT_PAGES
+from src.domain import TradingSymbol
 
 logger = get_logger("TimeMachine.DataLoader")
 
@@ -34,21 +35,50 @@ class BinanceHistoricalLoader:
         - Error handling y retries
     """
     
-    def __init__(self, base_url: str = "https://api.binance.com/api/v3"):
+    def __init__(self, base_url: str = "https://api.binance.com/api/v3", max_workers: int = MAX_CONCURRENT_PAGES):
         self.base_url = base_url
-        self.request_count = 0
-        self.last_request_time = 0
+        self.max_workers = max_workers
+        # V22.2: Páginas de 1000 velas en paralelo bajo el límite de peso
+        # compartido (X-MBX-USED-WEIGHT-1M); el store solo pide los huecos
+        self.fetcher = ParallelKlineFetcher(f"{base_url}/klines", max_workers=max_workers)
+        self.store = CandleStore(fetcher=self.fetcher)
     
-    def _rate_limit(self):
-        """Apply rate limiting (1200 requests/min = 20/sec)."""
-        now = time.time()
-        elapsed = now - self.last_request_time
+    @property
+    def request_count(self) -> int:
+        return self.fetcher.request_count
+    
+    def load_candles(
+        self,
+        symbols: List[str],
+        interval: str,
+        start_time: datetime,
+        end_time: Optional[datetime] = None
+    ) -> Dict[str, Candles]:
+        """
+        V22.2: Rango completo de varios símbolos en paralelo.
+        
+        Sin límite de 1000 velas: cada rango faltante se divide en páginas
+        que se descargan en paralelo; el store las une ordenadas y sin
+        duplicados.
+        
+        Returns:
+            {símbolo base: Candles (arrays contiguos)}
+        """
+        start_ms = int(start_time.timestamp() * 1000)
+        end_ms = int((end_time or datetime.utcnow()).timestamp() * 1000)
+        
+        def _load(symbol):
+            try:
+                return self.store.get(symbol, interval, start_ms, end_ms)
+            except Exception as e:
+                logger.error(f"❌ Error fetching {symbol}: {e}")
+                # Lo que ya esté en cache (sin red)
+                return self.store.read(symbol, interval, start_ms, end_ms)
         
-        if elapsed < 0.05:  # Min 50ms between requests
-            time.sleep(0.05 - elapsed)
+        with ThreadPoolExecutor(max_workers=max(1, min(len(symbols), self.max_workers))) as executor:
+            loaded = list(executor.map(_load, symbols))
         
-        self.last_request_time = time.time()
-        self.request_count += 1
+        return {TradingSymbol.from_str(symbol).to_short(): candles for symbol, candles in zip(symbols, loaded)}
     
     def fetch_klines(
         self,
@@ -61,12 +91,16 @@ class BinanceHistoricalLoader:
         """
         Fetch historical klines from Binance.
         
+        V22.2: Served from the shared candle store; only missing ranges are
+        downloaded (closed candles only).
+        
         Args:
             symbol: Trading pair (e.g., "BTCUSDT")
             interval: Candle interval (1m, 5m, 1h, 1d)
             start_time: Start datetime (UTC)
             end_time: End datetime (UTC)
-            limit: Max candles per request (500-1000 recommended)
+            limit: Max candles without start_time/end_time range (V22.2: a
+                full start_time..end_time range is returned complete)
         
         Returns:
             List of OHLCV dicts: [
@@ -82,44 +116,24 @@ class BinanceHistoricalLoader:
                 ...
             ]
         """
-        url = f"{self.base_url}/klines"
-        
-        params = {
-            "symbol": symbol,
-            "interval": interval,
-            "limit": limit
-        }
-        
-        if start_time:
-            params["startTime"] = int(start_time.timestamp() * 1000)
-        if end_time:
-            params["endTime"] = int(end_time.timestamp() * 1000)
-        
-        self._rate_limit()
-        
+        # V22.2: Lectura desde el candle store (solo se descargan los huecos)
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            klines = response.json()
+            step = interval_ms(interval)
+            if start_time:
+                start_ms = int(start_time.timestamp() * 1000)
+                end_ms = int(end_time.timestamp() * 1000) if end_time else start_ms + (limit - 1) * step
+                candles = self.store.get(symbol, interval, start_ms, end_ms)
+            else:
+                end_ms = int(end_time.timestamp() * 1000) if end_time else None
+                candles = self.store.get_last(symbol, interval, limit, end_ms)
             
-            # Convert to standardized format
-            result = []
-            for kline in klines:
-                result.append({
-                    "timestamp": kline[0],
-                    "open": float(kline[1]),
-                    "high": float(kline[2]),
-                    "low": float(kline[3]),
-                    "close": float(kline[4]),
-                    "volume": float(kline[5]),
-                    "symbol": symbol.replace("USDT", "").replace("BUSD", "").replace("BTC", "", 1) if symbol.endswith(("USDT", "BUSD")) else symbol
-                })
+            base_symbol = TradingSymbol.from_str(symbol).to_short()
+            result = [dict(record, symbol=base_symbol) for record in candles.to_records(timestamp_unit='ms')]
             
             logger.info(f"✅ Fetched {len(result)} klines for {symbol}")
             return result
         
-        except requests.exceptions.RequestException as e:
+        except Exception as e:
             logger.error(f"❌ Error fetching klines for {symbol}: {e}")
             return []
     
@@ -146,28 +160,21 @@ class BinanceHistoricalLoader:
                 ...
             }
         """
-        result = {}
-        
         logger.info(f"📥 Fetching data for {len(symbols)} symbols...")
         
-        for i, symbol in enumerate(symbols, 1):
-            # Ensure symbol has USDT suffix
-            symbol_pair = f"{symbol}USDT" if not symbol.endswith("USDT") else symbol
-            base_symbol = symbol.replace("USDT", "")
-            
-            logger.info(f"   [{i}/{len(symbols)}] Fetching {symbol_pair}...")
-            
-            try:
-                klines = self.fetch_klines(
-                    symbol=symbol_pair,
-                    interval=interval,
-                    start_time=start_time,
-                    end_time=end_time
-                )
-                result[base_symbol] = klines
-            except Exception as e:
-                logger.error(f"❌ Error fetching {symbol}: {e}")
-                result[base_symbol] = []
+        # Ensure symbol has USDT suffix
+        pairs = [f"{symbol}USDT" if not symbol.endswith("USDT") else symbol for symbol in symbols]
+        
+        if start_time is None:
+            # Sin rango: últimas velas por símbolo
+            result = {pair.replace("USDT", ""): self.fetch_klines(pair, interval, end_time=end_time) for pair in pairs}
+        else:
+            # V22.2: Símbolos y páginas en paralelo, rango completo
+            loaded = self.load_candles(pairs, interval, start_time, end_time)
+            result = {
+                base_symbol: [dict(record, symbol=base_symbol) for record in candles.to_records(timestamp_unit='ms')]
+                for base_symbol, candles in loaded.items()
+            }
         
         total_candles = sum(len(klines) for klines in result.values())
         logger.info(f"✅ Fetched {total_candles} total candles for {len(symbols)} symbols")
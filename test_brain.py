@@ -0,0 +1,673 @@
+#!/usr/bin/env python3
+"""
+V22.2 BRAIN - UNIT TESTS
+========================
+Verifica el estado en vivo del Brain: resampler de timeframes, ring
+buffer OHLCV, régimen incremental, sharding, hot-swap de estrategias y
+warm-up concurrente desde el candle store.
+
+Ejecutar:
+    python3 test_brain.py
+"""
+
+import sys
+import os
+import time
+import numpy as np
+
+# Añadir src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.shared.utils import get_logger
+
+logger = get_logger("TestBrain")
+
+
+def _random_ohlc(n: int = 400, seed: int = 7):
+    """Serie OHLC sintética (random walk)"""
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    highs = closes + rng.uniform(0, 1, n)
+    lows = closes - rng.uniform(0, 1, n)
+    return closes, highs, lows
+
+
+def test_timeframe_resampler():
+    """Test 1: Resampler 1m -> 5m/15m/1h/4h incremental igual a pandas.resample"""
+    logger.info("=" * 80)
+    logger.info("TEST 1: Timeframe resampler")
+    logger.info("=" * 80)
+    
+    import pandas as pd
+    from src.services.brain.resampler import TimeframeResampler
+    
+    rng = np.random.default_rng(7)
+    minutes = 8 * 60
+    start_ts = 1704067200  # 2024-01-01 00:00 UTC (alineado a 4h)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, minutes)))
+    candles = [
+        {'timestamp': start_ts + 60 * i, 'open': closes[i - 1] if i else 100.0, 'high': closes[i] * 1.001,
+         'low': closes[i] * 0.999, 'close': closes[i], 'volume': float(i % 7 + 1)}
+        for i in range(minutes)
+    ]
+    
+    resampler = TimeframeResampler(['5m', '15m', '1h', '4h'], max_bars=50)
+    closed_count = {tf: 0 for tf in resampler.timeframes}
+    for candle in candles:
+        for tf in resampler.update(candle):
+            closed_count[tf] += 1
+    
+    failed = 0
+    frame = pd.DataFrame(candles)
+    frame.index = pd.to_datetime(frame['timestamp'], unit='s')
+    for tf, rule in (('5m', '5min'), ('15m', '15min'), ('1h', '1h'), ('4h', '4h')):
+        expected = frame.resample(rule).agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}).tail(50)
+        bars = resampler.bars[tf]
+        if closed_count[tf] != minutes // (int(pd.Timedelta(rule).total_seconds()) // 60):
+            logger.error(f"❌ FAIL: {tf} cerró {closed_count[tf]} barras")
+            failed += 1
+        for name in ('open', 'high', 'low', 'close', 'volume'):
+            if not np.allclose(bars.column(name), expected[name].to_numpy()):
+                logger.error(f"❌ FAIL: {tf} columna {name} distinta de pandas")
+                failed += 1
+    if resampler.partial('1h') is not None or len(resampler.bars['5m']) != 50:
+        logger.error("❌ FAIL: Barra parcial tras cierre o ring no acotado")
+        failed += 1
+    
+    # Falta el último minuto del bucket: la barra se cierra con la vela siguiente
+    gapped = TimeframeResampler(['5m'])
+    closed = [gapped.update(c) for c in candles[:4] + candles[5:7]]
+    if closed[4] != ['5m'] or gapped.bars['5m'].last()['close'] != candles[3]['close']:
+        logger.error(f"❌ FAIL: Cierre con minuto faltante {closed}")
+        failed += 1
+    
+    # Barras sembradas (candle store): las velas de 1m de esos buckets se ignoran
+    seeded = TimeframeResampler(['1h'])
+    seeded.seed('1h', [{'timestamp': start_ts, 'open': 1, 'high': 2, 'low': 0.5, 'close': 1.5, 'volume': 10}])
+    closed = [seeded.update(c) for c in candles[:120]]
+    if len(seeded.bars['1h']) != 2 or seeded.bars['1h'].column('close')[0] != 1.5 or closed[119] != ['1h']:
+        logger.error("❌ FAIL: Siembra de barras cerradas")
+        failed += 1
+    
+    if failed == 0:
+        logger.info(f"✅ PASS: {closed_count} barras cerradas, iguales a pandas.resample")
+    return failed == 0
+
+
+def test_ohlcv_ring():
+    """Test 2: OhlcvRing - vistas contiguas sin copia, iguales a un deque acotado"""
+    logger.info("=" * 80)
+    logger.info("TEST 2: OHLCV ring buffer")
+    logger.info("=" * 80)
+    
+    from collections import deque
+    from src.services.brain.history import OhlcvRing
+    from src.services.brain.strategies.regime_detector import RegimeDetector
+    
+    ring = OhlcvRing(200)
+    closes, highs, lows = deque(maxlen=200), deque(maxlen=200), deque(maxlen=200)
+    rng = np.random.default_rng(11)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, 537)))
+    failed = 0
+    
+    for i, price in enumerate(prices):
+        candle = {'timestamp': 60.0 * i, 'open': price, 'high': price * 1.002, 'low': price * 0.998,
+                  'close': price, 'volume': 1.0}
+        ring.append(candle)
+        closes.append(candle['close'])
+        highs.append(candle['high'])
+        lows.append(candle['low'])
+        if i in (5, 199, 200, 399, 536) and not (
+                np.array_equal(ring.close, np.array(closes)) and np.array_equal(ring.high, np.array(highs))):
+            logger.error(f"❌ FAIL: Contenido del ring distinto al deque tras {i + 1} velas")
+            failed += 1
+    
+    view = ring.close
+    if not (np.shares_memory(view, ring._data) and view.flags.c_contiguous and not view.flags.writeable):
+        logger.error("❌ FAIL: La columna no es una vista contigua de solo lectura")
+        failed += 1
+    if ring.total != 537 or len(ring) != 200 or ring.last()['close'] != prices[-1] or ring.timestamp[0] != 60.0 * 337:
+        logger.error(f"❌ FAIL: Contadores/última vela ({ring.total}, {len(ring)})")
+        failed += 1
+    
+    detector = RegimeDetector()
+    from_views = detector.detect(ring.close, ring.high, ring.low)
+    from_lists = detector.detect(list(closes), list(highs), list(lows))
+    if from_views[0] != from_lists[0] or from_views[1]['adx'] != from_lists[1]['adx']:
+        logger.error("❌ FAIL: RegimeDetector con vistas distinto a listas")
+        failed += 1
+    
+    if failed == 0:
+        logger.info("✅ PASS: 537 velas en ring de 200, vistas sin copia iguales al deque")
+    return failed == 0
+
+
+def test_regime_tracker():
+    """Test 3: RegimeTracker - EMA(200)/ATR/ADX incrementales iguales a la serie vectorizada"""
+    logger.info("=" * 80)
+    logger.info("TEST 3: Incremental regime tracker")
+    logger.info("=" * 80)
+    
+    from src.services.brain.indicators import series
+    from src.services.brain.strategies.regime_detector import RegimeDetector, RegimeTracker, MarketRegime
+    
+    rng = np.random.default_rng(3)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.004, 600)))
+    highs = closes * (1 + np.abs(rng.normal(0, 0.002, 600)))
+    lows = closes * (1 - np.abs(rng.normal(0, 0.002, 600)))
+    detector = RegimeDetector()
+    failed = 0
+    
+    tracker = RegimeTracker(detector)
+    for i in range(600):
+        tracker.update(closes[i], highs[i], lows[i])
+        if i == 198 and (tracker.ready or tracker.regime()[0] != MarketRegime.UNKNOWN):
+            logger.error("❌ FAIL: Tracker listo antes de EMA(200)")
+            failed += 1
+    
+    adx, di_plus, di_minus = series.adx(highs, lows, closes, 14)
+    expected = {
+        'ema_200': series.ema(closes, 200)[-1],
+        'adx': adx[-1],
+        'di_plus': di_plus[-1],
+        'atr_percent': series.atr(highs, lows, closes, 14)[-1] / closes[-15:].mean() * 100
+    }
+    regime, indicators = tracker.regime()
+    for name, value in expected.items():
+        if not np.isclose(indicators[name], value, rtol=1e-9):
+            logger.error(f"❌ FAIL: {name} incremental {indicators[name]:.6f} != serie {value:.6f}")
+            failed += 1
+    
+    # Siembra en bloque (arrays) == vela a vela
+    seeded = RegimeTracker(detector)
+    seeded.seed(closes[:400], highs[:400], lows[:400])
+    seeded.seed(closes[400:], highs[400:], lows[400:])
+    if seeded.regime()[1]['adx'] != indicators['adx'] or seeded.regime()[0] != regime:
+        logger.error("❌ FAIL: Siembra en bloque distinta a vela a vela")
+        failed += 1
+    
+    # El Brain solo escribe market_regime al cambiar o para refrescar el TTL
+    from src.services.brain.main import RegimeSwitchingBrain, REGIME_TTL
+    
+    class FakeRedis:
+        def __init__(self):
+            self.writes = []
+        
+        def setex(self, key, ttl, value):
+            self.writes.append((key, ttl))
+    
+    brain = RegimeSwitchingBrain()
+    brain.redis_client = FakeRedis()
+    brain.regime_trackers['BTC'] = tracker
+    for _ in range(50):
+        brain.detect_market_regime('BTC')
+    first_writes = len(brain.redis_client.writes)
+    brain.regime_written['BTC'] -= REGIME_TTL
+    brain.detect_market_regime('BTC')
+    if first_writes != 1 or len(brain.redis_client.writes) != 2:
+        logger.error(f"❌ FAIL: {first_writes} escrituras de régimen en 50 velas sin cambio")
+        failed += 1
+    
+    # Costo por vela constante vs detect() sobre el historial
+    start = time.perf_counter()
+    for i in range(50):
+        tracker.update(closes[i], highs[i], lows[i])
+        tracker.regime()
+    incremental = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(50):
+        detector.detect(closes[-200:], highs[-200:], lows[-200:])
+    full = time.perf_counter() - start
+    if incremental >= full:
+        logger.error(f"❌ FAIL: Tracker ({incremental * 1000:.1f}ms) no más rápido que detect ({full * 1000:.1f}ms)")
+        failed += 1
+    
+    if failed == 0:
+        logger.info(f"✅ PASS: {regime.value}, ADX={indicators['adx']:.1f}, "
+                    f"50 velas en {incremental * 1000:.1f}ms vs {full * 1000:.1f}ms con detect()")
+    return failed == 0
+
+
+def test_brain_sharding():
+    """Test 4: Sharding del Brain - particiones balanceadas, movimiento mínimo y lectura solo de lo propio"""
+    logger.info("=" * 80)
+    logger.info("TEST 4: Brain sharding")
+    logger.info("=" * 80)
+    
+    from src.config.settings import config
+    from src.shared.memory import memory
+    from src.services.brain import sharding
+    from src.services.brain.sharding import assign_partitions, BrainCoordinator, ASSIGNMENT_KEY
+    from src.services.brain.main import RegimeSwitchingBrain
+    
+    failed = 0
+    
+    # Reparto: 16 particiones en 4 shards -> 4 cada uno, determinista
+    before = assign_partitions(16, range(4))
+    counts = [sum(1 for shard in before.values() if shard == s) for s in range(4)]
+    if counts != [4, 4, 4, 4] or assign_partitions(16, range(4)) != before:
+        logger.error(f"❌ FAIL: Reparto desbalanceado o no determinista {counts}")
+        failed += 1
+    
+    # Quitar el shard 2: solo se mueven sus particiones, repartidas entre los demás
+    after = assign_partitions(16, [0, 1, 3], before)
+    moved = [p for p in before if after[p] != before[p]]
+    sizes = sorted(sum(1 for shard in after.values() if shard == s) for s in (0, 1, 3))
+    if any(before[p] != 2 for p in moved) or len(moved) != 4 or sizes != [5, 5, 6]:
+        logger.error(f"❌ FAIL: Se movieron {len(moved)} particiones (esperadas 4, solo del shard 2), tamaños {sizes}")
+        failed += 1
+    
+    # Vuelve el shard 2: recupera 4 particiones, el resto no se mueve
+    back = assign_partitions(16, range(4), after)
+    if sum(1 for p in back if back[p] != after[p]) != 4 or sorted(list(back.values()).count(s) for s in range(4)) != [4, 4, 4, 4]:
+        logger.error("❌ FAIL: Reincorporar un shard movió particiones de más")
+        failed += 1
+    
+    class FakeMemory:
+        def __init__(self):
+            self.data = {}
+        
+        def get(self, key):
+            return self.data.get(key)
+        
+        def set(self, key, value):
+            self.data[key] = value
+        
+        partition_of = staticmethod(memory.partition_of)
+    
+    original = (sharding.memory, config.MESSAGE_TRANSPORT, config.STREAM_PARTITIONS)
+    sharding.memory = FakeMemory()
+    config.MESSAGE_TRANSPORT, config.STREAM_PARTITIONS = 'streams', 16
+    symbols = [f"SYM{i}" for i in range(40)]
+    try:
+        # Sin streams no se puede particionar
+        config.MESSAGE_TRANSPORT = 'pubsub'
+        if sharding.sharding_error(4) is None:
+            logger.error("❌ FAIL: Sharding aceptado sin Redis Streams")
+            failed += 1
+        config.MESSAGE_TRANSPORT = 'streams'
+        
+        # Coordinador: publica solo cuando cambia la asignación
+        coordinator = BrainCoordinator(4, refresh_seconds=1)
+        published = [
+            coordinator.rebalance(symbols, [0, 1, 2, 3]),
+            coordinator.rebalance(symbols, [0, 1, 2, 3]),
+            coordinator.rebalance(symbols, [0, 1, 3])
+        ]
+        version, partitions, assigned = sharding.load_assignment()
+        if published != [True, False, True] or version != 2 or partitions != after:
+            logger.error(f"❌ FAIL: Publicaciones {published}, versión {version}")
+            failed += 1
+        if any(assigned[s] != after[memory.partition_of(s)] for s in symbols) or sharding.memory.data[ASSIGNMENT_KEY]['shards'] != 4:
+            logger.error("❌ FAIL: Símbolos asignados fuera de la partición de su shard")
+            failed += 1
+        
+        # Supervisión: crash loop espera para reiniciar, shard sin particiones queda detenido
+        class FakeProcess:
+            exitcode = 1
+            
+            def __init__(self, alive=False):
+                self.alive = alive
+            
+            def is_alive(self):
+                return self.alive
+        
+        started = []
+        
+        def fake_start_worker(shard_id):
+            started.append(shard_id)
+            coordinator.workers[shard_id] = FakeProcess(alive=True)
+        
+        coordinator._start_worker = fake_start_worker
+        now = time.time()
+        for shard_id, uptime in ((0, 5), (1, 3600), (2, 3600)):  # 2 no tiene particiones en `after`
+            coordinator.workers[shard_id] = FakeProcess()
+            coordinator.started_at[shard_id] = now - uptime
+        coordinator.supervise()
+        coordinator.restart_workers()
+        coordinator.supervise()  # Ya detectados: no se cuentan de nuevo
+        first = list(started)
+        coordinator.restart_at[0] = now
+        coordinator.restart_workers()
+        if first != [1] or started != [1, 0] or 2 not in coordinator.restart_at or coordinator.crashes != {0: 1}:
+            logger.error(f"❌ FAIL: Reinicios {started}, pendientes {coordinator.restart_at}")
+            failed += 1
+        
+        # Worker: lee solo sus particiones y solo es dueño de sus símbolos
+        worker = RegimeSwitchingBrain(shard_id=1, num_shards=4)
+        worker.partition_owners = partitions
+        owned = worker.owned_partitions()
+        if owned != sorted(p for p, shard in after.items() if shard == 1) or \
+                any(worker.owns(s) != (memory.partition_of(s) in owned) for s in symbols):
+            logger.error(f"❌ FAIL: Particiones del worker {owned}")
+            failed += 1
+    finally:
+        sharding.memory, config.MESSAGE_TRANSPORT, config.STREAM_PARTITIONS = original
+    
+    if failed == 0:
+        logger.info(f"✅ PASS: {counts} particiones por shard, {len(moved)} movidas al quitar un shard, "
+                    f"shard 1 lee {owned}")
+    return failed == 0
+
+
+def test_strategy_hot_swap():
+    """Test 5: Hot-swap por símbolo - conserva los indicadores compartidos y no toca los demás"""
+    logger.info("=" * 80)
+    logger.info("TEST 5: Strategy hot-swap")
+    logger.info("=" * 80)
+    
+    from src.shared.codec import encode
+    from src.services.brain.main import RegimeSwitchingBrain
+    
+    class FakeRedis:
+        def __init__(self):
+            self.data = {}
+        
+        def get(self, key):
+            return self.data.get(key)
+        
+        def set(self, key, value, **kwargs):
+            self.data[key] = value
+            return True
+    
+    brain = RegimeSwitchingBrain()
+    brain.redis_client = FakeRedis()
+    brain.redis_client.set('strategy_config:BTC', encode({'strategy_name': 'SmaCrossover', 'params': {'fast': 10, 'slow': 30}}))
+    brain.redis_client.set('strategy_config:ETH', encode({'strategy_name': 'SmaCrossover', 'params': {'fast': 5, 'slow': 20}}))
+    
+    closes, highs, lows = _random_ohlc(n=120, seed=5)
+    for i in range(len(closes)):
+        for symbol in ('BTC', 'ETH'):
+            brain.update_ohlcv_history(symbol, {'timestamp': 60 * i, 'open': closes[i], 'high': highs[i],
+                                                'low': lows[i], 'close': closes[i], 'volume': 1.0})
+    for symbol in ('BTC', 'ETH'):
+        brain.active_strategies[symbol] = brain.load_strategy_for_symbol(symbol)
+        brain.bind_strategy_indicators(symbol, brain.active_strategies[symbol])
+    
+    fast_before = brain.indicators['BTC'][('stats', 10)]
+    eth_before = brain.active_strategies['ETH']
+    brain.redis_client.set('strategy_config:BTC', encode({'strategy_name': 'SmaCrossover', 'params': {'fast': 10, 'slow': 50}}))
+    brain.request_strategy_swap('BTC')
+    brain.apply_strategy_swaps()
+    failed = 0
+    
+    if brain.active_strategies['BTC'].slow_period != 50 or brain.active_strategies['ETH'] is not eth_before:
+        logger.error("❌ FAIL: El swap no se aplicó solo al símbolo notificado")
+        failed += 1
+    if brain.indicators['BTC'][('stats', 10)] is not fast_before or ('stats', 30) in brain.indicators['BTC']:
+        logger.error("❌ FAIL: No se conservó el indicador compartido o quedó el obsoleto")
+        failed += 1
+    if not np.isclose(brain.indicators['BTC'][('stats', 50)].value.mean, closes[-50:].mean()):
+        logger.error("❌ FAIL: Indicador nuevo no sembrado con el historial")
+        failed += 1
+    
+    # Configuración inválida: se mantiene la estrategia actual
+    current = brain.active_strategies['BTC']
+    brain.redis_client.set('strategy_config:BTC', encode({'strategy_name': 'Unknown', 'params': {}}))
+    brain.request_strategy_swap('BTC')
+    brain.apply_strategy_swaps()
+    if brain.active_strategies['BTC'] is not current or brain.pending_swaps:
+        logger.error("❌ FAIL: Configuración inválida reemplazó la estrategia")
+        failed += 1
+    
+    # Cada run() detiene y espera su listener: los reinicios no acumulan threads ni conexiones
+    import threading
+    from src.services.brain import main as brain_main
+    
+    class FakePubSub:
+        def __init__(self):
+            self.closed = False
+        
+        def subscribe(self, channel):
+            pass
+        
+        def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+            time.sleep(timeout)
+            return None
+        
+        def close(self):
+            self.closed = True
+    
+    connections = []
+    
+    def fake_pubsub():
+        connections.append(FakePubSub())
+        return connections[-1]
+    
+    original_poll = brain_main.STRATEGY_UPDATES_POLL
+    brain_main.STRATEGY_UPDATES_POLL = 0.05
+    brain_main.memory.pubsub = fake_pubsub
+    brain_main.memory.listen = lambda *args, **kwargs: iter(())  # Sin conexión: run() retorna
+    brain_main.memory.get = lambda key: None
+    try:
+        for _ in range(3):
+            restarted = RegimeSwitchingBrain()
+            restarted.redis_client = FakeRedis()
+            restarted.warm_up_history = lambda symbols: None
+            restarted.run()
+    finally:
+        brain_main.STRATEGY_UPDATES_POLL = original_poll
+        del brain_main.memory.pubsub, brain_main.memory.listen, brain_main.memory.get
+    listeners = [t for t in threading.enumerate() if t.name == 'strategy-updates']
+    if listeners or not connections or not all(c.closed for c in connections):
+        logger.error(f"❌ FAIL: {len(listeners)} listeners vivos tras 3 reinicios de run()")
+        failed += 1
+    
+    if failed == 0:
+        logger.info(f"✅ PASS: BTC -> {brain.active_strategies['BTC']}, SMA(10) conservada, ETH sin cambios")
+    return failed == 0
+
+
+def test_concurrent_warm_up():
+    """Test 6: Warm-up concurrente desde el candle store + siembra en bloque == vela a vela"""
+    logger.info("=" * 80)
+    logger.info("TEST 6: Concurrent warm-up")
+    logger.info("=" * 80)
+    
+    import tempfile
+    import threading
+    from src.domain import parse_symbol_list
+    from src.shared.candle_store import CandleStore, interval_ms
+    from src.services.brain import main as brain_main
+    from src.services.brain.main import RegimeSwitchingBrain
+    
+    lock = threading.Lock()
+    active = [0, 0]  # [en curso, máximo simultáneo]
+    
+    def fake_fetcher(pair, interval, start_ms, end_ms):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        step = interval_ms(interval)
+        offset = sum(map(ord, pair))
+        rows = []
+        for t in range(start_ms - start_ms % step, end_ms + 1, step):
+            price = 100 + offset % 50 + 5 * np.sin(t / 3.6e6 + offset)
+            rows.append([t, price, price * 1.002, price * 0.998, price * 1.0005, 10.0, t + step - 1])
+        return rows
+    
+    symbols = parse_symbol_list(['BTC', 'ETH', 'SOL', 'BNB', 'XRP', 'ADA'])
+    original_store = brain_main.candle_store
+    brain_main.candle_store = CandleStore(tempfile.mkdtemp(), fake_fetcher)
+    failed = 0
+    
+    try:
+        brain = RegimeSwitchingBrain()
+        start = time.perf_counter()
+        brain.warm_up_history(symbols)
+        elapsed = time.perf_counter() - start
+        
+        jobs = len(symbols) * (1 + len(brain.resamplers['BTC'].timeframes))
+        if active[1] < 2 or elapsed >= jobs * 0.05:
+            logger.error(f"❌ FAIL: Warm-up no concurrente ({active[1]} simultáneos, {elapsed:.2f}s)")
+            failed += 1
+        
+        # Referencia: mismas velas (ya en cache) vela a vela con update_ohlcv_history
+        reference = RegimeSwitchingBrain()
+        for symbol in symbols:
+            key = symbol.to_short()
+            reference._init_symbol(key)
+            resampler = reference.resamplers[key]
+            for tf in resampler.timeframes:
+                bars = brain_main.candle_store.get_last(key, tf, brain_main.config.BRAIN_TIMEFRAME_BARS).to_records()
+                resampler.seed(tf, bars)
+                for bar in bars:
+                    reference.tf_indicators[key][tf].update(bar['close'], bar['high'], bar['low'])
+            for kline in brain_main.candle_store.get_last(key, '1m', reference.max_history_size).to_records():
+                reference.update_ohlcv_history(key, kline)
+            
+            regimes = [dict(tracker.regime()[1], timestamp=None) for tracker in
+                       (brain.regime_trackers[key], reference.regime_trackers[key])]
+            if (brain.history[key].total != reference.history[key].total
+                    or brain.history[key].to_records() != reference.history[key].to_records()
+                    or regimes[0] != regimes[1]
+                    or any(brain.resamplers[key].bars[tf].to_records() != resampler.bars[tf].to_records()
+                           or brain.resamplers[key].partial(tf) != resampler.partial(tf) for tf in resampler.timeframes)):
+                logger.error(f"❌ FAIL: {key} sembrado en bloque distinto a vela a vela")
+                failed += 1
+    finally:
+        brain_main.candle_store = original_store
+    
+    if failed == 0:
+        logger.info(f"✅ PASS: {len(symbols)} símbolos ({jobs} series) en {elapsed:.2f}s, "
+                    f"{active[1]} descargas simultáneas")
+    return failed == 0
+
+def test_live_indicators_match_tournament():
+    """Test 7: Indicadores en vivo del Brain == IndicatorSet.from_prices (definición del torneo)"""
+    logger.info("=" * 80)
+    logger.info("TEST 7: Live indicators vs tournament")
+    logger.info("=" * 80)
+    
+    from src.services.brain.indicators import IndicatorSet
+    from src.services.brain.strategies import AVAILABLE_STRATEGIES
+    from src.services.brain.main import RegimeSwitchingBrain
+    
+    closes, highs, lows = _random_ohlc(n=150, seed=9)
+    brain = RegimeSwitchingBrain()
+    failed = 0
+    
+    for name, strategy_class in AVAILABLE_STRATEGIES.items():
+        strategy = strategy_class({})
+        if not strategy.supports_incremental:
+            continue
+        key = name.upper()[:10]
+        # Mitad antes del bind (siembra desde el ring) y mitad vela a vela, con high/low reales
+        for i in range(len(closes)):
+            if i == 75:
+                brain.bind_strategy_indicators(key, strategy)
+            brain.update_ohlcv_history(key, {'timestamp': 60 * i, 'open': closes[i], 'high': highs[i],
+                                             'low': lows[i], 'close': closes[i], 'volume': 1.0})
+        
+        specs = list(strategy.get_indicator_specs().values())
+        reference = IndicatorSet.from_prices(closes.tolist(), specs)
+        for spec in specs:
+            if brain.indicators[key][spec].value != reference[spec].value:
+                logger.error(f"❌ FAIL: {name} {spec}: {brain.indicators[key][spec].value} != {reference[spec].value}")
+                failed += 1
+    
+    if failed == 0:
+        logger.info("✅ PASS: Indicadores en vivo iguales a los del torneo (solo cierres)")
+    return failed == 0
+
+
+def test_higher_timeframe_evaluation_price():
+    """Test 8: Estrategias de timeframe superior se evalúan con el close de la barra cerrada"""
+    logger.info("=" * 80)
+    logger.info("TEST 8: Higher timeframe evaluation price")
+    logger.info("=" * 80)
+    
+    from src.shared.codec import encode
+    from src.services.brain.strategies import AVAILABLE_STRATEGIES
+    from src.services.brain.main import RegimeSwitchingBrain
+    
+    evaluated = []
+    
+    class RecordingStrategy(AVAILABLE_STRATEGIES['SmaCrossover']):
+        def evaluate_indicators(self, price, indicators):
+            evaluated.append(price)
+            result = super().evaluate_indicators(price, indicators)
+            result.signal = None  # Sin publicar señales (no hay Redis)
+            return result
+    
+    strategy = RecordingStrategy({'fast': 3, 'slow': 5})
+    strategy.timeframe = '5m'
+    brain = RegimeSwitchingBrain()
+    brain._init_symbol('BTC')
+    brain.active_strategies['BTC'] = strategy
+    brain.bind_strategy_indicators('BTC', strategy)
+    
+    closes, highs, lows = _random_ohlc(n=60, seed=11)
+    minutes = [i for i in range(60) if i % 5 != 4]  # Falta el último minuto de cada barra
+    for i in minutes:
+        brain.process_market_update({'data': encode({'symbol': 'BTC', 'timestamp': 60 * i, 'open': closes[i],
+                                                     'high': highs[i], 'low': lows[i], 'close': closes[i],
+                                                     'volume': 1.0})})
+    
+    bars = brain.resamplers['BTC'].bars['5m']
+    expected = bars.close[-len(evaluated):].tolist() if evaluated else []
+    failed = 0
+    if not evaluated or evaluated != expected or evaluated[-1] == closes[minutes[-1]]:
+        logger.error(f"❌ FAIL: Precio de evaluación {evaluated[-3:]} != close de la barra {expected[-3:]}")
+        failed += 1
+    
+    if failed == 0:
+        logger.info(f"✅ PASS: {len(evaluated)} evaluaciones 5m con el close de la barra cerrada")
+    return failed == 0
+
+
+def main():
+    logger.info("=" * 80)
+    logger.info("🧪 V22.2 BRAIN - UNIT TESTS")
+    logger.info("=" * 80)
+    
+    tests = [
+        ("Timeframe Resampler", test_timeframe_resampler),
+        ("OHLCV Ring", test_ohlcv_ring),
+        ("Regime Tracker", test_regime_tracker),
+        ("Brain Sharding", test_brain_sharding),
+        ("Strategy Hot-Swap", test_strategy_hot_swap),
+        ("Concurrent Warm-Up", test_concurrent_warm_up),
+        ("Live Indicators Match Tournament", test_live_indicators_match_tournament),
+        ("Higher Timeframe Evaluation Price", test_higher_timeframe_evaluation_price),
+    ]
+    
+    results = []
+    
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            logger.error(f"❌ Test '{test_name}' crashed: {e}")
+            results.append((test_name, False))
+    
+    # Resumen final
+    logger.info("\n" + "=" * 80)
+    logger.info("📊 RESUMEN FINAL DE TESTS")
+    logger.info("=" * 80)
+    
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+    
+    for test_name, passed in results:
+        status = "✅ PASS" if passed else "❌ FAIL"
+        logger.info(f"   {status}: {test_name}")
+    
+    logger.info(f"\n🎯 RESULTADO: {total_passed}/{total_tests} tests PASSED")
+    
+    if total_passed == total_tests:
+        logger.info("=" * 80)
+        return 0
+    else:
+        logger.error(f"\n⚠️ {total_tests - total_passed} tests FALLARON - Revisar arriba")
+        logger.info("=" * 80)
+        return 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
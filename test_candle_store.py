@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+V22.2 CANDLE STORE - UNIT TESTS
+===============================
+Verifica el cache local de velas (CandleStore), la descarga paralela
+de históricos bajo el límite de peso de Binance y el endpoint /range del
+servicio historical.
+
+Ejecutar:
+    python3 test_candle_store.py
+"""
+
+import sys
+import os
+import time
+import numpy as np
+
+# Añadir src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.shared.utils import get_logger
+
+logger = get_logger("TestCandleStore")
+
+
+def test_candle_store():
+    """Test 1: Candle store - top-up incremental, huecos y backfill"""
+    logger.info("=" * 80)
+    logger.info("TEST 1: Candle store")
+    logger.info("=" * 80)
+    
+    import tempfile
+    from src.shared.candle_store import CandleStore
+    
+    step = 3_600_000
+    last_closed = (int(time.time() * 1000) // step - 1) * step
+    hole = (last_closed - 300 * step, last_closed - 298 * step)  # Sin datos en Binance
+    requests_made = []
+    
+    def fake_fetcher(pair, interval, start_ms, end_ms):
+        requests_made.append((start_ms, end_ms))
+        return [[t, t % 97 + 1, t % 97 + 2, t % 97, t % 97 + 1.5, 10, t + step - 1]
+                for t in range(start_ms, end_ms + 1, step) if not hole[0] <= t <= hole[1]]
+    
+    store = CandleStore(tempfile.mkdtemp(), fake_fetcher)
+    failed = 0
+    
+    first = store.get_last('BTC', '1h', 100)
+    cached = store.get_last('BTC', '1h', 100)
+    if len(first) != 100 or len(requests_made) != 1 or not np.array_equal(first.close, cached.close):
+        logger.error(f"❌ FAIL: Top-up inicial ({len(first)} velas, {len(requests_made)} requests)")
+        failed += 1
+    
+    # Backfill: solo se piden las 400 velas anteriores
+    requests_made.clear()
+    backfilled = store.get_last('BTC', '1h', 500)
+    if [(e - s) // step + 1 for s, e in requests_made] != [400] or len(backfilled) != 497:
+        logger.error(f"❌ FAIL: Backfill incremental ({requests_made})")
+        failed += 1
+    if not np.all(np.diff(backfilled.open_time) > 0) or not np.array_equal(backfilled.close[-100:], first.close):
+        logger.error("❌ FAIL: Serie no ordenada o datos previos alterados tras backfill")
+        failed += 1
+    if store.find_gaps('BTC', '1h', last_closed - 499 * step, last_closed) != [hole]:
+        logger.error("❌ FAIL: Detección de huecos")
+        failed += 1
+    
+    # Los huecos reales de Binance no se vuelven a pedir
+    requests_made.clear()
+    store.get_last('BTC', '1h', 500)
+    if requests_made:
+        logger.error(f"❌ FAIL: Hueco conocido re-descargado: {requests_made}")
+        failed += 1
+    
+    # Vela recién cerrada que Binance aún no publicó: no queda como hueco definitivo
+    published = {'live': False}
+    
+    def late_fetcher(pair, interval, start_ms, end_ms):
+        return [[t, 1, 2, 0.5, 1.5, 10, t + step - 1] for t in range(start_ms, end_ms + 1, step)
+                if t != last_closed or published['live']]
+    
+    live_store = CandleStore(tempfile.mkdtemp(), late_fetcher)
+    before = live_store.get_last('BTC', '1h', 10, end_ms=last_closed)
+    published['live'] = True
+    after = live_store.get_last('BTC', '1h', 10, end_ms=last_closed)
+    if len(before) != 9 or len(after) != 10 or after.open_time[-1] != last_closed:
+        logger.error(f"❌ FAIL: Vela del borde en vivo recordada como hueco ({len(before)} -> {len(after)})")
+        failed += 1
+    
+    # Append interrumpido (columnas de distinto largo) se recorta antes del siguiente append
+    gen_dir = store._current_dir(store._series_dir('BTCUSDT', '1h'))
+    with open(os.path.join(gen_dir, 'close.f8'), 'ab') as f:
+        f.write(np.zeros(3).tobytes())
+    store.append('BTC', '1h', np.array([[last_closed + step, 1, 2, 0.5, 1.5, 10]]))
+    tail = store.read('BTC', '1h', last_closed, last_closed + step)
+    if len(tail) != 2 or tail.close[-1] != 1.5:
+        logger.error("❌ FAIL: Append tras escritura interrumpida desalineado")
+        failed += 1
+
+    # Lector sin lock: un backfill borra la generación entre CURRENT y la apertura
+    old_gen = store._current_dir(store._series_dir('BTCUSDT', '1h'))
+    load_columns = store._load_columns
+    raced = []
+
+    def racing_load(gen_dir):
+        if not raced:
+            raced.append(gen_dir)
+            store.append('BTC', '1h', np.array([[last_closed - 600 * step, 1, 2, 0.5, 1.5, 10]]))
+        return load_columns(gen_dir)
+
+    store._load_columns = racing_load
+    try:
+        raced_read = store.read('BTC', '1h')
+    except FileNotFoundError:
+        raced_read = None
+    finally:
+        del store._load_columns
+    if raced != [old_gen] or os.path.exists(old_gen) or raced_read is None or raced_read.open_time[0] != last_closed - 600 * step:
+        logger.error("❌ FAIL: Lectura concurrente con backfill (generación borrada)")
+        failed += 1
+
+    if failed == 0:
+        logger.info(f"✅ PASS: {len(backfilled)} velas, top-up solo de huecos, hueco real {hole} recordado")
+    return failed == 0
+
+
+def test_parallel_historical_loader():
+    """Test 2: BinanceHistoricalLoader - páginas y símbolos en paralelo, rango completo"""
+    logger.info("=" * 80)
+    logger.info("TEST 2: Parallel historical loader")
+    logger.info("=" * 80)
+    
+    import json
+    import tempfile
+    import threading
+    from datetime import datetime, timezone
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse, parse_qs
+    from src.shared.candle_store import CandleStore
+    from src.time_machine.data_loader import BinanceHistoricalLoader
+    
+    step = 60_000
+    state = {'active': 0, 'max_active': 0, 'requests': 0}
+    lock = threading.Lock()
+    
+    class KlinesHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+        
+        def do_GET(self):
+            query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            start, end, limit = int(query['startTime']), int(query['endTime']), int(query['limit'])
+            with lock:
+                state['active'] += 1
+                state['requests'] += 1
+                state['max_active'] = max(state['max_active'], state['active'])
+                used = state['requests'] * 2
+            time.sleep(0.05)
+            klines = [[t, "1", "2", "0.5", "1.5", "10", t + step - 1]
+                      for t in range(start, end + 1, step)][:limit]
+            body = json.dumps(klines).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('X-MBX-USED-WEIGHT-1M', str(used))
+            self.end_headers()
+            self.wfile.write(body)
+            with lock:
+                state['active'] -= 1
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KlinesHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    failed = 0
+    
+    try:
+        loader = BinanceHistoricalLoader(f"http://127.0.0.1:{server.server_address[1]}", max_workers=4)
+        loader.store = CandleStore(tempfile.mkdtemp(), loader.fetcher)
+        
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        end = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        data = loader.fetch_multiple_symbols(['BTC', 'ETH', 'SOL'], '1m', start, end)
+        
+        for symbol, klines in data.items():
+            timestamps = [k['timestamp'] for k in klines]
+            if len(klines) != 1441 or timestamps != sorted(set(timestamps)):
+                logger.error(f"❌ FAIL: {symbol} {len(klines)} velas (esperadas 1441, sin duplicados)")
+                failed += 1
+        if set(data) != {'BTC', 'ETH', 'SOL'} or state['requests'] != 6:
+            logger.error(f"❌ FAIL: {state['requests']} requests para 3 símbolos x 2 páginas")
+            failed += 1
+        if state['max_active'] < 2:
+            logger.error("❌ FAIL: Las páginas se descargaron en serie")
+            failed += 1
+        if loader.fetcher.limiter.used_weight < 12:
+            logger.error(f"❌ FAIL: Peso usado no registrado ({loader.fetcher.limiter.used_weight})")
+            failed += 1
+        
+        # Repetición: todo sale del cache
+        state['requests'] = 0
+        single = loader.fetch_klines('BTCUSDT', '1m', start, end)
+        if len(single) != 1441 or state['requests'] != 0:
+            logger.error(f"❌ FAIL: Rango cacheado ({len(single)} velas, {state['requests']} requests)")
+            failed += 1
+    finally:
+        server.shutdown()
+    
+    if failed == 0:
+        logger.info(f"✅ PASS: 3 x 1441 velas, hasta {state['max_active']} requests simultáneos")
+    return failed == 0
+
+
+def test_historical_range_api():
+    """Test 3: historical /range - columnar, streaming y servido desde el cache"""
+    logger.info("=" * 80)
+    logger.info("TEST 3: Historical range API")
+    logger.info("=" * 80)
+    
+    import json
+    import tempfile
+    from src.shared.candle_store import CandleStore
+    from src.services.historical import main as historical
+    
+    step = 60_000
+    requests_made = []
+    
+    def fake_fetcher(pair, interval, start_ms, end_ms):
+        requests_made.append((start_ms, end_ms))
+        return [[t, 1.0, 2.0, 0.5, t / step % 100, 10.0, t + step - 1] for t in range(start_ms, end_ms + 1, step)]
+    
+    original_store = historical.candle_store
+    original_chunk = historical.RANGE_CHUNK_SIZE
+    original_max = historical.RANGE_MAX_CANDLES
+    historical.candle_store = CandleStore(tempfile.mkdtemp(), fake_fetcher)
+    historical.RANGE_CHUNK_SIZE = 1000
+    client = historical.app.test_client()
+    failed = 0
+    
+    try:
+        start_ms = 1704067200000  # 2024-01-01 UTC
+        url = '/range/BTC?start=2024-01-01&end=2024-01-03T23:59&interval=1m&fields=close,volume'
+        body = client.get(url).get_json()
+        columns = body['columns']
+        expected = 3 * 1440
+        if (body['count'] != expected or list(columns) != ['timestamp', 'close', 'volume']
+                or columns['timestamp'][0] != start_ms or len(columns['close']) != expected
+                or columns['close'][:3] != [t / step % 100 for t in range(start_ms, start_ms + 3 * step, step)]):
+            logger.error(f"❌ FAIL: Respuesta columnar ({body['count']} velas, campos {list(columns)})")
+            failed += 1
+        
+        # Repetición: servida desde el cache, sin requests nuevos
+        requests_before = len(requests_made)
+        response = client.get(url.replace('fields=close,volume', 'format=ndjson'))
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        chunk_rows = sum(len(line['timestamp']) for line in lines[1:])
+        if len(requests_made) != requests_before or lines[0]['count'] != expected or chunk_rows != expected:
+            logger.error(f"❌ FAIL: NDJSON/cache ({len(requests_made) - requests_before} requests, {chunk_rows} filas)")
+            failed += 1
+        if len(lines) != 1 + -(-expected // 1000) or lines[1]['close'] != columns['close'][:1000]:
+            logger.error(f"❌ FAIL: Chunks NDJSON ({len(lines) - 1})")
+            failed += 1
+        
+        if client.get('/range/BTC?fields=price').status_code != 400 or client.get('/range/BTC?interval=7m').status_code != 400:
+            logger.error("❌ FAIL: Parámetros inválidos aceptados")
+            failed += 1
+        
+        # Rango por encima del tope: 400 salvo fill=0 (solo cache, sin Binance)
+        historical.RANGE_MAX_CANDLES = 1000
+        requests_before = len(requests_made)
+        capped = client.get(url.replace('2024-01-01', '2023-12-01'))
+        cached = client.get(url + '&fill=0')
+        if capped.status_code != 400 or len(requests_made) != requests_before or cached.get_json()['count'] != expected:
+            logger.error(f"❌ FAIL: Tope de rango ({capped.status_code}, {len(requests_made) - requests_before} requests)")
+            failed += 1
+    finally:
+        historical.candle_store = original_store
+        historical.RANGE_CHUNK_SIZE = original_chunk
+        historical.RANGE_MAX_CANDLES = original_max
+    
+    if failed == 0:
+        logger.info(f"✅ PASS: {expected} velas columnar + NDJSON, repetición sin requests a Binance")
+    return failed == 0
+
+
+def main():
+    logger.info("=" * 80)
+    logger.info("🧪 V22.2 CANDLE STORE - UNIT TESTS")
+    logger.info("=" * 80)
+    
+    tests = [
+        ("Candle Store", test_candle_store),
+        ("Parallel Historical Loader", test_parallel_historical_loader),
+        ("Historical Range API", test_historical_range_api),
+    ]
+    
+    results = []
+    
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            logger.error(f"❌ Test '{test_name}' crashed: {e}")
+            results.append((test_name, False))
+    
+    # Resumen final
+    logger.info("\n" + "=" * 80)
+    logger.info("📊 RESUMEN FINAL DE TESTS")
+    logger.info("=" * 80)
+    
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+    
+    for test_name, passed in results:
+        status = "✅ PASS" if passed else "❌ FAIL"
+        logger.info(f"   {status}: {test_name}")
+    
+    logger.info(f"\n🎯 RESULTADO: {total_passed}/{total_tests} tests PASSED")
+    
+    if total_passed == total_tests:
+        logger.info("=" * 80)
+        return 0
+    else:
+        logger.error(f"\n⚠️ {total_tests - total_passed} tests FALLARON - Revisar arriba")
+        logger.info("=" * 80)
+        return 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
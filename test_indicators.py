@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+V22.2 INCREMENTAL INDICATORS - UNIT TESTS
+=========================================
+Verifica que los indicadores O(1) coinciden con el cálculo completo sobre
+la serie y que las estrategias dan la misma señal en modo lista e incremental.
+También verifica las series vectorizadas (series + generate_signals) y su
+cache (IndicatorCache).
+
+Ejecutar:
+    python3 test_indicators.py
+"""
+
+import sys
+import os
+import time
+import itertools
+import numpy as np
+
+# Añadir src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.services.brain.indicators import (
+    EmaIndicator,
+    RollingStatsIndicator,
+    RsiIndicator,
+    MacdIndicator,
+    AtrIndicator,
+    DonchianIndicator,
+    AdxIndicator,
+    IndicatorSet,
+    IndicatorCache,
+    series
+)
+from src.services.brain.strategies import AVAILABLE_STRATEGIES
+from src.services.brain.strategies.base import StrategyInterface
+from src.shared.utils import get_logger
+
+logger = get_logger("TestIndicators")
+
+
+def _random_ohlc(n: int = 400, seed: int = 7):
+    """Serie OHLC sintética (random walk)"""
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    highs = closes + rng.uniform(0, 1, n)
+    lows = closes - rng.uniform(0, 1, n)
+    return closes, highs, lows
+
+
+def _reference_ema(values: np.ndarray, period: int) -> float:
+    ema = np.mean(values[:period])
+    k = 2 / (period + 1)
+    for v in values[period:]:
+        ema = (v - ema) * k + ema
+    return ema
+
+
+def _reference_wilder(values: np.ndarray, period: int) -> float:
+    avg = np.mean(values[:period])
+    for v in values[period:]:
+        avg = (avg * (period - 1) + v) / period
+    return avg
+
+
+def _close(a: float, b: float, tol: float = 1e-8) -> bool:
+    return abs(a - b) <= tol * max(1.0, abs(b))
+
+
+def test_moving_averages():
+    """Test 1: EMA y SMA/std móviles"""
+    logger.info("=" * 80)
+    logger.info("TEST 1: EMA / Rolling Stats")
+    logger.info("=" * 80)
+    
+    closes, _, _ = _random_ohlc()
+    ema = EmaIndicator(20)
+    stats = RollingStatsIndicator(20)
+    for c in closes:
+        ema.update(c)
+        stats.update(c)
+    
+    checks = [
+        ("EMA(20)", ema.value, _reference_ema(closes, 20)),
+        ("SMA(20)", stats.value.mean, np.mean(closes[-20:])),
+        ("STD(20)", stats.value.std, np.std(closes[-20:])),
+    ]
+    
+    failed = 0
+    for name, got, expected in checks:
+        if _close(got, expected):
+            logger.info(f"✅ PASS: {name} = {got:.6f}")
+        else:
+            logger.error(f"❌ FAIL: {name} = {got:.6f}, esperado {expected:.6f}")
+            failed += 1
+    return failed == 0
+
+
+def test_oscillators():
+    """Test 2: RSI de Wilder y MACD"""
+    logger.info("=" * 80)
+    logger.info("TEST 2: RSI / MACD")
+    logger.info("=" * 80)
+    
+    closes, _, _ = _random_ohlc()
+    rsi = RsiIndicator(14)
+    macd = MacdIndicator(12, 26, 9)
+    for c in closes:
+        rsi.update(c)
+        macd.update(c)
+    
+    deltas = np.diff(closes)
+    avg_gain = _reference_wilder(np.where(deltas > 0, deltas, 0), 14)
+    avg_loss = _reference_wilder(np.where(deltas < 0, -deltas, 0), 14)
+    expected_rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    
+    macd_line = [
+        _reference_ema(closes[:i + 1], 12) - _reference_ema(closes[:i + 1], 26)
+        for i in range(25, len(closes))
+    ]
+    expected_macd = macd_line[-1]
+    expected_signal = _reference_ema(np.array(macd_line), 9)
+    
+    checks = [
+        ("RSI(14)", rsi.value, expected_rsi),
+        ("MACD line", macd.value.macd, expected_macd),
+        ("MACD signal", macd.value.signal, expected_signal),
+    ]
+    
+    failed = 0
+    for name, got, expected in checks:
+        if _close(got, expected):
+            logger.info(f"✅ PASS: {name} = {got:.6f}")
+        else:
+            logger.error(f"❌ FAIL: {name} = {got:.6f}, esperado {expected:.6f}")
+            failed += 1
+    return failed == 0
+
+
+def test_volatility_and_directional():
+    """Test 3: ATR, Donchian y ADX con High/Low"""
+    logger.info("=" * 80)
+    logger.info("TEST 3: ATR / Donchian / ADX")
+    logger.info("=" * 80)
+    
+    closes, highs, lows = _random_ohlc()
+    atr = AtrIndicator(14)
+    donchian = DonchianIndicator(26)
+    adx = AdxIndicator(14)
+    for c, h, l in zip(closes, highs, lows):
+        atr.update(c, h, l)
+        donchian.update(c, h, l)
+        adx.update(c, h, l)
+    
+    tr = np.maximum(highs[1:] - lows[1:], np.maximum(np.abs(highs[1:] - closes[:-1]), np.abs(lows[1:] - closes[:-1])))
+    up = highs[1:] - highs[:-1]
+    down = lows[:-1] - lows[1:]
+    dm_plus = np.where((up > down) & (up > 0), up, 0)
+    dm_minus = np.where((down > up) & (down > 0), down, 0)
+    
+    # DX para cada vela a partir de la semilla
+    dx_values = []
+    for i in range(14, len(tr) + 1):
+        s_tr = _reference_wilder(tr[:i], 14)
+        di_p = _reference_wilder(dm_plus[:i], 14) / s_tr * 100
+        di_m = _reference_wilder(dm_minus[:i], 14) / s_tr * 100
+        dx_values.append(abs(di_p - di_m) / (di_p + di_m) * 100)
+    
+    checks = [
+        ("ATR(14)", atr.value, _reference_wilder(tr, 14)),
+        ("Donchian upper(26)", donchian.value.upper, np.max(highs[-26:])),
+        ("Donchian lower(26)", donchian.value.lower, np.min(lows[-26:])),
+        ("DI+(14)", adx.value.di_plus, di_p),
+        ("DI-(14)", adx.value.di_minus, di_m),
+        ("ADX(14)", adx.value.adx, _reference_wilder(np.array(dx_values), 14)),
+    ]
+    
+    failed = 0
+    for name, got, expected in checks:
+        if _close(got, expected):
+            logger.info(f"✅ PASS: {name} = {got:.6f}")
+        else:
+            logger.error(f"❌ FAIL: {name} = {got:.6f}, esperado {expected:.6f}")
+            failed += 1
+    return failed == 0
+
+
+def test_strategy_modes_match():
+    """Test 4: evaluate() (lista) y evaluate_indicators() (incremental) coinciden"""
+    logger.info("=" * 80)
+    logger.info("TEST 4: Strategy list vs incremental")
+    logger.info("=" * 80)
+    
+    closes, _, _ = _random_ohlc(n=300, seed=11)
+    prices = closes.tolist()
+    failed = 0
+    
+    for name, strategy_class in AVAILABLE_STRATEGIES.items():
+        strategy = strategy_class({})
+        if not strategy.supports_incremental:
+            logger.info(f"⏭️ SKIP: {name} (sin modo incremental)")
+            continue
+        
+        indicator_set = IndicatorSet()
+        indicator_set.require_all(strategy.get_indicator_specs().values())
+        mismatches = 0
+        for i, price in enumerate(prices):
+            indicator_set.update(price)
+            if i < strategy.get_required_history() or i % 25:
+                continue
+            incremental = strategy.evaluate_indicators(price, indicator_set)
+            full = strategy.evaluate(price, prices[:i])
+            if incremental.signal != full.signal or incremental.reason != full.reason:
+                mismatches += 1
+        
+        if mismatches == 0:
+            logger.info(f"✅ PASS: {name}")
+        else:
+            logger.error(f"❌ FAIL: {name} ({mismatches} discrepancias)")
+            failed += 1
+    return failed == 0
+
+
+def test_update_cost_is_flat():
+    """Test 5: El coste por vela no crece con el historial"""
+    logger.info("=" * 80)
+    logger.info("TEST 5: O(1) update cost")
+    logger.info("=" * 80)
+    
+    closes, highs, lows = _random_ohlc(n=20000, seed=3)
+    indicator_set = IndicatorSet()
+    indicator_set.require_all([('ema', 200), ('rsi', 14), ('adx', 14), ('stats', 20), ('donchian', 52), ('macd', 12, 26, 9), ('atr', 14)])
+    
+    timings = []
+    for start in (0, 19000):
+        t0 = time.perf_counter()
+        for i in range(start, start + 1000):
+            indicator_set.update(closes[i], highs[i], lows[i])
+        timings.append(time.perf_counter() - t0)
+        if start == 0:
+            for i in range(1000, 19000):
+                indicator_set.update(closes[i], highs[i], lows[i])
+    
+    ratio = timings[1] / timings[0]
+    logger.info(f"   Primeras 1000 velas: {timings[0]*1000:.2f}ms | Velas 19000-20000: {timings[1]*1000:.2f}ms")
+    if ratio < 3:
+        logger.info(f"✅ PASS: ratio {ratio:.2f}")
+        return True
+    logger.error(f"❌ FAIL: ratio {ratio:.2f} (coste crece con el historial)")
+    return False
+
+
+def test_series_match_incremental():
+    """Test 6: Las series vectorizadas coinciden con los indicadores incrementales"""
+    logger.info("=" * 80)
+    logger.info("TEST 6: Vectorized series vs incremental")
+    logger.info("=" * 80)
+    
+    closes, highs, lows = _random_ohlc(n=500, seed=5)
+    cases = [
+        ("EMA(200)", EmaIndicator(200), lambda v: v, series.ema(closes, 200)),
+        ("SMA(20)", RollingStatsIndicator(20), lambda v: v.mean, series.rolling_stats(closes, 20)[0]),
+        ("RSI(14)", RsiIndicator(14), lambda v: v, series.rsi(closes, 14)),
+        ("MACD", MacdIndicator(12, 26, 9), lambda v: v.signal, series.macd(closes, 12, 26, 9)[1]),
+        ("ATR(14)", AtrIndicator(14), lambda v: v, series.atr(highs, lows, closes, 14)),
+        ("ADX(14)", AdxIndicator(14), lambda v: v.adx, series.adx(highs, lows, closes, 14)[0]),
+        ("Donchian(52)", DonchianIndicator(52), lambda v: v.middle, series.donchian(highs, lows, 52)[2]),
+    ]
+    
+    failed = 0
+    for name, indicator, extract, vectorized in cases:
+        mismatches = 0
+        for i in range(len(closes)):
+            value = indicator.update(closes[i], highs[i], lows[i])
+            if value is None:
+                mismatches += int(not np.isnan(vectorized[i]))
+            else:
+                mismatches += int(not _close(extract(value), vectorized[i]))
+        
+        if mismatches == 0:
+            logger.info(f"✅ PASS: {name}")
+        else:
+            logger.error(f"❌ FAIL: {name} ({mismatches} discrepancias)")
+            failed += 1
+    return failed == 0
+
+
+def test_vectorized_signals_match():
+    """Test 7: generate_signals() vectorizado coincide con la evaluación vela a vela"""
+    logger.info("=" * 80)
+    logger.info("TEST 7: Vectorized signals vs bar-by-bar")
+    logger.info("=" * 80)
+    
+    closes, _, _ = _random_ohlc(n=600, seed=13)
+    failed = 0
+    
+    for name, strategy_class in AVAILABLE_STRATEGIES.items():
+        strategy = strategy_class({})
+        vectorized = strategy.generate_signals(closes)
+        reference = StrategyInterface.generate_signals(strategy, closes)
+        mismatches = int(np.sum(vectorized != reference))
+        
+        if mismatches == 0:
+            logger.info(f"✅ PASS: {name} ({int(np.count_nonzero(reference))} señales)")
+        else:
+            logger.error(f"❌ FAIL: {name} ({mismatches} discrepancias)")
+            failed += 1
+    return failed == 0
+
+
+def test_indicator_cache():
+    """Test 8: IndicatorCache reutiliza series, respeta el presupuesto y no cambia señales"""
+    logger.info("=" * 80)
+    logger.info("TEST 8: Indicator cache")
+    logger.info("=" * 80)
+    
+    closes, _, _ = _random_ohlc(n=600, seed=21)
+    cache = IndicatorCache()
+    failed = 0
+    
+    # Misma serie -> un solo cálculo, y arrays de solo lectura
+    first = cache.ema(closes, 20)
+    second = cache.ema(closes.copy(), 20)
+    if first is second and cache.hits == 1 and not first.flags.writeable:
+        logger.info("✅ PASS: EMA reutilizada (mismos datos, otra copia)")
+    else:
+        logger.error(f"❌ FAIL: EMA no reutilizada ({cache.stats()})")
+        failed += 1
+    
+    # Señales con cache = señales sin cache, para todo el grid
+    for name, strategy_class in AVAILABLE_STRATEGIES.items():
+        space = strategy_class({}).get_parameter_space()
+        mismatches = 0
+        for combination in itertools.product(*space.values()):
+            try:
+                strategy = strategy_class(dict(zip(space.keys(), combination)))
+            except ValueError:
+                continue
+            cached = strategy.generate_signals(closes, cache=cache)
+            mismatches += int(np.sum(cached != strategy.generate_signals(closes)))
+        if mismatches:
+            logger.error(f"❌ FAIL: {name} ({mismatches} discrepancias con cache)")
+            failed += 1
+    logger.info(f"   Cache tras el grid: {cache.stats()}")
+    
+    # Presupuesto: nunca supera max_bytes (evicción LRU)
+    small = IndicatorCache(max_bytes=closes.nbytes * 3)
+    for period in range(5, 25):
+        small.ema(closes, period)
+    if small.nbytes <= small.max_bytes and len(small) == 3:
+        logger.info(f"✅ PASS: Presupuesto respetado ({len(small)} series)")
+    else:
+        logger.error(f"❌ FAIL: Presupuesto excedido ({small.stats()})")
+        failed += 1
+    
+    # clear() también reinicia los contadores (stats por ejecución del torneo)
+    small.clear()
+    if len(small) or small.nbytes or small.hits or small.misses:
+        logger.error(f"❌ FAIL: clear() dejó estado ({small.stats()})")
+        failed += 1
+    
+    return failed == 0
+
+
+def main():
+    logger.info("=" * 80)
+    logger.info("🧪 V22.2 INCREMENTAL INDICATORS - UNIT TESTS")
+    logger.info("=" * 80)
+    
+    tests = [
+        ("Moving Averages", test_moving_averages),
+        ("Oscillators", test_oscillators),
+        ("Volatility & Directional", test_volatility_and_directional),
+        ("Strategy Modes Match", test_strategy_modes_match),
+        ("Flat Update Cost", test_update_cost_is_flat),
+        ("Series Match Incremental", test_series_match_incremental),
+        ("Vectorized Signals Match", test_vectorized_signals_match),
+        ("Indicator Cache", test_indicator_cache),
+    ]
+    
+    results = []
+    
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            logger.error(f"❌ Test '{test_name}' crashed: {e}")
+            results.append((test_name, False))
+    
+    # Resumen final
+    logger.info("\n" + "=" * 80)
+    logger.info("📊 RESUMEN FINAL DE TESTS")
+    logger.info("=" * 80)
+    
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+    
+    for test_name, passed in results:
+        status = "✅ PASS" if passed else "❌ FAIL"
+        logger.info(f"   {status}: {test_name}")
+    
+    logger.info(f"\n🎯 RESULTADO: {total_passed}/{total_tests} tests PASSED")
+    
+    if total_passed == total_tests:
+        logger.info("=" * 80)
+        return 0
+    else:
+        logger.error(f"\n⚠️ {total_tests - total_passed} tests FALLARON - Revisar arriba")
+        logger.info("=" * 80)
+        return 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+V22.2 MARKET DATA - UNIT TESTS
+==============================
+Verifica la descarga concurrente de klines (sesión aiohttp compartida)
+y la ingesta por WebSocket (kline_1m) contra un servidor de replay local.
+
+Ejecutar:
+    python3 test_market_data.py
+"""
+
+import sys
+import os
+import time
+
+# Añadir src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.shared.utils import get_logger
+
+logger = get_logger("TestMarketData")
+
+
+def test_concurrent_kline_fetch():
+    """Test 1: market_data - fetches concurrentes con sesión compartida y rate limit"""
+    logger.info("=" * 80)
+    logger.info("TEST 1: Concurrent kline fetching")
+    logger.info("=" * 80)
+    
+    import asyncio
+    from aiohttp import web
+    from src.services.market_data import main as market_data
+    from src.domain import parse_symbol_list
+    
+    peers = set()
+    
+    async def klines_handler(request):
+        peers.add(request.transport.get_extra_info('peername'))
+        await asyncio.sleep(0.1)
+        closed, current = [1700000000000, "1", "2", "0.5", "1.5", "10"], [1700000060000, "1.5", "1.6", "1.4", "1.55", "1"]
+        return web.json_response([closed, current][-int(request.query['limit']):],
+                                 headers={'X-MBX-USED-WEIGHT-1M': '42'})
+    
+    async def run():
+        app = web.Application()
+        app.router.add_get('/klines', klines_handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        
+        original_url = market_data.BINANCE_KLINES_URL
+        market_data.BINANCE_KLINES_URL = f'http://127.0.0.1:{port}/klines'
+        symbols = parse_symbol_list(['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT', 'XRPUSDT', 'ADAUSDT'])
+        try:
+            timings = []
+            for _ in range(2):
+                start = time.perf_counter()
+                klines = await market_data.fetch_latest_klines(symbols)
+                timings.append(time.perf_counter() - start)
+            return klines, timings
+        finally:
+            market_data.BINANCE_KLINES_URL = original_url
+            await market_data.close_http_session()
+            await runner.cleanup()
+    
+    klines, timings = asyncio.run(run())
+    failed = 0
+    
+    if [k['symbol'] for _, k in klines] != ['BTC', 'ETH', 'SOL', 'BNB', 'XRP', 'ADA'] or max(timings) > 0.5:
+        logger.error(f"❌ FAIL: Fetch concurrente ({timings})")
+        failed += 1
+    if any(k['timestamp'] != 1700000000 or k['close'] != 1.5 for _, k in klines):
+        logger.error("❌ FAIL: REST publicó la vela en curso en vez de la última cerrada")
+        failed += 1
+    if len(peers) > len(klines) or market_data.rate_limiter.used_weight != 42:
+        logger.error(f"❌ FAIL: Conexiones no reutilizadas ({len(peers)}) o peso no leído")
+        failed += 1
+    
+    limiter = market_data.BinanceRateLimiter()
+    limiter.update(type('Response', (), {'status': 429, 'headers': {'Retry-After': '30'}})())
+    if not 29 <= limiter.blocked_until - time.time() <= 30:
+        logger.error("❌ FAIL: Retry-After no respetado")
+        failed += 1
+    
+    if failed == 0:
+        logger.info(f"✅ PASS: {len(klines)} símbolos por ciclo en {max(timings) * 1000:.0f}ms, "
+                    f"{len(peers)} conexiones para {2 * len(klines)} requests")
+    return failed == 0
+
+
+def test_kline_stream():
+    """Test 2: market_data - stream kline_1m con re-suscripción (replay server local)"""
+    logger.info("=" * 80)
+    logger.info("TEST 2: Kline stream")
+    logger.info("=" * 80)
+    
+    import asyncio
+    from src.services.market_data import main as market_data
+    from src.services.market_data.replay_server import KlineReplayServer, build_kline_message, synthetic_candles
+    from src.domain import parse_symbol_list
+    
+    published = []
+    
+    class RecordingMemory:
+        def publish(self, channel, data, partition=0):
+            published.append(data)
+        
+        def set_many(self, values, ttl=None):
+            pass
+        
+        def partition_of(self, key):
+            return 0
+    
+    async def run():
+        server = await KlineReplayServer(synthetic_candles(['BTCUSDT', 'ETHUSDT', 'SOLUSDT'], 5), interval=0.01).start()
+        url = f'ws://127.0.0.1:{server.port}/stream'
+        try:
+            for symbols in (['BTCUSDT', 'ETHUSDT'], ['BTCUSDT', 'SOLUSDT']):
+                market_data.current_symbols = parse_symbol_list(symbols)
+                market_data.symbols_changed.clear()
+                task = asyncio.create_task(market_data.consume_kline_stream(market_data.build_stream_url(market_data.current_symbols, url)))
+                await asyncio.sleep(0.3)
+                market_data.symbols_changed.set()
+                await task
+            return server.subscriptions
+        finally:
+            await server.stop()
+    
+    original_memory = market_data.memory
+    market_data.memory = RecordingMemory()
+    market_data.last_published.clear()
+    try:
+        subscriptions = asyncio.run(run())
+    finally:
+        market_data.memory = original_memory
+        market_data.last_published.clear()
+    
+    failed = 0
+    
+    candle = {'timestamp': 1700000000.0, 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 3.0}
+    if market_data.parse_stream_kline(build_kline_message('BTCUSDT', candle, closed=False)) is not None:
+        logger.error("❌ FAIL: Vela no cerrada publicada")
+        failed += 1
+    if market_data.parse_stream_kline(build_kline_message('BTCUSDT', candle)) != dict(symbol='BTC', **candle):
+        logger.error("❌ FAIL: Formato de vela del stream distinto al de REST")
+        failed += 1
+    
+    if subscriptions != [['BTCUSDT', 'ETHUSDT'], ['BTCUSDT', 'SOLUSDT']]:
+        logger.error(f"❌ FAIL: Re-suscripción incorrecta: {subscriptions}")
+        failed += 1
+    
+    # BTC se repite tras reconectar: no debe publicarse dos veces
+    candles = [k for batch in published for k in batch]
+    counts = {base: sum(1 for k in candles if k['symbol'] == base) for base in ('BTC', 'ETH', 'SOL')}
+    if counts != {'BTC': 5, 'ETH': 5, 'SOL': 5}:
+        logger.error(f"❌ FAIL: Velas publicadas por símbolo: {counts}")
+        failed += 1
+    
+    # Un mensaje por minuto con los cierres de todos los símbolos suscritos
+    if [len(batch) for batch in published] != [2] * 5 + [1] * 5 or any(len({k['timestamp'] for k in batch}) != 1 for batch in published):
+        logger.error(f"❌ FAIL: Lotes por minuto incorrectos: {[len(batch) for batch in published]}")
+        failed += 1
+    
+    if failed == 0:
+        logger.info(f"✅ PASS: {len(candles)} velas cerradas en {len(published)} mensajes, re-suscripción {subscriptions[0]} -> {subscriptions[1]} sin duplicados")
+    return failed == 0
+
+
+def main():
+    logger.info("=" * 80)
+    logger.info("🧪 V22.2 MARKET DATA - UNIT TESTS")
+    logger.info("=" * 80)
+    
+    tests = [
+        ("Concurrent Kline Fetch", test_concurrent_kline_fetch),
+        ("Kline Stream", test_kline_stream),
+    ]
+    
+    results = []
+    
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            logger.error(f"❌ Test '{test_name}' crashed: {e}")
+            results.append((test_name, False))
+    
+    # Resumen final
+    logger.info("\n" + "=" * 80)
+    logger.info("📊 RESUMEN FINAL DE TESTS")
+    logger.info("=" * 80)
+    
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+    
+    for test_name, passed in results:
+        status = "✅ PASS" if passed else "❌ FAIL"
+        logger.info(f"   {status}: {test_name}")
+    
+    logger.info(f"\n🎯 RESULTADO: {total_passed}/{total_tests} tests PASSED")
+    
+    if total_passed == total_tests:
+        logger.info("=" * 80)
+        return 0
+    else:
+        logger.error(f"\n⚠️ {total_tests - total_passed} tests FALLARON - Revisar arriba")
+        logger.info("=" * 80)
+        return 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+V22.2 MESSAGING - UNIT TESTS
+============================
+Verifica el codec versionado JSON/msgpack de los mensajes entre servicios.
+
+Ejecutar:
+    python3 test_messaging.py
+"""
+
+import sys
+import os
+
+# Añadir src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.shared.utils import get_logger
+
+logger = get_logger("TestMessaging")
+
+
+def test_message_codec():
+    """Test 1: Codec de mensajes JSON / msgpack v1 (byte de versión)"""
+    logger.info("=" * 80)
+    logger.info("TEST 1: Message codec")
+    logger.info("=" * 80)
+    
+    from src.config.settings import config
+    from src.shared import codec
+    
+    payload = {'symbol': 'BTC', 'type': 'BUY', 'price': 65000.12,
+               'indicators': {'rsi': 28.5, 'adx': 31.2}, 'params': {'period': 14}}
+    failed = 0
+    original_codec = config.MESSAGE_CODEC
+    try:
+        config.MESSAGE_CODEC = 'json'
+        as_json = codec.encode(payload)
+        if not isinstance(as_json, str) or codec.decode(as_json) != payload:
+            logger.error("❌ FAIL: Round-trip JSON")
+            failed += 1
+        if codec.decode('2026-01-01T00:00:00') != '2026-01-01T00:00:00':
+            logger.error("❌ FAIL: Strings planos deben retornarse tal cual")
+            failed += 1
+        
+        if codec.msgpack is None:
+            logger.warning("⚠️ msgpack no instalado, se omite la parte binaria")
+        else:
+            config.MESSAGE_CODEC = 'msgpack'
+            packed = codec.encode([payload] * 3)
+            # Redis (decode_responses + surrogateescape) lo entrega como str
+            as_str = packed.decode('utf-8', 'surrogateescape')
+            if packed[:1] != codec.MSGPACK_V1 or len(packed) >= len(as_json) * 3:
+                logger.error("❌ FAIL: msgpack sin byte de versión o no más compacto")
+                failed += 1
+            if codec.decode(packed) != [payload] * 3 or codec.decode(as_str) != [payload] * 3:
+                logger.error("❌ FAIL: Round-trip msgpack (bytes / str surrogateescape)")
+                failed += 1
+            # Un lector durante el rollout sigue entendiendo JSON
+            if codec.decode(as_json) != payload:
+                logger.error("❌ FAIL: Lector msgpack no acepta JSON")
+                failed += 1
+    finally:
+        config.MESSAGE_CODEC = original_codec
+    
+    if failed == 0:
+        logger.info("✅ PASS: JSON y msgpack v1 interoperables")
+    return failed == 0
+
+
+def main():
+    logger.info("=" * 80)
+    logger.info("🧪 V22.2 MESSAGING - UNIT TESTS")
+    logger.info("=" * 80)
+    
+    tests = [
+        ("Message Codec", test_message_codec),
+    ]
+    
+    results = []
+    
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            logger.error(f"❌ Test '{test_name}' crashed: {e}")
+            results.append((test_name, False))
+    
+    # Resumen final
+    logger.info("\n" + "=" * 80)
+    logger.info("📊 RESUMEN FINAL DE TESTS")
+    logger.info("=" * 80)
+    
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+    
+    for test_name, passed in results:
+        status = "✅ PASS" if passed else "❌ FAIL"
+        logger.info(f"   {status}: {test_name}")
+    
+    logger.info(f"\n🎯 RESULTADO: {total_passed}/{total_tests} tests PASSED")
+    
+    if total_passed == total_tests:
+        logger.info("=" * 80)
+        return 0
+    else:
+        logger.error(f"\n⚠️ {total_tests - total_passed} tests FALLARON - Revisar arriba")
+        logger.info("=" * 80)
+        return 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
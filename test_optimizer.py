@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+V22.2 STRATEGY OPTIMIZER - UNIT TESTS
+=====================================
+Verifica el FastBacktester vectorizado, el torneo paralelo
+(TournamentOptimizer con pool de procesos), el ciclo completo del
+servicio strategy_optimizer, los modos de búsqueda de parámetros, la
+validación rolling con simulación compartida y el walk-forward.
+
+Ejecutar:
+    python3 test_optimizer.py
+"""
+
+import sys
+import os
+import time
+import numpy as np
+
+# Añadir src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.services.brain.indicators import IndicatorCache
+from src.services.brain.strategies import AVAILABLE_STRATEGIES
+from src.services.brain.strategies.optimizer import TournamentOptimizer
+from src.services.brain.strategies.search import create_search
+from src.services.brain.backtesting import FastBacktester
+from src.services.strategy_optimizer.rolling_validator import RollingValidator
+from src.services.strategy_optimizer.walk_forward import WalkForwardOptimizer
+from src.shared.utils import get_logger
+
+logger = get_logger("TestOptimizer")
+
+
+def _random_ohlc(n: int = 400, seed: int = 7):
+    """Serie OHLC sintética (random walk)"""
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    highs = closes + rng.uniform(0, 1, n)
+    lows = closes - rng.uniform(0, 1, n)
+    return closes, highs, lows
+
+
+def _close(a: float, b: float, tol: float = 1e-8) -> bool:
+    return abs(a - b) <= tol * max(1.0, abs(b))
+
+
+def test_vectorized_backtest():
+    """Test 1: FastBacktester vectorizado = bucle vela a vela, y < 100ms por 1000 velas"""
+    logger.info("=" * 80)
+    logger.info("TEST 1: Vectorized FastBacktester")
+    logger.info("=" * 80)
+    
+    closes, _, _ = _random_ohlc(n=1000, seed=17)
+    prices = closes.tolist()
+    vectorized_backtester = FastBacktester()
+    loop_backtester = FastBacktester(vectorized=False)
+    failed = 0
+    
+    for name, strategy_class in AVAILABLE_STRATEGIES.items():
+        strategy = strategy_class({})
+        t0 = time.perf_counter()
+        fast = vectorized_backtester.run(strategy, prices)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        reference = loop_backtester.run(strategy, prices)
+        
+        same = (fast.total_trades == reference.total_trades and
+                _close(fast.score, reference.score) and
+                _close(fast.final_capital, reference.final_capital))
+        if same and elapsed_ms < 100:
+            logger.info(f"✅ PASS: {name} ({fast.total_trades} trades, {elapsed_ms:.1f}ms)")
+        else:
+            logger.error(f"❌ FAIL: {name} (vectorizado={fast}, bucle={reference}, {elapsed_ms:.1f}ms)")
+            failed += 1
+    return failed == 0
+
+
+def test_parallel_tournament():
+    """Test 2: El torneo en pool de procesos da el mismo ranking que el secuencial"""
+    logger.info("=" * 80)
+    logger.info("TEST 2: Parallel tournament")
+    logger.info("=" * 80)
+    
+    symbols_data = {
+        symbol: _random_ohlc(n=500, seed=seed)[0].tolist()
+        for seed, symbol in enumerate(['BTC', 'ETH', 'SOL'])
+    }
+    serial = TournamentOptimizer(AVAILABLE_STRATEGIES, max_workers=1).optimize_symbols(symbols_data, max_combinations=60)
+    parallel = TournamentOptimizer(AVAILABLE_STRATEGIES, max_workers=2).optimize_symbols(symbols_data, max_combinations=60)
+    
+    failed = 0
+    for symbol in symbols_data:
+        serial_strategy, serial_result = serial[symbol]
+        parallel_strategy, parallel_result = parallel[symbol]
+        if serial_strategy.name == parallel_strategy.name and serial_result.score == parallel_result.score:
+            logger.info(f"✅ PASS: {symbol} -> {parallel_result}")
+        else:
+            logger.error(f"❌ FAIL: {symbol} (secuencial={serial_result}, paralelo={parallel_result})")
+            failed += 1
+    return failed == 0
+
+
+def test_optimization_cycle():
+    """Test 3: StrategyOptimizerWorker.run_optimization_cycle completo (Redis simulado)"""
+    logger.info("=" * 80)
+    logger.info("TEST 3: Optimization cycle")
+    logger.info("=" * 80)
+    
+    from src.shared.codec import decode
+    from src.services.brain.strategies.regime_detector import RegimeDetector
+    from src.services.strategy_optimizer.main import StrategyOptimizerWorker, HISTORICAL_INTERVAL
+    
+    class FakeRedis:
+        def __init__(self):
+            self.data = {}
+            self.published = []
+        
+        def set(self, key, value, **kwargs):
+            self.data[key] = value
+            return True
+        
+        def publish(self, channel, message):
+            self.published.append((channel, message))
+    
+    prices = {symbol: _random_ohlc(n=1000, seed=seed)[0].tolist()
+              for symbol, seed in (('BTC', 21), ('ETH', 22), ('SOL', 23))}
+    rejected = 'SOL'  # Cae al fallback: se queda en el timeframe base
+    
+    # Sin __init__: no conecta a Redis ni lanza el torneo inicial
+    worker = StrategyOptimizerWorker.__new__(StrategyOptimizerWorker)
+    worker.redis_client = FakeRedis()
+    worker.optimizer = TournamentOptimizer(AVAILABLE_STRATEGIES, max_workers=1)
+    worker.rolling_validator = RollingValidator()
+    worker.walk_forward = None
+    validate_candidates = worker.rolling_validator.validate_candidates
+    
+    def validate_or_reject(candidates, price_data):
+        validations = validate_candidates(candidates, price_data)
+        if price_data is prices[rejected]:
+            for _, validation in validations:
+                validation['is_approved'] = False
+        return validations
+    
+    worker.rolling_validator.validate_candidates = validate_or_reject
+    worker.regime_detector = RegimeDetector()
+    worker.get_active_symbols = lambda: list(prices)
+    worker.fetch_historical_data = lambda symbol: prices[symbol]
+    
+    start = time.perf_counter()
+    worker.run_optimization_cycle()
+    elapsed = time.perf_counter() - start
+    failed = 0
+    
+    for symbol in prices:
+        raw = worker.redis_client.data.get(f"strategy_config:{symbol}")
+        saved = decode(raw) if raw else {}
+        if symbol == rejected:
+            if 'note' not in saved or 'interval' in saved:
+                logger.error(f"❌ FAIL: Fallback de {symbol} con timeframe del torneo: {saved}")
+                failed += 1
+        elif saved.get('strategy_name') not in AVAILABLE_STRATEGIES or saved.get('interval') != HISTORICAL_INTERVAL:
+            logger.error(f"❌ FAIL: Configuración de {symbol} no guardada: {saved}")
+            failed += 1
+        elif 'error' in saved:
+            logger.error(f"❌ FAIL: {symbol} cayó al fallback por error: {saved['error']}")
+            failed += 1
+    if len(worker.redis_client.published) != len(prices):
+        logger.error(f"❌ FAIL: {len(worker.redis_client.published)} avisos de estrategia publicados")
+        failed += 1
+    
+    if failed == 0:
+        logger.info(f"✅ PASS: Ciclo completo para {len(prices)} símbolos en {elapsed:.1f}s")
+    return failed == 0
+
+
+def test_search_modes():
+    """Test 4: Modos de búsqueda - grid legado, reparto equitativo y halving"""
+    logger.info("=" * 80)
+    logger.info("TEST 4: Search modes")
+    logger.info("=" * 80)
+    
+    failed = 0
+    
+    # Grid: mismo truncado que V18 (las primeras estrategias consumen el presupuesto)
+    grid = create_search('grid').sample(AVAILABLE_STRATEGIES, 50)
+    if sum(len(c) for c in grid.values()) == 50 and len(grid) < len(AVAILABLE_STRATEGIES):
+        logger.info(f"✅ PASS: grid trunca en orden ({list(grid)})")
+    else:
+        logger.error(f"❌ FAIL: grid {({k: len(v) for k, v in grid.items()})}")
+        failed += 1
+    
+    # Random / halving: todas las estrategias reciben parte del presupuesto
+    for mode in ('random', 'halving'):
+        sampled = create_search(mode, seed=7).sample(AVAILABLE_STRATEGIES, 50)
+        shares = {name: len(candidates) for name, candidates in sampled.items()}
+        if set(shares) == set(AVAILABLE_STRATEGIES) and max(shares.values()) - min(shares.values()) <= 10:
+            logger.info(f"✅ PASS: {mode} reparte entre {len(shares)} estrategias")
+        else:
+            logger.error(f"❌ FAIL: {mode} {shares}")
+            failed += 1
+    
+    # Halving: el ganador proviene de la ronda final (backtest sobre toda la serie)
+    prices = _random_ohlc(n=800, seed=29)[0].tolist()
+    optimizer = TournamentOptimizer(AVAILABLE_STRATEGIES, search=create_search('halving', seed=7))
+    best_strategy, best_result = optimizer.optimize_for_symbol('BTC', prices, max_combinations=30)
+    full = FastBacktester().run(best_strategy, prices)
+    if _close(full.score, best_result.score):
+        logger.info(f"✅ PASS: halving -> {best_result}")
+    else:
+        logger.error(f"❌ FAIL: score del ganador no es de la serie completa ({best_result} vs {full})")
+        failed += 1
+    
+    return failed == 0
+
+
+def test_shared_rolling_validation():
+    """Test 5: RollingValidator shared_work - una simulación, ventanas por tramos"""
+    logger.info("=" * 80)
+    logger.info("TEST 5: Shared-work rolling validation")
+    logger.info("=" * 80)
+    
+    prices = _random_ohlc(n=1000, seed=31)[0].tolist()
+    validator = RollingValidator()
+    backtester = FastBacktester()
+    failed = 0
+    
+    # La ventana más larga coincide exactamente con un backtest independiente
+    for name, strategy_class in AVAILABLE_STRATEGIES.items():
+        strategy = strategy_class({})
+        windows = backtester.run_windows(strategy, prices, validator.validation_windows)
+        standalone = backtester.run(strategy, prices[-720:])
+        if not (_close(windows['full_30d'].score, standalone.score) and
+                windows['full_30d'].total_trades == standalone.total_trades):
+            logger.error(f"❌ FAIL: {name} full_30d ({windows['full_30d']} vs {standalone})")
+            failed += 1
+    
+    # Ventanas más largas que los datos -> None (igual que el modo V18.5)
+    short = backtester.run_windows(AVAILABLE_STRATEGIES['RsiMeanReversion']({}), prices[:400], validator.validation_windows)
+    if short['full_30d'] is None and short['recent_7d'] is not None:
+        logger.info("✅ PASS: Ventanas sin datos suficientes -> None")
+    else:
+        logger.error(f"❌ FAIL: Ventanas con datos insuficientes: {short}")
+        failed += 1
+    
+    # Lote: aprobadas primero, ordenadas por weighted score
+    candidates = [strategy_class({}) for strategy_class in AVAILABLE_STRATEGIES.values()]
+    validations = validator.validate_candidates(candidates, prices, top_k=6)
+    keys = [(v['is_approved'], v['weighted_score']) for _, v in validations]
+    if len(validations) == 6 and keys == sorted(keys, reverse=True):
+        logger.info(f"✅ PASS: Lote de {len(validations)} candidatos, mejor = {validations[0][0]}")
+    else:
+        logger.error(f"❌ FAIL: Orden del lote {keys}")
+        failed += 1
+    
+    return failed == 0
+
+
+def test_walk_forward():
+    """Test 6: Walk-forward - folds, torneo por fold y reporte OOS"""
+    logger.info("=" * 80)
+    logger.info("TEST 6: Walk-forward optimization")
+    logger.info("=" * 80)
+    
+    prices = _random_ohlc(n=1000, seed=41)[0]
+    failed = 0
+    
+    # Tramo completo == backtest clásico
+    backtester = FastBacktester(cache=IndicatorCache())
+    for name, strategy_class in AVAILABLE_STRATEGIES.items():
+        strategy = strategy_class({})
+        if not _close(backtester.run_range(strategy, prices, 0, len(prices)).score,
+                      FastBacktester().run(strategy, prices).score):
+            logger.error(f"❌ FAIL: run_range completo != run ({name})")
+            failed += 1
+    
+    engine = WalkForwardOptimizer(TournamentOptimizer(AVAILABLE_STRATEGIES), train_size=500, test_size=100)
+    folds = engine.make_folds(len(prices))
+    bounds = [(f.train_start, f.test_start, f.test_end) for f in folds]
+    if bounds == [(0, 500, 600), (100, 600, 700), (200, 700, 800), (300, 800, 900), (400, 900, 1000)]:
+        logger.info(f"✅ PASS: {len(folds)} folds anclados al final de la serie")
+    else:
+        logger.error(f"❌ FAIL: Folds {bounds}")
+        failed += 1
+    
+    # La ganadora de cada fold es la misma que un torneo sobre solo su train
+    strategies = {name: AVAILABLE_STRATEGIES[name] for name in ('SmaCrossover', 'RsiMeanReversion')}
+    report = engine.run({'BTC': prices}, max_combinations=10, strategies_by_symbol={'BTC': strategies})['BTC']
+    for fold in report['folds']:
+        start, end = fold['train']
+        ranking = engine.optimizer.run_tournaments({'BTC': prices}, {'fold': ('BTC', start, end)}, 10,
+                                                   {'BTC': strategies})['fold']
+        if (ranking[0][0].name, ranking[0][0].params) != (fold['strategy_name'], fold['params']):
+            logger.error(f"❌ FAIL: Ganador del fold {fold['fold']} distinto al torneo aislado")
+            failed += 1
+    
+    stability = report['stability']
+    if len(report['folds']) == 5 and 0 < stability['strategy_consistency'] <= 1 and 'mean_score' in report['oos']:
+        logger.info(f"✅ PASS: OOS score medio {report['oos']['mean_score']:.3f}, "
+                    f"dominante {stability['dominant_strategy']} ({stability['strategy_consistency']:.0%})")
+    else:
+        logger.error(f"❌ FAIL: Reporte walk-forward {report['oos']} {stability}")
+        failed += 1
+    
+    return failed == 0
+
+
+def main():
+    logger.info("=" * 80)
+    logger.info("🧪 V22.2 STRATEGY OPTIMIZER - UNIT TESTS")
+    logger.info("=" * 80)
+    
+    tests = [
+        ("Vectorized Backtest", test_vectorized_backtest),
+        ("Parallel Tournament", test_parallel_tournament),
+        ("Optimization Cycle", test_optimization_cycle),
+        ("Search Modes", test_search_modes),
+        ("Shared Rolling Validation", test_shared_rolling_validation),
+        ("Walk-Forward", test_walk_forward),
+    ]
+    
+    results = []
+    
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            logger.error(f"❌ Test '{test_name}' crashed: {e}")
+            results.append((test_name, False))
+    
+    # Resumen final
+    logger.info("\n" + "=" * 80)
+    logger.info("📊 RESUMEN FINAL DE TESTS")
+    logger.info("=" * 80)
+    
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+    
+    for test_name, passed in results:
+        status = "✅ PASS" if passed else "❌ FAIL"
+        logger.info(f"   {status}: {test_name}")
+    
+    logger.info(f"\n🎯 RESULTADO: {total_passed}/{total_tests} tests PASSED")
+    
+    if total_passed == total_tests:
+        logger.info("=" * 80)
+        return 0
+    else:
+        logger.error(f"\n⚠️ {total_tests - total_passed} tests FALLARON - Revisar arriba")
+        logger.info("=" * 80)
+        return 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+V22.2 HIGH-FIDELITY SIMULATOR - UNIT TESTS
+==========================================
+Verifica la matriz OHLCV alineada (AlignedMarketData), las vistas OHLC
+sin copia para las estrategias (OhlcView) y el sweep de parámetros
+multiproceso.
+
+Ejecutar:
+    python3 test_simulator.py
+"""
+
+import sys
+import os
+import time
+import numpy as np
+
+# Añadir src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.services.simulator.aligned_data import AlignedMarketData
+from src.services.simulator.ohlc_view import OhlcView
+from src.services.simulator.strategy_v20 import RsiMeanReversionV20
+from src.services.simulator.sweep import run_sweep, build_config_grid
+from src.shared.utils import get_logger
+
+logger = get_logger("TestSimulator")
+
+
+def _random_ohlc(n: int = 400, seed: int = 7):
+    """Serie OHLC sintética (random walk)"""
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    highs = closes + rng.uniform(0, 1, n)
+    lows = closes - rng.uniform(0, 1, n)
+    return closes, highs, lows
+
+
+def _close(a: float, b: float, tol: float = 1e-8) -> bool:
+    return abs(a - b) <= tol * max(1.0, abs(b))
+
+
+def test_aligned_market_data():
+    """Test 1: AlignedMarketData - forward fill e historia igual a los filtros por timestamp"""
+    logger.info("=" * 80)
+    logger.info("TEST 1: Aligned market data")
+    logger.info("=" * 80)
+    
+    import pandas as pd
+    
+    frames = {}
+    for symbol, seed, gaps in (('BTC', 1, [5, 6, 300]), ('ETH', 2, list(range(3)) + [400])):
+        c, h, l = _random_ohlc(n=600, seed=seed)
+        df = pd.DataFrame({'timestamp': pd.date_range('2024-01-01', periods=600, freq='1min'),
+                           'open': np.roll(c, 1), 'high': h, 'low': l, 'close': c, 'volume': np.arange(600.0)})
+        frames[symbol] = df.drop(index=gaps).reset_index(drop=True)
+    
+    start = time.perf_counter()
+    aligned = AlignedMarketData.from_frames(frames)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    failed = 0
+    
+    for i in (0, 2, 3, 5, 7, 300, 301, 400, 599):
+        ts = aligned.timestamps[i]
+        for symbol, df in frames.items():
+            previous = df[df['timestamp'] <= ts]
+            expected_price = previous.iloc[-1]['close'] if not previous.empty else None
+            expected_history = df[df['timestamp'] < ts][['open', 'high', 'low', 'close', 'volume']].to_dict('records')
+            if aligned.prices_at(i).get(symbol) != expected_price or aligned.ohlc_view(symbol, i).to_records() != expected_history:
+                logger.error(f"❌ FAIL: {symbol} en {ts}")
+                failed += 1
+    
+    if len(aligned) == 600 and failed == 0:
+        logger.info(f"✅ PASS: {len(aligned)} minutos × {len(aligned.symbols)} símbolos en {elapsed_ms:.1f}ms")
+    
+    return failed == 0 and len(aligned) == 600
+
+
+def test_ohlc_view():
+    """Test 2: OhlcView - estrategia V20 y ATR iguales con vista o lista de dicts"""
+    logger.info("=" * 80)
+    logger.info("TEST 2: OHLC view")
+    logger.info("=" * 80)
+    
+    closes, highs, lows = _random_ohlc(n=300, seed=51)
+    data = np.column_stack([np.roll(closes, 1), highs, lows, closes, np.linspace(1, 3, 300)])
+    records = [dict(zip(('open', 'high', 'low', 'close', 'volume'), row)) for row in data.tolist()]
+    strategy = RsiMeanReversionV20(enable_volume_filter=False)
+    failed = 0
+    
+    for end in range(60, 300, 7):
+        view = OhlcView(data, 0, end)
+        legacy_tr = [max(h - l, abs(h - pc), abs(l - pc)) for h, l, pc in
+                     zip(highs[1:end], lows[1:end], closes[:end - 1])]
+        if not _close(strategy.smart_exit_manager.calculate_atr(view), np.mean(legacy_tr[-14:]), 1e-12):
+            logger.error(f"❌ FAIL: ATR en {end}")
+            failed += 1
+        if strategy.evaluate('TEST', closes[end - 1], view, None) != strategy.evaluate('TEST', closes[end - 1], records[:end], None):
+            logger.error(f"❌ FAIL: Señal V20 distinta en {end}")
+            failed += 1
+    
+    view = OhlcView(data, 0, 120)
+    if view[-1] == records[119] and view[-20:].volume.base is not None and not view.close.flags.writeable:
+        logger.info("✅ PASS: Vista de solo lectura sin copia, compatible con dicts")
+    else:
+        logger.error("❌ FAIL: OhlcView no es una vista de solo lectura")
+        failed += 1
+    
+    return failed == 0
+
+
+def test_parameter_sweep():
+    """Test 3: Sweep - datos memory-mapped y pool igual a simulaciones secuenciales"""
+    logger.info("=" * 80)
+    logger.info("TEST 3: Parameter sweep")
+    logger.info("=" * 80)
+    
+    import pandas as pd
+    import tempfile
+    from src.services.simulator.high_fidelity_backtester import HighFidelityBacktester
+    
+    closes, highs, lows = _random_ohlc(n=400, seed=61)
+    frames = {
+        symbol: pd.DataFrame({'timestamp': pd.date_range('2024-01-01', periods=400, freq='1min'),
+                              'open': np.roll(closes, shift) + 200, 'high': highs + 200, 'low': lows + 200,
+                              'close': closes + 200, 'volume': np.ones(400)})
+        for symbol, shift in (('BTC', 1), ('ETH', 2))
+    }
+    aligned = AlignedMarketData.from_frames(frames)
+    failed = 0
+    
+    loaded = AlignedMarketData.load(aligned.save(tempfile.mkdtemp()), mmap=True)
+    if not (np.array_equal(loaded.values, aligned.values, equal_nan=True) and loaded.timestamps == aligned.timestamps):
+        logger.error("❌ FAIL: save/load memory-mapped no conserva los datos")
+        failed += 1
+    
+    configs = build_config_grid(stop_loss_pct=[1.0, 2.0], cooldown_minutes=[5, 10])
+    variants = {'V20_NoFilters': (RsiMeanReversionV20, {'enable_candle_confirmation': False, 'enable_volume_filter': False})}
+    results = run_sweep(frames, configs, variants, max_workers=2)
+    
+    pnls = [r.result.total_pnl for r in results]
+    if len(results) != 4 or pnls != sorted(pnls, reverse=True):
+        logger.error(f"❌ FAIL: Ranking del sweep {pnls}")
+        failed += 1
+    
+    for r in results:
+        expected = HighFidelityBacktester(r.config).run(frames, RsiMeanReversionV20(**variants['V20_NoFilters'][1]))
+        if expected.equity_curve != r.result.equity_curve:
+            logger.error(f"❌ FAIL: Sweep distinto a simulación directa ({r.config})")
+            failed += 1
+    
+    if failed == 0:
+        logger.info(f"✅ PASS: {len(results)} simulaciones en pool, mejor PnL ${pnls[0]:.2f}")
+    
+    return failed == 0
+
+
+def main():
+    logger.info("=" * 80)
+    logger.info("🧪 V22.2 HIGH-FIDELITY SIMULATOR - UNIT TESTS")
+    logger.info("=" * 80)
+    
+    tests = [
+        ("Aligned Market Data", test_aligned_market_data),
+        ("OHLC View", test_ohlc_view),
+        ("Parameter Sweep", test_parameter_sweep),
+    ]
+    
+    results = []
+    
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            logger.error(f"❌ Test '{test_name}' crashed: {e}")
+            results.append((test_name, False))
+    
+    # Resumen final
+    logger.info("\n" + "=" * 80)
+    logger.info("📊 RESUMEN FINAL DE TESTS")
+    logger.info("=" * 80)
+    
+    total_passed = sum(1 for _, passed in results if passed)
+    total_tests = len(results)
+    
+    for test_name, passed in results:
+        status = "✅ PASS" if passed else "❌ FAIL"
+        logger.info(f"   {status}: {test_name}")
+    
+    logger.info(f"\n🎯 RESULTADO: {total_passed}/{total_tests} tests PASSED")
+    
+    if total_passed == total_tests:
+        logger.info("=" * 80)
+        return 0
+    else:
+        logger.error(f"\n⚠️ {total_tests - total_passed} tests FALLARON - Revisar arriba")
+        logger.info("=" * 80)
+        return 1
+
+
+if __name__ == '__main__':
+    exit_code = main()
+    sys.exit(exit_code)